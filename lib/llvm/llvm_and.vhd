@@ -3,6 +3,8 @@ use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 
 entity llvm_and is
+  generic (
+    delay : natural := 1);
   port (
     clk      : in  std_ulogic;
     sreset   : in  std_ulogic;
@@ -23,9 +25,11 @@ architecture rtl of llvm_and is
 
 begin
 
-  s_tdata_i <= a and b;
+  s_tdata_i <= std_ulogic_vector(resize(unsigned(std_ulogic_vector'(a and b)), s_tdata_i'length));
 
   llvm_buffer_1 : entity work.llvm_buffer(rtl)
+    generic map (
+      delay => delay)
     port map (
       clk      => clk,
       sreset   => sreset,
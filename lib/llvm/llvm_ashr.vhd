@@ -6,6 +6,8 @@ use ieee.numeric_std.to_integer;
 use ieee.numeric_std.unsigned;
 
 entity llvm_ashr is
+  generic (
+    delay : natural := 1);
   port (
     clk      : in  std_ulogic;
     sreset   : in  std_ulogic;
@@ -29,6 +31,8 @@ begin
   s_tdata_i <= std_ulogic_vector(shift_right(unsigned(a), to_integer(unsigned(b))));
   
   llvm_buffer_1 : entity work.llvm_buffer(rtl)
+    generic map (
+      delay => delay)
     port map (
       clk      => clk,
       sreset   => sreset,
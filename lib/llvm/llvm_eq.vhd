@@ -3,6 +3,8 @@ use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 
 entity llvm_eq is
+  generic (
+    delay : natural := 1);
   port (
     clk      : in  std_ulogic;
     sreset   : in  std_ulogic;
@@ -26,6 +28,8 @@ begin
   s_tdata_i <= (others => '1') when (a = b) else (others => '0');
   
   llvm_buffer_1 : entity work.llvm_buffer(rtl)
+    generic map (
+      delay => delay)
     port map (
       clk      => clk,
       sreset   => sreset,
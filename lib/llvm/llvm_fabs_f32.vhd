@@ -3,6 +3,8 @@ use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 
 entity llvm_fabs_f32 is
+  generic (
+    delay : natural := 1);
   port (
     a        : in  std_ulogic_vector;
     m_tdata  : out std_ulogic_vector;
@@ -41,6 +43,8 @@ begin
   s_tdata_i <= to_slv(q_i);
 
   llvm_buffer_1 : entity work.llvm_buffer(rtl)
+    generic map (
+      delay => delay)
     port map (
       clk      => clk,
       sreset   => sreset,
@@ -3,6 +3,8 @@ use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 
 entity llvm_fadd is
+  generic (
+    delay : natural := 1);
   port (
     clk      : in  std_ulogic;
     sreset   : in  std_ulogic;
@@ -43,6 +45,8 @@ begin
   s_tdata_i <= to_slv(q_i);
 
   llvm_buffer_1 : entity work.llvm_buffer(rtl)
+    generic map (
+      delay => delay)
     port map (
       clk      => clk,
       sreset   => sreset,
@@ -3,6 +3,8 @@ use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 
 entity llvm_getelementptr is
+  generic (
+    delay : natural := 1);
   port (
     a        : in  std_ulogic_vector;
     offset   : in  std_ulogic_vector;
@@ -33,6 +35,8 @@ begin
   s_tdata_i <= std_ulogic_vector(q_i);
 
   llvm_buffer_1 : entity work.llvm_buffer(rtl)
+    generic map (
+      delay => delay)
     port map (
       clk      => clk,
       sreset   => sreset,
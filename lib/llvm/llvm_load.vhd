@@ -46,22 +46,38 @@ architecture rtl of llvm_load is
 
   signal tag_storage_i   : tag_storage_t;
   signal data_transfer_i : std_ulogic;
+  signal read_transfer_i : std_ulogic;
   signal id_i            : natural range 0 to c_id_size - 1 := 0;
+  signal outstanding_i   : natural range 0 to c_id_size     := 0;
+  signal m_arvalid_i     : std_ulogic;
+  signal m_rready_i      : std_ulogic;
+  signal m_tvalid_i      : std_ulogic;
+  signal id_free_i       : std_ulogic;
 
 begin
 
-  s_tready <= (not m_arvalid or m_arready) and
-              (not m_rvalid or m_rready);
+  -- A new load is only accepted when its id is not in use by an outstanding
+  -- load, otherwise the tag of the outstanding load would be overwritten
+  id_free_i <= '1' when outstanding_i < c_id_size else '0';
+
+  s_tready <= (not m_arvalid_i or m_arready) and
+              (not m_rvalid or m_rready_i) and id_free_i;
 
   data_transfer_i <= s_tvalid and s_tready;
 
+  m_arvalid <= m_arvalid_i;
+
   process (clk)
     variable id_v : std_ulogic_vector(0 to c_id_width - 1);
   begin
     if rising_edge(clk) then
-      m_arvalid <= '0';
+      if sreset = '1' then
+        m_arvalid_i <= '0';
+      elsif m_arready = '1' then
+        m_arvalid_i <= '0';
+      end if;
       if (data_transfer_i = '1') then
-        m_arvalid           <= '1';
+        m_arvalid_i         <= '1';
         m_araddr            <= std_ulogic_vector(resize(unsigned(a), m_araddr'length));
         id_v                := std_ulogic_vector(to_unsigned(id_i, c_id_width));
         m_arid              <= id_v;
@@ -74,24 +90,45 @@ begin
     end if;
   end process;
 
-  m_rready <= m_tready or (not m_tvalid);
+  process (clk)
+  begin
+    if rising_edge(clk) then
+      if sreset = '1' then
+        outstanding_i <= 0;
+      elsif data_transfer_i = '1' and read_transfer_i = '0' then
+        outstanding_i <= outstanding_i + 1;
+      elsif data_transfer_i = '0' and read_transfer_i = '1' then
+        outstanding_i <= outstanding_i - 1;
+      end if;
+    end if;
+  end process;
+
+  m_rready_i <= m_tready or (not m_tvalid_i);
 
+  m_rready <= m_rready_i;
+
+  m_tvalid <= m_tvalid_i;
+
+  read_transfer_i <= m_rvalid and m_rready_i;
+
+  -- The read data is captured on every read transfer, also when the output
+  -- is empty and m_tready is low
   process (clk)
   begin
     if rising_edge(clk) then
       if sreset = '1' then
-        m_tvalid <= '0';
+        m_tvalid_i <= '0';
       else
         if m_tready = '1' then
-          m_tvalid <= '0';
-          if m_rvalid = '1' then
-            m_tag    <= tag_storage_i(to_integer(unsigned(m_rid)));
-            m_tvalid <= '1';
-            m_tdata  <= m_rdata;
-            --pragma synthesis_off
-            report "Load data 0x" & std_ulogic_vector_to_hex(m_rdata);
-            --pragma synthesis_on
-          end if;
+          m_tvalid_i <= '0';
+        end if;
+        if read_transfer_i = '1' then
+          m_tag      <= tag_storage_i(to_integer(unsigned(m_rid)));
+          m_tvalid_i <= '1';
+          m_tdata    <= m_rdata;
+          --pragma synthesis_off
+          report "Load data 0x" & std_ulogic_vector_to_hex(m_rdata);
+          --pragma synthesis_on
         end if;
       end if;
     end if;
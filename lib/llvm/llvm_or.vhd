@@ -4,6 +4,8 @@ use ieee.numeric_std.all;
 use ieee.numeric_std.resize;
 
 entity llvm_or is
+  generic (
+    delay : natural := 1);
   port (
     clk      : in  std_ulogic;
     sreset   : in  std_ulogic;
@@ -31,6 +33,8 @@ begin
   s_tdata_i <= std_ulogic_vector(resize(unsigned(x), s_tdata_i'length)); 
 
   llvm_buffer_1 : entity work.llvm_buffer(rtl)
+  generic map (
+    delay => delay)
   port map (
     clk      => clk,
     sreset   => sreset,
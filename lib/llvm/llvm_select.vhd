@@ -3,6 +3,8 @@ use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 
 entity llvm_select is
+  generic (
+    delay : natural := 1);
   port (
     clk      : in  std_ulogic;
     sreset   : in  std_ulogic;
@@ -24,9 +26,12 @@ architecture rtl of llvm_select is
 
 begin
 
-  s_tdata_i <= c when (unsigned(a) = 0) else b;
+  s_tdata_i <= std_ulogic_vector(resize(unsigned(c), s_tdata_i'length)) when (unsigned(a) = 0) else
+               std_ulogic_vector(resize(unsigned(b), s_tdata_i'length));
 
   llvm_buffer_1 : entity work.llvm_buffer(rtl)
+  generic map (
+    delay => delay)
   port map (
     clk      => clk,
     sreset   => sreset,
@@ -0,0 +1,75 @@
+library ieee;
+use ieee.std_logic_1164.all;
+
+-- Two entry skid buffer. s_tready is registered, so the ready path of a
+-- pipeline is cut, and a token that arrives while the output is stalled is
+-- kept in the skid register instead of being dropped.
+
+entity llvm_skid_buffer is
+  port (
+    clk      : in  std_ulogic;
+    sreset   : in  std_ulogic;
+    s_tag    : in  std_ulogic_vector;
+    s_tvalid : in  std_ulogic;
+    s_tready : out std_ulogic;
+    s_tdata  : in  std_ulogic_vector;
+    m_tvalid : out std_ulogic;
+    m_tready : in  std_ulogic;
+    m_tag    : out std_ulogic_vector;
+    m_tdata  : out std_ulogic_vector
+    );
+end entity llvm_skid_buffer;
+
+architecture rtl of llvm_skid_buffer is
+
+  signal m_tvalid_i    : std_ulogic;
+  signal skid_tvalid_i : std_ulogic;
+  signal skid_tag_i    : std_ulogic_vector(0 to s_tag'length - 1);
+  signal skid_tdata_i  : std_ulogic_vector(0 to s_tdata'length - 1);
+
+begin
+
+  s_tready <= not skid_tvalid_i;
+
+  m_tvalid <= m_tvalid_i;
+
+  process (clk)
+  begin
+    if rising_edge(clk) then
+      if sreset = '1' then
+        m_tvalid_i    <= '0';
+        skid_tvalid_i <= '0';
+      else
+        if m_tvalid_i = '0' or m_tready = '1' then
+          if skid_tvalid_i = '1' then
+            m_tvalid_i    <= '1';
+            skid_tvalid_i <= '0';
+          else
+            m_tvalid_i <= s_tvalid;
+          end if;
+        elsif s_tvalid = '1' and skid_tvalid_i = '0' then
+          skid_tvalid_i <= '1';
+        end if;
+      end if;
+    end if;
+  end process;
+
+  process (clk)
+  begin
+    if rising_edge(clk) then
+      if m_tvalid_i = '0' or m_tready = '1' then
+        if skid_tvalid_i = '1' then
+          m_tag   <= skid_tag_i;
+          m_tdata <= skid_tdata_i;
+        else
+          m_tag   <= s_tag;
+          m_tdata <= s_tdata;
+        end if;
+      elsif skid_tvalid_i = '0' then
+        skid_tag_i   <= s_tag;
+        skid_tdata_i <= s_tdata;
+      end if;
+    end if;
+  end process;
+
+end architecture rtl;
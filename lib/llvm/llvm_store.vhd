@@ -42,13 +42,25 @@ architecture rtl of llvm_store is
   type tag_storage_t is array (0 to c_id_size - 1) of
     std_ulogic_vector(0 to s_tag'length - 1);
 
-  signal tag_storage_i   : tag_storage_t;
-  signal data_transfer_i : std_ulogic;
-  signal id_i            : natural range 0 to c_id_size - 1 := 0;
+  signal tag_storage_i    : tag_storage_t;
+  signal data_transfer_i  : std_ulogic;
+  signal write_response_i : std_ulogic;
+  signal id_i             : natural range 0 to c_id_size - 1 := 0;
+  signal outstanding_i    : natural range 0 to c_id_size     := 0;
+  signal m_wvalid_i       : std_ulogic;
+  signal m_bready_i       : std_ulogic;
+  signal m_tvalid_i       : std_ulogic;
+  signal id_free_i        : std_ulogic;
 
 begin
 
-  s_tready <= (not m_wvalid or m_wready);
+  -- A new store is only accepted when its id is not in use by an outstanding
+  -- store, otherwise the tag of the outstanding store would be overwritten
+  id_free_i <= '1' when outstanding_i < c_id_size else '0';
+
+  s_tready <= (not m_wvalid_i or m_wready) and id_free_i;
+
+  m_wvalid <= m_wvalid_i;
 
   data_transfer_i <= s_tvalid and s_tready;
 
@@ -57,13 +69,13 @@ begin
   begin
     if rising_edge(clk) then
       if sreset = '1' then
-        m_wvalid <= '0';
+        m_wvalid_i <= '0';
       else
         if m_wready = '1' then
-          m_wvalid <= '0';
+          m_wvalid_i <= '0';
         end if;
         if (data_transfer_i = '1') then
-          m_wvalid            <= '1';
+          m_wvalid_i          <= '1';
           m_awaddr            <= std_ulogic_vector(resize(unsigned(b), m_awaddr'length));
           id_v                := std_ulogic_vector(to_unsigned(id_i, c_id_width));
           m_wid               <= id_v;
@@ -75,20 +87,39 @@ begin
     end if;
   end process;
 
-  m_bready <= m_tready or (not m_tvalid);
+  process (clk)
+  begin
+    if rising_edge(clk) then
+      if sreset = '1' then
+        outstanding_i <= 0;
+      elsif data_transfer_i = '1' and write_response_i = '0' then
+        outstanding_i <= outstanding_i + 1;
+      elsif data_transfer_i = '0' and write_response_i = '1' then
+        outstanding_i <= outstanding_i - 1;
+      end if;
+    end if;
+  end process;
+
+  m_bready_i <= m_tready or (not m_tvalid_i);
+
+  m_bready <= m_bready_i;
+
+  m_tvalid <= m_tvalid_i;
+
+  write_response_i <= m_bvalid and m_bready_i;
 
   process (clk)
   begin
     if rising_edge(clk) then
       if sreset = '1' then
-        m_tvalid <= '0';
+        m_tvalid_i <= '0';
       else
         if m_tready = '1' then
-          m_tvalid <= '0';
+          m_tvalid_i <= '0';
         end if;
-        if m_bvalid = '1' and (m_bready = '1' or m_tvalid = '0') then
-          m_tag    <= tag_storage_i(to_integer(unsigned(m_bid)));
-          m_tvalid <= '1';
+        if write_response_i = '1' then
+          m_tag      <= tag_storage_i(to_integer(unsigned(m_bid)));
+          m_tvalid_i <= '1';
         end if;
       end if;
     end if;
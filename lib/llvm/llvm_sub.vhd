@@ -3,6 +3,8 @@ use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 
 entity llvm_sub is
+  generic (
+    delay : natural := 1);
   port (
     clk      : in  std_ulogic;
     sreset   : in  std_ulogic;
@@ -21,7 +23,6 @@ architecture rtl of llvm_sub is
 
   signal a_i : unsigned(0 to a'length - 1);
   signal b_i : unsigned(0 to b'length - 1);
-  signal q_i : unsigned(0 to m_tdata'length - 1);
 
   signal s_tdata_i : std_ulogic_vector(0 to m_tdata'length - 1);
 
@@ -31,11 +32,11 @@ begin
 
   b_i <= unsigned(b);
 
-  q_i <= a_i - b_i;
-
-  s_tdata_i <= std_ulogic_vector(q_i);
+  s_tdata_i <= std_ulogic_vector(resize(a_i - b_i, s_tdata_i'length));
 
   llvm_buffer_1 : entity work.llvm_buffer(rtl)
+    generic map (
+      delay => delay)
     port map (
       clk      => clk,
       sreset   => sreset,
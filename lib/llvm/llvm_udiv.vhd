@@ -0,0 +1,53 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+entity llvm_udiv is
+  generic (
+    delay : natural := 1);
+  port (
+    clk      : in  std_ulogic;
+    sreset   : in  std_ulogic;
+    a        : in  std_ulogic_vector;
+    b        : in  std_ulogic_vector;
+    s_tag    : in  std_ulogic_vector;
+    s_tvalid : in  std_ulogic;
+    s_tready : out std_ulogic;
+    m_tvalid : out std_ulogic;
+    m_tready : in  std_ulogic;
+    m_tag    : out std_ulogic_vector;
+    m_tdata  : out std_ulogic_vector);
+end entity llvm_udiv;
+
+architecture rtl of llvm_udiv is
+
+  signal a_i : unsigned(0 to a'length - 1);
+  signal b_i : unsigned(0 to b'length - 1);
+
+  signal s_tdata_i : std_ulogic_vector(0 to m_tdata'length - 1);
+
+begin
+
+  a_i <= unsigned(a);
+
+  b_i <= unsigned(b);
+
+  -- Division by zero is undefined in llvm, the result is zero
+  s_tdata_i <= (others => '0') when (b_i = 0) else std_ulogic_vector(resize(a_i / b_i, s_tdata_i'length));
+
+  llvm_buffer_1 : entity work.llvm_buffer(rtl)
+    generic map (
+      delay => delay)
+    port map (
+      clk      => clk,
+      sreset   => sreset,
+      s_tag    => s_tag,
+      s_tvalid => s_tvalid,
+      s_tready => s_tready,
+      s_tdata  => s_tdata_i,
+      m_tvalid => m_tvalid,
+      m_tready => m_tready,
+      m_tag    => m_tag,
+      m_tdata  => m_tdata);
+
+end architecture rtl;
@@ -2,7 +2,29 @@ library ieee;
 use ieee.std_logic_1164.all;
 use ieee.numeric_std.all;
 
+-- Arbiter of the accessors of one memory. The read channels (ar, r) and the
+-- write channels (aw, w, b) are arbitrated independently. The grant of every
+-- transfer is stored under the id that is sent to the memory, so a master can
+-- have several reads in flight and the responses are routed back by id.
+-- The default generics give the fixed priority arbiter without a limit on the
+-- reads in flight and without register slices.
+--   round_robin        : Grant the next requester after the last granted one
+--                        instead of the lowest index
+--   weights            : Consecutive grants of each requester in round robin
+--                        mode, requesters without a weight have weight 1
+--   outstanding        : Reads that may be in flight, at most 2 ** id width,
+--                        0 is only limited by the ids
+--   request_registers  : Register slices on the ar and the aw/w channel
+--   response_registers : Register slices on the r and the b channel
+
 entity arbiter is
+  generic (
+    round_robin        : boolean        := false;
+    weights            : integer_vector := (0 => 1);
+    outstanding        : natural        := 0;
+    request_registers  : natural        := 0;
+    response_registers : natural        := 0
+    );
   port (
     clk       : in  std_ulogic;
     sreset    : in  std_ulogic;
@@ -43,9 +65,10 @@ end entity arbiter;
 
 architecture rtl of arbiter is
 
-  constant c_size     : positive := s_arvalid'length;
-  constant c_id_width : positive := m_rid'length;
-  constant c_id_size  : positive := 2 ** c_id_width;
+  constant c_size        : positive := s_arvalid'length;
+  constant c_id_width    : positive := m_rid'length;
+  constant c_id_size     : positive := 2 ** c_id_width;
+  constant c_outstanding : natural  := minimum(outstanding, c_id_size);
 
   type tag_t is record
     id    : std_ulogic_vector(0 to c_id_width - 1);
@@ -66,6 +89,37 @@ architecture rtl of arbiter is
     return 0;
   end function first;
 
+  function get_weight(index : natural)
+    return positive is
+    alias x : integer_vector(0 to weights'length - 1) is weights;
+  begin
+    if index < x'length and x(index) > 0 then
+      return x(index);
+    end if;
+    return 1;
+  end function get_weight;
+
+  -- The last granted requester keeps the grant until it has used its weight,
+  -- then the first requester after it in cyclic order is granted
+  function next_grant(data  : std_ulogic_vector;
+                      last  : natural;
+                      count : natural)
+    return natural is
+    alias x     : std_ulogic_vector(0 to data'length - 1) is data;
+    variable i_v : natural;
+  begin
+    if x(last) = '1' and count < get_weight(last) then
+      return last;
+    end if;
+    for i in 1 to c_size loop
+      i_v := (last + i) mod c_size;
+      if x(i_v) = '1' then
+        return i_v;
+      end if;
+    end loop;
+    return last;
+  end function next_grant;
+
   function get(data  : std_ulogic_vector;
                grant : natural)
     return std_ulogic_vector is
@@ -99,6 +153,9 @@ architecture rtl of arbiter is
     return x;
   end function copy_all;
 
+  constant c_addr_width : positive := m_araddr'length;
+  constant c_data_width : positive := m_wdata'length;
+
   signal ar_tag_i : tag_array_t;
   signal ar_id_i  : natural range 0 to c_id_size - 1;
   signal r_id_i   : natural range 0 to c_id_size - 1;
@@ -116,22 +173,104 @@ architecture rtl of arbiter is
   signal w_grant_i  : integer range 0 to c_size - 1;
   signal b_grant_i  : integer range 0 to c_size - 1;
 
+  -- The last requester has used its weight, so the first grant goes to 0
+  signal ar_last_i  : integer range 0 to c_size - 1 := c_size - 1;
+  signal ar_count_i : natural                       := get_weight(c_size - 1);
+  signal w_last_i   : integer range 0 to c_size - 1 := c_size - 1;
+  signal w_count_i  : natural                       := get_weight(c_size - 1);
+
+  signal ar_outstanding_i : natural range 0 to c_outstanding;
+  signal ar_enable_i      : std_ulogic;
+
   signal ar_transfer_i : boolean;
+  signal r_transfer_i  : boolean;
   signal w_transfer_i  : boolean;
 
+  -- The channels between the arbitration and the register slices
+  signal arvalid_i : std_ulogic;
+  signal arready_i : std_ulogic;
+  signal ar_data_i : std_ulogic_vector(0 to c_addr_width + c_id_width - 1);
+  signal m_ar_i    : std_ulogic_vector(0 to c_addr_width + c_id_width - 1);
+  signal rvalid_i  : std_ulogic;
+  signal rready_i  : std_ulogic;
+  signal r_data_i  : std_ulogic_vector(0 to c_data_width + c_id_width - 1);
+  signal rdata_i   : std_ulogic_vector(0 to c_data_width - 1);
+  signal rid_i     : std_ulogic_vector(0 to c_id_width - 1);
+  signal wvalid_i  : std_ulogic;
+  signal wready_i  : std_ulogic;
+  signal w_data_i  : std_ulogic_vector(0 to c_addr_width + c_data_width + c_id_width - 1);
+  signal m_w_i     : std_ulogic_vector(0 to c_addr_width + c_data_width + c_id_width - 1);
+  signal bvalid_i  : std_ulogic;
+  signal bready_i  : std_ulogic;
+  signal bid_i     : std_ulogic_vector(0 to c_id_width - 1);
+
 begin
 
-  ar_grant_i <= first(s_arvalid);
-  w_grant_i  <= first(s_wvalid);
+  fixed_priority_g : if not round_robin generate
+
+    ar_grant_i <= first(s_arvalid);
+    w_grant_i  <= first(s_wvalid);
+
+  else generate
+
+    ar_grant_i <= next_grant(s_arvalid, ar_last_i, ar_count_i);
+    w_grant_i  <= next_grant(s_wvalid, w_last_i, w_count_i);
+
+    process (clk) is
+    begin
+      if rising_edge(clk) then
+        if ar_transfer_i then
+          ar_last_i  <= ar_grant_i;
+          ar_count_i <= minimum(ar_count_i + 1, get_weight(ar_grant_i)) when ar_grant_i = ar_last_i else 1;
+        end if;
+        if w_transfer_i then
+          w_last_i  <= w_grant_i;
+          w_count_i <= minimum(w_count_i + 1, get_weight(w_grant_i)) when w_grant_i = w_last_i else 1;
+        end if;
+        if sreset = '1' then
+          ar_last_i  <= c_size - 1;
+          ar_count_i <= get_weight(c_size - 1);
+          w_last_i   <= c_size - 1;
+          w_count_i  <= get_weight(c_size - 1);
+        end if;
+      end if;
+    end process;
+
+  end generate fixed_priority_g;
+
+  unlimited_g : if c_outstanding = 0 generate
 
-  m_arvalid <= s_arvalid(ar_grant_i);
-  m_wvalid  <= s_wvalid(w_grant_i);
+    ar_enable_i <= '1';
 
-  s_arready <= drive_one(m_arready, ar_grant_i, s_arready'length);
-  s_wready  <= drive_one(m_wready, w_grant_i, s_wready'length);
+  else generate
 
-  ar_transfer_i <= (m_arvalid = '1' and m_arready = '1');
-  w_transfer_i  <= (m_wvalid = '1' and m_wready = '1');
+    ar_enable_i <= '1' when ar_outstanding_i < c_outstanding else '0';
+
+    process (clk) is
+    begin
+      if rising_edge(clk) then
+        if ar_transfer_i and not r_transfer_i then
+          ar_outstanding_i <= ar_outstanding_i + 1;
+        elsif r_transfer_i and not ar_transfer_i then
+          ar_outstanding_i <= ar_outstanding_i - 1;
+        end if;
+        if sreset = '1' then
+          ar_outstanding_i <= 0;
+        end if;
+      end if;
+    end process;
+
+  end generate unlimited_g;
+
+  arvalid_i <= s_arvalid(ar_grant_i) and ar_enable_i;
+  wvalid_i  <= s_wvalid(w_grant_i);
+
+  s_arready <= drive_one(arready_i and ar_enable_i, ar_grant_i, s_arready'length);
+  s_wready  <= drive_one(wready_i, w_grant_i, s_wready'length);
+
+  ar_transfer_i <= (arvalid_i = '1' and arready_i = '1');
+  r_transfer_i  <= (rvalid_i = '1' and rready_i = '1');
+  w_transfer_i  <= (wvalid_i = '1' and wready_i = '1');
 
   s_arid_i <= get(s_arid, ar_grant_i);
 
@@ -149,31 +288,115 @@ begin
     end if;
   end process;
 
-  r_id_i    <= to_integer(unsigned(m_rid));
+  r_id_i    <= to_integer(unsigned(rid_i));
   r_grant_i <= ar_tag_i(r_id_i).grant;
 
-  s_rdata  <= copy_all(m_rdata, s_rdata'length);
+  s_rdata  <= copy_all(rdata_i, s_rdata'length);
   s_rid_i  <= ar_tag_i(r_id_i).id;
   s_rid    <= copy_all(s_rid_i, s_rid'length);
-  s_rvalid <= drive_one(m_rvalid, r_grant_i, s_rvalid'length);
+  s_rvalid <= drive_one(rvalid_i, r_grant_i, s_rvalid'length);
 
-  m_araddr <= get(s_araddr, ar_grant_i);
-  m_arid   <= std_ulogic_vector(to_unsigned(ar_id_i, m_arid'length));
-  m_rready <= s_rready(r_grant_i);
-
-  m_awaddr <= get(s_awaddr, w_grant_i);
-  m_wid    <= std_ulogic_vector(to_unsigned(w_id_i, m_wid'length));
+  ar_data_i <= get(s_araddr, ar_grant_i) & std_ulogic_vector(to_unsigned(ar_id_i, c_id_width));
+  rready_i  <= s_rready(r_grant_i);
 
   s_wid_i <= get(s_wid, w_grant_i);
 
-  m_wdata  <= get(s_wdata, w_grant_i);
+  w_data_i <= get(s_awaddr, w_grant_i) & get(s_wdata, w_grant_i) & std_ulogic_vector(to_unsigned(w_id_i, c_id_width));
 
-  b_id_i    <= to_integer(unsigned(m_bid));
+  b_id_i    <= to_integer(unsigned(bid_i));
   b_grant_i <= w_tag_i(b_id_i).grant;
 
-  m_bready <= s_bready(b_grant_i);
+  bready_i <= s_bready(b_grant_i);
 
-  s_bvalid <= drive_one(m_bvalid, b_grant_i, s_bvalid'length);
+  s_bvalid <= drive_one(bvalid_i, b_grant_i, s_bvalid'length);
   s_bid    <= copy_all(w_tag_i(b_id_i).id, s_bid'length);
 
+  request_g : if request_registers = 0 generate
+
+    m_arvalid <= arvalid_i;
+    arready_i <= m_arready;
+    m_ar_i    <= ar_data_i;
+    m_wvalid  <= wvalid_i;
+    wready_i  <= m_wready;
+    m_w_i     <= w_data_i;
+
+  else generate
+
+    ar_pipeline_1 : entity work.register_pipeline(rtl)
+      generic map (
+        stages => request_registers)
+      port map (
+        clk     => clk,
+        sreset  => sreset,
+        s_valid => arvalid_i,
+        s_ready => arready_i,
+        s_data  => ar_data_i,
+        m_valid => m_arvalid,
+        m_ready => m_arready,
+        m_data  => m_ar_i);
+
+    w_pipeline_1 : entity work.register_pipeline(rtl)
+      generic map (
+        stages => request_registers)
+      port map (
+        clk     => clk,
+        sreset  => sreset,
+        s_valid => wvalid_i,
+        s_ready => wready_i,
+        s_data  => w_data_i,
+        m_valid => m_wvalid,
+        m_ready => m_wready,
+        m_data  => m_w_i);
+
+  end generate request_g;
+
+  m_araddr <= m_ar_i(0 to c_addr_width - 1);
+  m_arid   <= m_ar_i(c_addr_width to c_addr_width + c_id_width - 1);
+
+  m_awaddr <= m_w_i(0 to c_addr_width - 1);
+  m_wdata  <= m_w_i(c_addr_width to c_addr_width + c_data_width - 1);
+  m_wid    <= m_w_i(c_addr_width + c_data_width to c_addr_width + c_data_width + c_id_width - 1);
+
+  response_g : if response_registers = 0 generate
+
+    rvalid_i <= m_rvalid;
+    m_rready <= rready_i;
+    r_data_i <= std_ulogic_vector(m_rdata) & std_ulogic_vector(m_rid);
+    bvalid_i <= m_bvalid;
+    m_bready <= bready_i;
+    bid_i    <= m_bid;
+
+  else generate
+
+    r_pipeline_1 : entity work.register_pipeline(rtl)
+      generic map (
+        stages => response_registers)
+      port map (
+        clk     => clk,
+        sreset  => sreset,
+        s_valid => m_rvalid,
+        s_ready => m_rready,
+        s_data  => std_ulogic_vector(m_rdata) & std_ulogic_vector(m_rid),
+        m_valid => rvalid_i,
+        m_ready => rready_i,
+        m_data  => r_data_i);
+
+    b_pipeline_1 : entity work.register_pipeline(rtl)
+      generic map (
+        stages => response_registers)
+      port map (
+        clk     => clk,
+        sreset  => sreset,
+        s_valid => m_bvalid,
+        s_ready => m_bready,
+        s_data  => m_bid,
+        m_valid => bvalid_i,
+        m_ready => bready_i,
+        m_data  => bid_i);
+
+  end generate response_g;
+
+  rdata_i <= r_data_i(0 to c_data_width - 1);
+  rid_i   <= r_data_i(c_data_width to c_data_width + c_id_width - 1);
+
 end architecture rtl;
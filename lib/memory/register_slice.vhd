@@ -0,0 +1,128 @@
+library ieee;
+use ieee.std_logic_1164.all;
+
+-- Two entry register slice of a valid/ready channel. Both the data and the
+-- ready path are registered, so a slice cuts the timing path of a memory
+-- channel without reducing its throughput.
+
+entity register_slice is
+  port (
+    clk     : in  std_ulogic;
+    sreset  : in  std_ulogic;
+    s_valid : in  std_ulogic;
+    s_ready : out std_ulogic;
+    s_data  : in  std_ulogic_vector;
+    m_valid : out std_ulogic;
+    m_ready : in  std_ulogic;
+    m_data  : out std_ulogic_vector
+    );
+end entity register_slice;
+
+architecture rtl of register_slice is
+
+  signal m_valid_i    : std_ulogic;
+  signal skid_valid_i : std_ulogic;
+  signal m_data_i     : std_ulogic_vector(0 to s_data'length - 1);
+  signal skid_data_i  : std_ulogic_vector(0 to s_data'length - 1);
+
+begin
+
+  s_ready <= not skid_valid_i;
+
+  m_valid <= m_valid_i;
+
+  m_data <= m_data_i;
+
+  process (clk)
+  begin
+    if rising_edge(clk) then
+      if sreset = '1' then
+        m_valid_i    <= '0';
+        skid_valid_i <= '0';
+      else
+        if m_valid_i = '0' or m_ready = '1' then
+          if skid_valid_i = '1' then
+            m_valid_i    <= '1';
+            skid_valid_i <= '0';
+          else
+            m_valid_i <= s_valid;
+          end if;
+        elsif s_valid = '1' and skid_valid_i = '0' then
+          skid_valid_i <= '1';
+        end if;
+      end if;
+    end if;
+  end process;
+
+  process (clk)
+  begin
+    if rising_edge(clk) then
+      if m_valid_i = '0' or m_ready = '1' then
+        if skid_valid_i = '1' then
+          m_data_i <= skid_data_i;
+        else
+          m_data_i <= s_data;
+        end if;
+      elsif skid_valid_i = '0' then
+        skid_data_i <= s_data;
+      end if;
+    end if;
+  end process;
+
+end architecture rtl;
+
+library ieee;
+use ieee.std_logic_1164.all;
+
+-- A chain of stages register slices, or a plain connection when stages is 0
+
+entity register_pipeline is
+  generic (
+    stages : natural := 0
+    );
+  port (
+    clk     : in  std_ulogic;
+    sreset  : in  std_ulogic;
+    s_valid : in  std_ulogic;
+    s_ready : out std_ulogic;
+    s_data  : in  std_ulogic_vector;
+    m_valid : out std_ulogic;
+    m_ready : in  std_ulogic;
+    m_data  : out std_ulogic_vector
+    );
+end entity register_pipeline;
+
+architecture rtl of register_pipeline is
+
+  type data_array_t is array (natural range <>) of std_ulogic_vector(0 to s_data'length - 1);
+
+  signal valid_i : std_ulogic_vector(0 to stages);
+  signal ready_i : std_ulogic_vector(0 to stages);
+  signal data_i  : data_array_t(0 to stages);
+
+begin
+
+  valid_i(0) <= s_valid;
+  s_ready    <= ready_i(0);
+  data_i(0)  <= s_data;
+
+  stages_g : for i in 0 to stages - 1 generate
+
+    register_slice_1 : entity work.register_slice(rtl)
+      port map (
+        clk     => clk,
+        sreset  => sreset,
+        s_valid => valid_i(i),
+        s_ready => ready_i(i),
+        s_data  => data_i(i),
+        m_valid => valid_i(i + 1),
+        m_ready => ready_i(i + 1),
+        m_data  => data_i(i + 1));
+
+  end generate stages_g;
+
+  m_valid         <= valid_i(stages);
+  ready_i(stages) <= m_ready;
+  m_data          <= data_i(stages);
+
+end architecture rtl;
@@ -0,0 +1,224 @@
+-- Testbench of memory.arbiter. All the masters read all the time from a
+-- memory that returns the address as data, so the order of the grants is the
+-- order of the arbitration. Each master reads its own index as address and
+-- id and checks that its responses are routed back to it.
+entity arbiter_test is
+  generic (
+    g_round_robin : boolean := false;
+    g_weighted    : boolean := false;
+    g_outstanding : natural := 0;
+    g_registers   : natural := 0);
+end entity arbiter_test;
+
+use std.env.finish;
+
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+architecture behavior of arbiter_test is
+
+  constant c_clock_period : time     := 10 ns;
+  constant c_timeout      : time     := c_clock_period * 200;
+  constant c_size         : positive := 3;
+  constant c_addr_width   : positive := 8;
+  constant c_data_width   : positive := 8;
+  constant c_id_width     : positive := 4;
+  constant c_grants       : positive := 16;
+
+  function get_weights
+    return integer_vector is
+  begin
+    if g_weighted then
+      return (0 => 2, 1 => 1, 2 => 3);
+    end if;
+    return (0 => 1, 1 => 1, 2 => 1);
+  end function get_weights;
+
+  constant c_weights : integer_vector(0 to c_size - 1) := get_weights;
+
+  -- The grant of transfer n when all the masters request
+  function expected_grant(n : natural)
+    return natural is
+    variable grant_v : natural := 0;
+    variable count_v : natural := 0;
+  begin
+    if not g_round_robin then
+      return 0;
+    end if;
+    for i in 1 to n loop
+      count_v := count_v + 1;
+      if count_v = c_weights(grant_v) then
+        grant_v := (grant_v + 1) mod c_size;
+        count_v := 0;
+      end if;
+    end loop;
+    return grant_v;
+  end function expected_grant;
+
+  function get_all(width : positive)
+    return std_ulogic_vector is
+    variable x : std_ulogic_vector(0 to c_size * width - 1);
+  begin
+    for i in 0 to c_size - 1 loop
+      x(i * width to (i + 1) * width - 1) := std_ulogic_vector(to_unsigned(i, width));
+    end loop;
+    return x;
+  end function get_all;
+
+  function get(data  : std_ulogic_vector;
+               index : natural;
+               width : positive)
+    return natural is
+    alias x : std_ulogic_vector(0 to data'length - 1) is data;
+  begin
+    return to_integer(unsigned(x(index * width to (index + 1) * width - 1)));
+  end function get;
+
+  constant c_ones   : std_ulogic_vector(0 to c_size - 1)     := (others => '1');
+  constant c_zeros  : std_ulogic_vector(0 to c_size - 1)     := (others => '0');
+  constant c_no_bid : std_ulogic_vector(0 to c_id_width - 1) := (others => '0');
+  constant c_addrs  : std_ulogic_vector                      := get_all(c_addr_width);
+  constant c_data   : std_ulogic_vector                      := get_all(c_data_width);
+  constant c_ids    : std_ulogic_vector                      := get_all(c_id_width);
+
+  signal clk    : std_ulogic := '0';
+  signal sreset : std_ulogic;
+
+  signal s_arvalid : std_ulogic_vector(0 to c_size - 1);
+  signal s_arready : std_ulogic_vector(0 to c_size - 1);
+  signal s_rdata   : std_ulogic_vector(0 to c_size * c_data_width - 1);
+  signal s_rid     : std_logic_vector(0 to c_size * c_id_width - 1);
+  signal s_rvalid  : std_ulogic_vector(0 to c_size - 1);
+  signal s_wready  : std_ulogic_vector(0 to c_size - 1);
+  signal s_bvalid  : std_ulogic_vector(0 to c_size - 1);
+  signal s_bid     : std_ulogic_vector(0 to c_size * c_id_width - 1);
+
+  signal m_araddr  : std_ulogic_vector(0 to c_addr_width - 1);
+  signal m_arid    : std_ulogic_vector(0 to c_id_width - 1);
+  signal m_arvalid : std_ulogic;
+  signal m_arready : std_ulogic;
+  signal m_rdata   : std_ulogic_vector(0 to c_data_width - 1);
+  signal m_rid     : std_logic_vector(0 to c_id_width - 1);
+  signal m_rvalid  : std_ulogic := '0';
+  signal m_rready  : std_ulogic;
+  signal m_awaddr  : std_ulogic_vector(0 to c_addr_width - 1);
+  signal m_wvalid  : std_ulogic;
+  signal m_wdata   : std_ulogic_vector(0 to c_data_width - 1);
+  signal m_wid     : std_ulogic_vector(0 to c_id_width - 1);
+  signal m_bready  : std_ulogic;
+
+  signal grants    : natural := 0;
+  signal responses : natural := 0;
+
+begin
+
+  arbiter_1 : entity work.arbiter(rtl)
+    generic map (
+      round_robin        => g_round_robin,
+      weights            => c_weights,
+      outstanding        => g_outstanding,
+      request_registers  => g_registers,
+      response_registers => g_registers)
+    port map (
+      clk       => clk,
+      sreset    => sreset,
+      s_araddr  => c_addrs,
+      s_arid    => c_ids,
+      s_arvalid => s_arvalid,
+      s_arready => s_arready,
+      s_rdata   => s_rdata,
+      s_rid     => s_rid,
+      s_rvalid  => s_rvalid,
+      s_rready  => c_ones,
+      s_awaddr  => c_addrs,
+      s_wready  => s_wready,
+      s_wvalid  => c_zeros,
+      s_wdata   => c_data,
+      s_wid     => c_ids,
+      s_bready  => c_ones,
+      s_bvalid  => s_bvalid,
+      s_bid     => s_bid,
+      m_araddr  => m_araddr,
+      m_arid    => m_arid,
+      m_arvalid => m_arvalid,
+      m_arready => m_arready,
+      m_rdata   => m_rdata,
+      m_rid     => m_rid,
+      m_rvalid  => m_rvalid,
+      m_rready  => m_rready,
+      m_awaddr  => m_awaddr,
+      m_wready  => '1',
+      m_wvalid  => m_wvalid,
+      m_wdata   => m_wdata,
+      m_wid     => m_wid,
+      m_bready  => m_bready,
+      m_bvalid  => '0',
+      m_bid     => c_no_bid);
+
+  clk <= not clk after c_clock_period/2;
+
+  s_arvalid <= (others => not sreset);
+
+  -- The memory returns the address of a read one clock cycle later
+  m_arready <= m_rready or not m_rvalid;
+
+  process (clk) is
+  begin
+    if rising_edge(clk) then
+      if m_arready = '1' then
+        m_rvalid <= m_arvalid;
+        m_rid    <= std_logic_vector(m_arid);
+        m_rdata  <= m_araddr;
+      end if;
+      if sreset = '1' then
+        m_rvalid <= '0';
+      end if;
+    end if;
+  end process;
+
+  process is
+  begin
+    wait until rising_edge(clk);
+    for i in 0 to c_size - 1 loop
+      if s_arvalid(i) = '1' and s_arready(i) = '1' then
+        assert i = expected_grant(grants)
+          report "Test failed. Grant " & integer'image(grants) & " = " & integer'image(i) &
+          ", but expected " & integer'image(expected_grant(grants))
+          severity failure;
+        grants <= grants + 1;
+      end if;
+      if s_rvalid(i) = '1' then
+        assert get(s_rdata, i, c_data_width) = i and get(std_ulogic_vector(s_rid), i, c_id_width) = i
+          report "Test failed. The response of master " & integer'image(i) & " is routed to another master"
+          severity failure;
+        responses <= responses + 1;
+      end if;
+    end loop;
+    assert g_outstanding = 0 or grants - responses <= g_outstanding
+      report "Test failed. " & integer'image(grants - responses) & " reads in flight, but at most " &
+      integer'image(g_outstanding) & " are allowed"
+      severity failure;
+    if responses = c_grants then
+      finish;
+    end if;
+  end process;
+
+  process
+  begin
+    wait for c_timeout;
+    report "Simulation time exceeded " & time'image(c_timeout)
+      severity failure;
+    wait;
+  end process;
+
+  process is
+  begin
+    sreset <= '1';
+    wait for 2 * c_clock_period;
+    wait until rising_edge(clk);
+    sreset <= '0';
+    wait;
+  end process;
+
+end architecture behavior;
@@ -1,5 +1,9 @@
 
 entity test_main is
+  generic (
+    -- Number of calls that are issued back to back. A function generated
+    -- with --pipeline accepts a new call every clock cycle
+    g_calls : positive := 1);
 end entity test_main;
 
 use std.env.finish;
@@ -48,19 +52,34 @@ begin
 
   m_tready <= '1';
 
-  s_tag <= (others => '0');
+  s_tag <= tag_in;
   
   process is
   begin  
     s_tvalid <= '0';
     wait until rising_edge(clk) and sreset = '0';
-    s_tvalid <= '1';
-    wait until rising_edge(clk);
+    for i in 0 to g_calls - 1 loop
+      tag_in   <= std_ulogic_vector(to_unsigned(i, tag_width));
+      s_tvalid <= '1';
+      wait until rising_edge(clk) and s_tready = '1';
+    end loop;
     s_tvalid <= '0';
-    wait until rising_edge(clk) and m_tvalid = '1';
-    assert (unsigned(m_tdata) = 0) 
-    report "Test failed. m_tdata = " & to_string(m_tdata) & ", but expected 0" 
-    severity failure;
+    wait;
+  end process;
+
+  -- The results must be returned in the order of the calls
+  process is
+  begin
+    for i in 0 to g_calls - 1 loop
+      wait until rising_edge(clk) and m_tvalid = '1';
+      tag_out <= m_tag;
+      assert (unsigned(m_tdata) = 0) 
+      report "Test failed. m_tdata = " & to_string(m_tdata) & ", but expected 0" 
+      severity failure;
+      assert (to_integer(unsigned(m_tag)) = i)
+      report "Test failed. m_tag = " & to_string(m_tag) & ", but expected " & integer'image(i)
+      severity failure;
+    end loop;
     finish;
     wait;
   end process;
@@ -1,14 +1,16 @@
 from function_definition import FunctionDefinition
 from instance_container import InstanceContainer
 from llvm_function import LlvmFunction
+from llvm_value_range import LlvmValueRangeAnalysis
 
 class FunctionParser:
     
-    def parse(self, function: LlvmFunction) -> FunctionDefinition:								
+    def parse(self, function: LlvmFunction, narrow_widths: bool = False, reorder_memory: bool = False) -> FunctionDefinition:								
         input_ports = function.get_input_ports()
         ports = function.get_ports()
+        result_widths = LlvmValueRangeAnalysis().get_result_widths(function=function) if narrow_widths else None
         instance_container = InstanceContainer(instructions=function.instructions, 
-                                               input_ports=input_ports)
+                                               input_ports=input_ports, result_widths=result_widths, reorder_memory=reorder_memory)
         entity_name = function.name
         instances = instance_container.get_instances()
         declarations = instance_container.get_declarations()
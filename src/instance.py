@@ -1,63 +1,115 @@
+from dataclasses import replace
 from typing import List, Optional
 
 from source_info import SourceInfo
 from instance_container_interface import InstanceContainerInterface
 from instance_data import DeclarationData, InstanceData
+from llvm_declarations import LlvmIntegerDeclaration
+from llvm_port import LlvmOutputPort
 from llvm_type_declaration import TypeDeclaration
 from llvm_type import LlvmVariableName
 from llvm_parser import InstructionArgument
 from llvm_instruction import LlvmInstruction
 from instance_interface import InstanceInterface
+from vhdl_instance_name import VhdlInstanceName
 
 class Instance(InstanceInterface):
 
     instruction: LlvmInstruction
 
     _parent: InstanceContainerInterface
-    _prev: Optional[InstanceInterface]
-    _next: Optional[InstanceInterface]
-
-    def __init__(self, parent: InstanceContainerInterface, instruction : LlvmInstruction):
+    _index: int
+    _instance_name: str
+    _stage: int
+    _result_width: Optional[int]
+
+    def __init__(self, parent: InstanceContainerInterface, instruction : LlvmInstruction, index: int, result_width: Optional[int] = None):
+        """
+        result_width is the narrowed width of the result when it needs fewer bits than the data type
+        """
         self._parent = parent
         self.instruction = instruction
-        self._next = None
-        self._prev = None
+        self._index = index
+        self._stage = 0
+        self._result_width = result_width
+        instance_name = self.instruction.get_instance_name()
+        assert instance_name is not None
+        self._instance_name = f"{instance_name}_{str(index)}"
 
     def get_instance_index(self) -> int:
-        return 1 if self._prev is None else self._prev.get_instance_index() + 1
+        return self._index
+
+    def get_stage(self) -> int:
+        return self._stage
+
+    def set_stage(self, stage: int) -> None:
+        self._stage = stage
 
     def get_instance_name(self) -> str:
-        instance_name = self.instruction.get_instance_name()
-        assert instance_name is not None
-        return f"{instance_name}_{str(self.get_instance_index())}"
+        return self._instance_name
 
     def get_tag_name(self) -> str:
-        return f"{self.get_instance_name()}_tag_out_i"
+        return f"{self._instance_name}_tag_out_i"
 
     def get_output_signal_name(self) -> LlvmVariableName:
-        return LlvmVariableName(self.get_instance_name())	
+        """
+        The instance name of a call starts with the @ of the called function, but it is not the name of a global
+        """
+        return LlvmVariableName(VhdlInstanceName(name=self.get_instance_name()).get_entity_name())
 
     def get_instance_tag_name(self, instance: Optional[InstanceInterface], default: str) -> str:
         return default if instance is None else instance.get_tag_name()	
 
-    def _get_output_tag_name(self) -> str:
-        return "tag_out_i" if self._next is None else self.get_tag_name()	
-
     def get_data_type(self) -> Optional[TypeDeclaration]:
         return self.instruction.get_data_type()
 
+    def _get_result_data_type(self) -> Optional[TypeDeclaration]:
+        if self._result_width is None:
+            return self.instruction.get_data_type()
+        return LlvmIntegerDeclaration(data_width=self._result_width)
+
+    def _get_output_port(self) -> Optional[LlvmOutputPort]:
+        output_port = self.instruction.get_output_port()
+        if self._result_width is None or output_port is None:
+            return output_port
+        return LlvmOutputPort(data_type=LlvmIntegerDeclaration(data_width=self._result_width), port_name=output_port.port_name)
+
     def _resolve_operand(self, operand: InstructionArgument) -> InstructionArgument:
         source: Optional[SourceInfo] = self._parent.get_source(search_source=operand.signal_name)
-        if source is not None:
-            operand.signal_name = source.output_signal_name
-        return operand
+        if source is None:
+            return operand
+        return replace(operand, signal_name=source.output_signal_name)
 
     def get_source_info(self) -> SourceInfo:
         data_type = self.get_data_type()
         assert data_type is not None
         return SourceInfo(destination=self.instruction.get_destination(),
         output_signal_name=self.get_output_signal_name(),
-        data_type=data_type)
+        data_type=data_type, stage=self._stage)
+
+    def _get_operands(self) -> List[InstructionArgument]:
+        operands = self.instruction.get_operands()
+        return [] if operands is None else operands
+
+    def get_operand_stages(self) -> List[int]:
+        sources = [self._parent.get_source(search_source=i.signal_name) for i in self._get_operands()]
+        return [i.stage for i in sources if i is not None]
+
+    def _is_ordered_operand(self, operand: InstructionArgument) -> bool:
+        if operand.data_type.is_pointer():
+            return True
+        name = operand.signal_name.get_name()
+        return name is not None and name.startswith("@")
+
+    def is_ordered(self) -> bool:
+        """
+        Memory accesses, instructions without result and instructions using pointers or globals
+        keep their program order and are never started in parallel with other instructions.
+        """
+        instruction = self.instruction
+        if instruction.is_memory() or instruction.get_memory_interface() is not None or instruction.get_destination() is None:
+            return True
+        return any(self._is_ordered_operand(operand=i) for i in self._get_operands())
 
     def _get_input_ports(self, operands: Optional[List[InstructionArgument]]) -> List[InstructionArgument]:
         input_ports: List[InstructionArgument] = []
@@ -65,14 +117,13 @@ class Instance(InstanceInterface):
             input_ports.extend(self._resolve_operand(operand) for operand in operands)
         return input_ports
 
-    def get_instance_data(self) -> InstanceData:
+    def get_instance_data(self, previous_instance_name: Optional[str], tag_name: str, parallel: bool) -> InstanceData:
+        """
+        previous_instance_name is the name of the previous stage
+        """
         instance_name = self.get_instance_name()
         entity_name = self.instruction.get_instance_name()
-        output_port = self.instruction.get_output_port()
-        tag_name = self._get_output_tag_name()
-        previous_instance_name = None
-        if self._prev is not None:
-            previous_instance_name = self._prev.get_instance_name()
+        output_port = self._get_output_port()
         input_ports = self._get_input_ports(operands=self.instruction.get_operands())
         generic_map = self.instruction.get_generic_map()
         memory_interface = self.instruction.get_memory_interface()
@@ -81,9 +132,10 @@ class Instance(InstanceInterface):
         assert library is not None
         return InstanceData(instance_name=instance_name, entity_name=entity_name, library=library, 
         output_port=output_port, tag_name=tag_name, generic_map=generic_map, input_ports=input_ports, 
-        previous_instance_name=previous_instance_name, memory_interface=memory_interface, instruction=self.instruction)
+        previous_instance_name=previous_instance_name, memory_interface=memory_interface, instruction=self.instruction,
+        parallel=parallel)
 
     def get_declaration_data(self) -> DeclarationData:
-        data_type = self.instruction.get_data_type()
+        data_type = self._get_result_data_type()
         assert data_type is not None
         return DeclarationData(instance_name=self.get_instance_name(), declaration_name=self.get_tag_name(), data_type=data_type)
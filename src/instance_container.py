@@ -1,21 +1,55 @@
-import contextlib
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from instance import DeclarationData, Instance
 from instance_container_data import InstanceContainerData
+from instance_data import InstanceData, InstanceStageData
 from instance_container_interface import InstanceContainerInterface, SourceInfo
 from llvm_instruction import LlvmInstruction
+from llvm_memory_alias import LlvmMemoryAccess, LlvmMemoryAliasAnalysis
 from llvm_type import LlvmType
 from ports import Port
 
 class InstanceContainer(InstanceContainerInterface):
+    """
+    The instances are scheduled in stages from the data flow graph.
+    An instance is placed in the stage after the last stage producing one of its operands,
+    so instances that do not depend on each other are started in parallel.
+    Ordered instances (see Instance.is_ordered) are placed alone in a new stage after all previous instances
+    and the following instances are placed after them.
+    With reorder_memory the loads and stores of allocas and pointer arguments and the getelementptr into them are not ordered.
+    A load or a store of them is placed after the last access that it conflicts with (see LlvmMemoryAccess.conflicts),
+    so accesses to different memories or to different elements are started in parallel.
+    Example with reorder_memory:
+        %mul.1 = fmul float %1, 3.0   -> stage 1
+        %mul.2 = fmul float %2, 5.0   -> stage 1
+        %add = fadd float %mul.1, %mul.2 -> stage 2
+        store i32 %a, ptr %n          -> stage 1
+        %0 = load i32, ptr %m         -> stage 1
+        %1 = load i32, ptr %n         -> stage 2
+    """
 
     _container: List[Instance]
     _source_info_map: Dict[LlvmType, SourceInfo]
+    _last_stage: int
+    _barrier_stage: int
+    _alias_analysis: LlvmMemoryAliasAnalysis
+    _accesses: List[Tuple[LlvmMemoryAccess, int]]
+    _result_widths: Dict[LlvmType, int]
+    _reorder_memory: bool
     
-    def __init__(self, instructions: List[LlvmInstruction], input_ports: List[Port]):
+    def __init__(self, instructions: List[LlvmInstruction], input_ports: List[Port], result_widths: Optional[Dict[LlvmType, int]] = None,
+                 reorder_memory: bool = False):
+        """
+        result_widths are the narrowed result widths of the instruction destinations (see LlvmValueRangeAnalysis)
+        """
         self._container = []
+        self._reorder_memory = reorder_memory
+        self._result_widths = {} if result_widths is None else result_widths
         self._source_info_map = {}
+        self._last_stage = 0
+        self._barrier_stage = 0
+        self._alias_analysis = LlvmMemoryAliasAnalysis(instructions=instructions)
+        self._accesses = []
         for i in instructions:
             self._add_instruction(instruction=i)
         for j in input_ports:
@@ -29,19 +63,85 @@ class InstanceContainer(InstanceContainerInterface):
     def _add_instruction(self, instruction : LlvmInstruction) -> None:
         if not instruction.is_valid():
             return
-        instance = Instance(self, instruction)
-        with contextlib.suppress(IndexError):
-            last_instance: Instance = self._container[-1]
-            last_instance._next = instance
-            instance._prev = last_instance
         destination = instruction.get_destination()
+        result_width = None if destination is None else self._result_widths.get(destination)
+        instance = Instance(self, instruction, index=len(self._container) + 1, result_width=result_width)
+        self._schedule(instance=instance, instruction=instruction)
         if destination is not None:
             self._source_info_map[destination] = instance.get_source_info()
         self._container.append(instance)
         
+    def _get_local_access(self, instruction: LlvmInstruction) -> Optional[LlvmMemoryAccess]:
+        """
+        Returns the access of a load or a store of an alloca or a pointer argument when the memory accesses are reordered
+        """
+        if not self._reorder_memory:
+            return None
+        access = self._alias_analysis.get_access(instruction=instruction)
+        if access is None or access.address is None or access.address.kind == "global":
+            return None
+        return access
+
+    def _is_barrier(self, instance: Instance, instruction: LlvmInstruction) -> bool:
+        """
+        Without reorder_memory every ordered instance is a barrier
+        """
+        return instance.is_ordered() and not (self._reorder_memory and self._alias_analysis.is_local_pointer(instruction=instruction))
+
+    def _schedule_access(self, instance: Instance, access: LlvmMemoryAccess) -> int:
+        conflicts = [stage for i, stage in self._accesses if i.conflicts(other=access)]
+        stage = max([self._barrier_stage] + instance.get_operand_stages() + conflicts) + 1
+        self._accesses.append((access, stage))
+        return stage
+
+    def _schedule(self, instance: Instance, instruction: LlvmInstruction) -> None:
+        access = self._get_local_access(instruction=instruction)
+        if access is not None:
+            stage = self._schedule_access(instance=instance, access=access)
+        elif self._is_barrier(instance=instance, instruction=instruction):
+            stage = self._last_stage + 1
+            self._barrier_stage = stage
+            self._accesses = []
+        else:
+            stage = max([self._barrier_stage] + instance.get_operand_stages()) + 1
+        instance.set_stage(stage)
+        self._last_stage = max(self._last_stage, stage)
+
+    def _get_stages(self) -> List[List[Instance]]:
+        stages: Dict[int, List[Instance]] = {}
+        for i in self._container:
+            stages.setdefault(i.get_stage(), []).append(i)
+        return [stages[i] for i in sorted(stages)]
+
+    def _get_stage_name(self, stage: List[Instance], number: int) -> str:
+        return stage[0].get_instance_name() if len(stage) == 1 else f"stage_{number}"
+
+    def _get_stage_data(self, stage: List[Instance], number: int, last: bool, previous_stage_name: Optional[str], 
+                        instance_data: Dict[str, InstanceData]) -> InstanceStageData:
+        """
+        Adds the instance data of the instances of the stage, the last stage drives the tag output
+        """
+        stage_name = self._get_stage_name(stage=stage, number=number)
+        stage_tag_name = "tag_out_i" if last else f"{stage_name}_tag_out_i"
+        parallel = len(stage) > 1
+        for i in stage:
+            tag_name = i.get_tag_name() if parallel else stage_tag_name
+            instance_data[i.get_instance_name()] = i.get_instance_data(previous_instance_name=previous_stage_name, 
+                                                                       tag_name=tag_name, parallel=parallel)
+        return InstanceStageData(stage_name=stage_name, instance_names=[i.get_instance_name() for i in stage], 
+                                 tag_name=stage_tag_name, previous_stage_name=previous_stage_name)
+
     def get_instances(self) -> InstanceContainerData:
-        instances = [i.get_instance_data() for i in self._container]
-        return InstanceContainerData(instances=instances)
+        instance_data: Dict[str, InstanceData] = {}
+        stage_data: List[InstanceStageData] = []
+        previous_stage_name: Optional[str] = None
+        stages = self._get_stages()
+        for number, stage in enumerate(stages, 1):
+            stage_data.append(self._get_stage_data(stage=stage, number=number, last=number == len(stages), 
+                                                   previous_stage_name=previous_stage_name, instance_data=instance_data))
+            previous_stage_name = stage_data[-1].stage_name
+        instances = [instance_data[i.get_instance_name()] for i in self._container]
+        return InstanceContainerData(instances=instances, stages=stage_data)
 
     def get_declarations(self) -> List[DeclarationData]:
         return [i.get_declaration_data() for i in self._container]
@@ -1,8 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
 
-from instance_data import InstanceData
+from instance_data import InstanceData, InstanceStageData
 
 @dataclass
 class InstanceContainerData:
     instances: List[InstanceData]    
+    stages: List[InstanceStageData] = field(default_factory=list)
@@ -17,6 +17,20 @@ class InstanceData:
     previous_instance_name: Optional[str]
     memory_interface: Optional[MemoryInterface]
     instruction: LlvmInstruction
+    parallel: bool = False
+
+@dataclass
+class InstanceStageData:
+    """
+    Instances in the same stage do not depend on each other and are started at the same time.
+    A stage with a single instance uses the instance name as stage name.
+    """
+    stage_name: str
+    instance_names: List[str]
+    tag_name: str
+    previous_stage_name: Optional[str]
+    def is_parallel(self) -> bool:
+        return len(self.instance_names) > 1
 
 @dataclass
 class DeclarationData:
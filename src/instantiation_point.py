@@ -1,13 +1,16 @@
 
 import inspect
 from frame_info import FrameInfo, FrameInfoFactory
+from vhdl_comment_generator import VhdlCommentGenerator
 
 class InstantiationPoint:
     
     frame_info: FrameInfo
 
     def __init__(self) -> None:
-        self.frame_info = FrameInfoFactory().get_frame_info(current_frame=inspect.currentframe())
+        self.frame_info = FrameInfo()
+        if VhdlCommentGenerator().is_generator_enabled():
+            self.frame_info = FrameInfoFactory().get_frame_info(current_frame=inspect.currentframe())
 
     def show(self) -> str:
         return f"{self.frame_info.file_name}({self.frame_info.line_number})"
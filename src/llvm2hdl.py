@@ -1,11 +1,38 @@
 import os
 import argparse
+from typing import List, Optional, Tuple
 
 from instance_statistics import InstanceStatistics
+from llvm_call_policy import LlvmCallPolicy
+from llvm_memory_partitioning import LlvmMemoryPartitioner
+from llvm_optimizer import LlvmOptimizer
 from llvm_parser import LlvmParser
 from messages import Messages
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_function_cache import VhdlFunctionCache
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdl_memory_arbiter import VhdlMemoryArbiterFactory
+from vhdl_operator_chaining import VhdlOperatorDelayTable
+from vhdl_resource_estimator import VhdlDeviceProfile
+from vhdl_resource_sharing import VhdlResourceSharingFactory
 from vhdlgen import VhdlGen
 
+def split_names(text: str) -> List[str]:
+    return [i.strip() for i in text.split(",") if i.strip()]
+
+def optimization_passes(text: str) -> Tuple[str, ...]:
+    passes = tuple(split_names(text=text))
+    unknown = [i for i in passes if i not in VhdlGen.optimization_passes]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown optimization passes {unknown}, must be one of {list(VhdlGen.optimization_passes)}")
+    return passes
+
+def non_negative_int(text: str) -> int:
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"{value} must not be negative")
+    return value
+
 def arguments():
     parser = argparse.ArgumentParser(description='Process some integers.')
     parser.add_argument('-f', dest='file_name', required=True,
@@ -16,33 +43,115 @@ def arguments():
                         help='Set verbosity on')
     parser.add_argument('--llvm-tree', dest='llvm_tree', action='store_true', default=False,
                         help='Displays the complete parsed llvm tree')
-    return parser.parse_args()
+    parser.add_argument('-j', dest='jobs', type=int, default=1,
+                        help='Number of processes used to generate the functions in parallel')
+    parser.add_argument('--source-comments', dest='source_comments', choices=VhdlCommentGenerator.modes, default="generator",
+                        help='Source location comments in the generated VHDL: off, generator file and line, or only the llvm source line')
+    parser.add_argument('--cache-dir', dest='cache_dir', default=None,
+                        help='Directory of the cache of generated functions. Unchanged functions are not generated again')
+    parser.add_argument('--cache-size', dest='cache_size', type=int, default=256,
+                        help='Maximum size of the cache in MB. The least recently used functions are removed first')
+    parser.add_argument('--pipeline', dest='pipeline', action='store_true', default=False,
+                        help='Accept a new call every clock cycle. Skid buffers are added after loads, stores and calls')
+    parser.add_argument('--report', dest='report', action='store_true', default=False,
+                        help='Write the static latency and throughput of each entity to <output>_report.json and <output>_report.txt')
+    parser.add_argument('--resources', dest='resources', action='store_true', default=False,
+                        help='Write the estimated LUT, FF, DSP and BRAM usage of each entity to <output>_resources.json and <output>_resources.txt')
+    parser.add_argument('--device-profile', dest='device_profile', default=None,
+                        help='Json file with the resource costs of the device. Implies --resources')
+    parser.add_argument('--clock-period', dest='clock_period', type=float, default=None,
+                        help='Target clock period in ns. Consecutive operators that fit in the clock period share one register stage')
+    parser.add_argument('--operator-delays', dest='operator_delays', default=None,
+                        help='Json file with the delay in ns of operator entities, e.g. {"llvm_add": 0.9}. Replaces the default delays')
+    parser.add_argument('--optimize', dest='optimize', nargs='?', type=optimization_passes, const=VhdlGen.module_passes + LlvmOptimizer.default_passes, 
+                        default="", help=f'Comma separated optimization passes run before the instances are generated, one of {list(VhdlGen.optimization_passes)}. '
+                             'All passes are run when no pass is given')
+    parser.add_argument('--narrow-widths', dest='narrow_widths', action='store_true', default=False,
+                        help='Narrow the integer results and tag items to the width of their value range')
+    parser.add_argument('--share', dest='share', default="",
+                        help='Comma separated operators, e.g. fmul,fadd, whose instances share one operator instance per function '
+                             'when the saved LUTs and DSP blocks outweigh the added multiplexers and registers')
+    parser.add_argument('--call-policy', dest='call_policy', default="",
+                        help=f'Comma separated policy for the calls, one of {list(LlvmCallPolicy.policies)}, optionally per called function, '
+                             'e.g. share,_Z3sqri=inline. Repeated calls to a shared function use one instance of it through an arbiter')
+    parser.add_argument('--partition', dest='partition', nargs='?', const="auto", default=None, choices=LlvmMemoryPartitioner.schemes,
+                        help='Split the array allocas into memory banks that are accessed in parallel. '
+                             'The auto scheme is chosen from the getelementptr offsets of the accesses')
+    parser.add_argument('--banks', dest='banks', type=int, default=4,
+                        help='Number of memory banks of a partitioned array')
+    parser.add_argument('--arbiter', dest='arbiter', default=None, choices=VhdlMemoryArbiterFactory.modes,
+                        help='Arbitrate the accessors of a memory in round robin order instead of by fixed priority. '
+                             'Weighted gives a called function as many consecutive grants as its loads and stores')
+    parser.add_argument('--arbiter-registers', dest='arbiter_registers', type=non_negative_int, default=None,
+                        help='Register slices on each request and response channel of a memory arbiter with --arbiter. '
+                             'By default one slice is used when a memory has more than '
+                             f'{VhdlMemoryArbiterFactory.register_threshold} accessors')
+    parser.add_argument('--reorder-memory', dest='reorder_memory', action='store_true', default=False,
+                        help='Schedule the loads and stores of allocas and pointer arguments after the last access they conflict with, '
+                             'instead of after all previous memory accesses')
+    args = parser.parse_args()
+    if args.partition is not None and args.banks < 2:
+        parser.error(f"argument --banks: {args.banks} must be more than 1 with --partition")
+    return args
+
+def get_output_file_name(args: argparse.Namespace) -> str:
+    if args.output_file_name is not None:
+        return args.output_file_name
+    pre, _ = os.path.splitext(args.file_name)
+    return f"{pre}.vhd"
+
+def get_cache(args: argparse.Namespace) -> Optional[VhdlFunctionCache]:
+    if args.cache_dir is None:
+        return None
+    return VhdlFunctionCache(cache_dir=args.cache_dir, max_size=args.cache_size*1024*1024)
+
+def get_options(args: argparse.Namespace) -> VhdlGeneratorOptions:
+    operator_delays = () if args.operator_delays is None else VhdlOperatorDelayTable().read_file(file_name=args.operator_delays)
+
+    share = VhdlResourceSharingFactory().get_entity_names(names=split_names(text=args.share))
+
+    call_policy = LlvmCallPolicy().parse(text=args.call_policy)
+
+    return VhdlGeneratorOptions(pipeline=args.pipeline, clock_period=args.clock_period, operator_delays=operator_delays,
+                                narrow_widths=args.narrow_widths, optimization_passes=args.optimize, share=share,
+                                call_policy=call_policy, memory_partitioning=args.partition, memory_banks=args.banks,
+                                memory_arbiter=args.arbiter, arbiter_registers=args.arbiter_registers, reorder_memory=args.reorder_memory)
+
+def get_device_profile(args: argparse.Namespace) -> Optional[VhdlDeviceProfile]:
+    if args.device_profile is not None:
+        return VhdlDeviceProfile().read_file(file_name=args.device_profile)
+    if args.resources:
+        return VhdlDeviceProfile()
+    return None
 
 def main():
     
     args = arguments()
 
     msg = Messages(verbose=args.verbose)
-    
-    with open(args.file_name, 'r') as file_handle:
-        text = file_handle.readlines()
 
+    VhdlCommentGenerator().set_mode(mode=args.source_comments)
+    
     llvm_parser = LlvmParser()
 
-    llvm_module = llvm_parser.parse(text)
+    with open(args.file_name, 'r') as file_handle:
+        llvm_module = llvm_parser.parse(file_handle)
  
     if args.llvm_tree:
         msg.highlight(text=llvm_module)
 
-    if args.output_file_name is not None:
-        output_file_name = args.output_file_name
-    else:
-        pre, _ = os.path.splitext(args.file_name)
-        output_file_name = f"{pre}.vhd"
-
     statistics = InstanceStatistics()
 
-    VhdlGen().parse(file_name=output_file_name, module=llvm_module)
+    cache = get_cache(args=args)
+
+    optimizer_statistics = VhdlGen().parse(file_name=get_output_file_name(args=args), module=llvm_module, jobs=args.jobs, cache=cache,
+                                           options=get_options(args=args), report=args.report, device_profile=get_device_profile(args=args))
+
+    if cache is not None:
+        msg.note(cache.statistics.get_summary())
+
+    for i in optimizer_statistics.get_summary():
+        msg.note(i)
     
     if args.verbose:
         statistics.print()
@@ -0,0 +1,163 @@
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from instruction import CallInstruction, DefaultInstruction
+from llvm_function import LlvmFunction, LlvmFunctionContainer
+from llvm_instruction import LlvmInstruction
+from llvm_optimizer import LlvmPassStatistics
+from llvm_parser import LlvmInstructionCommand
+from llvm_type import LlvmType, LlvmVariableName
+from vhdl_instance_name import VhdlInstanceName
+
+class LlvmCallPolicy:
+    """
+    How the calls to a function are implemented:
+        duplicate: Every call gets its own instance of the called function
+        share: The calls of a function share one instance of the called function through an arbiter
+        inline: The call is replaced by the instructions of the called function (see LlvmCallInliner)
+    The policy is a comma separated list of a policy for all called functions and <function>=<policy> items,
+    where the function name can be written with or without @ and leading underscores, for example:
+        share,_Z3sqri=inline
+    """
+
+    policies = ("duplicate", "share", "inline")
+
+    default_policy = "duplicate"
+
+    _all_functions = "*"
+
+    def __init__(self, items: Tuple[Tuple[str, str], ...] = ()) -> None:
+        self._policies: Dict[str, str] = {self._get_name(name=name): policy for name, policy in items}
+
+    def _get_name(self, name: str) -> str:
+        return name if name == self._all_functions else VhdlInstanceName(name=name).get_entity_name()
+
+    def _parse_item(self, item: str, text: str) -> Tuple[str, str]:
+        name, policy = item.split("=", maxsplit=1) if "=" in item else (self._all_functions, item)
+        assert policy.strip() in self.policies, f"Unknown call policy {policy} in {text}, must be one of {list(self.policies)}"
+        return name.strip(), policy.strip()
+
+    def parse(self, text: str) -> Tuple[Tuple[str, str], ...]:
+        return tuple(self._parse_item(item=i.strip(), text=text) for i in text.split(",") if i.strip())
+
+    def get(self, name: str) -> str:
+        policy = self._policies.get(self._get_name(name=name))
+        if policy is not None:
+            return policy
+        return self._policies.get(self._all_functions, self.default_policy)
+
+    def has_policy(self, policy: str) -> bool:
+        return policy in self._policies.values()
+
+class LlvmCallInliner:
+    """
+    Replaces the calls to the functions with the inline policy by the instructions of the called function.
+    The destinations of the called function are prefixed with the destination of the call, the arguments are
+    replaced by the operands of the call and the last valid instruction, which drives the output of the called
+    function, gets the destination of the call. Calls in the inlined instructions are inlined again unless
+    they are recursive.
+    Example:
+        define i32 @_Z3sqri(i32 %x) {
+          %mul = mul nsw i32 %x, %x
+        ...
+        %call = tail call noundef i32 @_Z3sqri(i32 noundef %a)   ->   %call = mul nsw i32 %a, %a
+    Only functions without pointer arguments, whose instructions are operations and calls, are inlined.
+    """
+
+    name = "inline"
+
+    def __init__(self, functions: LlvmFunctionContainer, policy: LlvmCallPolicy) -> None:
+        self._functions = functions.get_function_dictionary()
+        self._policy = policy
+
+    def _get_commands(self, function: LlvmFunction) -> List[LlvmInstructionCommand]:
+        return [i for i in function.instructions if isinstance(i, LlvmInstructionCommand)]
+
+    def _get_call(self, instruction: LlvmInstruction) -> Optional[CallInstruction]:
+        """
+        Returns the call of a function of the module that has a destination
+        """
+        if not isinstance(instruction, LlvmInstructionCommand) or not isinstance(instruction.instruction, CallInstruction):
+            return None
+        return None if instruction.instruction.llvm_function or instruction.get_destination() is None else instruction.instruction
+
+    def _get_callee(self, instruction: LlvmInstruction, active: Set[str]) -> Optional[LlvmFunction]:
+        call = self._get_call(instruction=instruction)
+        callee = None if call is None else self._functions.get(call.opcode)
+        if callee is None or not self._is_inlined(function=callee, active=active):
+            return None
+        return callee
+
+    def _is_inlined(self, function: LlvmFunction, active: Set[str]) -> bool:
+        """
+        A function is not inlined into itself
+        """
+        return function.name not in active and self._policy.get(name=function.name) == "inline" and self._is_inlinable(function=function)
+
+    def _has_pointer_arguments(self, function: LlvmFunction) -> bool:
+        return any(i.data_type.is_pointer() for i in function.arguments)
+
+    def _is_inlinable(self, function: LlvmFunction) -> bool:
+        commands = self._get_commands(function=function)
+        return (not self._has_pointer_arguments(function=function) and bool(commands) and
+                all(isinstance(i.instruction, (DefaultInstruction, CallInstruction)) for i in commands) and
+                commands[-1].get_destination() is not None)
+
+    def _get_destination_names(self, destination: LlvmVariableName, callee: LlvmFunction) -> Dict[LlvmType, LlvmType]:
+        """
+        The destinations of the called function are prefixed with the destination of the call
+        and the last one is replaced by the destination of the call
+        """
+        destinations = [i.get_destination() for i in self._get_commands(function=callee)]
+        names: Dict[LlvmType, LlvmType] = {i: LlvmVariableName(f"{destination.get_name()}.{i.get_name().lstrip('%')}")
+                                           for i in destinations[:-1] if i is not None}
+        last_destination = destinations[-1]
+        assert last_destination is not None
+        names[last_destination] = destination
+        return names
+
+    def _get_names(self, call: LlvmInstructionCommand, callee: LlvmFunction) -> Dict[LlvmType, LlvmType]:
+        destination = call.get_destination()
+        assert destination is not None and isinstance(call.instruction, CallInstruction)
+        names: Dict[LlvmType, LlvmType] = {i.signal_name: j.signal_name for i, j in zip(callee.arguments, call.instruction.operands)}
+        names.update(self._get_destination_names(destination=destination, callee=callee))
+        return names
+
+    def _get_destination(self, instruction: LlvmInstructionCommand, names: Dict[LlvmType, LlvmType]) -> Optional[LlvmVariableName]:
+        destination = instruction.get_destination()
+        new_destination = None if destination is None else names.get(destination, destination)
+        assert new_destination is None or isinstance(new_destination, LlvmVariableName)
+        return new_destination
+
+    def _rename(self, instruction: LlvmInstructionCommand, names: Dict[LlvmType, LlvmType]) -> LlvmInstructionCommand:
+        operation = instruction.instruction
+        assert isinstance(operation, (DefaultInstruction, CallInstruction))
+        operands = [replace(i, signal_name=names.get(i.signal_name, i.signal_name)) for i in operation.operands]
+        return replace(instruction, destination=self._get_destination(instruction=instruction, names=names),
+                       instruction=replace(operation, operands=operands))
+
+    def _inline_call(self, call: LlvmInstructionCommand, callee: LlvmFunction, active: Set[str],
+                     statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        names = self._get_names(call=call, callee=callee)
+        body = [self._rename(instruction=i, names=names) for i in self._get_commands(function=callee)]
+        statistics.removed_instructions += 1
+        statistics.added_instructions += len(body)
+        return self._inline(instructions=body, active=active | {callee.name}, statistics=statistics)
+
+    def _inline(self, instructions: Sequence[LlvmInstruction], active: Set[str], statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        result: List[LlvmInstruction] = []
+        for i in instructions:
+            callee = self._get_callee(instruction=i, active=active)
+            if callee is None:
+                result.append(i)
+                continue
+            assert isinstance(i, LlvmInstructionCommand)
+            result.extend(self._inline_call(call=i, callee=callee, active=active, statistics=statistics))
+        return result
+
+    def run(self, function: LlvmFunction) -> Tuple[LlvmFunction, LlvmPassStatistics]:
+        statistics = LlvmPassStatistics(pass_name=self.name, functions=1)
+        if not self._policy.has_policy(policy="inline"):
+            return function, statistics
+        instructions = self._inline(instructions=function.instructions, active={function.name}, statistics=statistics)
+        return replace(function, instructions=instructions), statistics
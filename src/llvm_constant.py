@@ -24,6 +24,11 @@ class DeclarationBase:
         return self.name.equals(other=name)
     def match(self, name: Optional[LlvmType]) -> bool:
         return False if name is None else self._is_name(name=name)
+    def get_lookup_name(self) -> Optional[str]:
+        """
+        Returns the key that match() compares, or None if the declaration can not be matched by name
+        """
+        return self.name.get_name()
     def get_values(self) -> Optional[List[str]]:
         return None
     def get_data_width(self) -> Optional[str]:
@@ -88,6 +93,8 @@ class DeclarationContainer:
     declaration: DeclarationBase
     def match(self, name: Optional[LlvmType]) -> bool:
         return self.declaration.match(name=name)
+    def get_name(self) -> Optional[str]:
+        return self.declaration.get_lookup_name()
     def get_values(self) -> Optional[List[str]]:
         return self.declaration.get_values()
     def get_data_width(self) -> Optional[str]:
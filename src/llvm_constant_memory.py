@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from instruction import GetelementptrInstruction, LoadInstruction
+from instruction_argument import InstructionArgument
+from llvm_constant import Constant, ConstantDeclaration
+from llvm_declarations import LlvmIntegerDeclaration
+from llvm_globals_container import GlobalsContainer
+from llvm_instruction import LlvmInstruction
+from llvm_optimizer import LlvmFunctionPass, LlvmPassStatistics
+from llvm_parser import LlvmInstructionCommand
+from llvm_type import LlvmInteger, LlvmType
+
+@dataclass
+class LlvmConstantElement:
+    """
+    A pointer to element index of the constant global array name
+    """
+    name: LlvmType
+    index: int
+
+class LlvmConstantLoadPass(LlvmFunctionPass):
+    """
+    Replaces the loads from constant global arrays at constant offsets with the value of the element,
+    so they need neither a load instance nor a memory interface.
+    Example:
+        @__const.coef = private unnamed_addr constant [4 x i32] [i32 3, i32 5, i32 7, i32 11]
+        %g = getelementptr inbounds [4 x i32], ptr @__const.coef, i64 0, i64 2    -> removed
+        %0 = load i32, ptr %g                                                     -> removed
+        %1 = mul nsw i32 %0, %a                                                   -> %1 = mul nsw i32 7, %a
+    A load is only replaced when the element is an integer of the loaded width and all the users of the load
+    take literal operands. The getelementptr instructions that are no longer used are removed.
+    """
+
+    name = "constant-loads"
+
+    def __init__(self, constants: GlobalsContainer) -> None:
+        self._constants = constants
+        self._pointers: Dict[LlvmType, LlvmConstantElement] = {}
+        self._values: Dict[LlvmType, int] = {}
+
+    def _get_array(self, name: LlvmType) -> Optional[List[Constant]]:
+        container = self._constants.get_declaration(name=name)
+        if container is None or not isinstance(container.declaration, ConstantDeclaration):
+            return None
+        return container.declaration.values
+
+    def _get_element(self, pointer: LlvmType) -> Optional[LlvmConstantElement]:
+        element = self._pointers.get(pointer)
+        if element is not None:
+            return element
+        if self._get_array(name=pointer) is None:
+            return None
+        return LlvmConstantElement(name=pointer, index=0)
+
+    def _get_constant(self, element: LlvmConstantElement, width: int) -> Optional[Constant]:
+        """
+        Returns the element when it is an integer of the width
+        """
+        values = self._get_array(name=element.name) or []
+        if not 0 <= element.index < len(values):
+            return None
+        constant = values[element.index]
+        is_integer = isinstance(constant.data_type, LlvmIntegerDeclaration) and constant.data_type.data_width == width
+        return constant if is_integer else None
+
+    def _get_integer(self, constant: Constant, width: int) -> Optional[int]:
+        try:
+            value = int(constant.value) % 2 ** width
+        except ValueError:
+            return None
+        if len(f"{value:x}") * 4 > width:
+            return None
+        return value
+
+    def _get_value(self, element: LlvmConstantElement, width: int) -> Optional[int]:
+        constant = self._get_constant(element=element, width=width)
+        return None if constant is None else self._get_integer(constant=constant, width=width)
+
+    def _add_pointer(self, instruction: LlvmInstructionCommand) -> None:
+        destination = instruction.get_destination()
+        assert isinstance(instruction.instruction, GetelementptrInstruction)
+        element = self._get_element(pointer=instruction.instruction.operands[0].signal_name)
+        if destination is not None and element is not None:
+            self._pointers[destination] = LlvmConstantElement(name=element.name, index=element.index + instruction.instruction.offset)
+
+    def _get_load_value(self, instruction: LoadInstruction) -> Optional[int]:
+        element = self._get_element(pointer=instruction.operands[0].signal_name)
+        if element is None or not isinstance(instruction.data_type, LlvmIntegerDeclaration):
+            return None
+        return self._get_value(element=element, width=instruction.data_type.data_width)
+
+    def _add_load(self, instruction: LlvmInstructionCommand) -> None:
+        destination = instruction.get_destination()
+        assert isinstance(instruction.instruction, LoadInstruction)
+        value = self._get_load_value(instruction=instruction.instruction)
+        if destination is not None and value is not None:
+            self._values[destination] = value
+
+    def _add_instruction(self, instruction: LlvmInstruction) -> None:
+        if not isinstance(instruction, LlvmInstructionCommand):
+            return
+        if isinstance(instruction.instruction, GetelementptrInstruction):
+            self._add_pointer(instruction=instruction)
+        elif isinstance(instruction.instruction, LoadInstruction):
+            self._add_load(instruction=instruction)
+
+    def _is_literal_operand(self, instruction: LlvmInstruction, operand: InstructionArgument) -> bool:
+        if operand.signal_name not in self._values:
+            return True
+        return isinstance(instruction, LlvmInstructionCommand) and not isinstance(instruction.instruction, (LoadInstruction, GetelementptrInstruction))
+
+    def _get_folded(self, instructions: List[LlvmInstruction]) -> Set[LlvmType]:
+        """
+        Returns the loads whose result can be replaced by a literal in every user
+        """
+        return_driver = self._get_return_driver(instructions=instructions)
+        folded = set(self._values)
+        for i in instructions:
+            folded -= {j.signal_name for j in self._get_operands(instruction=i) if not self._is_literal_operand(instruction=i, operand=j)}
+        if return_driver is not None:
+            folded.discard(return_driver.get_destination())
+        return folded
+
+    def _get_replacement(self, instruction: LlvmInstructionCommand, operand: InstructionArgument) -> Optional[LlvmType]:
+        value = self._values.get(operand.signal_name)
+        return None if value is None else LlvmInteger(value=value)
+
+    def _remove_unused_pointers(self, instructions: List[LlvmInstruction], statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        """
+        Removes the getelementptr into the constant arrays that are no longer used, from the last to the first
+        """
+        used: Set[LlvmType] = set()
+        result = []
+        for i in reversed(instructions):
+            destination = i.get_destination()
+            if destination in self._pointers and destination not in used:
+                statistics.removed_instructions += 1
+                continue
+            used.update(j.signal_name for j in self._get_operands(instruction=i))
+            result.append(i)
+        result.reverse()
+        return result
+
+    def _remove_folded(self, instructions: List[LlvmInstruction], folded: Set[LlvmType], 
+                       statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        """
+        Removes the folded loads and replaces their users' operands with the loaded values
+        """
+        result = []
+        for i in instructions:
+            if i.get_destination() in folded:
+                statistics.removed_instructions += 1
+                continue
+            result.append(self._replace_operands(instruction=i, statistics=statistics, get_replacement=self._get_replacement))
+        return result
+
+    def run(self, instructions: List[LlvmInstruction], statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        self._pointers = {}
+        self._values = {}
+        for i in instructions:
+            self._add_instruction(instruction=i)
+        folded = self._get_folded(instructions=instructions)
+        self._values = {i: j for i, j in self._values.items() if i in folded}
+        result = self._remove_folded(instructions=instructions, folded=folded, statistics=statistics)
+        return self._remove_unused_pointers(instructions=result, statistics=statistics)
@@ -1,11 +1,12 @@
 
 import re
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from llvm_globals_container import GlobalsContainer
 from llvm_type import LlvmPointer, LlvmType, LlvmTypeFactory, LlvmVariableName
 from llvm_type_declaration import TypeDeclaration, TypeDeclarationFactory
 
+@dataclass(frozen=True)
 class LlvmVoidDeclaration(TypeDeclaration):
 
     def get_dimensions(self) -> Tuple[int, str]:
@@ -28,6 +29,7 @@ class LlvmVoidDeclarationFactory(TypeDeclarationFactory):
     def get(self) -> TypeDeclaration:
         return LlvmVoidDeclaration()
 
+@dataclass(frozen=True)
 class LlvmFloatDeclaration(TypeDeclaration):
     """
     data_type is one of float 
@@ -50,7 +52,7 @@ class LlvmFloatDeclarationFactory(TypeDeclarationFactory):
     def get(self) -> TypeDeclaration:
         return LlvmFloatDeclaration()
 
-@dataclass
+@dataclass(frozen=True)
 class LlvmIntegerDeclaration(TypeDeclaration):
 
     data_width: int
@@ -70,15 +72,17 @@ class LlvmIntegerDeclarationFactory(TypeDeclarationFactory):
     
     data_type: str
 
+    _pattern = re.compile(r"^i\d+")
+
     def match(self) -> bool:
-        return bool(re.match("^i\d+", self.data_type))
+        return bool(self._pattern.match(self.data_type))
 
     def get(self) -> TypeDeclaration:
         data_type = self.data_type.strip()
         data_width = int(data_type[1:])
         return LlvmIntegerDeclaration(data_width=data_width)
 
-@dataclass
+@dataclass(frozen=True)
 class LlvmConstantDeclaration(TypeDeclaration):
 
     number: str
@@ -100,7 +104,7 @@ class LlvmConstantDeclarationFactory(TypeDeclarationFactory):
     def get(self) -> TypeDeclaration:
         return LlvmConstantDeclaration(number=self.data_type)
 
-@dataclass
+@dataclass(frozen=True)
 class LlvmPointerDeclaration(TypeDeclaration):
     
     def is_pointer(self) -> bool:
@@ -139,7 +143,7 @@ class LlvmPointerDeclarationFactory(TypeDeclarationFactory):
     def get(self) -> TypeDeclaration:
         return LlvmPointerDeclaration()
 
-@dataclass
+@dataclass(frozen=True)
 class LlvmArrayDeclaration(TypeDeclaration):
     """
     Declaration: <index> x <data_type>
@@ -262,7 +266,7 @@ class LlvmClassDeclarationFactory(TypeDeclarationFactory):
         return LlvmClassDeclaration(name=LlvmVariableName(self.data_type), 
                                     constants=self.constants)
 
-@dataclass
+@dataclass(frozen=True)
 class LlvmVariableDeclaration(TypeDeclaration):
     """
     Declaration: %<name>
@@ -290,9 +294,28 @@ class LlvmVariableDeclarationFactory(TypeDeclarationFactory):
         return LlvmVariableDeclaration(name=LlvmVariableName(self.data_type))
 
 class LlvmDeclarationFactory:
+    """
+    The cached declarations are shared by all instructions, which is why they are frozen
+    """
+
+    _cache: Dict[str, TypeDeclaration] = {}
 
     def get(self, data_type: str, 
             constants: Optional[GlobalsContainer] = None) -> TypeDeclaration:
+        """
+        Declarations that do not depend on the globals are only resolved once per data type
+        """
+        if constants is not None:
+            return self._resolve(data_type=data_type, constants=constants)
+        try:
+            return self._cache[data_type]
+        except KeyError:
+            declaration = self._resolve(data_type=data_type, constants=constants)
+            self._cache[data_type] = declaration
+            return declaration
+
+    def _resolve(self, data_type: str, 
+                 constants: Optional[GlobalsContainer]) -> TypeDeclaration:
         declaration_types = [
             LlvmVoidDeclarationFactory(data_type=data_type),
             LlvmFloatDeclarationFactory(data_type=data_type),
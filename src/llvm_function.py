@@ -1,19 +1,59 @@
 
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+import hashlib
+from typing import Dict, List, Optional, Set, Tuple
 
 from instruction_argument import InstructionArgument
 from llvm_instruction import LlvmInstruction
+from llvm_lexer import LlvmLexer, LlvmTokenKind
+from llvm_source_file import LlvmSourceLine
 from llvm_type import LlvmVariableName
 from llvm_type_declaration import TypeDeclaration
 from ports import InputPort, OutputPort, Port, PortContainer
 
+@dataclass
+class LlvmFunctionDigest:
+    """
+    The summary of the llvm text of a function that the function cache keys on, so the text itself is not kept.
+    text_hash: Hash of the stripped lines, which does not depend on where the function is in the file
+    line_hash: Hash of the line numbers relative to the define line
+    definition: The stripped define line
+    references: The global names that the function references, in sorted order
+    first_line: The line number of the define line
+    """
+    text_hash: str = ""
+    line_hash: str = ""
+    definition: str = ""
+    references: Tuple[str, ...] = ()
+    first_line: int = 0
+
+class LlvmFunctionDigestFactory:
+
+    def _get_references(self, lexer: LlvmLexer, text: str) -> List[str]:
+        return [i.text for i in lexer.tokenize(text) if i.kind == LlvmTokenKind.GLOBAL]
+
+    def get(self, lines: List[LlvmSourceLine]) -> LlvmFunctionDigest:
+        lexer = LlvmLexer()
+        text_hash = hashlib.sha256()
+        line_hash = hashlib.sha256()
+        references: Set[str] = set()
+        first_line = lines[0].line_number if lines else 0
+        for i in lines:
+            text = i.line.strip()
+            text_hash.update(f"{text}\n".encode("utf-8"))
+            line_hash.update(f"{i.line_number - first_line}\n".encode("utf-8"))
+            references.update(self._get_references(lexer=lexer, text=text))
+        return LlvmFunctionDigest(text_hash=text_hash.hexdigest(), line_hash=line_hash.hexdigest(),
+                                  definition=lines[0].line.strip() if lines else "", references=tuple(sorted(references)),
+                                  first_line=first_line)
+
 @dataclass
 class LlvmFunction:
     name: str
     arguments: List[InstructionArgument]
     return_type : TypeDeclaration
     instructions: List[LlvmInstruction]
+    digest: LlvmFunctionDigest = field(default_factory=LlvmFunctionDigest, repr=False)
     def get_input_ports(self) -> List[Port]:
         return [InputPort(name=i.signal_name, data_type=i.data_type) for i in self.arguments]
     def get_ports(self) -> PortContainer:								
@@ -29,5 +69,8 @@ class LlvmFunctionContainer:
     def get_function(self, name: str) -> Optional[LlvmFunction]:
         return next((i for i in self.functions if i.name == name), None)
 
+    def get_function_dictionary(self) -> Dict[str, LlvmFunction]:
+        return {i.name: i for i in self.functions}
+
     def get_function_names(self) -> List[str]:
         return [i.name for i in self.functions]      
\ No newline at end of file
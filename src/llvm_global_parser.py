@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import List
 from instantiation_point import InstantiationPoint
 from llvm_constant import ClassDeclaration, Constant, ConstantDeclaration, DeclarationContainer, GlobalVariableDeclaration, ReferenceDeclaration
+from llvm_lexer import LlvmLexer, LlvmToken
 from llvm_source_file import LlvmSourceLine
 
 from llvm_type_declaration import TypeDeclaration
@@ -11,12 +12,16 @@ from llvm_declarations import LlvmArrayDeclarationFactory, LlvmIntegerDeclaratio
 class LlvmGlobalParserBase(ABC):
 
     def _parse_definition(self, definition: str) -> List[Constant]:
+        """
+        definition = "i32 1, i32 2, i32 3"
+        """
+        tokens = LlvmLexer().get_tokens(text=definition)
+        # tokens = i32 1 i32 2 i32 3
         definitions: List[Constant] = []
-        for i in definition.split(","):
-            x = i.split()
-            data_type = LlvmIntegerDeclarationFactory(data_type=x[0]).get()
-            value = x[1]
-            definitions.append(Constant(value=value, data_type=data_type))
+        for data_type_token, value in zip(tokens, tokens[1:]):
+            if data_type_token.is_type():
+                data_type = LlvmIntegerDeclarationFactory(data_type=data_type_token.text).get()
+                definitions.append(Constant(value=value.text, data_type=data_type))
         return definitions
 
     def _get_array_data_type(self, source: str) -> TypeDeclaration:
@@ -34,9 +39,12 @@ class LlvmGlobalParserBase(ABC):
         pass
 
     @abstractmethod
-    def match(self, source: List[str]   ) -> bool:
+    def match(self, source: List[LlvmToken]) -> bool:
         pass
 
+    def _has_keyword(self, source: List[LlvmToken], keyword: str) -> bool:
+        return any(i.is_keyword(text=keyword) for i in source)
+
 class LlvmGlobalClassParser(LlvmGlobalParserBase):
     
     def parse(self, name: str, source: str, instruction: LlvmSourceLine) -> DeclarationContainer:
@@ -52,8 +60,8 @@ class LlvmGlobalClassParser(LlvmGlobalParserBase):
                                              name=LlvmVariableName(name), type=declaration)
         return DeclarationContainer(instruction=instruction, declaration=class_declaration)
 
-    def match(self, source: List[str]) -> bool:
-        return "type" in source
+    def match(self, source: List[LlvmToken]) -> bool:
+        return self._has_keyword(source=source, keyword="type")
         
 class LlvmGlobalConstantParser(LlvmGlobalParserBase):
     
@@ -74,8 +82,8 @@ class LlvmGlobalConstantParser(LlvmGlobalParserBase):
                                                    values=definitions)
         return DeclarationContainer(instruction=instruction, declaration=constant_declaration)
 
-    def match(self, source: List[str]) -> bool:
-        return "constant" in source
+    def match(self, source: List[LlvmToken]) -> bool:
+        return self._has_keyword(source=source, keyword="constant")
         
 class LlvmGlobalReferenceParser(LlvmGlobalParserBase):
 
@@ -90,8 +98,8 @@ class LlvmGlobalReferenceParser(LlvmGlobalParserBase):
                                                      reference=LlvmReferenceName(reference))
         return DeclarationContainer(instruction=instruction, declaration=reference_declaration)
 
-    def match(self, source: List[str]) -> bool:
-        return "alias" in source
+    def match(self, source: List[LlvmToken]) -> bool:
+        return self._has_keyword(source=source, keyword="alias")
         
 
 class LlvmGlobalVariableParser(LlvmGlobalParserBase):
@@ -107,8 +115,8 @@ class LlvmGlobalVariableParser(LlvmGlobalParserBase):
                                                           type=data_type)
         return DeclarationContainer(instruction=instruction, declaration=declaration)
 
-    def match(self, source: List[str]) -> bool:
-        return "global" in source
+    def match(self, source: List[LlvmToken]) -> bool:
+        return self._has_keyword(source=source, keyword="global")
         
 
 class LlvmGlobalParser:
@@ -123,8 +131,9 @@ class LlvmGlobalParser:
         assignment = instruction.line.split("=")
         name = assignment[0].strip()    
         source = assignment[1].strip()
+        tokens = LlvmLexer().get_tokens(text=source)
         for i in [LlvmGlobalClassParser(), LlvmGlobalConstantParser(), LlvmGlobalReferenceParser(), LlvmGlobalVariableParser()]:
-            if i.match(source.split()):
+            if i.match(tokens):
                 return i.parse(name=name, source=source, instruction=instruction)
         assert False, f"Could not parse instruction {instruction}"
 
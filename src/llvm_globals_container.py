@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from file_writer_interface import FileWriterInterface
 from llvm_constant import DeclarationContainer
 from llvm_function import LlvmFunctionContainer
@@ -9,29 +9,50 @@ from llvm_type import LlvmType, LlvmVariableName
 class GlobalsContainer:
     
     declarations: List[DeclarationContainer]
+    _names: Dict[str, DeclarationContainer] = field(init=False, repr=False, compare=False, default_factory=dict)
+    _constants: List[DeclarationContainer] = field(init=False, repr=False, compare=False, default_factory=list)
+    _references: List[DeclarationContainer] = field(init=False, repr=False, compare=False, default_factory=list)
+    _variables: List[DeclarationContainer] = field(init=False, repr=False, compare=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        declarations = self.declarations
+        self.declarations = []
+        for i in declarations:
+            self.add_declaration(declaration=i)
+
+    def add_declaration(self, declaration: DeclarationContainer) -> None:
+        self.declarations.append(declaration)
+        name = declaration.get_name()
+        if name is not None:
+            self._names.setdefault(name, declaration)
+        if declaration.is_constant():
+            self._constants.append(declaration)
+        if declaration.is_reference():
+            self._references.append(declaration)
+        if declaration.is_variable():
+            self._variables.append(declaration)
 
     def write_constants(self, file_writer: FileWriterInterface) -> None:
-        for i in self.declarations:
-            if i.is_constant():
-                file_writer.write_constant(constant=i.declaration)
+        for i in self._constants:
+            file_writer.write_constant(constant=i.declaration)
     
     def write_references(self, file_writer: FileWriterInterface, 
                          functions: LlvmFunctionContainer) -> None:
-        for i in self.declarations:
-            if i.is_reference():
-                file_writer.write_reference(reference=i.declaration, 
-                                            functions=functions)
+        for i in self._references:
+            file_writer.write_reference(reference=i.declaration, 
+                                        functions=functions)
     
     def write_variables(self, file_writer: FileWriterInterface) -> None:
-        for i in self.declarations:
-            if i.is_variable():
-                file_writer.write_variable(variable=i.declaration)
+        for i in self._variables:
+            file_writer.write_variable(variable=i.declaration)
     
-    def _get_match(self, name: Optional[LlvmType]) \
+    def _get_match(self, name: LlvmType) \
         -> Optional[DeclarationContainer]:
-        return next(
-            (i for i in self.declarations if i.match(name=name)), None
-        )   
+        key = name.get_name()
+        return None if key is None else self._names.get(key)
+
+    def get_named_declaration(self, name: str) -> Optional[DeclarationContainer]:
+        return self._names.get(name)
 
     def get_declaration(self, name: Optional[LlvmType]) \
         -> Optional[DeclarationContainer]:
@@ -47,4 +68,3 @@ class GlobalsContainer:
     def get_data_width(self, name: LlvmVariableName) -> Optional[str]:
         declaration = self.get_declaration(name=name)
         return None if declaration is None else declaration.get_data_width()
-
@@ -0,0 +1,138 @@
+import re
+from dataclasses import dataclass
+from typing import Generator, List, Optional, Pattern
+
+class LlvmTokenKind:
+    TYPE = "type"
+    LOCAL = "local"
+    GLOBAL = "global"
+    METADATA = "metadata"
+    ATTRIBUTE_GROUP = "attribute_group"
+    HEX = "hex"
+    FLOAT = "float"
+    INTEGER = "integer"
+    STRING = "string"
+    KEYWORD = "keyword"
+    LEFT_BRACKET = "left_bracket"
+    RIGHT_BRACKET = "right_bracket"
+    COMMA = "comma"
+    EQUAL = "equal"
+    OTHER = "other"
+
+@dataclass
+class LlvmToken:
+    kind: str
+    text: str
+    start: int
+    end: int
+    def is_type(self) -> bool:
+        return self.kind == LlvmTokenKind.TYPE
+    def is_identifier(self) -> bool:
+        return self.kind in (LlvmTokenKind.LOCAL, LlvmTokenKind.GLOBAL)
+    def is_keyword(self, text: Optional[str] = None) -> bool:
+        return self.kind == LlvmTokenKind.KEYWORD and (text is None or self.text == text)
+    def is_comma(self) -> bool:
+        return self.kind == LlvmTokenKind.COMMA
+    def is_left_bracket(self) -> bool:
+        return self.kind == LlvmTokenKind.LEFT_BRACKET
+    def is_right_bracket(self) -> bool:
+        return self.kind == LlvmTokenKind.RIGHT_BRACKET
+
+class LlvmLexer:
+    """
+    Splits a line of llvm ir into typed tokens using one precompiled regular expression.
+    Example:
+        "add nsw i32 %b, 5" -> keyword(add) keyword(nsw) type(i32) local(%b) comma(,) integer(5)
+    """
+
+    _name = r'(?:[-a-zA-Z$._0-9]+|"[^"]*")'
+
+    _token_specification = [
+        ("comment", r";.*"),
+        ("whitespace", r"\s+"),
+        (LlvmTokenKind.TYPE, r"(?:i\d+|half|bfloat|float|double|fp128|void|ptr|label|metadata)\b\**"),
+        (LlvmTokenKind.LOCAL, rf"%{_name}"),
+        (LlvmTokenKind.GLOBAL, rf"@{_name}"),
+        (LlvmTokenKind.METADATA, rf"!{_name}"),
+        (LlvmTokenKind.ATTRIBUTE_GROUP, r"#\d+"),
+        (LlvmTokenKind.HEX, r"0x[0-9A-Fa-f]+"),
+        (LlvmTokenKind.FLOAT, r"[-+]?\d+\.\d*(?:[eE][-+]?\d+)?"),
+        (LlvmTokenKind.INTEGER, r"-?\d+"),
+        (LlvmTokenKind.STRING, r'c?"[^"]*"'),
+        (LlvmTokenKind.KEYWORD, r"[a-zA-Z_][a-zA-Z0-9_.]*"),
+        (LlvmTokenKind.LEFT_BRACKET, r"[(\[{<]"),
+        (LlvmTokenKind.RIGHT_BRACKET, r"[)\]}>]"),
+        (LlvmTokenKind.COMMA, r","),
+        (LlvmTokenKind.EQUAL, r"="),
+        (LlvmTokenKind.OTHER, r"\.\.\.|."),
+    ]
+
+    _ignored = {"comment", "whitespace"}
+
+    _pattern: Pattern = re.compile("|".join(f"(?P<{name}>{regex})" for name, regex in _token_specification))
+
+    _parenthesis_pattern: Pattern = re.compile(r"[()]")
+
+    _comma_pattern: Pattern = re.compile(",")
+
+    _whitespace_pattern: Pattern = re.compile(r"\s+")
+
+    def tokenize(self, text: str) -> Generator[LlvmToken, None, None]:
+        for match in self._pattern.finditer(text):
+            kind = match.lastgroup
+            assert kind is not None
+            if kind not in self._ignored:
+                yield LlvmToken(kind=kind, text=match.group(), start=match.start(), end=match.end())
+
+    def get_tokens(self, text: str) -> List[LlvmToken]:
+        """
+        Returns all tokens except the commas.
+        Example:
+            "select i1 %cmp, i32 1, i32 2" -> select i1 %cmp i32 1 i32 2
+        """
+        return [i for i in self.tokenize(text) if not i.is_comma()]
+
+    def _new_depth(self, parenthesis: str, depth: int, text: str) -> int:
+        depth += 1 if parenthesis == "(" else -1
+        assert depth >= 0, f"Found more left paranthesis than right paranthesis in {text}"
+        return depth
+
+    def _append(self, result: List[str], segment: str, splitter: Pattern, split: bool) -> None:
+        """
+        Appends the segment to the last item, the parts after a split start new items
+        """
+        first, *rest = splitter.split(segment) if split else [segment]
+        result[-1] += first
+        result.extend(rest)
+
+    def _split_top(self, text: str, splitter: Pattern) -> List[str]:
+        """
+        Only the parenthesis are visited one at a time. 
+        The text between them is split by the compiled splitter pattern.
+        """
+        result = [""]
+        depth = 0
+        position = 0
+        for match in self._parenthesis_pattern.finditer(text):
+            self._append(result=result, segment=text[position:match.start()], splitter=splitter, split=depth == 0)
+            result[-1] += match.group()
+            depth = self._new_depth(parenthesis=match.group(), depth=depth, text=text)
+            position = match.end()
+        self._append(result=result, segment=text[position:], splitter=splitter, split=True)
+        return [i.strip() for i in result if i and not i.isspace()]
+
+    def split_top_comma(self, text: str) -> List[str]:
+        """
+        Splits the text at the commas that are not enclosed by parenthesis.
+        Example:
+            "i32 2, ptr getelementptr (i32, ptr %a, i64 1)" -> ["i32 2", "ptr getelementptr (i32, ptr %a, i64 1)"]
+        """
+        return self._split_top(text=text, splitter=self._comma_pattern)
+
+    def split_top_space(self, text: str) -> List[str]:
+        """
+        Splits the text at the whitespace that is not enclosed by parenthesis.
+        Example:
+            "ptr align 4 dereferenceable(12) %a" -> ["ptr", "align", "4", "dereferenceable(12)", "%a"]
+        """
+        return self._split_top(text=text, splitter=self._whitespace_pattern)
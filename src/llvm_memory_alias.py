@@ -0,0 +1,140 @@
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Set
+
+from instruction import AllocaInstruction, DefaultInstruction, GetelementptrInstruction, LoadInstruction
+from instruction_argument import InstructionArgument
+from llvm_instruction import LlvmInstruction
+from llvm_parser import LlvmInstructionCommand
+from llvm_type import LlvmPointer, LlvmType
+
+@dataclass(frozen=True)
+class LlvmMemoryAddress:
+    """
+    The element offset into a memory that a pointer points to.
+    memory: The name of the alloca, pointer argument or global that the pointer is derived from
+    kind: "alloca", "argument" or "global"
+    """
+    memory: str
+    kind: str
+    offset: int
+
+    def may_alias(self, other: "LlvmMemoryAddress") -> bool:
+        """
+        An alloca is only accessed through the pointers derived from it and two globals never overlap,
+        but a pointer argument may point into a global or into the memory of another pointer argument
+        """
+        if self.memory == other.memory:
+            return self.offset == other.offset
+        if "alloca" in (self.kind, other.kind):
+            return False
+        return not self.kind == other.kind == "global"
+
+@dataclass
+class LlvmMemoryAccess:
+    """
+    A load or a store and the address it accesses, which is None when the memory is unknown
+    """
+    address: Optional[LlvmMemoryAddress]
+    write: bool
+
+    def may_alias(self, address: Optional[LlvmMemoryAddress]) -> bool:
+        if self.address is None or address is None:
+            return True
+        return self.address.may_alias(other=address)
+
+    def conflicts(self, other: "LlvmMemoryAccess") -> bool:
+        """
+        Two accesses must keep their program order when one of them writes an element the other one may access
+        """
+        return (self.write or other.write) and self.may_alias(address=other.address)
+
+class LlvmMemoryAliasAnalysis:
+    """
+    Follows the pointers of a function through the getelementptr instructions to the memory they point into.
+    A name that is not defined in the function is a pointer argument, and a pointer that is defined by
+    any other instruction, for example a pointer that is loaded from memory, may point anywhere.
+    Example:
+        %n = alloca [4 x i32]                                          %n + 0 (alloca)
+        %g = getelementptr inbounds [4 x i32], ptr %n, i64 0, i64 1    %n + 1 (alloca)
+        %0 = load i32, ptr %p                                          %p + 0 (argument)
+        %1 = load i32, ptr getelementptr ([4 x i32], ptr @a, i64 1)    @a + 1 (global)
+    """
+
+    def __init__(self, instructions: List[LlvmInstruction]) -> None:
+        self._defined: Set[str] = set()
+        self._addresses: Dict[str, LlvmMemoryAddress] = {}
+        self._defined = {i for i in (self._get_name(instruction=j) for j in instructions) if i is not None}
+        for i in instructions:
+            self._add_pointer(instruction=i)
+
+    def _get_name(self, instruction: LlvmInstruction) -> Optional[str]:
+        destination = instruction.get_destination()
+        return None if destination is None else destination.get_name()
+
+    def _get_offset_address(self, address: Optional[LlvmMemoryAddress], offset: int) -> Optional[LlvmMemoryAddress]:
+        return None if address is None else replace(address, offset=address.offset + offset)
+
+    def _get_pointer_address(self, instruction: LlvmInstructionCommand, name: str) -> Optional[LlvmMemoryAddress]:
+        """
+        Returns the address of the destination of an alloca or a getelementptr
+        """
+        if isinstance(instruction.instruction, AllocaInstruction):
+            return LlvmMemoryAddress(memory=name, kind="alloca", offset=0)
+        if isinstance(instruction.instruction, GetelementptrInstruction):
+            return self._get_offset_address(address=self.get_address(pointer=instruction.instruction.operands[0].signal_name), 
+                                            offset=instruction.instruction.offset)
+        return None
+
+    def _add_pointer(self, instruction: LlvmInstruction) -> None:
+        name = self._get_name(instruction=instruction)
+        if not isinstance(instruction, LlvmInstructionCommand) or name is None:
+            return
+        address = self._get_pointer_address(instruction=instruction, name=name)
+        if address is not None:
+            self._addresses[name] = address
+
+    def _get_named_address(self, name: str) -> Optional[LlvmMemoryAddress]:
+        if name in self._addresses:
+            return self._addresses[name]
+        if name.startswith("@"):
+            return LlvmMemoryAddress(memory=name, kind="global", offset=0)
+        if name in self._defined:
+            return None
+        return LlvmMemoryAddress(memory=name, kind="argument", offset=0)
+
+    def get_address(self, pointer: LlvmType) -> Optional[LlvmMemoryAddress]:
+        if isinstance(pointer, LlvmPointer):
+            return self._get_offset_address(address=self.get_address(pointer=pointer.name), offset=pointer.offset)
+        name = pointer.get_name()
+        return None if name is None else self._get_named_address(name=name)
+
+    def get_pointer(self, instruction: LlvmInstruction) -> Optional[InstructionArgument]:
+        """
+        Returns the address operand of a load or a store
+        """
+        if not isinstance(instruction, LlvmInstructionCommand):
+            return None
+        if isinstance(instruction.instruction, LoadInstruction):
+            return instruction.instruction.operands[0]
+        if isinstance(instruction.instruction, DefaultInstruction) and instruction.instruction.opcode == "store":
+            return instruction.instruction.operands[1]
+        return None
+
+    def get_access(self, instruction: LlvmInstruction) -> Optional[LlvmMemoryAccess]:
+        """
+        Returns None when the instruction is neither a load nor a store
+        """
+        pointer = self.get_pointer(instruction=instruction)
+        if pointer is None:
+            return None
+        assert isinstance(instruction, LlvmInstructionCommand)
+        return LlvmMemoryAccess(address=self.get_address(pointer=pointer.signal_name), write=not isinstance(instruction.instruction, LoadInstruction))
+
+    def is_local_pointer(self, instruction: LlvmInstruction) -> bool:
+        """
+        Returns True for a getelementptr into an alloca or a pointer argument
+        """
+        if not isinstance(instruction, LlvmInstructionCommand) or not isinstance(instruction.instruction, GetelementptrInstruction):
+            return False
+        address = self._addresses.get(self._get_name(instruction=instruction) or "")
+        return address is not None and address.kind != "global"
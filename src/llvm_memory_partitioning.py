@@ -0,0 +1,304 @@
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+from instruction import AllocaInstruction, DefaultInstruction, GetelementptrInstruction, LoadInstruction
+from instruction_argument import InstructionArgument
+from llvm_declarations import LlvmArrayDeclaration, LlvmConstantDeclaration
+from llvm_function import LlvmFunction
+from llvm_instruction import LlvmInstruction
+from llvm_optimizer import LlvmPassStatistics
+from llvm_parser import LlvmInstructionCommand
+from llvm_type import LlvmType, LlvmVariableName
+
+@dataclass
+class LlvmMemoryPartition:
+    """
+    How the elements of an array are distributed over the banks:
+        cyclic: Element i is element i // banks of bank i % banks
+        block: Element i is element i % block_size of bank i // block_size, where block_size = ceil(size / banks)
+        complete: Every element is a bank of its own, which is a register
+    """
+    scheme: str
+    size: int
+    banks: int
+
+    def _get_block_size(self) -> int:
+        return -(-self.size // self.banks)
+
+    def get_bank(self, index: int) -> int:
+        if self.scheme == "cyclic":
+            return index % self.banks
+        if self.scheme == "block":
+            return index // self._get_block_size()
+        return index
+
+    def get_offset(self, index: int) -> int:
+        if self.scheme == "cyclic":
+            return index // self.banks
+        if self.scheme == "block":
+            return index % self._get_block_size()
+        return 0
+
+    def get_elements(self, bank: int) -> List[int]:
+        return [i for i in range(self.size) if self.get_bank(index=i) == bank]
+
+    def get_conflicts(self, indexes: List[int]) -> int:
+        """
+        Returns the highest number of accesses to one bank
+        """
+        banks = [self.get_bank(index=i) for i in indexes]
+        return max((banks.count(i) for i in set(banks)), default=0)
+
+@dataclass
+class LlvmMemoryAccesses:
+    """
+    The element index of every pointer that is derived from an alloca and the accesses through them.
+    pointers: The alloca and the getelementptr destinations
+    accesses: The element indexes of the loads and stores in instruction order
+    """
+    pointers: Dict[LlvmType, int]
+    accesses: List[int]
+
+@dataclass
+class LlvmPartitionedAlloca:
+    """
+    An alloca with the partition of its elements.
+    accessed: The pointers that are used by loads and stores
+    """
+    alloca: LlvmInstructionCommand
+    destination: LlvmVariableName
+    accesses: LlvmMemoryAccesses
+    partition: LlvmMemoryPartition
+    accessed: Set[LlvmType]
+
+    def get_bank(self, pointer: LlvmType) -> int:
+        return self.partition.get_bank(index=self.accesses.pointers[pointer])
+
+    def get_offset(self, pointer: LlvmType) -> int:
+        return self.partition.get_offset(index=self.accesses.pointers[pointer])
+
+    def get_bank_name(self, bank: int) -> LlvmVariableName:
+        return LlvmVariableName(f"{self.destination.get_name()}.bank{bank}")
+
+    def get_banks(self) -> List[int]:
+        return sorted({self.get_bank(pointer=i) for i in self.accessed})
+
+    def get_replacement(self, pointer: Optional[LlvmType]) -> Optional[LlvmVariableName]:
+        """
+        Returns the bank of an accessed pointer that is the first element of its bank
+        """
+        if pointer not in self.accessed or self.get_offset(pointer=pointer) != 0:
+            return None
+        return self.get_bank_name(bank=self.get_bank(pointer=pointer))
+
+class LlvmMemoryPartitioner:
+    """
+    Splits the array allocas of a function into banks, so that the accesses to different banks
+    are served by different memories and arbiters in the same clock cycle.
+    The scheme is chosen from the getelementptr offsets of the accesses. The auto scheme uses complete
+    partitioning when the array has no more elements than banks, otherwise the one of cyclic and block
+    partitioning that has the fewest accesses to the busiest bank.
+    Example with 2 banks:
+        %n = alloca [8 x i32]                     -> %n.bank0 = alloca [4 x i32]
+                                                     %n.bank1 = alloca [4 x i32]
+        %g = getelementptr inbounds [8 x i32],    -> %g = getelementptr inbounds [8 x i32],
+               ptr %n, i64 0, i64 4                      ptr %n.bank1, i64 0, i64 0 (block)
+    Only allocas whose pointers are used by loads, stores and getelementptr with constant offsets
+    are partitioned, and banks that are never accessed are removed.
+    """
+
+    name = "partition"
+
+    schemes = ("auto", "cyclic", "block", "complete")
+
+    def __init__(self, scheme: Optional[str] = None, banks: int = 4) -> None:
+        assert scheme is None or scheme in self.schemes, f"Unknown partitioning scheme {scheme}, must be one of {list(self.schemes)}"
+        assert scheme is None or banks > 1, f"The number of banks is {banks}, must be more than 1"
+        self._scheme = scheme
+        self._banks = banks
+
+    def _get_commands(self, instructions: List[LlvmInstruction]) -> List[LlvmInstructionCommand]:
+        return [i for i in instructions if isinstance(i, LlvmInstructionCommand)]
+
+    def _get_operands(self, instruction: LlvmInstructionCommand) -> List[InstructionArgument]:
+        return instruction.instruction.get_operands() or []
+
+    def _get_pointer_position(self, instruction: LlvmInstructionCommand) -> Optional[int]:
+        """
+        Returns the position of the operand that is the accessed address of a load or store
+        """
+        if isinstance(instruction.instruction, LoadInstruction):
+            return 0
+        if isinstance(instruction.instruction, DefaultInstruction) and instruction.instruction.opcode == "store":
+            return 1
+        return None
+
+    def _get_pointer(self, instruction: LlvmInstructionCommand, pointers: Dict[LlvmType, int]) -> Optional[LlvmType]:
+        """
+        Returns the accessed address of a load or store when it is one of the pointers
+        """
+        position = self._get_pointer_position(instruction=instruction)
+        operands = self._get_operands(instruction=instruction)
+        if position is None or position >= len(operands):
+            return None
+        name = operands[position].signal_name
+        return name if name in pointers else None
+
+    def _get_used(self, instruction: LlvmInstructionCommand, pointers: Dict[LlvmType, int]) -> List[int]:
+        """
+        Returns the positions of the operands that are one of the pointers
+        """
+        return [position for position, operand in enumerate(self._get_operands(instruction=instruction)) if operand.signal_name in pointers]
+
+    def _add_access(self, instruction: LlvmInstructionCommand, used: List[int], accesses: LlvmMemoryAccesses, size: int) -> bool:
+        """
+        Adds the element index of a getelementptr destination or of a load or store.
+        Returns False when the pointer escapes or is out of range
+        """
+        operands = self._get_operands(instruction=instruction)
+        destination = instruction.get_destination()
+        if isinstance(instruction.instruction, GetelementptrInstruction) and destination is not None:
+            index = accesses.pointers[operands[0].signal_name] + instruction.instruction.offset
+            accesses.pointers[destination] = index
+            return 0 <= index < size
+        if used != [self._get_pointer_position(instruction=instruction)]:
+            return False
+        accesses.accesses.append(accesses.pointers[operands[used[0]].signal_name])
+        return True
+
+    def _get_accesses(self, instructions: List[LlvmInstruction], alloca: LlvmInstructionCommand, size: int) -> Optional[LlvmMemoryAccesses]:
+        """
+        Returns None when a pointer to the alloca escapes or is out of range
+        """
+        destination = alloca.get_destination()
+        assert destination is not None
+        accesses = LlvmMemoryAccesses(pointers={destination: 0}, accesses=[])
+        for i in self._get_commands(instructions=instructions):
+            used = self._get_used(instruction=i, pointers=accesses.pointers)
+            if used and not self._add_access(instruction=i, used=used, accesses=accesses, size=size):
+                return None
+        return accesses
+
+    def _get_scheme(self, size: int, accesses: List[int]) -> str:
+        """
+        Returns the scheme of the auto partitioning
+        """
+        if size <= self._banks:
+            return "complete"
+        candidates = [LlvmMemoryPartition(scheme=i, size=size, banks=self._banks) for i in ("cyclic", "block")]
+        return min(candidates, key=lambda x: x.get_conflicts(indexes=accesses)).scheme
+
+    def _select_partition(self, size: int, accesses: List[int]) -> LlvmMemoryPartition:
+        assert self._scheme is not None
+        scheme = self._get_scheme(size=size, accesses=accesses) if self._scheme == "auto" else self._scheme
+        if scheme == "complete":
+            return LlvmMemoryPartition(scheme=scheme, size=size, banks=size)
+        return LlvmMemoryPartition(scheme=scheme, size=size, banks=min(self._banks, size))
+
+    def _get_partition(self, size: int, accesses: List[int]) -> Optional[LlvmMemoryPartition]:
+        """
+        Returns None when all the accesses are to the same bank
+        """
+        partition = self._select_partition(size=size, accesses=accesses)
+        if len({partition.get_bank(index=i) for i in accesses}) < 2:
+            return None
+        return partition
+
+    def _get_bank(self, alloca: LlvmInstructionCommand, instruction: AllocaInstruction, data_type: LlvmArrayDeclaration,
+                  name: LlvmVariableName, elements: List[int]) -> LlvmInstructionCommand:
+        bank_type = data_type.y if len(elements) == 1 else replace(data_type, x=LlvmConstantDeclaration(str(len(elements))))
+        initialization = None
+        if instruction.initialization is not None:
+            initialization = [instruction.initialization[i] if i < len(instruction.initialization) else "0" for i in elements]
+        return replace(alloca, destination=name, instruction=replace(instruction, data_type=bank_type, output_port_name=name,
+                                                                     initialization=initialization))
+
+    def _get_banks(self, alloca: LlvmPartitionedAlloca) -> List[LlvmInstructionCommand]:
+        instruction = alloca.alloca.instruction
+        assert isinstance(instruction, AllocaInstruction) and isinstance(instruction.data_type, LlvmArrayDeclaration)
+        return [self._get_bank(alloca=alloca.alloca, instruction=instruction, data_type=instruction.data_type,
+                               name=alloca.get_bank_name(bank=i), elements=alloca.partition.get_elements(bank=i))
+                for i in alloca.get_banks()]
+
+    def _rewrite_pointer(self, instruction: LlvmInstructionCommand, position: int, name: LlvmType) -> LlvmInstructionCommand:
+        access = instruction.instruction
+        assert isinstance(access, (LoadInstruction, DefaultInstruction))
+        operands = list(access.operands)
+        operands[position] = replace(operands[position], signal_name=name)
+        return replace(instruction, instruction=replace(access, operands=operands))
+
+    def _rewrite_getelementptr(self, instruction: LlvmInstructionCommand, alloca: LlvmPartitionedAlloca,
+                               statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        """
+        A getelementptr that is only used by other getelementptr is removed, and one with offset 0 in its bank
+        is replaced by the bank. Any other is based on the bank of its element.
+        """
+        pointer = instruction.get_destination()
+        gep = instruction.instruction
+        assert pointer is not None and isinstance(gep, GetelementptrInstruction)
+        if pointer not in alloca.accessed or alloca.get_replacement(pointer=pointer) is not None:
+            statistics.removed_instructions += 1
+            return []
+        operands = list(gep.operands)
+        operands[0] = replace(operands[0], signal_name=alloca.get_bank_name(bank=alloca.get_bank(pointer=pointer)))
+        statistics.replaced_operands += 1
+        return [replace(instruction, instruction=replace(gep, operands=operands, offset=alloca.get_offset(pointer=pointer)))]
+
+    def _rewrite_access(self, instruction: LlvmInstructionCommand, alloca: LlvmPartitionedAlloca,
+                        statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        """
+        A load or store of a pointer that is replaced by a bank accesses the bank
+        """
+        replacement = alloca.get_replacement(pointer=self._get_pointer(instruction=instruction, pointers=alloca.accesses.pointers))
+        position = self._get_pointer_position(instruction=instruction)
+        if replacement is None or position is None:
+            return [instruction]
+        statistics.replaced_operands += 1
+        return [self._rewrite_pointer(instruction=instruction, position=position, name=replacement)]
+
+    def _rewrite(self, instruction: LlvmInstruction, alloca: LlvmPartitionedAlloca, statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        if instruction is alloca.alloca:
+            banks = self._get_banks(alloca=alloca)
+            statistics.removed_instructions += 1
+            statistics.added_instructions += len(banks)
+            return list(banks)
+        if not isinstance(instruction, LlvmInstructionCommand):
+            return [instruction]
+        if isinstance(instruction.instruction, GetelementptrInstruction) and instruction.get_destination() in alloca.accesses.pointers:
+            return self._rewrite_getelementptr(instruction=instruction, alloca=alloca, statistics=statistics)
+        return self._rewrite_access(instruction=instruction, alloca=alloca, statistics=statistics)
+
+    def _get_accessed(self, instructions: List[LlvmInstruction], pointers: Dict[LlvmType, int]) -> Set[LlvmType]:
+        accessed = {self._get_pointer(instruction=i, pointers=pointers) for i in self._get_commands(instructions=instructions)}
+        return {i for i in accessed if i is not None}
+
+    def _partition(self, instructions: List[LlvmInstruction], alloca: LlvmInstructionCommand, accesses: LlvmMemoryAccesses,
+                   partition: LlvmMemoryPartition, statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        destination = alloca.get_destination()
+        assert destination is not None
+        partitioned = LlvmPartitionedAlloca(alloca=alloca, destination=destination, accesses=accesses, partition=partition,
+                                            accessed=self._get_accessed(instructions=instructions, pointers=accesses.pointers))
+        return [j for i in instructions for j in self._rewrite(instruction=i, alloca=partitioned, statistics=statistics)]
+
+    def _get_arrays(self, instructions: List[LlvmInstruction]) -> List[Tuple[LlvmInstructionCommand, int]]:
+        arrays = []
+        for i in self._get_commands(instructions=instructions):
+            if isinstance(i.instruction, AllocaInstruction) and isinstance(i.instruction.data_type, LlvmArrayDeclaration):
+                size, _ = i.instruction.data_type.get_dimensions()
+                arrays.append((i, size))
+        return arrays
+
+    def run(self, function: LlvmFunction) -> Tuple[LlvmFunction, LlvmPassStatistics]:
+        statistics = LlvmPassStatistics(pass_name=self.name, functions=1)
+        if self._scheme is None:
+            return function, statistics
+        instructions = function.instructions
+        for alloca, size in self._get_arrays(instructions=instructions):
+            accesses = self._get_accesses(instructions=instructions, alloca=alloca, size=size)
+            if accesses is None:
+                continue
+            partition = self._get_partition(size=size, accesses=accesses.accesses)
+            if partition is not None:
+                instructions = self._partition(instructions=instructions, alloca=alloca, accesses=accesses,
+                                               partition=partition, statistics=statistics)
+        return replace(function, instructions=instructions), statistics
@@ -0,0 +1,761 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Type, Union
+
+from instruction import BitcastInstruction, CallInstruction, DefaultInstruction, GetelementptrInstruction, LoadInstruction, ReturnInstruction
+from instruction_argument import InstructionArgument
+from llvm_declarations import LlvmIntegerDeclaration
+from llvm_function import LlvmFunction
+from llvm_instruction import LlvmInstruction
+from llvm_memory_alias import LlvmMemoryAddress, LlvmMemoryAliasAnalysis
+from llvm_parser import LlvmInstructionCommand
+from llvm_type import LlvmBoolean, LlvmFloat, LlvmInteger, LlvmType, LlvmVariableName
+from llvm_type_declaration import TypeDeclaration
+
+@dataclass
+class LlvmPassStatistics:
+    pass_name: str
+    functions: int = 0
+    removed_instructions: int = 0
+    added_instructions: int = 0
+    replaced_operands: int = 0
+
+    def add(self, other: "LlvmPassStatistics") -> None:
+        self.functions += other.functions
+        self.removed_instructions += other.removed_instructions
+        self.added_instructions += other.added_instructions
+        self.replaced_operands += other.replaced_operands
+
+    def get_summary(self) -> str:
+        return (f"{self.pass_name}: {self.removed_instructions} instructions removed, {self.added_instructions} added, "
+                f"{self.replaced_operands} operands replaced")
+
+@dataclass
+class LlvmOptimizerStatistics:
+    """
+    The statistics of each pass summed over all functions.
+    order: The pass names in the order the passes are run. The summary lists the passes in this order
+    and the passes that are not in it last, because a pass is only reported by some of the functions.
+    """
+    passes: Dict[str, LlvmPassStatistics] = field(default_factory=dict)
+    order: Tuple[str, ...] = ()
+
+    def add(self, statistics: List[LlvmPassStatistics]) -> None:
+        for i in statistics:
+            self.passes.setdefault(i.pass_name, LlvmPassStatistics(pass_name=i.pass_name)).add(i)
+
+    def _get_position(self, pass_name: str) -> int:
+        return self.order.index(pass_name) if pass_name in self.order else len(self.order)
+
+    def get_summary(self) -> List[str]:
+        passes = sorted(self.passes.values(), key=lambda i: self._get_position(pass_name=i.pass_name))
+        return [f"Optimization pass {i.get_summary()}" for i in passes]
+
+OperandInstruction = Union[ReturnInstruction, BitcastInstruction, GetelementptrInstruction, CallInstruction, LoadInstruction, DefaultInstruction]
+
+class LlvmFunctionPass(ABC):
+    """
+    A pass rewrites the instructions of a function and never modifies the instructions it is given,
+    because the parsed module is shared by all functions and processes.
+    The ret instruction is not parsed and the last valid instruction drives the function output,
+    so the passes never remove or merge the last valid instruction.
+    """
+
+    name: str
+
+    _operand_instructions = (ReturnInstruction, BitcastInstruction, GetelementptrInstruction, CallInstruction, LoadInstruction, DefaultInstruction)
+
+    @abstractmethod
+    def run(self, instructions: List[LlvmInstruction], statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        pass
+
+    def _get_return_driver(self, instructions: List[LlvmInstruction]) -> Optional[LlvmInstruction]:
+        return next((i for i in reversed(instructions) if isinstance(i, LlvmInstructionCommand) and i.is_valid()), None)
+
+    def _get_operands(self, instruction: LlvmInstruction) -> List[InstructionArgument]:
+        if not isinstance(instruction, LlvmInstructionCommand) or not isinstance(instruction.instruction, self._operand_instructions):
+            return []
+        return instruction.instruction.operands
+
+    def _replace_operand(self, instruction: LlvmInstructionCommand, operand: InstructionArgument, statistics: LlvmPassStatistics,
+                         get_replacement: Callable[[LlvmInstructionCommand, InstructionArgument], Optional[LlvmType]]) -> InstructionArgument:
+        replacement = get_replacement(instruction, operand)
+        if replacement is None:
+            return operand
+        statistics.replaced_operands += 1
+        return replace(operand, signal_name=replacement)
+
+    def _set_operands(self, instruction: LlvmInstructionCommand, operand_instruction: OperandInstruction,
+                      operands: List[InstructionArgument]) -> LlvmInstruction:
+        if all(i is j for i, j in zip(operand_instruction.operands, operands)):
+            return instruction
+        return replace(instruction, instruction=replace(operand_instruction, operands=operands))
+
+    def _replace_operands(self, instruction: LlvmInstruction, statistics: LlvmPassStatistics,
+                          get_replacement: Callable[[LlvmInstructionCommand, InstructionArgument], Optional[LlvmType]]) -> LlvmInstruction:
+        """
+        Returns a copy of the instruction with the operands for which get_replacement returns a new value
+        """
+        if not isinstance(instruction, LlvmInstructionCommand) or not isinstance(instruction.instruction, self._operand_instructions):
+            return instruction
+        operands = [self._replace_operand(instruction=instruction, operand=i, statistics=statistics, get_replacement=get_replacement)
+                    for i in instruction.instruction.operands]
+        return self._set_operands(instruction=instruction, operand_instruction=instruction.instruction, operands=operands)
+
+class LlvmConstantFoldingPass(LlvmFunctionPass):
+    """
+    Propagates integer constants through the function and replaces the operands
+    that have a constant value with the constant.
+    A select with a constant condition is replaced by the selected value.
+    Example:
+        %a = add nsw i32 2, 3
+        %b = mul nsw i32 %a, %x     -> %b = mul nsw i32 5, %x
+        %c = select i1 true, i32 %b, i32 %x
+        ret i32 %c                  -> ret i32 %b
+    Constants are written as hexadecimal literals, so a value is only replaced when its literal fits
+    in the width of the operand. The instructions that are no longer used are removed by the dead code pass.
+    values: Known values of names that are not defined by the instructions, for example of the arguments
+    """
+
+    name = "constant-folding"
+
+    _compare_conditions = {"eq", "ne", "ugt", "uge", "ult", "ule", "sgt", "sge", "slt", "sle"}
+
+    def __init__(self, values: Optional[Dict[LlvmType, int]] = None) -> None:
+        self._known_values: Dict[LlvmType, int] = {} if values is None else values
+        self._values: Dict[LlvmType, int] = {}
+        self._aliases: Dict[LlvmType, LlvmType] = {}
+
+    def _get_width(self, argument: InstructionArgument) -> Optional[int]:
+        data_type = argument.data_type
+        return data_type.data_width if isinstance(data_type, LlvmIntegerDeclaration) else None
+
+    def _get_literal(self, value: LlvmType) -> Optional[int]:
+        if isinstance(value, LlvmInteger):
+            return value.value
+        if isinstance(value, LlvmBoolean):
+            return int(value.value == "true")
+        if isinstance(value, LlvmFloat) and value.value.is_integer():
+            return int(value.value)
+        return None
+
+    def _get_value(self, argument: InstructionArgument) -> Optional[int]:
+        width = self._get_width(argument=argument)
+        if width is None:
+            return None
+        value = self._get_literal(value=argument.signal_name)
+        if value is None:
+            value = self._values.get(argument.signal_name)
+        return None if value is None else value % 2 ** width
+
+    def _to_signed(self, value: int, width: int) -> int:
+        return value - 2 ** width if value >= 2 ** (width - 1) else value
+
+    def _compare(self, condition: str, a: int, b: int, width: int) -> bool:
+        if condition.startswith("s"):
+            a = self._to_signed(value=a, width=width)
+            b = self._to_signed(value=b, width=width)
+            condition = "u" + condition[1:]
+        return {"eq": a == b, "ne": a != b, "ugt": a > b, "uge": a >= b, "ult": a < b, "ule": a <= b}[condition]
+
+    def _divide(self, a: int, b: int, width: int, signed: bool, remainder: bool) -> int:
+        """
+        The quotient is rounded towards zero and the remainder has the sign of the dividend
+        """
+        if signed:
+            a = self._to_signed(value=a, width=width)
+            b = self._to_signed(value=b, width=width)
+        quotient = abs(a) // abs(b) * (1 if (a < 0) == (b < 0) else -1)
+        return a - b * quotient if remainder else quotient
+
+    def _is_defined(self, opcode: str, values: List[int], result_width: int) -> bool:
+        """
+        Shifts by the width of the result or more and divisions by zero are undefined
+        """
+        if opcode in ("shl", "lshr", "ashr"):
+            return values[1] < result_width
+        return opcode not in ("udiv", "sdiv", "urem", "srem") or values[1] != 0
+
+    def _get_operations(self, values: List[int], width: int, result_width: int) -> Dict[str, Callable[[], int]]:
+        return {
+            "add": lambda: values[0] + values[1],
+            "sub": lambda: values[0] - values[1],
+            "mul": lambda: values[0] * values[1],
+            "and": lambda: values[0] & values[1],
+            "or": lambda: values[0] | values[1],
+            "xor": lambda: values[0] ^ values[1],
+            "shl": lambda: values[0] << values[1],
+            "lshr": lambda: values[0] >> values[1],
+            "ashr": lambda: self._to_signed(value=values[0], width=result_width) >> values[1],
+            "zext": lambda: values[0],
+            "trunc": lambda: values[0],
+            "sext": lambda: self._to_signed(value=values[0], width=width),
+            "udiv": lambda: self._divide(a=values[0], b=values[1], width=width, signed=False, remainder=False),
+            "sdiv": lambda: self._divide(a=values[0], b=values[1], width=width, signed=True, remainder=False),
+            "urem": lambda: self._divide(a=values[0], b=values[1], width=width, signed=False, remainder=True),
+            "srem": lambda: self._divide(a=values[0], b=values[1], width=width, signed=True, remainder=True)}
+
+    def _get_operation(self, opcode: str, values: List[int], width: int, result_width: int) -> Optional[Callable[[], int]]:
+        if opcode in self._compare_conditions:
+            return lambda: int(self._compare(condition=opcode, a=values[0], b=values[1], width=width))
+        return self._get_operations(values=values, width=width, result_width=result_width).get(opcode)
+
+    def _evaluate(self, instruction: DefaultInstruction, values: List[int]) -> Optional[int]:
+        width = self._get_width(argument=instruction.operands[0])
+        data_type = instruction.data_type
+        if width is None or not isinstance(data_type, LlvmIntegerDeclaration):
+            return None
+        operation = self._get_operation(opcode=instruction.opcode, values=values, width=width, result_width=data_type.data_width)
+        if operation is None or not self._is_defined(opcode=instruction.opcode, values=values, result_width=data_type.data_width):
+            return None
+        return operation() % 2 ** data_type.data_width
+
+    def _add_select(self, destination: LlvmType, instruction: DefaultInstruction) -> None:
+        condition = self._get_value(argument=instruction.operands[0])
+        if condition is None:
+            return
+        selected = instruction.operands[1] if condition else instruction.operands[2]
+        value = self._get_value(argument=selected)
+        if value is not None:
+            self._values[destination] = value
+        elif selected.signal_name.is_name():
+            self._aliases[destination] = selected.signal_name
+
+    def _get_values(self, instruction: DefaultInstruction) -> Optional[List[int]]:
+        """
+        Returns None when the value of an operand is unknown
+        """
+        values = [self._get_value(argument=i) for i in instruction.operands]
+        known = [i for i in values if i is not None]
+        return known if len(known) == len(values) else None
+
+    def _add_value(self, destination: LlvmType, instruction: DefaultInstruction) -> None:
+        values = self._get_values(instruction=instruction)
+        value = None if values is None else self._evaluate(instruction=instruction, values=values)
+        if value is not None:
+            self._values[destination] = value
+
+    def _add_instruction(self, instruction: LlvmInstruction) -> None:
+        destination = instruction.get_destination()
+        if not isinstance(instruction, LlvmInstructionCommand) or not isinstance(instruction.instruction, DefaultInstruction) or destination is None:
+            return
+        if instruction.instruction.opcode == "select":
+            self._add_select(destination=destination, instruction=instruction.instruction)
+        else:
+            self._add_value(destination=destination, instruction=instruction.instruction)
+
+    def _is_literal_operand(self, instruction: LlvmInstructionCommand) -> bool:
+        """
+        The operands of loads and getelementptr are never replaced with literals
+        """
+        return isinstance(instruction.instruction, (DefaultInstruction, CallInstruction, ReturnInstruction))
+
+    def _get_literal_replacement(self, operand: InstructionArgument) -> Optional[LlvmType]:
+        width = self._get_width(argument=operand)
+        value = self._values.get(operand.signal_name)
+        if value is None or width is None or len(f"{value:x}") * 4 > width:
+            return None
+        return LlvmInteger(value=value)
+
+    def _get_replacement(self, instruction: LlvmInstructionCommand, operand: InstructionArgument) -> Optional[LlvmType]:
+        alias = self._aliases.get(operand.signal_name)
+        if alias is not None or not self._is_literal_operand(instruction=instruction):
+            return alias
+        return self._get_literal_replacement(operand=operand)
+
+    def run(self, instructions: List[LlvmInstruction], statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        self._values = dict(self._known_values)
+        self._aliases = {}
+        result = []
+        for i in instructions:
+            instruction = self._replace_operands(instruction=i, statistics=statistics, get_replacement=self._get_replacement)
+            self._add_instruction(instruction=instruction)
+            result.append(instruction)
+        return result
+
+class LlvmCommonSubexpressionPass(LlvmFunctionPass):
+    """
+    Replaces the result of an instruction with the result of an earlier instruction
+    that has the same opcode, type and operands. The operands of commutative instructions are compared in any order.
+    Example:
+        %a = add nsw i32 %x, %y
+        %b = add nsw i32 %y, %x
+        %c = mul nsw i32 %a, %b     -> %c = mul nsw i32 %a, %a
+    Only instructions without side effects are merged, so loads, stores and calls are never merged.
+    """
+
+    name = "cse"
+
+    _commutative = {"add", "mul", "and", "or", "xor", "eq", "ne", "fadd", "fmul"}
+
+    def __init__(self) -> None:
+        self._replacements: Dict[LlvmType, LlvmType] = {}
+
+    def _get_key(self, instruction: DefaultInstruction) -> Tuple:
+        operands = [(i.signal_name, type(i.data_type).__name__, i.data_type.get_data_width()) for i in instruction.operands]
+        if instruction.opcode in self._commutative:
+            operands.sort(key=repr)
+        data_type = instruction.data_type
+        return (instruction.opcode, instruction.sub_type, type(data_type).__name__, data_type.get_data_width(), tuple(operands))
+
+    def _get_replacement(self, instruction: LlvmInstructionCommand, operand: InstructionArgument) -> Optional[LlvmType]:
+        return self._replacements.get(operand.signal_name)
+
+    def _merge(self, instruction: LlvmInstruction, expressions: Dict[Tuple, LlvmType], statistics: LlvmPassStatistics) -> bool:
+        """
+        Returns True when the result is replaced by the result of an earlier instruction with the same expression
+        """
+        destination = instruction.get_destination()
+        if not isinstance(instruction, LlvmInstructionCommand) or not isinstance(instruction.instruction, DefaultInstruction) or destination is None:
+            return False
+        key = self._get_key(instruction=instruction.instruction)
+        if key not in expressions:
+            expressions[key] = destination
+            return False
+        self._replacements[destination] = expressions[key]
+        statistics.removed_instructions += 1
+        return True
+
+    def run(self, instructions: List[LlvmInstruction], statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        self._replacements = {}
+        expressions: Dict[Tuple, LlvmType] = {}
+        return_driver = self._get_return_driver(instructions=instructions)
+        result = []
+        for i in instructions:
+            instruction = self._replace_operands(instruction=i, statistics=statistics, get_replacement=self._get_replacement)
+            if i is return_driver or not self._merge(instruction=instruction, expressions=expressions, statistics=statistics):
+                result.append(instruction)
+        return result
+
+@dataclass
+class LlvmShiftTerm:
+    """
+    The term +/- (x << shift) of a shift and add network
+    """
+    shift: int
+    negative: bool = False
+
+@dataclass
+class LlvmStrengthReductionCost:
+    """
+    The relative cost of the operators of a shift and add network compared to a multiplier or divider.
+    A multiplier uses a DSP block, which is the scarcest resource, so it costs as much as several adders.
+    A shift by a constant is only wiring, but it still costs a handshake stage.
+    """
+    add: float = 1.0
+    shift: float = 0.25
+    mul: float = 4.0
+    div: float = 16.0
+
+    def get_network_cost(self, terms: List[LlvmShiftTerm]) -> float:
+        adders = len(terms) - 1 + (1 if terms[0].negative else 0)
+        shifts = len([i for i in terms if i.shift > 0])
+        return adders * self.add + shifts * self.shift
+
+class LlvmStrengthReductionPass(LlvmFunctionPass):
+    """
+    Replaces multiplications and divisions by constants with shifts, adds and masks.
+    A multiplication is replaced by the cheapest of the binary and the canonical signed digit
+    shift and add networks when it is cheaper than the multiplier (see LlvmStrengthReductionCost).
+    Example:
+        %a = mul nsw i32 %x, 10     -> %a.sr1 = shl i32 %x, 3
+                                       %a.sr2 = shl i32 %x, 1
+                                       %a = add i32 %a.sr1, %a.sr2
+        %b = mul nsw i32 %x, 255    -> %b.sr1 = shl i32 %x, 8
+                                       %b = sub i32 %b.sr1, %x
+        %c = udiv i32 %x, 8         -> %c = lshr i32 %x, 3
+        %d = urem i32 %x, 8         -> %d = and i32 %x, 7
+    Signed divisions by a power of two add the rounding bias of negative dividends before the shift.
+    """
+
+    name = "strength-reduction"
+
+    def __init__(self, cost: Optional[LlvmStrengthReductionCost] = None) -> None:
+        self._cost = LlvmStrengthReductionCost() if cost is None else cost
+        self._statistics = LlvmPassStatistics(pass_name=self.name)
+        self._result: List[LlvmInstruction] = []
+        self._count = 0
+
+    def _get_constant(self, argument: InstructionArgument, width: int) -> Optional[int]:
+        value = argument.signal_name
+        if isinstance(value, LlvmInteger):
+            return value.value % 2 ** width
+        if isinstance(value, LlvmFloat) and value.value.is_integer():
+            return int(value.value) % 2 ** width
+        return None
+
+    def _fits(self, value: int, width: int) -> bool:
+        """
+        Constants are written as hexadecimal literals that must fit in the operand width
+        """
+        return len(f"{value:x}") * 4 <= width
+
+    def _get_power_of_two(self, value: int) -> Optional[int]:
+        if value <= 0 or value & (value - 1):
+            return None
+        return value.bit_length() - 1
+
+    def get_binary_terms(self, value: int) -> List[LlvmShiftTerm]:
+        return [LlvmShiftTerm(shift=i) for i in reversed(range(value.bit_length())) if value >> i & 1]
+
+    def get_csd_terms(self, value: int, width: int) -> List[LlvmShiftTerm]:
+        """
+        The canonical signed digit form has no two adjacent non-zero digits, for example 255 = 256 - 1.
+        The digits at or above the width are removed because the result is modulo 2 ** width.
+        """
+        terms = []
+        shift = 0
+        while value:
+            if value & 1:
+                digit = 2 - (value & 3)
+                terms.append(LlvmShiftTerm(shift=shift, negative=digit < 0))
+                value -= digit
+            value >>= 1
+            shift += 1
+        return [i for i in reversed(terms) if i.shift < width]
+
+    def _get_multiplication_terms(self, value: int, width: int) -> Optional[List[LlvmShiftTerm]]:
+        forms = [i for i in (self.get_binary_terms(value=value), self.get_csd_terms(value=value, width=width)) if i]
+        if not forms:
+            return None
+        terms = min(forms, key=self._cost.get_network_cost)
+        if self._cost.get_network_cost(terms) >= self._cost.mul:
+            return None
+        return terms
+
+    def _get_name(self, destination: LlvmType) -> LlvmVariableName:
+        self._count += 1
+        return LlvmVariableName(f"{destination.get_name()}.sr{self._count}")
+
+    def _add(self, command: LlvmInstructionCommand, destination: LlvmVariableName, opcode: str, operands: List[LlvmType]) -> LlvmType:
+        instruction = command.instruction
+        assert isinstance(instruction, DefaultInstruction)
+        arguments = [InstructionArgument(signal_name=i, data_type=instruction.data_type, port_name=chr(ord('a') + index)) 
+                     for index, i in enumerate(operands)]
+        self._result.append(replace(command, destination=destination,
+                                    instruction=DefaultInstruction(opcode=opcode, sub_type=None, data_type=instruction.data_type,
+                                                                   operands=arguments, output_port_name=instruction.output_port_name)))
+        self._statistics.added_instructions += 1
+        return destination
+
+    def _get_network_size(self, terms: List[LlvmShiftTerm]) -> int:
+        """
+        Returns the number of shifts, adds and subtracts of the network
+        """
+        return len([i for i in terms if i.shift > 0]) + len(terms) - 1 + int(terms[0].negative)
+
+    def _add_shift(self, command: LlvmInstructionCommand, x: LlvmType, term: LlvmShiftTerm, names: Iterator[LlvmVariableName]) -> LlvmType:
+        if term.shift == 0:
+            return x
+        return self._add(command=command, destination=next(names), opcode="shl", operands=[x, LlvmInteger(term.shift)])
+
+    def _add_terms(self, command: LlvmInstructionCommand, terms: List[LlvmShiftTerm], values: List[LlvmType],
+                   names: Iterator[LlvmVariableName]) -> None:
+        accumulator = values[0]
+        if terms[0].negative:
+            accumulator = self._add(command=command, destination=next(names), opcode="sub", operands=[LlvmInteger(0), accumulator])
+        for term, value in zip(terms[1:], values[1:]):
+            accumulator = self._add(command=command, destination=next(names), opcode="sub" if term.negative else "add", operands=[accumulator, value])
+
+    def _add_network(self, command: LlvmInstructionCommand, x: InstructionArgument, terms: List[LlvmShiftTerm]) -> None:
+        """
+        The shifted terms are added in order and the last instruction gets the destination of the multiplication
+        """
+        destination = command.get_destination()
+        assert destination is not None
+        names = iter([self._get_name(destination=destination) for _ in range(self._get_network_size(terms=terms) - 1)] + [destination])
+        values = [self._add_shift(command=command, x=x.signal_name, term=i, names=names) for i in terms]
+        self._add_terms(command=command, terms=terms, values=values, names=names)
+
+    def _get_multiplication_operands(self, instruction: DefaultInstruction, width: int) -> Optional[Tuple[InstructionArgument, int]]:
+        """
+        Returns the variable operand and the value of the constant operand
+        """
+        for x, constant in (instruction.operands, reversed(instruction.operands)):
+            value = self._get_constant(argument=constant, width=width)
+            if value is not None and self._get_constant(argument=x, width=width) is None:
+                return x, value
+        return None
+
+    def _is_network(self, terms: List[LlvmShiftTerm], width: int) -> bool:
+        """
+        A multiplication by 1 is not replaced, and the shifts must fit in the operand width
+        """
+        return terms != [LlvmShiftTerm(shift=0)] and all(self._fits(value=i.shift, width=width) for i in terms)
+
+    def _reduce_multiplication(self, command: LlvmInstructionCommand, width: int) -> bool:
+        instruction = command.instruction
+        assert isinstance(instruction, DefaultInstruction)
+        operands = self._get_multiplication_operands(instruction=instruction, width=width)
+        if operands is None:
+            return False
+        x, value = operands
+        terms = self._get_multiplication_terms(value=value, width=width)
+        if terms is None or not self._is_network(terms=terms, width=width):
+            return False
+        self._add_network(command=command, x=x, terms=terms)
+        return True
+
+    def _get_division_shift(self, instruction: DefaultInstruction, width: int) -> Optional[int]:
+        """
+        Returns the shift of a division by a power of two other than 1 when the shift is cheaper than the divider
+        """
+        value = self._get_constant(argument=instruction.operands[1], width=width)
+        shift = None if value is None else self._get_power_of_two(value=value)
+        if not shift or self._cost.get_network_cost([LlvmShiftTerm(shift=shift)]) >= self._cost.div:
+            return None
+        return shift
+
+    def _reduce_udiv(self, command: LlvmInstructionCommand, destination: LlvmVariableName, x: LlvmType, shift: int, width: int) -> bool:
+        if not self._fits(value=shift, width=width):
+            return False
+        self._add(command=command, destination=destination, opcode="lshr", operands=[x, LlvmInteger(shift)])
+        return True
+
+    def _reduce_urem(self, command: LlvmInstructionCommand, destination: LlvmVariableName, x: LlvmType, shift: int, width: int) -> bool:
+        if not self._fits(value=2 ** shift - 1, width=width):
+            return False
+        self._add(command=command, destination=destination, opcode="and", operands=[x, LlvmInteger(2 ** shift - 1)])
+        return True
+
+    def _get_signed_mask(self, shift: int, width: int) -> int:
+        return 2 ** width - 2 ** shift
+
+    def _is_signed_reducible(self, shift: int, width: int) -> bool:
+        return (shift < width - 1 and self._fits(value=width - 1, width=width) and
+                self._fits(value=self._get_signed_mask(shift=shift, width=width), width=width))
+
+    def _add_bias(self, command: LlvmInstructionCommand, destination: LlvmVariableName, x: LlvmType, shift: int, width: int) -> LlvmType:
+        """
+        Adds 2 ** shift - 1 to a negative dividend, so that the shift rounds towards zero
+        """
+        sign = self._add(command=command, destination=self._get_name(destination=destination), opcode="ashr", 
+                         operands=[x, LlvmInteger(width - 1)])
+        bias = self._add(command=command, destination=self._get_name(destination=destination), opcode="lshr", 
+                         operands=[sign, LlvmInteger(width - shift)])
+        return self._add(command=command, destination=self._get_name(destination=destination), opcode="add", operands=[x, bias])
+
+    def _reduce_sdiv(self, command: LlvmInstructionCommand, destination: LlvmVariableName, x: LlvmType, shift: int, width: int) -> bool:
+        if not self._is_signed_reducible(shift=shift, width=width):
+            return False
+        biased = self._add_bias(command=command, destination=destination, x=x, shift=shift, width=width)
+        self._add(command=command, destination=destination, opcode="ashr", operands=[biased, LlvmInteger(shift)])
+        return True
+
+    def _reduce_srem(self, command: LlvmInstructionCommand, destination: LlvmVariableName, x: LlvmType, shift: int, width: int) -> bool:
+        if not self._is_signed_reducible(shift=shift, width=width):
+            return False
+        biased = self._add_bias(command=command, destination=destination, x=x, shift=shift, width=width)
+        rounded = self._add(command=command, destination=self._get_name(destination=destination), opcode="and", 
+                            operands=[biased, LlvmInteger(self._get_signed_mask(shift=shift, width=width))])
+        self._add(command=command, destination=destination, opcode="sub", operands=[x, rounded])
+        return True
+
+    def _reduce_division(self, command: LlvmInstructionCommand, width: int) -> bool:
+        instruction = command.instruction
+        assert isinstance(instruction, DefaultInstruction)
+        destination = command.get_destination()
+        shift = self._get_division_shift(instruction=instruction, width=width)
+        if destination is None or shift is None:
+            return False
+        reductions = {"udiv": self._reduce_udiv, "urem": self._reduce_urem, "sdiv": self._reduce_sdiv, "srem": self._reduce_srem}
+        return reductions[instruction.opcode](command=command, destination=destination, x=instruction.operands[0].signal_name,
+                                              shift=shift, width=width)
+
+    def _reduce(self, instruction: LlvmInstruction) -> bool:
+        if not isinstance(instruction, LlvmInstructionCommand) or not isinstance(instruction.instruction, DefaultInstruction):
+            return False
+        data_type = instruction.instruction.data_type
+        reductions = {"mul": self._reduce_multiplication, "udiv": self._reduce_division, "urem": self._reduce_division,
+                      "sdiv": self._reduce_division, "srem": self._reduce_division}
+        reduction = reductions.get(instruction.instruction.opcode)
+        if reduction is None or not isinstance(data_type, LlvmIntegerDeclaration):
+            return False
+        return reduction(command=instruction, width=data_type.data_width)
+
+    def run(self, instructions: List[LlvmInstruction], statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        self._statistics = statistics
+        self._result = []
+        self._count = 0
+        for i in instructions:
+            if self._reduce(instruction=i):
+                statistics.removed_instructions += 1
+            else:
+                self._result.append(i)
+        return self._result
+
+@dataclass
+class LlvmMemoryValue:
+    """
+    The value that an address is known to hold after a store to it or a load from it
+    """
+    address: LlvmMemoryAddress
+    data_type: TypeDeclaration
+    value: LlvmType
+
+class LlvmMemoryForwardingPass(LlvmFunctionPass):
+    """
+    Replaces a load with the value of an earlier store to the same address, or with the result of an earlier
+    load from the same address, when no store or call in between may write the address.
+    Example:
+        store i32 %a, ptr %g
+        %0 = load i32, ptr %g       -> removed
+        %1 = load i32, ptr %n
+        %2 = load i32, ptr %n       -> removed
+        %3 = add nsw i32 %0, %2     -> %3 = add nsw i32 %a, %1
+    A store forgets the values of all the addresses that it may write (see LlvmMemoryAliasAnalysis) and a call
+    with pointer arguments forgets all values. A value is only forwarded to a load of the same type,
+    and a literal only when all the users of the load take literal operands.
+    """
+
+    name = "memory-forwarding"
+
+    def __init__(self) -> None:
+        self._replacements: Dict[LlvmType, LlvmType] = {}
+        self._values: List[LlvmMemoryValue] = []
+
+    def _get_replacement(self, instruction: LlvmInstructionCommand, operand: InstructionArgument) -> Optional[LlvmType]:
+        return self._replacements.get(operand.signal_name)
+
+    def _is_same_type(self, a: TypeDeclaration, b: TypeDeclaration) -> bool:
+        return type(a) is type(b) and a.get_data_width() == b.get_data_width()
+
+    def _get_non_literal_users(self, instructions: List[LlvmInstruction]) -> Set[LlvmType]:
+        """
+        Returns the names that are operands of instructions that do not take literal operands, like loads and getelementptr
+        """
+        return {j.signal_name for i in instructions if isinstance(i, LlvmInstructionCommand) and 
+                not isinstance(i.instruction, (DefaultInstruction, CallInstruction, ReturnInstruction)) for j in self._get_operands(instruction=i)}
+
+    def _is_call(self, instruction: LlvmInstruction) -> bool:
+        """
+        Returns True for a call that may access memory
+        """
+        if not isinstance(instruction, LlvmInstructionCommand) or not isinstance(instruction.instruction, CallInstruction):
+            return False
+        return not instruction.instruction.llvm_function or any(i.data_type.is_pointer() for i in instruction.instruction.operands)
+
+    def _get_value(self, address: Optional[LlvmMemoryAddress], data_type: TypeDeclaration) -> Optional[LlvmType]:
+        if address is None:
+            return None
+        return next((i.value for i in reversed(self._values) if i.address == address and self._is_same_type(i.data_type, data_type)), None)
+
+    def _is_forwardable(self, value: LlvmType, destination: LlvmType, non_literal_users: Set[LlvmType]) -> bool:
+        """
+        A literal is only forwarded when all the users of the load take literal operands
+        """
+        return value.is_name() or destination not in non_literal_users
+
+    def _forward(self, instruction: LlvmInstructionCommand, address: Optional[LlvmMemoryAddress], non_literal_users: Set[LlvmType]) -> bool:
+        """
+        Returns True when the load is replaced by a known value
+        """
+        destination = instruction.get_destination()
+        assert isinstance(instruction.instruction, LoadInstruction) and destination is not None
+        value = self._get_value(address=address, data_type=instruction.instruction.data_type)
+        if value is not None and self._is_forwardable(value=value, destination=destination, non_literal_users=non_literal_users):
+            self._replacements[destination] = value
+            return True
+        if address is not None:
+            self._values.append(LlvmMemoryValue(address=address, data_type=instruction.instruction.data_type, value=destination))
+        return False
+
+    def _store(self, instruction: LlvmInstructionCommand, analysis: LlvmMemoryAliasAnalysis) -> None:
+        access = analysis.get_access(instruction=instruction)
+        assert access is not None and isinstance(instruction.instruction, DefaultInstruction)
+        self._values = [i for i in self._values if not access.may_alias(address=i.address)]
+        value = instruction.instruction.operands[0]
+        if access.address is not None:
+            self._values.append(LlvmMemoryValue(address=access.address, data_type=value.data_type, value=value.signal_name))
+
+    def _is_forwarded(self, instruction: LlvmInstruction, analysis: LlvmMemoryAliasAnalysis, non_literal_users: Set[LlvmType],
+                      forward: bool) -> bool:
+        """
+        Updates the known values with a store or load and returns True when a load is replaced by a known value
+        """
+        access = analysis.get_access(instruction=instruction)
+        if access is None or not isinstance(instruction, LlvmInstructionCommand):
+            return False
+        if access.write:
+            self._store(instruction=instruction, analysis=analysis)
+            return False
+        return forward and self._forward(instruction=instruction, address=access.address, non_literal_users=non_literal_users)
+
+    def run(self, instructions: List[LlvmInstruction], statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        self._replacements = {}
+        self._values = []
+        analysis = LlvmMemoryAliasAnalysis(instructions=instructions)
+        non_literal_users = self._get_non_literal_users(instructions=instructions)
+        return_driver = self._get_return_driver(instructions=instructions)
+        result = []
+        for i in instructions:
+            instruction = self._replace_operands(instruction=i, statistics=statistics, get_replacement=self._get_replacement)
+            if self._is_call(instruction=instruction):
+                self._values = []
+            if self._is_forwarded(instruction=instruction, analysis=analysis, non_literal_users=non_literal_users, forward=i is not return_driver):
+                statistics.removed_instructions += 1
+                continue
+            result.append(instruction)
+        return result
+
+class LlvmDeadCodePass(LlvmFunctionPass):
+    """
+    Removes the instructions without side effects whose result is never used.
+    The instructions are visited from the last to the first, so chains of unused instructions are removed in one pass.
+    """
+
+    name = "dce"
+
+    def _is_used(self, instruction: LlvmInstruction, used: Set[LlvmType]) -> bool:
+        """
+        An instruction without a destination, like a store, is kept for its side effect
+        """
+        destination = instruction.get_destination()
+        return destination is None or destination in used
+
+    def _is_removable(self, instruction: LlvmInstruction, used: Set[LlvmType]) -> bool:
+        return (isinstance(instruction, LlvmInstructionCommand) and not self._is_used(instruction=instruction, used=used) and
+                isinstance(instruction.instruction, (DefaultInstruction, GetelementptrInstruction, BitcastInstruction)))
+
+    def run(self, instructions: List[LlvmInstruction], statistics: LlvmPassStatistics) -> List[LlvmInstruction]:
+        used: Set[LlvmType] = set()
+        return_driver = self._get_return_driver(instructions=instructions)
+        result = []
+        for i in reversed(instructions):
+            if i is not return_driver and self._is_removable(instruction=i, used=used):
+                statistics.removed_instructions += 1
+                continue
+            used.update(j.signal_name for j in self._get_operands(instruction=i))
+            result.append(i)
+        result.reverse()
+        return result
+
+class LlvmOptimizer:
+    """
+    Runs optimization passes over the instructions of a function before the instances are generated.
+    The passes are run in the given order, see LlvmOptimizer.passes for the pass names.
+    """
+
+    passes: Dict[str, Type[LlvmFunctionPass]] = {
+        LlvmConstantFoldingPass.name: LlvmConstantFoldingPass,
+        LlvmMemoryForwardingPass.name: LlvmMemoryForwardingPass,
+        LlvmStrengthReductionPass.name: LlvmStrengthReductionPass,
+        LlvmCommonSubexpressionPass.name: LlvmCommonSubexpressionPass,
+        LlvmDeadCodePass.name: LlvmDeadCodePass}
+
+    default_passes: Tuple[str, ...] = (LlvmConstantFoldingPass.name, LlvmMemoryForwardingPass.name, LlvmStrengthReductionPass.name, 
+                                       LlvmCommonSubexpressionPass.name, LlvmDeadCodePass.name)
+
+    def __init__(self, pass_names: Tuple[str, ...] = default_passes) -> None:
+        unknown = [i for i in pass_names if i not in self.passes]
+        assert not unknown, f"Unknown optimization passes {unknown}, must be one of {list(self.passes)}"
+        self._pass_names = pass_names
+
+    def run(self, function: LlvmFunction) -> Tuple[LlvmFunction, List[LlvmPassStatistics]]:
+        instructions = function.instructions
+        statistics = []
+        for name in self._pass_names:
+            pass_statistics = LlvmPassStatistics(pass_name=name, functions=1)
+            instructions = self.passes[name]().run(instructions=instructions, statistics=pass_statistics)
+            statistics.append(pass_statistics)
+        return replace(function, instructions=instructions), statistics
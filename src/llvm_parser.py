@@ -1,14 +1,15 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Dict, Iterable, List, Tuple, Optional, Union
 from instruction import AllocaInstruction, BitcastInstruction, CallInstruction, GetelementptrInstruction, DefaultInstruction, LoadInstruction, ReturnInstruction
 from instruction_interface import InstructionArgument, InstructionInterface, LlvmOutputPort, MemoryInterface
 from llvm_globals_container import GlobalsContainer
-from llvm_function import LlvmFunction, LlvmFunctionContainer
+from llvm_function import LlvmFunction, LlvmFunctionContainer, LlvmFunctionDigestFactory
 from llvm_global_parser import LlvmGlobalParser
 from llvm_instruction import LlvmInstruction
+from llvm_lexer import LlvmLexer, LlvmToken
 from llvm_module import LlvmModule
-from llvm_source_file import LlvmSourceConstants, LlvmSourceFile, LlvmSourceFileParser, LlvmSourceFunction, LlvmSourceFunctions, LlvmSourceLine
+from llvm_source_file import LlvmSourceFileParser, LlvmSourceFunction, LlvmSourceLine
 
 from messages import Messages
 from llvm_type_declaration import TypeDeclaration
@@ -23,23 +24,23 @@ class InstructionPosition:
     sub_type : Optional[int] = None
     
 class InstructionPositionParser:
-    source : List[str]
+    source : List[LlvmToken]
     opcode : str
     sub_type: Optional[str]
     operands : List[InstructionArgument]
     data_type : str
-    def __init__(self, instruction: List[str], position: InstructionPosition):
+    def __init__(self, instruction: List[LlvmToken], position: InstructionPosition):
         self.source = instruction
-        self.opcode = instruction[position.opcode]
-        self.sub_type = instruction[position.sub_type] if position.sub_type is not None else None
-        self.data_type = instruction[position.data_type].replace(",", "")
+        self.opcode = instruction[position.opcode].text
+        self.sub_type = instruction[position.sub_type].text if position.sub_type is not None else None
+        self.data_type = instruction[position.data_type].text
         self.operands = [self._parse_operand(instruction, item, index) for index, item in enumerate(position.operands)]
-    def _parse_operand(self, instruction: List[str], item: Tuple[int, int], index: int) -> InstructionArgument:
+    def _parse_operand(self, instruction: List[LlvmToken], item: Tuple[int, int], index: int) -> InstructionArgument:
         type_index, value_index = item
-        value = instruction[value_index]
-        signal_name = LlvmTypeFactory(value.replace(",","")).resolve()
+        value = instruction[value_index].text
+        signal_name = LlvmTypeFactory(value).resolve()
         port_name = chr(ord('a') + index)
-        data_type = LlvmDeclarationFactory().get(instruction[type_index].replace(",", ""))
+        data_type = LlvmDeclarationFactory().get(instruction[type_index].text)
         return InstructionArgument(port_name=port_name, signal_name=signal_name, data_type=data_type)
     def __str__(self) -> str:
         return str(vars(self))
@@ -49,37 +50,14 @@ class LlvmParserException(Exception):
 
 class LlvmParserUtilities:
 
+    _lexer = LlvmLexer()
+
     def __init__(self):
         self._msg = Messages()
 
     def _remove_empty_elements(self, x: List[str]) -> List[str]:
         return [i for i in x if len(i) > 0]
 
-    def _new_depth(self, letter: str, depth: int, string: str) -> int:
-        if letter == "(":
-            depth += 1
-        elif letter == ")":
-            depth += -1
-        assert depth >= 0, f"Found more left paranthesis than right paranthesis in {string}"
-        return depth
-
-    def _split_top(self, string: str, splitter: str) -> List[str]:
-        ''' Splits strings at occurance of 'splitter' but only if not enclosed by brackets.
-            Removes all whitespace immediately after each splitter.
-            This assumes brackets, braces, and parens are properly matched - may fail otherwise '''
-        outlist = []
-        outstring: List[str] = []
-        depth = 0
-        for letter in string:
-            depth = self._new_depth(letter=letter, depth=depth, string=string)
-            if not depth and letter == splitter:
-                outlist.append("".join(outstring))
-                outstring = []
-            else:
-                outstring.append(letter)
-        outlist.append("".join(outstring))
-        return outlist
-    
     def _split(self, x: str, split_char: str) -> List[str]:
         return self._remove_empty_elements(x.split(split_char))
 
@@ -90,13 +68,16 @@ class LlvmParserUtilities:
         return self._split(x, ' ')
 
     def split_top_space(self, x: str) -> List[str]:
-        return self._remove_empty_elements(self._split_top(string=x, splitter=" "))
+        return self._lexer.split_top_space(text=x)
+
+    def split_tokens(self, x: str) -> List[LlvmToken]:
+        return self._lexer.get_tokens(text=x)
 
     def split_comma(self, x: str) -> List[str]:
         return self._split(x, ',')
 
     def split_top_comma(self, x: str) -> List[str]:
-        return self._remove_empty_elements(self._split_top(string=x, splitter=","))
+        return self._lexer.split_top_comma(text=x)
 
     def get_list_element(self, x : Union[List[str], Tuple[str, str, str]], index : int) -> str:
         return x[index].strip()
@@ -165,7 +146,7 @@ class InstructionParser(ABC):
         pass
 
     @abstractmethod
-    def match(self, instruction: List[str]) -> bool:
+    def get_opcodes(self) -> List[str]:
         pass
 
 class BitCastInstructionParser(InstructionParser):
@@ -183,8 +164,8 @@ class BitCastInstructionParser(InstructionParser):
             opcode=opcode, data_type=data_type, operands=operands
         )
 
-    def match(self, instruction: List[str]) -> bool:
-        return instruction[0] == "bitcast"
+    def get_opcodes(self) -> List[str]:
+        return ["bitcast"]
 
 class GetelementptrInstructionParser(InstructionParser):
 
@@ -211,8 +192,8 @@ class GetelementptrInstructionParser(InstructionParser):
         operands = [argument]
         return GetelementptrInstruction(opcode=opcode, data_type=signal_data_type, operands=operands, offset=pointer_offset)
 
-    def match(self, instruction: List[str]) -> bool:
-        return instruction[0] == "getelementptr"
+    def get_opcodes(self) -> List[str]:
+        return ["getelementptr"]
 
 class ReturnInstructionParser(InstructionParser):
 
@@ -223,20 +204,20 @@ class ReturnInstructionParser(InstructionParser):
             "ret void"
         """
         utils = LlvmParserUtilities()
-        a = utils.split_space(arguments.instruction)
-        opcode = a[0]
-        data_width = int(a[1].strip())
+        a = utils.split_tokens(arguments.instruction)
+        opcode = a[0].text
+        data_width = int(a[1].text)
         data_type = LlvmIntegerDeclaration(data_width=data_width)
         try:
-            signal_name = LlvmVariableName(a[2].strip())
+            signal_name = LlvmVariableName(a[2].text)
             argument = InstructionArgument(signal_name=signal_name, data_type=data_type)
             operands = [argument]
         except IndexError:
             operands = []
         return ReturnInstruction(opcode=opcode, data_type=data_type, operands=operands)
 
-    def match(self, instruction: List[str]) -> bool:
-        return instruction[0] == "ret"
+    def get_opcodes(self) -> List[str]:
+        return ["ret"]
 
 class AllocaInstructionParser(InstructionParser):
 
@@ -254,8 +235,8 @@ class AllocaInstructionParser(InstructionParser):
             opcode=opcode, data_type=data_type, output_port_name=arguments.destination, initialization=initialization
         )
 
-    def match(self, instruction: List[str]) -> bool:
-        return instruction[0] == "alloca"
+    def get_opcodes(self) -> List[str]:
+        return ["alloca"]
 
 class CallInstructionParser(InstructionParser):
 
@@ -299,8 +280,8 @@ class CallInstructionParser(InstructionParser):
         function_name = function_name.replace(".", "_")
         return self._get_call_instruction(function_name=function_name, llvm_function=llvm_function, return_type=return_type, arguments=function_arguments)
 
-    def match(self, instruction: List[str]) -> bool:
-        return instruction[0] == "call" or instruction[:2] == ["tail", "call"]
+    def get_opcodes(self) -> List[str]:
+        return ["call"]
 
 class LoadInstructionParser(InstructionParser):
 
@@ -319,11 +300,19 @@ class LoadInstructionParser(InstructionParser):
             opcode=opcode, data_type=data_type, output_port_name=arguments.destination, operands=operands
         )
 
-    def match(self, instruction: List[str]) -> bool:
-        return instruction[0] == "load"
+    def get_opcodes(self) -> List[str]:
+        return ["load"]
 
 class DefaultInstructionParser(InstructionParser):
 
+    _instruction_positions: Dict[str, InstructionPosition]
+
+    _flags = {"nsw", "nuw", "exact", "disjoint", "nneg", "fast", "nnan", "ninf", "nsz", "arcp", "contract", "afn", "reassoc"}
+
+    def __init__(self):
+        super().__init__()
+        self._instruction_positions = self._get_instruction_positions()
+
     def _get_type_and_two_arguments_instructions(self) -> Dict[str, InstructionPosition]:
         """
         The instruction is expected to be in one of the following formats:
@@ -338,8 +327,10 @@ class DefaultInstructionParser(InstructionParser):
     def _get_arithmetic_instructions(self) -> Dict[str, InstructionPosition]:
         # 1) add nsw i32 %0, %1
         # 2) sub nsw i32 %0, %1
-        position = InstructionPosition(opcode=0, data_type=2, operands=[(2, 3), (2, 4)])
-        commands = ["add", "sub", "mul"]
+        # 3) udiv exact i32 %0, 4
+        # The flags are removed before the positions are applied (see _flags)
+        position = InstructionPosition(opcode=0, data_type=1, operands=[(1, 2), (1, 3)])
+        commands = ["add", "sub", "mul", "udiv", "sdiv", "urem", "srem"]
         return {i:position for i in commands}
 
     def _get_special_instructions(self) -> Dict[str, InstructionPosition]:
@@ -349,6 +340,7 @@ class DefaultInstructionParser(InstructionParser):
             "zext i1 %cmp to i32"
             "select i1 %cmp, i32 1, i32 2"
             "trunc i64 %x.coerce to i32"
+            "sext i8 %x to i32"
             "store i32 %a, i32* %a.addr, align 4"
             "fcmp ule float %0, %mul.i"
         """
@@ -356,6 +348,7 @@ class DefaultInstructionParser(InstructionParser):
             "icmp": InstructionPosition(opcode=1, data_type=2, operands=[(2, 3), (2, 4)]),
             "zext": InstructionPosition(opcode=0, data_type=1, operands=[(1, 2)]),
             "trunc": InstructionPosition(opcode=0, data_type=4, operands=[(1, 2)]),
+            "sext": InstructionPosition(opcode=0, data_type=4, operands=[(1, 2)]),
             "select": InstructionPosition(opcode=0, data_type=3, operands=[(1, 2), (3, 4), (5, 6)]),
             "store": InstructionPosition(opcode=0, data_type=1, operands=[(1, 2), (3, 4)]),
             "fcmp": InstructionPosition(opcode=0, sub_type=1, data_type=2, operands=[(2, 3), (2, 4)])}
@@ -368,10 +361,9 @@ class DefaultInstructionParser(InstructionParser):
 
     def parse(self,  arguments: InstructionParserArguments) -> InstructionInterface:
         utils = LlvmParserUtilities()
-        a = utils.split_space(arguments.instruction)
-        position: Dict[str, InstructionPosition] = self._get_instruction_positions()
-        opcode = utils.get_list_element(a, 0)
-        x = InstructionPositionParser(instruction=a, position=position[opcode])
+        a = [i for i in utils.split_tokens(arguments.instruction) if not (i.is_keyword() and i.text in self._flags)]
+        opcode = a[0].text
+        x = InstructionPositionParser(instruction=a, position=self._instruction_positions[opcode])
         data_type = LlvmDeclarationFactory().get(x.data_type)
         return DefaultInstruction(
             opcode=x.opcode,
@@ -381,8 +373,51 @@ class DefaultInstructionParser(InstructionParser):
             output_port_name="m_tdata"
         )
 
-    def match(self, instruction: List[str]) -> bool:
-        return True
+    def get_opcodes(self) -> List[str]:
+        return list(self._instruction_positions.keys())
+
+class InstructionParserRegistry:
+    """
+    Maps the opcode of an instruction to the parser of the instruction.
+    Support for new instructions is added by registering a parser for their opcodes.
+    """
+
+    _call_prefixes = ["tail", "musttail", "notail"]
+
+    _parsers: Dict[str, InstructionParser]
+
+    def __init__(self, parsers: List[InstructionParser]):
+        self._parsers = {}
+        for i in parsers:
+            self.register(parser=i)
+
+    def register(self, parser: InstructionParser) -> None:
+        for opcode in parser.get_opcodes():
+            self._parsers[opcode] = parser
+
+    def get_opcode(self, instruction: str) -> str:
+        """
+        1) instruction = "add nsw i32 %b, %a" -> "add"
+        2) instruction = "tail call i32 @_Z3addii(i32 2, i32 3)" -> "call"
+        """
+        words = instruction.split(maxsplit=2)
+        return words[1] if words[0] in self._call_prefixes else words[0]
+
+    def get(self, instruction: str) -> InstructionParser:
+        opcode = self.get_opcode(instruction=instruction)
+        try:
+            return self._parsers[opcode]
+        except KeyError as exception:
+            raise LlvmParserException(f"Unsupported instruction \"{opcode}\" in \"{instruction}\"") from exception
+
+instruction_parser_registry = InstructionParserRegistry(parsers=[
+    DefaultInstructionParser(),
+    BitCastInstructionParser(),
+    GetelementptrInstructionParser(),
+    ReturnInstructionParser(),
+    AllocaInstructionParser(),
+    CallInstructionParser(),
+    LoadInstructionParser()])
 
 class LlvmInstructionCommandParser:
 
@@ -390,18 +425,7 @@ class LlvmInstructionCommandParser:
         self._msg = Messages()
 
     def _parse_instruction(self, arguments: InstructionParserArguments) -> Optional[InstructionInterface]:
-        parsers: List[InstructionParser] =  [
-            BitCastInstructionParser(),
-            GetelementptrInstructionParser(),
-            ReturnInstructionParser(),
-            AllocaInstructionParser(),
-            CallInstructionParser(),
-            LoadInstructionParser()]
-        instruction_words = arguments.instruction.split()
-        parser: InstructionParser = DefaultInstructionParser()
-        for i in parsers:
-            if i.match(instruction_words):
-                parser = i
+        parser = instruction_parser_registry.get(instruction=arguments.instruction)
         return parser.parse(arguments=arguments)
 
     def parse(self, source_line: LlvmSourceLine, constants: GlobalsContainer) -> Optional[LlvmInstructionCommand]:
@@ -457,10 +481,14 @@ class LlvmArgumentParser:
 
 class LlvmInstructionParser:
 
+    def __init__(self) -> None:
+        self._label_parser = LlvmInstructionLabelParser()
+        self._command_parser = LlvmInstructionCommandParser()
+
     def _parse_line(self, line: LlvmSourceLine, constants: GlobalsContainer) -> Optional[LlvmInstruction]:
         if line.is_label():
-            return LlvmInstructionLabelParser().parse(source_line=line)
-        return LlvmInstructionCommandParser().parse(source_line=line, constants=constants)
+            return self._label_parser.parse(source_line=line)
+        return self._command_parser.parse(source_line=line, constants=constants)
 
     def parse(self, lines: List[LlvmSourceLine], constants: GlobalsContainer) -> List[LlvmInstruction]:
         """
@@ -505,7 +533,8 @@ class LlvmFunctionParser:
         function_name, arguments, return_type = self._parse_function_description(source_function.lines[0].line)
         comands_excluding_right_bracket = source_function.lines[1:-2]
         instructions = LlvmInstructionParser().parse(lines=comands_excluding_right_bracket, constants=constants)
-        return LlvmFunction(name=function_name, arguments=arguments, return_type=return_type, instructions=instructions)
+        return LlvmFunction(name=function_name, arguments=arguments, return_type=return_type, instructions=instructions,
+                            digest=LlvmFunctionDigestFactory().get(lines=source_function.lines))
 
 class LlvmParser:
 
@@ -514,21 +543,22 @@ class LlvmParser:
     def __init__(self):
         self._msg = Messages()
 
-    def _parse_globals(self, constants: LlvmSourceConstants) -> GlobalsContainer:
-        parsed_constants = [LlvmGlobalParser().parse(i) for i in constants.lines]
-        return GlobalsContainer(declarations=parsed_constants)
-
     def _parse_function(self, source_function: LlvmSourceFunction, llvm_constants: GlobalsContainer) -> LlvmFunction:
         return LlvmFunctionParser().parse(source_function=source_function, constants=llvm_constants)
 
-    def _parse_functions(self, source_file: LlvmSourceFile, llvm_constants: GlobalsContainer) -> LlvmFunctionContainer:
-        functions: LlvmSourceFunctions = LlvmSourceFileParser().extract_functions(source_file=source_file)
-        parsed_funtions = [self._parse_function(source_function=i, llvm_constants=llvm_constants) for i in functions.functions]
-        return LlvmFunctionContainer(functions=parsed_funtions)
-
-    def parse(self, text: List[str]) -> LlvmModule:
-        source_file = LlvmSourceFileParser().load(lines=text)
-        constants = LlvmSourceFileParser().extract_constants(source_file=source_file)
-        llvm_constants = self._parse_globals(constants=constants)
-        llvm_functions = self._parse_functions(source_file=source_file, llvm_constants=llvm_constants)
+    def parse(self, text: Iterable[str]) -> LlvmModule:
+        """
+        text can be an open file handle. The globals are expected to be declared 
+        before the functions, which is the order used by the llvm assembly writer.
+        """
+        source_file_parser = LlvmSourceFileParser()
+        source_lines = source_file_parser.read(file_handle=text)
+        llvm_constants = GlobalsContainer(declarations=[])
+        parsed_functions: List[LlvmFunction] = []
+        for element in source_file_parser.split(lines=source_lines):
+            if isinstance(element, LlvmSourceFunction):
+                parsed_functions.append(self._parse_function(source_function=element, llvm_constants=llvm_constants))
+            else:
+                llvm_constants.add_declaration(declaration=LlvmGlobalParser().parse(element))
+        llvm_functions = LlvmFunctionContainer(functions=parsed_functions)
         return LlvmModule(functions=llvm_functions, globals=llvm_constants)
@@ -1,6 +1,6 @@
 
 from dataclasses import dataclass
-from typing import Callable, List, Optional
+from typing import Generator, Iterable, Iterator, List, Union
 
 @dataclass
 class LlvmSourceLine:
@@ -40,69 +40,42 @@ class LlvmSourceFunctions:
 
 class LlvmSourceFileParser:
 
-    def _remove_comments(self, lines: List[LlvmSourceLine]) -> List[LlvmSourceLine]:
-        return [line for line in lines if not line.is_comment()]
-
-    def _extract_lines(self, lines: List[str]) -> List[LlvmSourceLine]:
-        return [LlvmSourceLine(line_number=line_number, line=line) for line_number, line in enumerate(lines, 1)]
-
-    def load(self, lines: List[str]) -> LlvmSourceFile:
-        source_lines = self._extract_lines(lines=lines)
-        return LlvmSourceFile(self._remove_comments(lines=source_lines))
+    def read(self, file_handle: Iterable[str]) -> Generator[LlvmSourceLine, None, None]:
+        """
+        Reads the lines one at a time from the file handle and skips the comments
+        """
+        for line_number, line in enumerate(file_handle, 1):
+            source_line = LlvmSourceLine(line_number=line_number, line=line)
+            if not source_line.is_comment():
+                yield source_line
+
+    def _read_function(self, start: LlvmSourceLine, lines: Iterator[LlvmSourceLine]) -> LlvmSourceFunction:
+        function_lines = [start]
+        for line in lines:
+            function_lines.append(line)
+            if line.is_function_end():
+                return LlvmSourceFunction(lines=function_lines)
+        assert False, f"Could not find end of function start {start.get_elaborated()}"
+
+    def split(self, lines: Iterable[LlvmSourceLine]) -> Generator[Union[LlvmSourceLine, LlvmSourceFunction], None, None]:
+        """
+        Yields the constant lines and the functions in the order they appear in the source.
+        Only one function is kept in memory at a time.
+        """
+        line_iterator = iter(lines)
+        for line in line_iterator:
+            if line.is_function_start():
+                yield self._read_function(start=line, lines=line_iterator)
+            elif line.is_constant():
+                yield line
+
+    def load(self, lines: Iterable[str]) -> LlvmSourceFile:
+        return LlvmSourceFile(lines=list(self.read(file_handle=lines)))
 
     def extract_constants(self, source_file: LlvmSourceFile) -> LlvmSourceConstants:
         constant_lines = [line for line in source_file.lines if line.is_constant()]
         return LlvmSourceConstants(lines=constant_lines)
 
-    def _index(self, lines: List[LlvmSourceLine], end_condition: Callable) -> Optional[int]:
-        return next(
-            (
-                index
-                for index, line in enumerate(lines, 1)
-                if end_condition(line)
-            ),
-            None,
-        )
-
-    def _index_function_start(self, lines: List[LlvmSourceLine]) -> Optional[int]:
-        def end_condition(x):
-            return x.is_function_start()
-        return self._index(lines=lines, end_condition=end_condition)
-
-    def _index_function_end(self, lines: List[LlvmSourceLine]) -> Optional[int]:
-        def end_condition(x):
-            return x.is_function_end()
-        return self._index(lines=lines, end_condition=end_condition)
-
-    @dataclass
-    class FunctionLineLocation:
-        start: int
-        end: int
-        def extract_function(self, lines: List[LlvmSourceLine]) -> List[LlvmSourceLine]:
-            return lines[self.start-1:self.end]
-        def extract_rest(self, lines: List[LlvmSourceLine]) -> List[LlvmSourceLine]:
-            return lines[self.end:]
-
-    def _find_function_location(self, lines: List[LlvmSourceLine]) -> Optional[FunctionLineLocation]:
-        start_index = self._index_function_start(lines=lines)
-        if start_index is None:
-            return None
-        lines = lines[start_index:]
-        end_index = self._index_function_end(lines=lines)
-        assert end_index is not None, f"Could not find end of function start {lines[start_index]}"
-        return self.FunctionLineLocation(start=start_index, end=end_index+start_index)
-
-    def _extract_function(self, lines: List[LlvmSourceLine], source_functions: List[LlvmSourceFunction]) -> None:
-        location = self._find_function_location(lines=lines)
-        if location is None:
-            return
-        function_lines = location.extract_function(lines=lines)
-        source_functions.append(LlvmSourceFunction(lines=function_lines))
-        rest_lines = location.extract_rest(lines=lines)
-        self._extract_function(lines=rest_lines, source_functions=source_functions)
-
     def extract_functions(self, source_file: LlvmSourceFile) -> LlvmSourceFunctions:
-        lines = source_file.lines
-        source_functions: List[LlvmSourceFunction] = []
-        self._extract_function(lines=lines, source_functions=source_functions)
+        source_functions = [i for i in self.split(lines=source_file.lines) if isinstance(i, LlvmSourceFunction)]
         return LlvmSourceFunctions(functions=source_functions)
@@ -1,3 +1,4 @@
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Optional
@@ -31,12 +32,48 @@ class LlvmTypeMatch(ABC):
 class LlvmName:
     name: str
 
+    _plain_pattern = re.compile(r"@[A-Za-z][A-Za-z0-9]*")
+
+    _escapes = {"_": "_u", ".": "_d"}
+
+    def _escape(self, letter: str) -> str:
+        if letter in self._escapes:
+            return self._escapes[letter]
+        code = ord(letter)
+        return f"_x{code:02x}" if code < 256 else f"_w{code:06x}"
+
+    def _is_plain(self, letter: str, index: int) -> bool:
+        """
+        Letters and digits are kept, except for a leading digit
+        """
+        return letter.isascii() and letter.isalnum() and not (index == 0 and letter.isdigit())
+
+    def _translate_letter(self, letter: str, index: int) -> str:
+        return letter if self._is_plain(letter=letter, index=index) else self._escape(letter=letter)
+
+    def _translate_global(self) -> str:
+        """
+        Translates the name of a global to a legal VHDL identifier that no other global is translated to.
+        Names of only letters and digits keep their name. The other names start with g, and a leading digit
+        and every character that is not a letter or a digit are written as an underscore and a letter code.
+        Example:
+            @coef           -> coef
+            @_ZL4coef       -> g_uZL4coef
+            @__const.main.n -> g_u_uconst_dmain_dn
+            @0              -> g_x30
+        """
+        if self._plain_pattern.fullmatch(self.name):
+            return self.name[1:]
+        return "g" + "".join(self._translate_letter(letter=letter, index=index) for index, letter in enumerate(self.name[1:]))
+
 class LlvmVariableName(LlvmName, LlvmType):
     """
-    Example %0, %a, %x.coerce, @_Z3Addi_1
+    Example %0, %a, %x.coerce, @_ZZ3firfE6buffer
     """
     def _to_string(self) -> str:
-        return self.name.replace("%", "").replace(".", "_").replace("@_", "").replace("@", "")
+        if self.name.startswith("@"):
+            return self._translate_global()
+        return self.name.replace("%", "").replace(".", "_")
     def translate_name(self) -> str:
         return self._to_string()
     def is_name(self) -> bool:
@@ -54,10 +91,10 @@ class LlvmVariableNameMatch(LlvmTypeMatch):
 
 class LlvmConstantName(LlvmName, LlvmType):
     """
-    Example @__const_main_n.n
+    Example @__const_main_n.n, @_ZL4coef
     """
     def _to_string(self) -> str:
-        return self.name.split(".")[-1]
+        return self._translate_global()
     def translate_name(self) -> str:
         return self._to_string()
     def is_name(self) -> bool:
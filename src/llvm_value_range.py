@@ -0,0 +1,285 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from instruction import DefaultInstruction
+from instruction_argument import InstructionArgument
+from llvm_declarations import LlvmIntegerDeclaration
+from llvm_function import LlvmFunction
+from llvm_parser import LlvmInstructionCommand
+from llvm_type import LlvmBoolean, LlvmFloat, LlvmInteger, LlvmType
+
+@dataclass(frozen=True)
+class LlvmValueRange:
+    """
+    The lowest and highest value of an integer when its bits are read as an unsigned number
+    """
+    low: int
+    high: int
+
+    def get_width(self) -> int:
+        return max(1, self.high.bit_length())
+
+    def union(self, other: "LlvmValueRange") -> "LlvmValueRange":
+        return LlvmValueRange(low=min(self.low, other.low), high=max(self.high, other.high))
+
+    def intersection(self, low: int, high: int) -> "LlvmValueRange":
+        return LlvmValueRange(low=max(self.low, low), high=min(self.high, high))
+
+    def is_empty(self) -> bool:
+        return self.low > self.high
+
+@dataclass(frozen=True)
+class LlvmCompare:
+    """
+    The result of "icmp <condition> <type> <variable>, <constant>"
+    """
+    condition: str
+    variable: LlvmType
+    constant: int
+    data_width: int
+
+class LlvmValueRangeAnalysis:
+    """
+    Infers the range of each integer value of a function from constants, icmp bounds used by select,
+    zext, trunc and and masks. Instructions that can overflow get the full range of their type.
+    Example:
+        %and = and i32 %a, 7                     -> [0, 7]
+        %add = add nuw nsw i32 %and, 1           -> [1, 8]
+        %cmp = icmp ult i32 %b, 10               -> [0, 1]
+        %min = select i1 %cmp, i32 %b, i32 9     -> [0, 9]
+    The result widths of the narrowable instructions are the bits needed by the highest value,
+    so %and, %add and %min are 3, 4 and 4 bits wide and %cmp is 1 bit wide.
+    """
+
+    compare_conditions = {"eq", "ne", "ugt", "uge", "ult", "ule", "sgt", "sge", "slt", "sle"}
+
+    narrowable = {"add", "sub", "mul", "and", "or", "xor", "shl", "lshr", "select"} | compare_conditions
+
+    def __init__(self) -> None:
+        self._ranges: Dict[LlvmType, LlvmValueRange] = {}
+        self._compares: Dict[LlvmType, LlvmCompare] = {}
+        self._operations: Dict[str, Callable[[DefaultInstruction, int], Optional[LlvmValueRange]]] = {
+            "add": self._get_add, "sub": self._get_sub, "mul": self._get_mul, "and": self._get_and,
+            "or": self._get_or, "xor": self._get_or, "shl": self._get_shl, "lshr": self._get_lshr,
+            "ashr": self._get_ashr, "zext": self._get_zext, "sext": self._get_sext, "trunc": self._get_trunc,
+            "select": self._get_select}
+
+    def _get_integer_width(self, argument: InstructionArgument) -> Optional[int]:
+        data_type = argument.data_type
+        return data_type.data_width if isinstance(data_type, LlvmIntegerDeclaration) else None
+
+    def _get_full_range(self, data_width: int) -> LlvmValueRange:
+        return LlvmValueRange(low=0, high=2 ** data_width - 1)
+
+    def _get_float_constant(self, value: LlvmFloat) -> Optional[int]:
+        return int(value.value) if value.value.is_integer() else None
+
+    def _get_constant(self, value: LlvmType) -> Optional[int]:
+        if isinstance(value, LlvmInteger):
+            return value.value
+        if isinstance(value, LlvmFloat):
+            return self._get_float_constant(value=value)
+        if isinstance(value, LlvmBoolean):
+            return int(value.value == "true")
+        return None
+
+    def get_range(self, argument: InstructionArgument) -> Optional[LlvmValueRange]:
+        data_width = self._get_integer_width(argument=argument)
+        if data_width is None:
+            return None
+        constant = self._get_constant(value=argument.signal_name)
+        if constant is not None:
+            constant %= 2 ** data_width
+            return LlvmValueRange(low=constant, high=constant)
+        return self._ranges.get(argument.signal_name, self._get_full_range(data_width=data_width))
+
+    def _limit(self, value_range: LlvmValueRange, data_width: int) -> LlvmValueRange:
+        """
+        Values that do not fit in the data width wrap around and can have any value
+        """
+        if value_range.low < 0 or value_range.high >= 2 ** data_width:
+            return self._get_full_range(data_width=data_width)
+        return value_range
+
+    def _get_operand_ranges(self, instruction: DefaultInstruction) -> Optional[List[LlvmValueRange]]:
+        ranges = [self.get_range(argument=i) for i in instruction.operands]
+        known = [i for i in ranges if i is not None]
+        return known if len(known) == len(ranges) else None
+
+    def _get_add(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        ranges = self._get_operand_ranges(instruction=instruction)
+        if ranges is None:
+            return None
+        a, b = ranges
+        return self._limit(LlvmValueRange(low=a.low + b.low, high=a.high + b.high), data_width=data_width)
+
+    def _get_sub(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        ranges = self._get_operand_ranges(instruction=instruction)
+        if ranges is None:
+            return None
+        a, b = ranges
+        return self._limit(LlvmValueRange(low=a.low - b.high, high=a.high - b.low), data_width=data_width)
+
+    def _get_mul(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        ranges = self._get_operand_ranges(instruction=instruction)
+        if ranges is None:
+            return None
+        a, b = ranges
+        return self._limit(LlvmValueRange(low=a.low * b.low, high=a.high * b.high), data_width=data_width)
+
+    def _get_and(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        ranges = self._get_operand_ranges(instruction=instruction)
+        if ranges is None:
+            return None
+        return LlvmValueRange(low=0, high=min(i.high for i in ranges))
+
+    def _get_or(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        ranges = self._get_operand_ranges(instruction=instruction)
+        if ranges is None:
+            return None
+        return LlvmValueRange(low=0, high=2 ** max(i.high.bit_length() for i in ranges) - 1)
+
+    def _get_shl(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        ranges = self._get_operand_ranges(instruction=instruction)
+        if ranges is None:
+            return None
+        a, b = ranges
+        if b.high >= data_width:
+            return self._get_full_range(data_width=data_width)
+        return self._limit(LlvmValueRange(low=a.low << b.low, high=a.high << b.high), data_width=data_width)
+
+    def _get_lshr(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        ranges = self._get_operand_ranges(instruction=instruction)
+        if ranges is None:
+            return None
+        a, b = ranges
+        return LlvmValueRange(low=a.low >> b.high, high=a.high >> b.low)
+
+    def _get_ashr(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        ranges = self._get_operand_ranges(instruction=instruction)
+        if ranges is None or ranges[0].high >= 2 ** (data_width - 1):
+            return None
+        return self._get_lshr(instruction=instruction, data_width=data_width)
+
+    def _get_zext(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        return self.get_range(argument=instruction.operands[0])
+
+    def _get_sext(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        operand = instruction.operands[0]
+        value_range = self.get_range(argument=operand)
+        operand_width = self._get_integer_width(argument=operand)
+        if value_range is None or operand_width is None or value_range.high >= 2 ** (operand_width - 1):
+            return None
+        return value_range
+
+    def _get_trunc(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        value_range = self.get_range(argument=instruction.operands[0])
+        if value_range is None:
+            return None
+        return self._limit(value_range, data_width=data_width)
+
+    def _get_compare_bounds(self, compare: LlvmCompare, taken: bool) -> Optional[Tuple[int, int]]:
+        """
+        The bounds of the compared variable when the compare is true (taken) or false
+        """
+        condition = compare.condition
+        constant = compare.constant
+        maximum = 2 ** compare.data_width - 1
+        if condition.startswith("s"):
+            if constant < 0 or self._ranges.get(compare.variable, self._get_full_range(compare.data_width)).high > maximum >> 1:
+                return None
+            condition = "u" + condition[1:]
+        if not taken:
+            condition = {"ult": "uge", "ule": "ugt", "ugt": "ule", "uge": "ult", "eq": "ne", "ne": "eq"}[condition]
+        bounds = {"ult": (0, constant - 1), "ule": (0, constant), "ugt": (constant + 1, maximum),
+                  "uge": (constant, maximum), "eq": (constant, constant)}
+        return bounds.get(condition)
+
+    def _get_compare(self, condition: LlvmType, argument: InstructionArgument) -> Optional[LlvmCompare]:
+        """
+        Returns the compare of the select condition when it compares the selected argument
+        """
+        compare = self._compares.get(condition)
+        return compare if compare is not None and compare.variable == argument.signal_name else None
+
+    def _refine(self, value_range: LlvmValueRange, compare: LlvmCompare, taken: bool) -> LlvmValueRange:
+        bounds = self._get_compare_bounds(compare=compare, taken=taken)
+        if bounds is None:
+            return value_range
+        refined = value_range.intersection(low=bounds[0], high=bounds[1])
+        return value_range if refined.is_empty() else refined
+
+    def _get_select_operand(self, condition: LlvmType, argument: InstructionArgument, taken: bool) -> Optional[LlvmValueRange]:
+        value_range = self.get_range(argument=argument)
+        compare = self._get_compare(condition=condition, argument=argument)
+        if value_range is None or compare is None:
+            return value_range
+        return self._refine(value_range=value_range, compare=compare, taken=taken)
+
+    def _get_select(self, instruction: DefaultInstruction, data_width: int) -> Optional[LlvmValueRange]:
+        condition, true_value, false_value = instruction.operands
+        constant = self._get_constant(value=condition.signal_name)
+        true_range = self._get_select_operand(condition=condition.signal_name, argument=true_value, taken=True)
+        false_range = self._get_select_operand(condition=condition.signal_name, argument=false_value, taken=False)
+        if constant is not None:
+            return true_range if constant else false_range
+        if true_range is None or false_range is None:
+            return None
+        return true_range.union(false_range)
+
+    def _add_compare(self, destination: LlvmType, instruction: DefaultInstruction) -> None:
+        variable, value = instruction.operands
+        data_width = self._get_integer_width(argument=variable)
+        constant = self._get_constant(value=value.signal_name)
+        if data_width is not None and constant is not None and self._get_constant(value=variable.signal_name) is None:
+            self._compares[destination] = LlvmCompare(condition=instruction.opcode, variable=variable.signal_name,
+                                                      constant=constant, data_width=data_width)
+
+    def _get_instruction_range(self, destination: LlvmType, instruction: DefaultInstruction) -> Optional[LlvmValueRange]:
+        if instruction.opcode in self.compare_conditions:
+            self._add_compare(destination=destination, instruction=instruction)
+            return LlvmValueRange(low=0, high=1)
+        data_type = instruction.data_type
+        operation = self._operations.get(instruction.opcode)
+        if operation is None or not isinstance(data_type, LlvmIntegerDeclaration):
+            return None
+        return operation(instruction, data_type.data_width)
+
+    def _get_instructions(self, function: LlvmFunction) -> List[Tuple[LlvmType, DefaultInstruction]]:
+        """
+        Returns the destination and the instruction of the default instructions that have a destination
+        """
+        instructions: List[Tuple[LlvmType, DefaultInstruction]] = []
+        for i in function.instructions:
+            destination = i.get_destination()
+            if isinstance(i, LlvmInstructionCommand) and isinstance(i.instruction, DefaultInstruction) and destination is not None:
+                instructions.append((destination, i.instruction))
+        return instructions
+
+    def get_ranges(self, function: LlvmFunction) -> Dict[LlvmType, LlvmValueRange]:
+        self._ranges = {}
+        self._compares = {}
+        for destination, instruction in self._get_instructions(function=function):
+            value_range = self._get_instruction_range(destination=destination, instruction=instruction)
+            if value_range is not None:
+                self._ranges[destination] = value_range
+        return self._ranges
+
+    def _get_result_width(self, value_range: Optional[LlvmValueRange], instruction: DefaultInstruction) -> Optional[int]:
+        data_type = instruction.data_type
+        if value_range is None or instruction.opcode not in self.narrowable or not isinstance(data_type, LlvmIntegerDeclaration):
+            return None
+        width = value_range.get_width()
+        return width if width < data_type.data_width else None
+
+    def get_result_widths(self, function: LlvmFunction) -> Dict[LlvmType, int]:
+        """
+        Returns the narrowed result width of the narrowable instructions that need fewer bits than their type
+        """
+        ranges = self.get_ranges(function=function)
+        widths: Dict[LlvmType, int] = {}
+        for destination, instruction in self._get_instructions(function=function):
+            width = self._get_result_width(value_range=ranges.get(destination), instruction=instruction)
+            if width is not None:
+                widths[destination] = width
+        return widths
@@ -8,4 +8,5 @@ class SourceInfo:
     destination: Optional[LlvmType]
     output_signal_name: LlvmType
     data_type: TypeDeclaration
+    stage: int = 0
 
@@ -0,0 +1,67 @@
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from llvm_function import LlvmFunction
+from llvm_instruction import LlvmInstruction
+from llvm_optimizer import LlvmOptimizerStatistics
+from llvm_parser import LlvmInstructionCommand, LlvmParser
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdl_resource_estimator import VhdlDeviceProfile
+from vhdlgen import VhdlGen
+
+def get_function(source: str, index: int = 0) -> LlvmFunction:
+    return LlvmParser().parse(source.splitlines(keepends=True)).functions.functions[index]
+
+def get_operands(instruction: LlvmInstructionCommand) -> str:
+    return ", ".join(i.signal_name.get_name() or i.signal_name.translate_name() for i in instruction.get_operands() or [])
+
+def get_offset(instruction: LlvmInstructionCommand, offsets: bool) -> str:
+    offset = getattr(instruction.instruction, "offset", None)
+    return "" if offset is None or not offsets else f" +{offset}"
+
+def get_line(instruction: LlvmInstructionCommand, offsets: bool = False) -> str:
+    destination = instruction.get_destination()
+    opcode = getattr(instruction.instruction, "opcode")
+    return (f"{'-' if destination is None else destination.get_name()} = {opcode} {get_operands(instruction=instruction)}" +
+            get_offset(instruction=instruction, offsets=offsets))
+
+def get_lines(instructions: List[LlvmInstruction], offsets: bool = False) -> List[str]:
+    """
+    Writes each valid instruction as "<destination> = <opcode> <operands>", where a missing destination is written as -
+    Example:
+        %add = add %mul, 3
+        - = store %b, %p
+        %g = getelementptr %n +4    (offsets=True)
+    """
+    return [get_line(instruction=i, offsets=offsets) for i in instructions if isinstance(i, LlvmInstructionCommand) and i.is_valid()]
+
+@dataclass
+class GeneratedFiles:
+    """
+    files: The contents of the generated files by file name, e.g. test.vhd, test_pkg.vhd and test_report.json
+    """
+    files: Dict[str, str]
+    statistics: LlvmOptimizerStatistics
+
+def generate(source: str, options: VhdlGeneratorOptions = VhdlGeneratorOptions(), report: bool = False,
+             device_profile: Optional[VhdlDeviceProfile] = None) -> GeneratedFiles:
+    """
+    Generates the source to test.vhd in a temporary directory without source comments
+    """
+    mode = VhdlCommentGenerator().get_mode()
+    VhdlCommentGenerator().set_mode(mode="off")
+    module = LlvmParser().parse(source.splitlines(keepends=True))
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            statistics = VhdlGen().parse(file_name=os.path.join(directory, "test.vhd"), module=module, options=options,
+                                         report=report, device_profile=device_profile)
+            files = {}
+            for i in os.listdir(directory):
+                with open(os.path.join(directory, i), "r", encoding="utf-8") as file_handle:
+                    files[i] = file_handle.read()
+    finally:
+        VhdlCommentGenerator().set_mode(mode=mode)
+    return GeneratedFiles(files=files, statistics=statistics)
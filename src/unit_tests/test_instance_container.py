@@ -0,0 +1,90 @@
+import time
+import unittest
+
+from function_parser import FunctionParser
+from llvm_parser import LlvmParser
+
+class TestInstanceContainer(unittest.TestCase):
+
+    def _get_function(self, number_of_instructions: int) -> str:
+        instructions = ["  %x0 = add nsw i32 %a, %b\n"]
+        instructions.extend(f"  %x{i} = add nsw i32 %x{i - 1}, %b\n" for i in range(1, number_of_instructions))
+        return ("define dso_local noundef i32 @_Z3addii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {\n" +
+                "entry:\n" + "".join(instructions) + f"  ret i32 %x{number_of_instructions - 1}\n" + "}\n")
+
+    def test_instance_names(self):
+        module = LlvmParser().parse(self._get_function(number_of_instructions=3).splitlines(keepends=True))
+        function_definition = FunctionParser().parse(function=module.functions.functions[0])
+        instances = function_definition.instances.instances
+        self.assertEqual([i.instance_name for i in instances], ["llvm_add_1", "llvm_add_2", "llvm_add_3"])
+        self.assertEqual([i.previous_instance_name for i in instances], [None, "llvm_add_1", "llvm_add_2"])
+        self.assertEqual(instances[1].input_ports[0].signal_name.get_name(), "llvm_add_1")
+
+    def test_parallel_stages(self):
+        source = """
+define dso_local noundef float @_Z3firPff(ptr noundef %p, float noundef %x, float noundef %y) local_unnamed_addr #0 {
+entry:
+  %0 = load float, ptr %p, align 4
+  %mul.1 = fmul float %x, 0x3FB99999A0000000
+  %mul.2 = fmul float %y, 0x3FC99999A0000000
+  %mul.3 = fmul float %0, 0x3FD3333340000000
+  %add.1 = fadd float %mul.1, %mul.2
+  %add.2 = fadd float %add.1, %mul.3
+  ret float %add.2
+}
+"""
+        module = LlvmParser().parse(source.splitlines(keepends=True))
+        function_definition = FunctionParser().parse(function=module.functions.functions[0])
+        stages = function_definition.instances.stages
+        self.assertEqual([i.instance_names for i in stages], 
+                         [["llvm_load_1"], ["llvm_fmul_2", "llvm_fmul_3", "llvm_fmul_4"], ["llvm_fadd_5"], ["llvm_fadd_6"]])
+        self.assertEqual([i.stage_name for i in stages], ["llvm_load_1", "stage_2", "llvm_fadd_5", "llvm_fadd_6"])
+        instances = {i.instance_name: i for i in function_definition.instances.instances}
+        self.assertEqual(instances["llvm_fmul_3"].previous_instance_name, "llvm_load_1")
+        self.assertEqual(instances["llvm_fadd_5"].previous_instance_name, "stage_2")
+
+    def test_parallel_stages_reorder_memory(self):
+        """
+        The load of a pointer argument is not a barrier with reorder_memory
+        """
+        source = """
+define dso_local noundef float @_Z3firPff(ptr noundef %p, float noundef %x, float noundef %y) local_unnamed_addr #0 {
+entry:
+  %0 = load float, ptr %p, align 4
+  %mul.1 = fmul float %x, 0x3FB99999A0000000
+  %mul.2 = fmul float %y, 0x3FC99999A0000000
+  %mul.3 = fmul float %0, 0x3FD3333340000000
+  %add.1 = fadd float %mul.1, %mul.2
+  %add.2 = fadd float %add.1, %mul.3
+  ret float %add.2
+}
+"""
+        module = LlvmParser().parse(source.splitlines(keepends=True))
+        function_definition = FunctionParser().parse(function=module.functions.functions[0], reorder_memory=True)
+        stages = function_definition.instances.stages
+        self.assertEqual([i.instance_names for i in stages], 
+                         [["llvm_load_1", "llvm_fmul_2", "llvm_fmul_3"], ["llvm_fmul_4", "llvm_fadd_5"], ["llvm_fadd_6"]])
+        self.assertEqual([i.stage_name for i in stages], ["stage_1", "stage_2", "llvm_fadd_6"])
+        self.assertEqual(stages[-1].tag_name, "tag_out_i")
+        instances = {i.instance_name: i for i in function_definition.instances.instances}
+        self.assertEqual(instances["llvm_fmul_4"].previous_instance_name, "stage_1")
+        self.assertTrue(instances["llvm_fmul_3"].parallel)
+        self.assertEqual(instances["llvm_fadd_6"].previous_instance_name, "stage_2")
+
+    def test_benchmark_large_function(self):
+        """
+        Regression benchmark: a 50k instruction function must not hit the recursion limit 
+        and the instance generation must scale linearly with the number of instructions
+        """
+        number_of_instructions = 50000
+        module = LlvmParser().parse(self._get_function(number_of_instructions=number_of_instructions).splitlines(keepends=True))
+        start = time.perf_counter()
+        function_definition = FunctionParser().parse(function=module.functions.functions[0])
+        elapsed = time.perf_counter() - start
+        instances = function_definition.instances.instances
+        self.assertEqual(len(instances), number_of_instructions)
+        self.assertEqual(instances[-1].instance_name, f"llvm_add_{number_of_instructions}")
+        self.assertLess(elapsed, 30.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from llvm_call_policy import LlvmCallInliner, LlvmCallPolicy
+from llvm_parser import LlvmParser
+from unit_tests.helpers import generate, get_lines
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdl_resource_estimator import VhdlDeviceProfile
+
+class TestLlvmCallPolicy(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z3sqri(i32 noundef %x) local_unnamed_addr #0 {
+entry:
+  %mul = mul nsw i32 %x, %x
+  %add = add nsw i32 %mul, 1
+  ret i32 %add
+}
+
+define dso_local noundef i32 @_Z4sumsii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %call = tail call noundef i32 @_Z3sqri(i32 noundef %a)
+  %call1 = tail call noundef i32 @_Z3sqri(i32 noundef %b)
+  %add = add nsw i32 %call1, %call
+  ret i32 %add
+}
+"""
+
+    def test_parse(self):
+        items = LlvmCallPolicy().parse(text="share, _Z3sqri=inline")
+        self.assertEqual(items, (("*", "share"), ("_Z3sqri", "inline")))
+        policy = LlvmCallPolicy(items=items)
+        self.assertEqual(policy.get(name="@_Z3sqri"), "inline")
+        self.assertEqual(policy.get(name="_Z4sumsii"), "share")
+        self.assertEqual(LlvmCallPolicy().get(name="_Z3sqri"), "duplicate")
+        with self.assertRaises(AssertionError):
+            LlvmCallPolicy().parse(text="_Z3sqri=unknown")
+
+    def test_inline(self):
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        policy = LlvmCallPolicy(items=(("_Z3sqri", "inline"),))
+        function, statistics = LlvmCallInliner(functions=module.functions, policy=policy).run(function=module.functions.functions[1])
+        self.assertEqual(get_lines(instructions=function.instructions),
+                         ["%call.mul = mul %a, %a", "%call = add %call.mul, 1",
+                          "%call1.mul = mul %b, %b", "%call1 = add %call1.mul, 1", "%add = add %call1, %call"])
+        self.assertEqual((statistics.removed_instructions, statistics.added_instructions), (2, 4))
+
+    def _generate(self, call_policy, source=None):
+        generated = generate(source=self._source if source is None else source, options=VhdlGeneratorOptions(call_policy=call_policy),
+                             report=True, device_profile=VhdlDeviceProfile())
+        return generated.files["test.vhd"], generated.files["test_report.txt"], generated.files["test_resources.txt"]
+
+    def _get_entity(self, contents, name):
+        start = contents.index(f"entity {name} is")
+        return contents[start:contents.index("end architecture rtl;", start)]
+
+    def test_inline_generated_callee(self):
+        """
+        The callee is generated before the caller, so its body must not be changed by its own generation
+        """
+        contents, _, _ = self._generate(call_policy=(("_Z3sqri", "inline"),))
+        callee, caller = self._source.strip().split("\n\n")
+        reordered, _, _ = self._generate(call_policy=(("_Z3sqri", "inline"),), source=caller + "\n\n" + callee + "\n")
+        self.assertEqual(self._get_entity(contents=contents, name="Z4sumsii"), self._get_entity(contents=reordered, name="Z4sumsii"))
+        self.assertIn("stage_2_tag_out_i.llvm_add_4 <= llvm_add_4_tag_out_i.llvm_add_4;", contents)
+
+    def test_share(self):
+        contents, report, resources = self._generate(call_policy=(("*", "share"),))
+        self.assertEqual(contents.count("entity work.Z3sqri"), 1)
+        self.assertIn("Z3sqri_share_1_b : block", contents)
+        self.assertIn("Z3sqri_2_share_request_i <= busy_i and not issued_i;", contents)
+        self.assertRegex(report, r"Z4sumsii\s+5\s+5\s+4\s")
+        self.assertRegex(resources, r"Z4sumsii\s+Z3sqri_share_1\s+2\s+-?\d+\s+-?\d+\s+4\s+2\n")
+
+    def test_duplicate(self):
+        contents, report, resources = self._generate(call_policy=())
+        self.assertEqual(contents.count("entity work.Z3sqri"), 2)
+        self.assertRegex(report, r"Z4sumsii\s+3\s+3\s+1\s")
+        self.assertNotIn("Shared operator", resources)
+
+if __name__ == "__main__":
+    unittest.main()
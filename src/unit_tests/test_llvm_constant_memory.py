@@ -0,0 +1,57 @@
+import unittest
+
+from llvm_constant_memory import LlvmConstantLoadPass
+from llvm_optimizer import LlvmPassStatistics
+from llvm_parser import LlvmParser
+from unit_tests.helpers import generate, get_lines
+from vhdl_generator_options import VhdlGeneratorOptions
+
+class TestLlvmConstantMemory(unittest.TestCase):
+
+    _source = """
+@_ZL4coef = internal unnamed_addr constant [4 x i32] [i32 3, i32 5, i32 -7, i32 11], align 16
+
+define dso_local noundef i32 @_Z3romi(i32 noundef %a) local_unnamed_addr #0 {
+entry:
+  %g1 = getelementptr inbounds [4 x i32], ptr @_ZL4coef, i64 0, i64 1
+  %g2 = getelementptr inbounds i32, ptr %g1, i64 1
+  %0 = load i32, ptr %g2, align 4
+  %1 = load i32, ptr @_ZL4coef, align 16
+  %mul = mul nsw i32 %0, %a
+  %add = add nsw i32 %mul, %1
+  ret i32 %add
+}
+"""
+
+    def _run(self, source):
+        module = LlvmParser().parse(source.splitlines(keepends=True))
+        statistics = LlvmPassStatistics(pass_name=LlvmConstantLoadPass.name)
+        instructions = LlvmConstantLoadPass(constants=module.globals).run(instructions=module.functions.functions[0].instructions,
+                                                                          statistics=statistics)
+        return get_lines(instructions=instructions), statistics
+
+    def test_fold(self):
+        lines, statistics = self._run(source=self._source)
+        self.assertEqual(lines, ["%mul = mul 4294967289, %a", "%add = add %mul, 3"])
+        self.assertEqual((statistics.removed_instructions, statistics.replaced_operands), (4, 2))
+
+    def test_return_driver(self):
+        source = self._source.replace("  %mul = mul nsw i32 %0, %a\n  %add = add nsw i32 %mul, %1\n  ret i32 %add", "  ret i32 %1")
+        lines, statistics = self._run(source=source)
+        self.assertEqual(lines, ["%1 = load @_ZL4coef"])
+        self.assertEqual(statistics.removed_instructions, 3)
+
+    def test_width(self):
+        lines, _ = self._run(source=self._source.replace("%0 = load i32", "%0 = load i16"))
+        self.assertEqual(lines[:3], ["%g1 = getelementptr @_ZL4coef, 1", "%g2 = getelementptr %g1, 1", "%0 = load %g2"])
+
+    def test_generate(self):
+        self.assertIn("llvm_load", generate(source=self._source).files["test.vhd"])
+        generated = generate(source=self._source, options=VhdlGeneratorOptions(optimization_passes=("constant-loads",)))
+        contents, package = generated.files["test.vhd"], generated.files["test_pkg.vhd"]
+        self.assertNotIn("llvm_load", contents)
+        self.assertIn("integer_4294967289 <= get(x\"fffffff9\", 32);", contents)
+        self.assertIn("constant g_uZL4coef : std_ulogic_vector", package)
+
+if __name__ == "__main__":
+    unittest.main()
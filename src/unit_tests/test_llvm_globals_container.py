@@ -0,0 +1,35 @@
+import unittest
+
+from llvm_global_parser import LlvmGlobalParser
+from llvm_globals_container import GlobalsContainer
+from llvm_source_file import LlvmSourceLine
+from llvm_type import LlvmConstantName, LlvmVariableName
+
+class TestGlobalsContainer(unittest.TestCase):
+
+    def _get_container(self) -> GlobalsContainer:
+        lines = [
+            "%class.ClassTest = type { i32, i32 }",
+            "@__const.main.n = private unnamed_addr constant [3 x i32] [i32 1, i32 2, i32 3], align 4",
+            "@_ZN9ClassTestC1Eii = dso_local unnamed_addr alias void (ptr, i32, i32), ptr @_ZN9ClassTestC2Eii",
+            "@_ZZ3firfE6buffer = internal unnamed_addr global [4 x float] zeroinitializer, align 16"]
+        declarations = [LlvmGlobalParser().parse(LlvmSourceLine(line_number=i, line=line)) for i, line in enumerate(lines, 1)]
+        return GlobalsContainer(declarations=declarations)
+
+    def test_get_declaration(self):
+        x = self._get_container()
+        self.assertEqual(x.get_initialization(name=LlvmConstantName("@__const.main.n")), ["1", "2", "3"])
+        self.assertEqual(x.get_data_width(name=LlvmVariableName("%class.ClassTest")), "32 + 32")
+        self.assertTrue(x.get_declaration(name=LlvmVariableName("@_ZZ3firfE6buffer")).is_variable())
+        self.assertIsNone(x.get_declaration(name=LlvmVariableName("%unknown")))
+
+    def test_add_declaration(self):
+        x = self._get_container()
+        y = GlobalsContainer(declarations=[])
+        for i in x.declarations:
+            y.add_declaration(declaration=i)
+        self.assertEqual(x, y)
+        self.assertEqual(y.get_initialization(name=LlvmConstantName("@__const.main.n")), ["1", "2", "3"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from llvm_lexer import LlvmLexer, LlvmTokenKind
+
+class TestLlvmLexer(unittest.TestCase):
+
+    def test_tokenize(self):
+        x = LlvmLexer()
+        got = [(i.kind, i.text) for i in x.tokenize("%0 = load float, ptr @_ZZ3firfE6buffer, align 16, !tbaa !5 ; comment")]
+        expected = [(LlvmTokenKind.LOCAL, "%0"), (LlvmTokenKind.EQUAL, "="), (LlvmTokenKind.KEYWORD, "load"), 
+                    (LlvmTokenKind.TYPE, "float"), (LlvmTokenKind.COMMA, ","), (LlvmTokenKind.TYPE, "ptr"), 
+                    (LlvmTokenKind.GLOBAL, "@_ZZ3firfE6buffer"), (LlvmTokenKind.COMMA, ","), 
+                    (LlvmTokenKind.KEYWORD, "align"), (LlvmTokenKind.INTEGER, "16"), (LlvmTokenKind.COMMA, ","), 
+                    (LlvmTokenKind.METADATA, "!tbaa"), (LlvmTokenKind.METADATA, "!5")]
+        self.assertEqual(got, expected)
+
+    def test_get_tokens(self):
+        x = LlvmLexer()
+        got = [(i.kind, i.text) for i in x.get_tokens("fmul float %x, 0x3FB99999A0000000")]
+        self.assertEqual(got, [(LlvmTokenKind.KEYWORD, "fmul"), (LlvmTokenKind.TYPE, "float"), (LlvmTokenKind.LOCAL, "%x"), (LlvmTokenKind.HEX, "0x3FB99999A0000000")])
+        got = [(i.kind, i.text) for i in x.get_tokens("store i32 %a, i32* %a.addr, align 4")]
+        self.assertEqual(got, [(LlvmTokenKind.KEYWORD, "store"), (LlvmTokenKind.TYPE, "i32"), (LlvmTokenKind.LOCAL, "%a"), (LlvmTokenKind.TYPE, "i32*"),
+                               (LlvmTokenKind.LOCAL, "%a.addr"), (LlvmTokenKind.KEYWORD, "align"), (LlvmTokenKind.INTEGER, "4")])
+
+    def test_split_top_comma(self):
+        x = LlvmLexer()
+        text = "ptr noundef nonnull align 4 dereferenceable(12) getelementptr inbounds ([4 x float], ptr @_ZZ3firfE6buffer, i64 0, i64 1), i32 noundef 1"
+        expected = ["ptr noundef nonnull align 4 dereferenceable(12) getelementptr inbounds ([4 x float], ptr @_ZZ3firfE6buffer, i64 0, i64 1)", "i32 noundef 1"]
+        self.assertEqual(x.split_top_comma(text), expected)
+
+    def test_split_top_space(self):
+        x = LlvmLexer()
+        text = "ptr noundef align 4 dereferenceable(12) getelementptr inbounds ([4 x float], ptr @_ZZ3firfE6buffer, i64 0, i64 1)"
+        expected = ["ptr", "noundef", "align", "4", "dereferenceable(12)", "getelementptr", "inbounds", "([4 x float], ptr @_ZZ3firfE6buffer, i64 0, i64 1)"]
+        self.assertEqual(x.split_top_space(text), expected)
+
+    def test_unbalanced_parenthesis(self):
+        with self.assertRaises(AssertionError):
+            LlvmLexer().split_top_comma("i32 1), i32 2")
+
+if __name__ == "__main__":
+    unittest.main()
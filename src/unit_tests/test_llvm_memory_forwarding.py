@@ -0,0 +1,98 @@
+import unittest
+
+from function_parser import FunctionParser
+from llvm_memory_alias import LlvmMemoryAddress, LlvmMemoryAliasAnalysis
+from llvm_optimizer import LlvmMemoryForwardingPass, LlvmPassStatistics
+from unit_tests.helpers import get_function, get_lines
+
+class TestLlvmMemoryForwarding(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z3fwdPiii(ptr noundef %p, i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %n = alloca [4 x i32], align 4
+  %g1 = getelementptr inbounds [4 x i32], ptr %n, i64 0, i64 1
+  store i32 %a, ptr %g1, align 4
+  store i32 %b, ptr %n, align 4
+  %0 = load i32, ptr %g1, align 4
+  %1 = load i32, ptr %p, align 4
+  store i32 %b, ptr %p, align 4
+  %2 = load i32, ptr %n, align 4
+  %3 = load i32, ptr %p, align 4
+  %g2 = getelementptr inbounds i32, ptr %p, i64 1
+  %4 = load i32, ptr %g2, align 4
+  %5 = load i32, ptr %g2, align 4
+  %s1 = add nsw i32 %0, %1
+  %s2 = add nsw i32 %2, %3
+  %s3 = add nsw i32 %4, %5
+  %s4 = add nsw i32 %s1, %s2
+  %s5 = add nsw i32 %s4, %s3
+  ret i32 %s5
+}
+"""
+
+    def _get_instructions(self, source):
+        return get_function(source=source).instructions
+
+    def _run(self, source):
+        statistics = LlvmPassStatistics(pass_name=LlvmMemoryForwardingPass.name)
+        instructions = LlvmMemoryForwardingPass().run(instructions=self._get_instructions(source=source), statistics=statistics)
+        return get_lines(instructions=instructions), statistics
+
+    def test_alias_analysis(self):
+        analysis = LlvmMemoryAliasAnalysis(instructions=self._get_instructions(source=self._source))
+        n = LlvmMemoryAddress(memory="%n", kind="alloca", offset=1)
+        p = LlvmMemoryAddress(memory="%p", kind="argument", offset=1)
+        self.assertEqual([analysis.get_access(instruction=i).address for i in self._get_instructions(source=self._source)
+                          if analysis.get_access(instruction=i) is not None][0], n)
+        self.assertFalse(n.may_alias(other=p))
+        self.assertTrue(p.may_alias(other=LlvmMemoryAddress(memory="%q", kind="argument", offset=0)))
+        self.assertTrue(p.may_alias(other=LlvmMemoryAddress(memory="@g", kind="global", offset=0)))
+        self.assertFalse(p.may_alias(other=LlvmMemoryAddress(memory="%p", kind="argument", offset=0)))
+
+    def test_forwarding(self):
+        lines, statistics = self._run(source=self._source)
+        self.assertEqual(lines, ["%n = alloca ", "%g1 = getelementptr %n, 1", "- = store %a, %g1", "- = store %b, %n",
+                                 "%1 = load %p", "- = store %b, %p", "%g2 = getelementptr %p, 1", "%4 = load %g2",
+                                 "%s1 = add %a, %1", "%s2 = add %b, %b", "%s3 = add %4, %4", "%s4 = add %s1, %s2", "%s5 = add %s4, %s3"])
+        self.assertEqual((statistics.removed_instructions, statistics.replaced_operands), (4, 4))
+
+    def test_call(self):
+        source = self._source.replace("  %3 = load i32, ptr %p, align 4\n",
+                                      "  %c = call noundef i32 @_Z3getPi(ptr noundef %n)\n  %3 = load i32, ptr %p, align 4\n")
+        lines, _ = self._run(source=source)
+        self.assertIn("%3 = load %p", lines)
+        self.assertIn("%4 = load %g2", lines)
+        self.assertIn("%s3 = add %4, %4", lines)
+
+    def test_unknown_pointer(self):
+        source = self._source.replace("  %2 = load i32, ptr %n, align 4\n",
+                                      "  %q = load ptr, ptr %p, align 8\n  store i32 %a, ptr %q, align 4\n  %2 = load i32, ptr %n, align 4\n")
+        lines, _ = self._run(source=source)
+        self.assertIn("%2 = load %n", lines)
+        self.assertIn("%3 = load %p", lines)
+
+    def test_schedule(self):
+        source = """
+define dso_local noundef i32 @_Z5stagePii(ptr noundef %p, i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %n = alloca [4 x i32], align 4
+  store i32 %a, ptr %n, align 4
+  %g1 = getelementptr inbounds [4 x i32], ptr %n, i64 0, i64 1
+  store i32 %b, ptr %g1, align 4
+  %0 = load i32, ptr %p, align 4
+  %1 = load i32, ptr %n, align 4
+  %add = add nsw i32 %0, %1
+  ret i32 %add
+}
+"""
+        function_definition = FunctionParser().parse(function=get_function(source=source), reorder_memory=True)
+        self.assertEqual([i.instance_names for i in function_definition.instances.stages],
+                         [["llvm_alloca_1"], ["llvm_store_2", "llvm_getelementptr_3", "llvm_load_5"], ["llvm_store_4", "llvm_load_6"], ["llvm_add_7"]])
+        function_definition = FunctionParser().parse(function=get_function(source=source))
+        self.assertEqual([i.instance_names for i in function_definition.instances.stages],
+                         [["llvm_alloca_1"], ["llvm_store_2"], ["llvm_getelementptr_3"], ["llvm_store_4"], ["llvm_load_5"], ["llvm_load_6"], 
+                          ["llvm_add_7"]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import unittest
+
+from llvm_memory_partitioning import LlvmMemoryPartition, LlvmMemoryPartitioner
+from unit_tests.helpers import generate, get_function, get_lines
+from vhdl_generator_options import VhdlGeneratorOptions
+
+class TestLlvmMemoryPartitioning(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z4bankii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %n = alloca [8 x i32], align 4
+  store i32 %a, ptr %n, align 4
+  %g4 = getelementptr inbounds [8 x i32], ptr %n, i64 0, i64 4
+  store i32 %b, ptr %g4, align 4
+  %0 = load i32, ptr %n, align 4
+  %1 = load i32, ptr %g4, align 4
+  %add = add nsw i32 %0, %1
+  ret i32 %add
+}
+"""
+
+    def _run(self, scheme, banks):
+        function = get_function(source=self._source)
+        return LlvmMemoryPartitioner(scheme=scheme, banks=banks).run(function=function)
+
+    def test_partition(self):
+        cyclic = LlvmMemoryPartition(scheme="cyclic", size=8, banks=2)
+        block = LlvmMemoryPartition(scheme="block", size=8, banks=2)
+        complete = LlvmMemoryPartition(scheme="complete", size=8, banks=8)
+        self.assertEqual([(cyclic.get_bank(index=i), cyclic.get_offset(index=i)) for i in (0, 2, 5)], [(0, 0), (0, 1), (1, 2)])
+        self.assertEqual([(block.get_bank(index=i), block.get_offset(index=i)) for i in (0, 2, 5)], [(0, 0), (0, 2), (1, 1)])
+        self.assertEqual([(complete.get_bank(index=i), complete.get_offset(index=i)) for i in (0, 2, 5)], [(0, 0), (2, 0), (5, 0)])
+        self.assertEqual(cyclic.get_elements(bank=1), [1, 3, 5, 7])
+        self.assertEqual(block.get_conflicts(indexes=[0, 2, 0, 2]), 4)
+        self.assertEqual(LlvmMemoryPartition(scheme="block", size=8, banks=4).get_conflicts(indexes=[0, 2, 0, 2]), 2)
+
+    def test_auto_scheme(self):
+        function, statistics = self._run(scheme="auto", banks=2)
+        self.assertEqual(get_lines(instructions=function.instructions, offsets=True),
+                         ["%n.bank0 = alloca ", "%n.bank1 = alloca ", "- = store %a, %n.bank0", "- = store %b, %n.bank1",
+                          "%0 = load %n.bank0", "%1 = load %n.bank1", "%add = add %0, %1"])
+        self.assertEqual((statistics.removed_instructions, statistics.added_instructions), (2, 2))
+        self.assertEqual(function.instructions[1].instruction.data_type.get_data_width(), "4*32")
+
+    def test_cyclic_scheme(self):
+        function, _ = self._run(scheme="cyclic", banks=2)
+        self.assertEqual(function, get_function(source=self._source))
+
+    def test_escape(self):
+        source = self._source.replace("%1 = load i32, ptr %g4, align 4", "%1 = call noundef i32 @_Z3getPi(ptr noundef %g4)")
+        function = get_function(source=source)
+        partitioned, statistics = LlvmMemoryPartitioner(scheme="complete").run(function=function)
+        self.assertEqual(partitioned.instructions, function.instructions)
+        self.assertEqual(statistics.removed_instructions, 0)
+
+    def test_generate(self):
+        generated = generate(source=self._source, options=VhdlGeneratorOptions(memory_partitioning="complete"), report=True)
+        contents, report = generated.files["test.vhd"], json.loads(generated.files["test_report.json"])
+        self.assertEqual(contents.count("entity memory.arbiter"), 0)
+        self.assertIn("llvm_alloca_1_araddr <= llvm_load_5_araddr;", contents)
+        self.assertIn("llvm_alloca_2_araddr <= llvm_load_6_araddr;", contents)
+        self.assertEqual(report["entities"][0]["initiation_interval"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
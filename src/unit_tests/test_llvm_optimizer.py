@@ -0,0 +1,86 @@
+import unittest
+
+from function_parser import FunctionParser
+from llvm_optimizer import LlvmConstantFoldingPass, LlvmOptimizer, LlvmOptimizerStatistics, LlvmPassStatistics
+from unit_tests.helpers import generate, get_function, get_lines
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdlgen import VhdlGen
+
+class TestLlvmOptimizer(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z3optii(i32 noundef %x, i32 noundef %y) local_unnamed_addr #0 {
+entry:
+  %a = add nsw i32 2, 3
+  %cmp = icmp eq i32 %a, 5
+  %b = mul nsw i32 %a, %x
+  %c = select i1 %cmp, i32 %b, i32 %y
+  %d = add nsw i32 %x, %y
+  %e = add nsw i32 %y, %x
+  %unused = sub nsw i32 %d, 1
+  %f = mul nsw i32 %d, %e
+  %g = add nsw i32 %c, %f
+  ret i32 %g
+}
+"""
+
+    def _get_function(self):
+        return get_function(source=self._source)
+
+    def test_constant_folding(self):
+        instructions = LlvmConstantFoldingPass().run(instructions=self._get_function().instructions,
+                                                     statistics=LlvmPassStatistics(pass_name="constant-folding"))
+        lines = get_lines(instructions=instructions)
+        self.assertIn("%b = mul 5, %x", lines)
+        self.assertIn("%g = add %b, %f", lines)
+
+    def test_passes(self):
+        function = self._get_function()
+        optimized, statistics = LlvmOptimizer(pass_names=("constant-folding", "cse", "dce")).run(function=function)
+        self.assertEqual(get_lines(instructions=optimized.instructions),
+                         ["%b = mul 5, %x", "%d = add %x, %y", "%f = mul %d, %d", "%g = add %b, %f"])
+        self.assertEqual([(i.pass_name, i.removed_instructions) for i in statistics],
+                         [("constant-folding", 0), ("cse", 1), ("dce", 4)])
+        self.assertEqual(len(get_lines(instructions=function.instructions)), 9)
+        definition = FunctionParser().parse(function=optimized)
+        self.assertEqual([i.instance_name for i in definition.instances.instances],
+                         ["llvm_mul_1", "llvm_add_2", "llvm_mul_3", "llvm_add_4"])
+
+    def test_return_driver_is_kept(self):
+        source = """
+define dso_local noundef i32 @_Z3dupii(i32 noundef %x, i32 noundef %y) local_unnamed_addr #0 {
+entry:
+  %a = add nsw i32 %x, %y
+  %b = add nsw i32 %x, %y
+  ret i32 %b
+}
+"""
+        function = get_function(source=source)
+        optimized, _ = LlvmOptimizer().run(function=function)
+        self.assertEqual(get_lines(instructions=optimized.instructions), ["%b = add %x, %y"])
+
+    def test_repeated_operand_signal(self):
+        generated = generate(source=self._source, options=VhdlGeneratorOptions(optimization_passes=("constant-folding", "cse", "dce")))
+        self.assertEqual(generated.files["test.vhd"].count("signal var_llvm_add_2 :"), 1)
+        self.assertEqual(generated.statistics.passes["dce"].removed_instructions, 4)
+
+    def test_statistics_summary(self):
+        statistics = LlvmOptimizerStatistics()
+        statistics.add(statistics=[LlvmPassStatistics(pass_name="dce", functions=1, removed_instructions=2)])
+        statistics.add(statistics=[LlvmPassStatistics(pass_name="dce", functions=1, removed_instructions=3)])
+        self.assertEqual(statistics.get_summary(), ["Optimization pass dce: 5 instructions removed, 0 added, 0 operands replaced"])
+
+    def test_statistics_order(self):
+        statistics = LlvmOptimizerStatistics(order=VhdlGen.pipeline_passes + ("cse", "dce"))
+        statistics.add(statistics=[LlvmPassStatistics(pass_name="inline"), LlvmPassStatistics(pass_name="cse"), LlvmPassStatistics(pass_name="dce")])
+        statistics.add(statistics=[LlvmPassStatistics(pass_name="inline"), LlvmPassStatistics(pass_name="constant-loads"), 
+                                   LlvmPassStatistics(pass_name="partition"), LlvmPassStatistics(pass_name="cse"), LlvmPassStatistics(pass_name="dce")])
+        self.assertEqual([i.split(":")[0] for i in statistics.get_summary()], 
+                         [f"Optimization pass {i}" for i in ("inline", "constant-loads", "partition", "cse", "dce")])
+
+    def test_unknown_pass(self):
+        with self.assertRaises(AssertionError):
+            LlvmOptimizer(pass_names=("unknown",))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,11 @@
 import unittest
+from dataclasses import FrozenInstanceError
 from instruction import GetelementptrInstruction
 from instruction_argument import InstructionArgument
-from llvm_declarations import LlvmIntegerDeclaration, LlvmPointerDeclaration
+from llvm_declarations import LlvmDeclarationFactory, LlvmIntegerDeclaration, LlvmPointerDeclaration
 
 from llvm_type import LlvmInteger, LlvmVariableName
-from llvm_parser import GlobalsContainer, GetelementptrInstructionParser, InstructionParserArguments, LlvmArgumentParser
+from llvm_parser import CallInstructionParser, DefaultInstructionParser, GlobalsContainer, GetelementptrInstructionParser, InstructionParserArguments, LlvmArgumentParser, LlvmParserException, instruction_parser_registry
 
 from messages import Messages
 
@@ -19,6 +20,24 @@ class TestGetelementptrInstructionParser(unittest.TestCase):
         got = x.parse(arguments=InstructionParserArguments(instruction=instruction, destination=destination, constants=constants))
         self.assertEqual(got, expected)
         
+class TestLlvmDeclarationFactory(unittest.TestCase):
+
+    def test_cached_declaration(self):
+        x = LlvmDeclarationFactory().get("i32")
+        self.assertIs(LlvmDeclarationFactory().get("i32"), x)
+        with self.assertRaises(FrozenInstanceError):
+            x.data_width = 8
+        self.assertEqual(LlvmDeclarationFactory().get("i32"), LlvmIntegerDeclaration(data_width=32))
+
+class TestInstructionParserRegistry(unittest.TestCase):
+
+    def test_get(self):
+        self.assertIsInstance(instruction_parser_registry.get("getelementptr inbounds i32, ptr %a, i64 1"), GetelementptrInstructionParser)
+        self.assertIsInstance(instruction_parser_registry.get("tail call i32 @_Z3addii(i32 2, i32 3)"), CallInstructionParser)
+        self.assertIsInstance(instruction_parser_registry.get("add nsw i32 %b, %a"), DefaultInstructionParser)
+        with self.assertRaises(LlvmParserException):
+            instruction_parser_registry.get("indirectbr ptr %Addr, [label %bb1, label %bb2]")
+
 class TestArgumentParser(unittest.TestCase):        
 
     def test_argument_parser(self):
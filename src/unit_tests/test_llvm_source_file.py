@@ -0,0 +1,36 @@
+import io
+import unittest
+
+from llvm_source_file import LlvmSourceFileParser, LlvmSourceFunction, LlvmSourceLine
+
+class TestLlvmSourceFileParser(unittest.TestCase):
+
+    def _get_function(self, name: str) -> str:
+        return f"""
+define dso_local noundef i32 @{name}(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {{
+entry:
+  %add = add nsw i32 %b, %a
+  ret i32 %add
+}}
+"""
+
+    def test_split(self):
+        text = "; ModuleID = 'add.cpp'\n@_ZZ3firfE6buffer = internal unnamed_addr global [4 x float] zeroinitializer, align 16\n"
+        text += self._get_function(name="_Z3addii")
+        x = LlvmSourceFileParser()
+        got = list(x.split(lines=x.read(file_handle=io.StringIO(text))))
+        self.assertEqual(len(got), 2)
+        self.assertIsInstance(got[0], LlvmSourceLine)
+        self.assertEqual(got[0].line_number, 2)
+        self.assertIsInstance(got[1], LlvmSourceFunction)
+        self.assertEqual([i.line.strip() for i in got[1].lines][-2:], ["ret i32 %add", "}"])
+
+    def test_split_many_functions(self):
+        number_of_functions = 5000
+        text = "".join(self._get_function(name=f"f{i}") for i in range(number_of_functions))
+        x = LlvmSourceFileParser()
+        functions = x.split(lines=x.read(file_handle=io.StringIO(text)))
+        self.assertEqual(sum(1 for _ in functions), number_of_functions)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+from dataclasses import replace
+
+from llvm_optimizer import LlvmConstantFoldingPass, LlvmOptimizer, LlvmPassStatistics, LlvmShiftTerm, LlvmStrengthReductionPass
+from llvm_parser import LlvmParser
+from llvm_type import LlvmVariableName
+
+class TestLlvmStrengthReduction(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z2srii(i32 noundef %x, i32 noundef %y) local_unnamed_addr #0 {
+entry:
+  %a = mul nsw i32 X, 10
+  %b = mul nsw i32 255, Y
+  %c = udiv i32 %a, 8
+  %d = urem i32 %b, 8
+  %e = sdiv i32 X, 4
+  %f = srem i32 Y, 16
+  %g = mul i32 X, -8
+  %h = mul i32 X, 305419896
+  %i = mul nsw i32 Y, -10
+  %j = mul i32 -255, X
+  %s1 = add i32 %e, %f
+  %s2 = add i32 %g, %h
+  %s3 = add i32 %s1, %s2
+  %s4 = add i32 %c, %d
+  %s5 = add i32 %s3, %s4
+  %s6 = add i32 %i, %j
+  %s7 = add i32 %s5, %s6
+  ret i32 %s7
+}
+"""
+
+    def _get_function(self, x: str = "%x", y: str = "%y", width: int = 32):
+        source = self._source.replace("X", x).replace("Y", y).replace("i32", f"i{width}")
+        return LlvmParser().parse(source.splitlines(keepends=True)).functions.functions[0]
+
+    def _get_opcodes(self, function):
+        return [i.instruction.opcode for i in function.instructions if i.is_valid()]
+
+    def _evaluate(self, instructions, x: int, y: int) -> int:
+        folding = LlvmConstantFoldingPass(values={LlvmVariableName("%x"): x, LlvmVariableName("%y"): y})
+        folding.run(instructions=instructions, statistics=LlvmPassStatistics(pass_name=folding.name))
+        return folding._values[LlvmVariableName("%s7")]
+
+    def test_terms(self):
+        reduction = LlvmStrengthReductionPass()
+        self.assertEqual(reduction.get_binary_terms(value=10), [LlvmShiftTerm(shift=3), LlvmShiftTerm(shift=1)])
+        self.assertEqual(reduction.get_csd_terms(value=255, width=32), [LlvmShiftTerm(shift=8), LlvmShiftTerm(shift=0, negative=True)])
+        self.assertEqual(reduction.get_csd_terms(value=2 ** 32 - 8, width=32), [LlvmShiftTerm(shift=3, negative=True)])
+
+    def test_rewrite(self):
+        function, statistics = LlvmOptimizer(pass_names=("strength-reduction",)).run(function=self._get_function())
+        opcodes = self._get_opcodes(function=function)
+        self.assertEqual(opcodes.count("mul"), 1)
+        self.assertNotIn("udiv", opcodes)
+        self.assertNotIn("srem", opcodes)
+        self.assertEqual(statistics[0].removed_instructions, 9)
+        self.assertEqual(function.instructions[-1].get_destination(), LlvmVariableName("%s7"))
+
+    def _get_values(self, generator: random.Random, width: int):
+        values = [0, 1, 7, 100, 2 ** (width - 1) - 1, 2 ** (width - 1), 2 ** width - 1]
+        return values + [generator.randrange(2 ** width) for _ in range(20)]
+
+    def test_equivalence(self):
+        generator = random.Random(5)
+        reduction = LlvmStrengthReductionPass()
+        for width in (8, 16, 32, 64):
+            function = self._get_function(width=width)
+            reduced = reduction.run(instructions=function.instructions, statistics=LlvmPassStatistics(pass_name=reduction.name))
+            self.assertLess(self._get_opcodes(function=replace(function, instructions=reduced)).count("mul"),
+                            self._get_opcodes(function=function).count("mul"))
+            values = self._get_values(generator=generator, width=width)
+            for x, y in zip(values, reversed(values)):
+                with self.subTest(width=width, x=x, y=y):
+                    self.assertEqual(self._evaluate(instructions=reduced, x=x, y=y), self._evaluate(instructions=function.instructions, x=x, y=y))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import re
+import unittest
+
+from llvm_type import LlvmConstantName, LlvmVariableName
+
+class TestLlvmName(unittest.TestCase):
+
+    _names = ["@coef", "@_coef", "@__coef", "@_ZL4coef", "@ZL4coef", "@__const.main.n", "@__const_main_n", "@a.b", "@a_b",
+              "@0", "@g0", "@x30", '@"a b"', "@a$b", "@llvm.memcpy.p0.p0.i64"]
+
+    def test_global_names(self):
+        identifiers = [LlvmConstantName(i).translate_name() for i in self._names]
+        self.assertEqual(identifiers[:4], ["coef", "g_ucoef", "g_u_ucoef", "g_uZL4coef"])
+        self.assertEqual(len(set(identifiers)), len(self._names))
+        for name, identifier in zip(self._names, identifiers):
+            with self.subTest(name=name):
+                self.assertRegex(identifier, re.compile(r"^[A-Za-z](_?[A-Za-z0-9])*$"))
+                self.assertEqual(LlvmVariableName(name).translate_name(), identifier)
+
+    def test_local_names(self):
+        self.assertEqual(LlvmVariableName("%x.coerce").translate_name(), "x_coerce")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from function_parser import FunctionParser
+from llvm_parser import LlvmParser
+from llvm_type import LlvmVariableName
+from llvm_value_range import LlvmValueRange, LlvmValueRangeAnalysis
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdlgen import VhdlGen
+
+class TestLlvmValueRange(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z6narrowii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %and = and i32 %a, 7
+  %add = add nuw i32 %and, 1
+  %cmp = icmp ult i32 %b, 10
+  %min = select i1 %cmp, i32 %b, i32 9
+  %mul = mul nuw i32 %add, %min
+  %wrap = add nsw i32 %a, 1
+  ret i32 %mul
+}
+"""
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def _get_function(self):
+        return LlvmParser().parse(self._source.splitlines(keepends=True)).functions.functions[0]
+
+    def test_ranges(self):
+        ranges = LlvmValueRangeAnalysis().get_ranges(function=self._get_function())
+        self.assertEqual(ranges[LlvmVariableName("%and")], LlvmValueRange(low=0, high=7))
+        self.assertEqual(ranges[LlvmVariableName("%add")], LlvmValueRange(low=1, high=8))
+        self.assertEqual(ranges[LlvmVariableName("%cmp")], LlvmValueRange(low=0, high=1))
+        self.assertEqual(ranges[LlvmVariableName("%min")], LlvmValueRange(low=0, high=9))
+        self.assertEqual(ranges[LlvmVariableName("%mul")], LlvmValueRange(low=0, high=72))
+        self.assertEqual(ranges[LlvmVariableName("%wrap")], LlvmValueRange(low=0, high=2 ** 32 - 1))
+
+    def test_result_widths(self):
+        widths = LlvmValueRangeAnalysis().get_result_widths(function=self._get_function())
+        self.assertEqual({i.get_name(): j for i, j in widths.items()},
+                         {"%and": 3, "%add": 4, "%cmp": 1, "%min": 4, "%mul": 7})
+
+    def test_declarations(self):
+        definition = FunctionParser().parse(function=self._get_function(), narrow_widths=True)
+        declarations = {i.instance_name: i.data_type.get_data_width() for i in definition.declarations}
+        self.assertEqual(declarations["llvm_and_1"], "3")
+        self.assertEqual(declarations["llvm_add_6"], "32")
+        instances = {i.instance_name: i for i in definition.instances.instances}
+        self.assertEqual(instances["llvm_mul_5"].output_port.data_type.get_data_width(), "7")
+        self.assertEqual(instances["llvm_mul_5"].input_ports[0].get_data_width(), "32")
+
+    def _generate(self, options: VhdlGeneratorOptions) -> str:
+        VhdlCommentGenerator().set_mode(mode="off")
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            VhdlGen().parse(file_name=file_name, module=module, options=options)
+            with open(file_name, "r", encoding="utf-8") as file_handle:
+                return file_handle.read()
+
+    def test_narrow_tag_items(self):
+        contents = self._generate(options=VhdlGeneratorOptions(narrow_widths=True))
+        self.assertIn("llvm_and_1 : std_ulogic_vector(0 to 3 - 1);", contents)
+        self.assertIn("llvm_ult_3 : std_ulogic_vector(0 to 1 - 1);", contents)
+        self.assertIn("var_llvm_add_2 <= get(tag_i.llvm_add_2, 32);", contents)
+
+    def test_no_narrowing_by_default(self):
+        contents = self._generate(options=VhdlGeneratorOptions())
+        self.assertIn("llvm_and_1 : std_ulogic_vector(0 to 32 - 1);", contents)
+
+if __name__ == "__main__":
+    unittest.main()
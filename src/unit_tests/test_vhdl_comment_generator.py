@@ -0,0 +1,34 @@
+import unittest
+
+from instantiation_point import InstantiationPoint
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_function_contents import VhdlFunctionContents
+
+class TestVhdlCommentGenerator(unittest.TestCase):
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def test_generator(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+        contents = VhdlFunctionContents()
+        contents.write_body("begin")
+        self.assertIn("test_vhdl_comment_generator.py(", contents.get_contents())
+        self.assertEqual(VhdlCommentGenerator().get_source_comment(source_line="Line 3: ret void"), "-- Line 3: ret void")
+
+    def test_off(self):
+        VhdlCommentGenerator().set_mode(mode="off")
+        contents = VhdlFunctionContents()
+        contents.write_body("begin")
+        self.assertNotIn(".py(", contents.get_contents())
+        self.assertEqual(VhdlCommentGenerator().get_comment(), "--")
+        self.assertEqual(VhdlCommentGenerator().get_source_comment(source_line="Line 3: ret void"), "")
+        self.assertIsNone(InstantiationPoint().frame_info.file_name)
+
+    def test_llvm(self):
+        VhdlCommentGenerator().set_mode(mode="llvm")
+        self.assertEqual(VhdlCommentGenerator().get_comment(), "--")
+        self.assertEqual(VhdlCommentGenerator().get_source_comment(source_line="Line 3: ret void"), "-- Line 3: ret void")
+
+if __name__ == "__main__":
+    unittest.main()
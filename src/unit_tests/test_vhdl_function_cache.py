@@ -0,0 +1,88 @@
+import glob
+import os
+import tempfile
+import unittest
+
+from llvm_parser import LlvmParser
+from vhdl_function_cache import VhdlFunctionCache
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdlgen import VhdlGen
+
+class TestVhdlFunctionCache(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z3addii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %add = add nsw i32 %b, %a
+  ret i32 %add
+}
+
+define dso_local noundef i32 @_Z3subii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %sub = sub nsw i32 %a, %b
+  ret i32 %sub
+}
+"""
+
+    def _generate(self, file_name: str, cache: VhdlFunctionCache, source: str, options: VhdlGeneratorOptions = VhdlGeneratorOptions()) -> str:
+        module = LlvmParser().parse(source.splitlines(keepends=True))
+        self.statistics = VhdlGen().parse(file_name=file_name, module=module, cache=cache, options=options)
+        with open(file_name, "r", encoding="utf-8") as file_handle:
+            return file_handle.read()
+
+    def test_hits_and_misses(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            cache_dir = os.path.join(directory, "cache")
+            first_cache = VhdlFunctionCache(cache_dir=cache_dir)
+            first = self._generate(file_name=file_name, cache=first_cache, source=self._source)
+            self.assertEqual((first_cache.statistics.hits, first_cache.statistics.misses), (0, 2))
+            second_cache = VhdlFunctionCache(cache_dir=cache_dir)
+            second = self._generate(file_name=file_name, cache=second_cache, source=self._source)
+            self.assertEqual((second_cache.statistics.hits, second_cache.statistics.misses), (2, 0))
+            self.assertEqual(first, second)
+            changed_cache = VhdlFunctionCache(cache_dir=cache_dir)
+            changed = self._generate(file_name=file_name, cache=changed_cache, source=self._source.replace("sub nsw i32 %a, %b", "sub nsw i32 %b, %a"))
+            self.assertEqual((changed_cache.statistics.hits, changed_cache.statistics.misses), (1, 1))
+            self.assertNotEqual(first, changed)
+
+    def test_moved_function(self):
+        """
+        A line added above the functions moves their source comments without invalidating them
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            cache_dir = os.path.join(directory, "cache")
+            self._generate(file_name=file_name, cache=VhdlFunctionCache(cache_dir=cache_dir), source=self._source)
+            moved_source = "; moved\n" + self._source
+            moved_cache = VhdlFunctionCache(cache_dir=cache_dir)
+            moved = self._generate(file_name=file_name, cache=moved_cache, source=moved_source)
+            self.assertEqual((moved_cache.statistics.hits, moved_cache.statistics.misses), (2, 0))
+            uncached = self._generate(file_name=file_name, cache=VhdlFunctionCache(cache_dir=os.path.join(directory, "empty")), source=moved_source)
+            self.assertEqual(moved, uncached)
+            self.assertIn("-- Line 5:   %add = add nsw i32 %b, %a", moved)
+
+    def test_pass_statistics(self):
+        """
+        The passes only run for the functions that are not found in the cache
+        """
+        options = VhdlGeneratorOptions(optimization_passes=("cse",))
+        source = self._source.replace("  ret i32 %sub", "  %sub.1 = sub nsw i32 %a, %b\n  %mul = mul nsw i32 %sub, %sub.1\n  ret i32 %mul")
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            cache_dir = os.path.join(directory, "cache")
+            self._generate(file_name=file_name, cache=VhdlFunctionCache(cache_dir=cache_dir), source=source, options=options)
+            self.assertEqual(self.statistics.passes["cse"].removed_instructions, 1)
+            self._generate(file_name=file_name, cache=VhdlFunctionCache(cache_dir=cache_dir), source=source, options=options)
+            self.assertEqual(self.statistics.passes, {})
+
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_dir = os.path.join(directory, "cache")
+            cache = VhdlFunctionCache(cache_dir=cache_dir, max_size=0)
+            self._generate(file_name=os.path.join(directory, "test.vhd"), cache=cache, source=self._source)
+            self.assertEqual(cache.statistics.evictions, 2)
+            self.assertEqual(glob.glob(os.path.join(cache_dir, "*")), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from llvm_parser import LlvmParser
+from vhdl_globals_generator import VhdlGlobalsGenerator
+
+class TestVhdlGlobalsGenerator(unittest.TestCase):
+
+    _source = """
+@__const.main.n = private unnamed_addr constant [3 x i32] [i32 1, i32 2, i32 3], align 4
+
+define dso_local noundef i32 @_Z3addii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %add = add nsw i32 %b, %a
+  ret i32 %add
+}
+
+define dso_local noundef i32 @_Z3subii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %sub = sub nsw i32 %a, %b
+  ret i32 %sub
+}
+"""
+
+    def test_package_name(self):
+        self.assertEqual(VhdlGlobalsGenerator().get_package_name(file_name="/path/fir-test.vhd"), "fir_test_pkg")
+
+    def test_constants_are_written_once(self):
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        module_globals = VhdlGlobalsGenerator().generate(module=module, file_name="/path/fir.vhd")
+        self.assertEqual(module_globals.get_package_use_clause(), "use work.fir_pkg.all;")
+        self.assertIn("package fir_pkg is", module_globals.package)
+        self.assertEqual(module_globals.package.count("constant g_u_uconst_dmain_dn :"), 1)
+        self.assertEqual(module_globals.package.count("constant c_mem_addr_width :"), 1)
+
+if __name__ == "__main__":
+    unittest.main()
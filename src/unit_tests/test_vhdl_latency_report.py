@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+
+from llvm_parser import LlvmParser
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdlgen import VhdlGen
+
+class TestVhdlLatencyReport(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z3addii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %add = add nsw i32 %b, %a
+  ret i32 %add
+}
+
+define dso_local noundef i32 @_Z4add3iii(i32 noundef %a, i32 noundef %b, i32 noundef %c) local_unnamed_addr #0 {
+entry:
+  %mul = mul nsw i32 %b, %a
+  %sub = sub nsw i32 %c, %a
+  %call = call noundef i32 @_Z3addii(i32 noundef %mul, i32 noundef %sub)
+  %add = add nsw i32 %call, %c
+  ret i32 %add
+}
+"""
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def test_report(self):
+        VhdlCommentGenerator().set_mode(mode="off")
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            VhdlGen().parse(file_name=file_name, module=module, report=True)
+            with open(os.path.join(directory, "test_report.json"), "r", encoding="utf-8") as file_handle:
+                report = json.load(file_handle)
+            with open(os.path.join(directory, "test_report.txt"), "r", encoding="utf-8") as file_handle:
+                text = file_handle.read()
+        entities = {i["entity_name"]: i for i in report["entities"]}
+        self.assertEqual(entities["Z3addii"]["pipeline_depth"], 1)
+        self.assertEqual(entities["Z4add3iii"]["number_of_stages"], 3)
+        self.assertEqual(entities["Z4add3iii"]["pipeline_depth"], 3)
+        self.assertEqual(entities["Z4add3iii"]["critical_path"], 3)
+        self.assertEqual(entities["Z4add3iii"]["initiation_interval"], 1)
+        self.assertEqual(entities["Z4add3iii"]["memory_ports"], [])
+        self.assertEqual(text.splitlines()[0].split()[:2], ["Entity", "Depth"])
+
+if __name__ == "__main__":
+    unittest.main()
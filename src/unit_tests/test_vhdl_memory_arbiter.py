@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+
+from llvm_parser import LlvmParser
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdl_memory_arbiter import VhdlMemoryArbiter
+from vhdlgen import VhdlGen
+
+class TestVhdlMemoryArbiter(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z3sumPi(ptr noundef %p) local_unnamed_addr #0 {
+entry:
+  %0 = load i32, ptr %p, align 4
+  %g1 = getelementptr inbounds i32, ptr %p, i64 1
+  %1 = load i32, ptr %g1, align 4
+  %add = add nsw i32 %1, %0
+  ret i32 %add
+}
+
+define dso_local noundef i32 @_Z4mainii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %n = alloca [4 x i32], align 4
+  store i32 %a, ptr %n, align 4
+  %g1 = getelementptr inbounds [4 x i32], ptr %n, i64 0, i64 1
+  store i32 %b, ptr %g1, align 4
+  %call = call noundef i32 @_Z3sumPi(ptr noundef %n)
+  %0 = load i32, ptr %g1, align 4
+  %add = add nsw i32 %call, %0
+  ret i32 %add
+}
+"""
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def _generate(self, options):
+        VhdlCommentGenerator().set_mode(mode="off")
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            VhdlGen().parse(file_name=file_name, module=module, options=options, report=True)
+            with open(file_name, "r", encoding="utf-8") as file_handle:
+                contents = file_handle.read()
+            with open(os.path.join(directory, "test_report.json"), "r", encoding="utf-8") as file_handle:
+                report = json.load(file_handle)
+        return contents, {i["entity_name"]: i for i in report["entities"]}
+
+    def test_generic_map(self):
+        arbiter = VhdlMemoryArbiter(mode="weighted", weights=[3, 1], outstanding=6, registers=1)
+        self.assertEqual(arbiter.get_generic_map(), ["round_robin => true", "weights => (0 => 3, 1 => 1)", "outstanding => 6",
+                                                     "request_registers => 1", "response_registers => 1"])
+        self.assertEqual(arbiter.get_added_latency(), 2)
+
+    def test_priority(self):
+        contents, _ = self._generate(options=VhdlGeneratorOptions())
+        self.assertIn("memory_arbiter_llvm_alloca_1: entity memory.arbiter(rtl)\nport map(", contents)
+
+    def test_weighted(self):
+        contents, _ = self._generate(options=VhdlGeneratorOptions(memory_arbiter="weighted"))
+        self.assertIn("weights => (0 => 1, 1 => 1, 2 => 2, 3 => 1),\noutstanding => 5,\nrequest_registers => 0", contents)
+
+    def test_registers(self):
+        _, unregistered = self._generate(options=VhdlGeneratorOptions(memory_arbiter="round-robin"))
+        contents, registered = self._generate(options=VhdlGeneratorOptions(memory_arbiter="round-robin", arbiter_registers=1))
+        self.assertIn("weights => (0 => 1, 1 => 1, 2 => 1, 3 => 1),\noutstanding => 6,\nrequest_registers => 1", contents)
+        self.assertGreater(registered["Z4mainii"]["pipeline_depth"], unregistered["Z4mainii"]["pipeline_depth"])
+        self.assertEqual(registered["Z4mainii"]["critical_path"], unregistered["Z4mainii"]["critical_path"] + 2 * 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+
+from llvm_parser import LlvmParser
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdlgen import VhdlGen
+
+class TestVhdlMemoryBinding(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z4swapi(i32 noundef %a) local_unnamed_addr #0 {
+entry:
+  %n = alloca [4 x i32], align 4
+  %g1 = getelementptr inbounds [4 x i32], ptr %n, i64 0, i64 1
+  store i32 %a, ptr %g1, align 4
+  %0 = load i32, ptr %n, align 4
+  ret i32 %0
+}
+"""
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def _generate(self, source):
+        VhdlCommentGenerator().set_mode(mode="off")
+        module = LlvmParser().parse(source.splitlines(keepends=True))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            VhdlGen().parse(file_name=file_name, module=module, options=VhdlGeneratorOptions(), report=True)
+            with open(file_name, "r", encoding="utf-8") as file_handle:
+                contents = file_handle.read()
+            with open(os.path.join(directory, "test_report.json"), "r", encoding="utf-8") as file_handle:
+                report = json.load(file_handle)
+        return contents, report["entities"][0]
+
+    def test_dual_port(self):
+        contents, report = self._generate(source=self._source)
+        self.assertNotIn("entity memory.arbiter", contents)
+        self.assertIn("-- Dual port llvm_alloca_1: llvm_load_4 reads, llvm_store_3_llvm_getelementptr_2 writes", contents)
+        self.assertIn("llvm_alloca_1_araddr <= llvm_load_4_araddr;", contents)
+        self.assertIn("llvm_alloca_1_awaddr <= llvm_store_3_llvm_getelementptr_2_awaddr;", contents)
+        self.assertIn("llvm_load_4_bvalid <= '0';", contents)
+        self.assertIn("llvm_store_3_llvm_getelementptr_2_rdata <= (others => '0');", contents)
+        self.assertEqual(report["initiation_interval"], 1)
+
+    def test_arbiter(self):
+        source = self._source.replace("  ret i32 %0", "  %1 = load i32, ptr %g1, align 4\n  %add = add nsw i32 %0, %1\n  ret i32 %add")
+        contents, report = self._generate(source=source)
+        self.assertEqual(contents.count("entity memory.arbiter"), 1)
+        self.assertIn("s_araddr <= llvm_store_3_llvm_getelementptr_2_araddr & llvm_load_4_araddr & llvm_load_5_araddr;", contents)
+        self.assertEqual(report["initiation_interval"], 3)
+
+if __name__ == "__main__":
+    unittest.main()
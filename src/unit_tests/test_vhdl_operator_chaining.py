@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from function_parser import FunctionParser
+from llvm_parser import LlvmParser
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_function_definition import VhdlFunctionDefinitionFactory
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdl_operator_chaining import VhdlOperatorChainingFactory, VhdlOperatorDelayTable
+from vhdlgen import VhdlGen
+
+class TestVhdlOperatorChaining(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z6decodeiii(i32 noundef %a, i32 noundef %b, i32 noundef %c) local_unnamed_addr #0 {
+entry:
+  %and = and i32 %a, 255
+  %shl = shl i32 %and, 2
+  %add = add nsw i32 %shl, %b
+  %mul = mul nsw i32 %add, %c
+  ret i32 %mul
+}
+"""
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def _get_chained_instances(self, clock_period: float, delays=()):
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        function_definition = FunctionParser().parse(function=module.functions.functions[0])
+        vhdl_function = VhdlFunctionDefinitionFactory().get(function_definition=function_definition, globals=module.globals)
+        chaining = VhdlOperatorChainingFactory().get(instances=vhdl_function.instances, clock_period=clock_period, 
+                                                     delay_table=VhdlOperatorDelayTable(delays=delays))
+        return chaining.chained_instances
+
+    def test_chaining(self):
+        self.assertEqual(self._get_chained_instances(clock_period=3.0), {"llvm_and_1", "llvm_shl_2"})
+        self.assertEqual(self._get_chained_instances(clock_period=1.0), set())
+        self.assertEqual(self._get_chained_instances(clock_period=10.0), {"llvm_and_1", "llvm_shl_2", "llvm_add_3"})
+        self.assertEqual(self._get_chained_instances(clock_period=3.0, delays=(("llvm_shl", 2.7),)), set())
+
+    def test_generic_map(self):
+        VhdlCommentGenerator().set_mode(mode="off")
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            VhdlGen().parse(file_name=file_name, module=module, options=VhdlGeneratorOptions(clock_period=3.0))
+            with open(file_name, "r", encoding="utf-8") as file_handle:
+                contents = file_handle.read()
+        self.assertEqual(contents.count("delay => 0"), 2)
+        self.assertIn("llvm_shl_2_inst : entity llvm.llvm_shl\n\ngeneric map (\ndelay => 0\n)", contents)
+
+if __name__ == "__main__":
+    unittest.main()
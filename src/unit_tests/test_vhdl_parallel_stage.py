@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from llvm_parser import LlvmParser
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdlgen import VhdlGen
+
+class TestVhdlParallelStage(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z4dot2iiii(i32 noundef %a, i32 noundef %b, i32 noundef %c, i32 noundef %d) local_unnamed_addr #0 {
+entry:
+  %mul.1 = mul nsw i32 %b, %a
+  %mul.2 = mul nsw i32 %d, %c
+  %add = add nsw i32 %mul.2, %mul.1
+  ret i32 %add
+}
+"""
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def _generate(self) -> str:
+        VhdlCommentGenerator().set_mode(mode="off")
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            VhdlGen().parse(file_name=file_name, module=module)
+            with open(file_name, "r", encoding="utf-8") as file_handle:
+                return file_handle.read()
+
+    def test_fork_and_join(self):
+        contents = self._generate()
+        self.assertIn("s_tready <= llvm_mul_1_s_tready_i and llvm_mul_2_s_tready_i;", contents)
+        self.assertIn("llvm_mul_1_s_tvalid_i <= s_tvalid and llvm_mul_2_s_tready_i;", contents)
+        self.assertIn("stage_1_m_tvalid_i <= llvm_mul_1_m_tvalid_i and llvm_mul_2_m_tvalid_i;", contents)
+        self.assertIn("llvm_mul_2_m_tready_i <= stage_1_m_tready_i and stage_1_m_tvalid_i;", contents)
+        self.assertIn("stage_1_tag_out_i.llvm_mul_2 <= llvm_mul_2_tag_out_i.llvm_mul_2;", contents)
+        self.assertIn("tag_i <= stage_1_tag_out_i;", contents)
+        self.assertIn("s_tvalid => stage_1_m_tvalid_i,", contents)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from typing import List, Tuple
+
+from llvm_parser import LlvmParser
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdlgen import VhdlGen
+
+class TestVhdlPipeline(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z4loadPii(ptr nocapture noundef readonly %p, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %0 = load i32, ptr %p, align 4
+  %add = add nsw i32 %0, %b
+  ret i32 %add
+}
+"""
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def _generate(self, options: VhdlGeneratorOptions) -> Tuple[str, List[str]]:
+        VhdlCommentGenerator().set_mode(mode="off")
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            VhdlGen().parse(file_name=file_name, module=module, options=options)
+            with open(file_name, "r", encoding="utf-8") as file_handle:
+                contents = file_handle.read()
+            with open(os.path.join(directory, "test.inc"), "r", encoding="utf-8") as file_handle:
+                instances = file_handle.read().split()
+        return contents, instances
+
+    def test_skid_buffer_after_load(self):
+        contents, instances = self._generate(options=VhdlGeneratorOptions(pipeline=True))
+        self.assertIn("llvm_load_1_skid_inst : entity llvm.llvm_skid_buffer", contents)
+        self.assertIn("m_tvalid => skid_m_tvalid_i,", contents)
+        self.assertIn("m_tvalid => llvm_load_1_m_tvalid_i,", contents)
+        self.assertIn("m_tag => local_tag_skid_i", contents)
+        self.assertIn("llvm_skid_buffer", instances)
+        self.assertNotIn("llvm_add_2_skid_inst", contents)
+
+    def test_no_skid_buffer_by_default(self):
+        contents, instances = self._generate(options=VhdlGeneratorOptions())
+        self.assertNotIn("skid", contents)
+        self.assertNotIn("llvm_skid_buffer", instances)
+
+if __name__ == "__main__":
+    unittest.main()
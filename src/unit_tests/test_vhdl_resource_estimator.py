@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from vhdl_latency_report import VhdlFunctionReport, VhdlInstanceReport
+from vhdl_resource_estimator import VhdlDeviceProfile, VhdlResourceEstimator
+
+class TestVhdlResourceEstimator(unittest.TestCase):
+
+    def _get_functions(self):
+        callee = VhdlFunctionReport(entity_name="Z3mulii", number_of_stages=1, registered_tag_bits=0, tag_registers=1, 
+                                    memory_ports=[], memory_accesses=0, instances=[
+            VhdlInstanceReport(instance_name="llvm_mul_1", entity_name="llvm_mul", stage=0, latency=1, predecessors=[], 
+                               data_width=32, operand_width=32)])
+        caller = VhdlFunctionReport(entity_name="main", number_of_stages=3, registered_tag_bits=32, tag_registers=2, 
+                                    memory_ports=["llvm_alloca_1"], memory_accesses=0, instances=[
+            VhdlInstanceReport(instance_name="llvm_alloca_1", entity_name="llvm_alloca", stage=0, latency=0, predecessors=[], 
+                               memory_bits=4096*32),
+            VhdlInstanceReport(instance_name="Z3mulii_2", entity_name="Z3mulii", stage=1, latency=0, predecessors=[], 
+                               callee="Z3mulii", data_width=32),
+            VhdlInstanceReport(instance_name="llvm_add_3", entity_name="llvm_add", stage=2, latency=1, predecessors=["Z3mulii_2"], 
+                               data_width=32, operand_width=32, tag_bits=32)])
+        return [callee, caller]
+
+    def test_estimate(self):
+        estimator = VhdlResourceEstimator(functions=self._get_functions(), profile=VhdlDeviceProfile())
+        resources = {i.entity_name: i for i in estimator.get_entity_resources()}
+        self.assertEqual(resources["Z3mulii"].own, {"lut": 12, "ff": 65, "dsp": 4, "bram": 0})
+        self.assertEqual(resources["main"].own["ff"], 32 + 32 + 32 + 1)
+        self.assertEqual(resources["main"].own["bram"], 4)
+        self.assertEqual(resources["main"].total["dsp"], 4)
+        self.assertEqual(resources["main"].total["ff"], 97 + 65)
+
+    def test_device_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "profile.json")
+            with open(file_name, "w", encoding="utf-8") as file_handle:
+                json.dump({"name": "small", "bram_bits": 18432, "operators": {"llvm_mul": {"lut_per_bit": 30.0}}}, file_handle)
+            profile = VhdlDeviceProfile().read_file(file_name=file_name)
+        self.assertEqual(profile.name, "small")
+        self.assertIn("llvm_add", profile.operators)
+        resources = {i.entity_name: i for i in VhdlResourceEstimator(functions=self._get_functions(), profile=profile).get_entity_resources()}
+        self.assertEqual(resources["Z3mulii"].own["dsp"], 0)
+        self.assertEqual(resources["main"].own["bram"], 8)
+
+    def test_benchmark(self):
+        """
+        The estimate is used in design space exploration loops and must be fast
+        """
+        instances = [VhdlInstanceReport(instance_name=f"llvm_add_{i}", entity_name="llvm_add", stage=i, latency=1, 
+                                        predecessors=[], data_width=32, operand_width=32, tag_bits=64) for i in range(20000)]
+        function = VhdlFunctionReport(entity_name="big", number_of_stages=len(instances), registered_tag_bits=0, tag_registers=0, 
+                                      memory_ports=[], memory_accesses=0, instances=instances)
+        start = time.perf_counter()
+        VhdlResourceEstimator(functions=[function], profile=VhdlDeviceProfile()).get_json()
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from function_parser import FunctionParser
+from llvm_parser import LlvmParser
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_function_definition import VhdlFunctionDefinitionFactory
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdl_resource_estimator import VhdlDeviceProfile
+from vhdl_resource_sharing import VhdlResourceSharingFactory
+from vhdlgen import VhdlGen
+
+class TestVhdlResourceSharing(unittest.TestCase):
+
+    _source = """
+define dso_local noundef float @_Z3dotffffii(float noundef %a, float noundef %b, float noundef %c, float noundef %d, i32 noundef %x, i32 noundef %y) local_unnamed_addr #0 {
+entry:
+  %mul = fmul float %a, %b
+  %mul1 = fmul float %c, %d
+  %add = fadd float %mul, %mul1
+  %j = add nsw i32 %x, 1
+  %k = add nsw i32 %j, %y
+  %mul2 = fmul float %add, %a
+  ret float %mul2
+}
+"""
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def _get_instances(self):
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        function_definition = FunctionParser().parse(function=module.functions.functions[0])
+        return VhdlFunctionDefinitionFactory().get(function_definition=function_definition, globals=module.globals).instances
+
+    def test_entity_names(self):
+        factory = VhdlResourceSharingFactory()
+        self.assertEqual(factory.get_entity_names(names=["fmul", "llvm_fadd"]), ("llvm_fmul", "llvm_fadd"))
+        with self.assertRaises(AssertionError):
+            factory.get_entity_names(names=["load"])
+
+    def test_cost_model(self):
+        instances = self._get_instances()
+        operators = VhdlResourceSharingFactory().get(instances=instances, entity_names=("llvm_fmul", "llvm_add"))
+        self.assertEqual([(i.name, [j.instance_name for j in i.clients]) for i in operators],
+                         [("llvm_fmul_share_1", ["llvm_fmul_1", "llvm_fmul_2", "llvm_fmul_6"])])
+        self.assertEqual([i.instance_name for i in instances.instances if i.is_shared()], ["llvm_fmul_1", "llvm_fmul_2", "llvm_fmul_6"])
+        profile = VhdlDeviceProfile(share_dsp_lut=0.0, share_client_lut=200.0)
+        self.assertEqual(VhdlResourceSharingFactory(profile=profile).get(instances=self._get_instances(), entity_names=("llvm_fmul",)), [])
+
+    def test_generate(self):
+        VhdlCommentGenerator().set_mode(mode="off")
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            VhdlGen().parse(file_name=file_name, module=module, options=VhdlGeneratorOptions(share=("llvm_fmul",)),
+                            report=True, device_profile=VhdlDeviceProfile())
+            with open(file_name, "r", encoding="utf-8") as file_handle:
+                contents = file_handle.read()
+            with open(os.path.join(directory, "test.inc"), "r", encoding="utf-8") as file_handle:
+                instances = file_handle.read().split()
+            with open(os.path.join(directory, "test_report.txt"), "r", encoding="utf-8") as file_handle:
+                report = file_handle.read()
+            with open(os.path.join(directory, "test_resources.txt"), "r", encoding="utf-8") as file_handle:
+                resources = file_handle.read()
+        self.assertEqual(contents.count("entity llvm.llvm_fmul"), 1)
+        self.assertEqual(instances.count("llvm_fmul"), 1)
+        self.assertIn("llvm_fmul_share_1_b : block", contents)
+        self.assertIn("  if llvm_fmul_6_share_request_i = '1' then\n    grant_i(2) <= '1';", contents)
+        self.assertIn("m_tdata_i <= llvm_fmul_share_1_m_tdata_i;", contents)
+        self.assertIn("llvm_fmul_1_s_tready_i <= ready_i;", contents)
+        self.assertRegex(report, r"Z3dotffffii\s+\d+\s+\d+\s+3\s")
+        self.assertRegex(resources, r"Z3dotffffii\s+\d+\s+\d+\s+3\s")
+
+if __name__ == "__main__":
+    unittest.main()
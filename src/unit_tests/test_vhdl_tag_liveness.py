@@ -0,0 +1,45 @@
+import os
+import re
+import tempfile
+import unittest
+
+from llvm_parser import LlvmParser
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdlgen import VhdlGen
+
+class TestVhdlTagLiveness(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z6muladdiii(i32 noundef %a, i32 noundef %b, i32 noundef %c) local_unnamed_addr #0 {
+entry:
+  %mul = mul nsw i32 %b, %a
+  %add = add nsw i32 %mul, %c
+  ret i32 %add
+}
+"""
+
+    def tearDown(self):
+        VhdlCommentGenerator().set_mode(mode="generator")
+
+    def _generate(self) -> str:
+        VhdlCommentGenerator().set_mode(mode="off")
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "test.vhd")
+            VhdlGen().parse(file_name=file_name, module=module)
+            with open(file_name, "r", encoding="utf-8") as file_handle:
+                return file_handle.read()
+
+    def _get_stage_widths(self, contents: str) -> dict:
+        pattern = re.compile(r"(\w+)_b : block\s+--\s+constant c_tag_width : natural := ([^;]*);")
+        return dict(pattern.findall(contents))
+
+    def test_stage_tags(self):
+        contents = self._generate()
+        widths = self._get_stage_widths(contents=contents)
+        self.assertEqual(widths, {"llvm_mul_1": "s_tag'length + c'length", "llvm_add_2": "s_tag'length"})
+        self.assertIn("result_v.tag := arg;", contents)
+        self.assertNotIn("result_v.a", contents)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+from llvm_parser import LlvmParser
+from vhdlgen import VhdlGen
+
+class TestVhdlGen(unittest.TestCase):
+
+    _source = """
+define dso_local noundef i32 @_Z3addii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %add = add nsw i32 %b, %a
+  ret i32 %add
+}
+
+define dso_local noundef i32 @_Z3subii(i32 noundef %a, i32 noundef %b) local_unnamed_addr #0 {
+entry:
+  %sub = sub nsw i32 %a, %b
+  ret i32 %sub
+}
+"""
+
+    def _generate(self, directory: str, jobs: int) -> str:
+        module = LlvmParser().parse(self._source.splitlines(keepends=True))
+        os.makedirs(os.path.join(directory, str(jobs)))
+        file_name = os.path.join(directory, str(jobs), "test.vhd")
+        VhdlGen().parse(file_name=file_name, module=module, jobs=jobs)
+        with open(file_name, "r", encoding="utf-8") as file_handle:
+            return file_handle.read()
+
+    def test_parallel_generation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            sequential = self._generate(directory=directory, jobs=1)
+            parallel = self._generate(directory=directory, jobs=2)
+        self.assertEqual(sequential, parallel)
+        self.assertLess(sequential.index("entity Z3addii is"), sequential.index("entity Z3subii is"))
+
+if __name__ == "__main__":
+    unittest.main()
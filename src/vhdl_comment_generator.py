@@ -1,14 +1,36 @@
-
 import inspect
 import os
 from types import FrameType
-from typing import Optional
+from typing import List, Optional
 
 from frame_info import FrameInfoFactory
 
 
 class VhdlCommentGenerator:
+    """
+    The source comment mode is one of:
+        off:       No source location comments
+        generator: The generator file and line that wrote the VHDL and the originating llvm line
+        llvm:      Only the originating llvm line
+    """
+
+    modes: List[str] = ["off", "generator", "llvm"]
+
+    _mode: str = "generator"
+
+    def set_mode(self, mode: str) -> None:
+        assert mode in self.modes, f"Unknown source comment mode {mode}, must be one of {self.modes}"
+        VhdlCommentGenerator._mode = mode
+
+    def get_mode(self) -> str:
+        return self._mode
+
+    def is_generator_enabled(self) -> bool:
+        return self._mode == "generator"
+
     def get_comment(self, current_frame: Optional[FrameType] = None) -> str:
+        if not self.is_generator_enabled():
+            return "--"
         if current_frame is None:
             current_frame = inspect.currentframe()
         frame_info = FrameInfoFactory().get_frame_info(current_frame=current_frame)
@@ -16,4 +38,5 @@ class VhdlCommentGenerator:
         file_name = os.path.basename(frame_info.file_name)
         return f"-- {file_name}({frame_info.line_number}): "
 
-
+    def get_source_comment(self, source_line: str) -> str:
+        return "" if self._mode == "off" else f"-- {source_line}"
@@ -0,0 +1,200 @@
+from dataclasses import dataclass, replace
+import glob
+import hashlib
+import os
+import pickle
+import re
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+from llvm_call_policy import LlvmCallPolicy
+from llvm_function import LlvmFunction
+from llvm_module import LlvmModule
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_function_contents import VhdlFunctionContents
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdl_globals_generator import VhdlModuleGlobals
+
+@dataclass
+class VhdlFunctionCacheStatistics:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    def get_summary(self) -> str:
+        return f"Function cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+
+@dataclass
+class VhdlCachedFunction:
+    """
+    A cache entry. first_line is the line number of the define line of the function when it was generated
+    """
+    contents: VhdlFunctionContents
+    first_line: int
+
+class VhdlFunctionCache:
+    """
+    Persistent cache of the generated VHDL of each function.
+    The key is a hash of:
+        - the normalized llvm text of the function (see LlvmFunctionDigest), and the line numbers relative
+          to the define line when the llvm lines are written to the VHDL
+        - the llvm text of the globals and the define lines of the functions it references, and the text hashes
+          of the functions it references directly or indirectly when calls can be inlined or the memory arbiters
+          are weighted by the accesses of the called functions
+        - the module globals package and variables
+        - the source comment mode
+        - the generator options
+        - the generator version, which is a hash of the generator source files
+    Each entry is a pickled VhdlCachedFunction in <cache_dir>/<key>.pickle.
+    The key does not depend on where the function is in the file, so an edit above a function does not invalidate it.
+    The "-- Line N:" source comments of an entry are moved to the current position of the function when it is read.
+    The optimization pass statistics are not cached, because the passes do not run for a cached function.
+    The least recently used entries are removed when the cache is larger than max_size bytes.
+    """
+
+    _file_extension = ".pickle"
+
+    _generator_version: Optional[str] = None
+
+    _source_comment_pattern: Pattern = re.compile(r"^-- Line (\d+): ", re.MULTILINE)
+
+    def __init__(self, cache_dir: str, max_size: int = 256*1024*1024) -> None:
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self.statistics = VhdlFunctionCacheStatistics()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_generator_version(self) -> str:
+        if VhdlFunctionCache._generator_version is None:
+            generator_hash = hashlib.sha256()
+            source_files = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py")))
+            for i in source_files:
+                with open(i, "rb") as file_handle:
+                    generator_hash.update(file_handle.read())
+            VhdlFunctionCache._generator_version = generator_hash.hexdigest()
+        return VhdlFunctionCache._generator_version
+
+    def _get_reference_text(self, module: LlvmModule, functions: Dict[str, LlvmFunction], name: str) -> str:
+        declaration = module.globals.get_named_declaration(name=name)
+        if declaration is not None:
+            return declaration.instruction.line.strip()
+        function = functions.get(name)
+        if function is not None and function.digest.definition:
+            return function.digest.definition
+        return name
+
+    def _is_callee_dependent(self, options: VhdlGeneratorOptions) -> bool:
+        """
+        Inlined calls and the weights of the weighted memory arbiter depend on the text of the called functions
+        """
+        return LlvmCallPolicy(items=options.call_policy).has_policy(policy="inline") or options.memory_arbiter == "weighted"
+
+    def _get_inlined_text(self, functions: Dict[str, LlvmFunction], function: LlvmFunction, options: VhdlGeneratorOptions) -> List[str]:
+        if not self._is_callee_dependent(options=options):
+            return []
+        return self._get_callee_text(functions=functions, function=function)
+
+    def _get_callee_text(self, functions: Dict[str, LlvmFunction], function: LlvmFunction) -> List[str]:
+        """
+        Returns the text hashes of the functions that are called directly or indirectly
+        """
+        text: List[str] = []
+        visited: Set[str] = set()
+        names = list(function.digest.references)
+        while names:
+            name = names.pop(0)
+            callee = functions.get(name)
+            if callee is None or name in visited:
+                continue
+            visited.add(name)
+            text.append(callee.digest.text_hash)
+            names.extend(callee.digest.references)
+        return text
+
+    def _get_key(self, module: LlvmModule, functions: Dict[str, LlvmFunction], function: LlvmFunction, module_globals: VhdlModuleGlobals, 
+                 options: VhdlGeneratorOptions) -> str:
+        mode = VhdlCommentGenerator().get_mode()
+        digest = function.digest
+        function_text = [digest.text_hash] + ([digest.line_hash] if mode != "off" else [])
+        references = [self._get_reference_text(module=module, functions=functions, name=i) for i in digest.references]
+        inlined = self._get_inlined_text(functions=functions, function=function, options=options)
+        key_hash = hashlib.sha256()
+        for i in [self._get_generator_version(), mode, options.get_key(), module_globals.package_name, module_globals.variables] + function_text + references + inlined:
+            key_hash.update(i.encode("utf-8"))
+            key_hash.update(b"\n")
+        return key_hash.hexdigest()
+
+    def get_keys(self, module: LlvmModule, module_globals: VhdlModuleGlobals, options: VhdlGeneratorOptions = VhdlGeneratorOptions()) -> List[str]:
+        functions = module.functions.get_function_dictionary()
+        return [self._get_key(module=module, functions=functions, function=i, module_globals=module_globals, options=options) 
+                for i in module.functions.functions]
+
+    def _get_file_name(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}{self._file_extension}")
+
+    def _move_source_comments(self, text: List[str], offset: int) -> List[str]:
+        return [self._source_comment_pattern.sub(lambda x: f"-- Line {int(x.group(1)) + offset}: ", i) for i in text]
+
+    def _move_function(self, entry: VhdlCachedFunction, first_line: int) -> VhdlFunctionContents:
+        contents = entry.contents
+        offset = first_line - entry.first_line
+        if offset == 0:
+            return contents
+        return replace(contents, header=self._move_source_comments(text=contents.header, offset=offset),
+                       body=self._move_source_comments(text=contents.body, offset=offset),
+                       trailer=self._move_source_comments(text=contents.trailer, offset=offset))
+
+    def get(self, key: str, first_line: int = 0) -> Optional[VhdlFunctionContents]:
+        """
+        first_line is the line number of the define line of the function in the current file
+        """
+        file_name = self._get_file_name(key=key)
+        try:
+            with open(file_name, "rb") as file_handle:
+                entry = pickle.load(file_handle)
+            os.utime(file_name)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            entry = None
+        if not isinstance(entry, VhdlCachedFunction):
+            self.statistics.misses += 1
+            return None
+        self.statistics.hits += 1
+        return self._move_function(entry=entry, first_line=first_line)
+
+    def put(self, key: str, contents: VhdlFunctionContents, first_line: int = 0) -> None:
+        """
+        The entry is written to a temporary file first so that an interrupted run never leaves a partial entry
+        """
+        file_name = self._get_file_name(key=key)
+        temporary_file_name = f"{file_name}.{os.getpid()}.tmp"
+        with open(temporary_file_name, "wb") as file_handle:
+            entry = VhdlCachedFunction(contents=replace(contents, pass_statistics=[]), first_line=first_line)
+            pickle.dump(entry, file_handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file_name, file_name)
+
+    def _get_entries(self) -> List[Tuple[os.stat_result, str]]:
+        entries = []
+        for i in glob.glob(os.path.join(self._cache_dir, f"*{self._file_extension}")):
+            try:
+                entries.append((os.stat(i), i))
+            except OSError:
+                continue
+        return entries
+
+    def _remove(self, file_name: str) -> bool:
+        """
+        Returns False when the entry was already removed, for example by another process
+        """
+        try:
+            os.remove(file_name)
+        except OSError:
+            return False
+        return True
+
+    def evict(self) -> None:
+        entries = self._get_entries()
+        total_size = sum(stat.st_size for stat, _ in entries)
+        for stat, file_name in sorted(entries, key=lambda entry: entry[0].st_mtime):
+            if total_size <= self._max_size:
+                break
+            if self._remove(file_name=file_name):
+                total_size -= stat.st_size
+                self.statistics.evictions += 1
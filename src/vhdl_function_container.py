@@ -3,7 +3,7 @@
 
 from dataclasses import dataclass, field
 import inspect
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from vhdl_comment_generator import VhdlCommentGenerator
 from llvm_constant import DeclarationBase
 from llvm_function import LlvmFunction, LlvmFunctionContainer
@@ -12,6 +12,11 @@ from ports import PortContainer
 from vhdl_declarations import VhdlDeclarations, VhdlSignal
 from vhdl_entity import VhdlEntity
 from vhdl_include_libraries import VhdlIncludeLibraries
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdl_memory_arbiter import VhdlMemoryArbiter
+from vhdl_memory_binding import VhdlMemoryBinding
+from vhdl_operator_chaining import VhdlOperatorChaining
+from vhdl_tag_liveness import VhdlTagLiveness
 
 @dataclass
 class FileWriterConstant:
@@ -64,13 +69,20 @@ end architecture rtl;
         assert function is not None, f'Could not find function reference {reference_name} among the following functions {function_names} in "{instruction}" instantiated at {instantiation_point}'
         return function.get_ports()
        
-    def write_reference(self) -> str:
-        comment = VhdlCommentGenerator().get_comment()
+    def get_alias(self) -> Tuple[str, str]:
+        """
+        Returns the entity name of the reference and the entity name that it references
+        """
         vhdl_entity = VhdlEntity()
         name = vhdl_entity.get_entity_name(self.reference.get_name())
         reference = self.reference.get_reference()
         assert reference is not None
-        entity_reference = vhdl_entity.get_entity_name(name=reference)
+        return name, vhdl_entity.get_entity_name(name=reference)
+
+    def write_reference(self) -> str:
+        comment = VhdlCommentGenerator().get_comment()
+        vhdl_entity = VhdlEntity()
+        name, entity_reference = self.get_alias()
         ports: PortContainer = self._get_ports(reference=self.reference)
         entity = vhdl_entity.get_entity(entity_name=name, ports=ports)
         port_map = self._get_port_map(ports=ports)
@@ -106,14 +118,20 @@ class InstanceSignals:
             result += "\n".join(f"signal {instance_signal};" for instance_signal in i.signals)
         return result
     def add(self, signals: List[str]) -> None:
-        comment = VhdlCommentGenerator().get_comment(current_frame=inspect.currentframe())
+        comment_generator = VhdlCommentGenerator()
+        comment = "--"
+        if comment_generator.is_generator_enabled():
+            comment = comment_generator.get_comment(current_frame=inspect.currentframe())
         self.signals.append(Signals(comment=comment, signals=signals))
 
 @dataclass
 class VhdlFunctionContainer:
     signals : List[VhdlSignal] = field(default_factory=list)
     instance_signals: InstanceSignals = field(default_factory=lambda : InstanceSignals())
-    constants : List[FileWriterConstant] = field(default_factory=list)
-    references: List[FileWriterReference] = field(default_factory=list)
-    variables: List[FileWriterVariable] = field(default_factory=list)
     ports: PortContainer = field(default_factory=lambda : PortContainer())
+    tag_liveness: VhdlTagLiveness = field(default_factory=lambda : VhdlTagLiveness(stage_tags={}))
+    options: VhdlGeneratorOptions = field(default_factory=lambda : VhdlGeneratorOptions())
+    operator_chaining: VhdlOperatorChaining = field(default_factory=lambda : VhdlOperatorChaining())
+    memory_binding: VhdlMemoryBinding = field(default_factory=lambda : VhdlMemoryBinding())
+    memory_arbiters: Dict[str, VhdlMemoryArbiter] = field(default_factory=dict)
+    memory_access_counts: Dict[str, int] = field(default_factory=dict)
@@ -5,7 +5,9 @@ import io
 from types import FrameType
 from typing import List, Optional
 
+from llvm_optimizer import LlvmPassStatistics
 from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_latency_report import VhdlFunctionReport
 
 
 @dataclass
@@ -14,6 +16,8 @@ class VhdlFunctionContents:
     body : List[str]  =  field(default_factory=list)
     trailer : List[str]  =  field(default_factory=list)
     instances : List[str]  =  field(default_factory=list)
+    report : Optional[VhdlFunctionReport] = None
+    pass_statistics : List[LlvmPassStatistics] = field(default_factory=list)
     
     def _get_comment(self, current_frame: Optional[FrameType] = None) -> str:
         return VhdlCommentGenerator().get_comment(current_frame=current_frame)
@@ -25,18 +29,24 @@ class VhdlFunctionContents:
         return contents
     
     def _append(self, contents: List[str], current_frame: Optional[FrameType], content: str) -> None:
+        if current_frame is None:
+            contents.append(f"\n{content}")
+            return
         comment = self._get_comment(current_frame=current_frame)
         contents.append(f"{comment}\n{content}")
 
     def write_body(self, *args, **kwargs) -> None:
         content = self._print_to_string(*args, **kwargs)
-        self._append(contents=self.body, current_frame=inspect.currentframe(), content=content)
+        current_frame = inspect.currentframe() if VhdlCommentGenerator().is_generator_enabled() else None
+        self._append(contents=self.body, current_frame=current_frame, content=content)
     def write_header(self, *args, **kwargs) -> None:
         content = self._print_to_string(*args, **kwargs)
-        self._append(contents=self.header, current_frame=inspect.currentframe(), content=content)
+        current_frame = inspect.currentframe() if VhdlCommentGenerator().is_generator_enabled() else None
+        self._append(contents=self.header, current_frame=current_frame, content=content)
     def write_trailer(self, *args, **kwargs) -> None:
         content = self._print_to_string(*args, **kwargs)
-        self._append(contents=self.trailer, current_frame=inspect.currentframe(), content=content)
+        current_frame = inspect.currentframe() if VhdlCommentGenerator().is_generator_enabled() else None
+        self._append(contents=self.trailer, current_frame=current_frame, content=content)
     def append_instance(self, name: str) -> None:
         self.instances.append(name)
 
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+@dataclass(frozen=True)
+class VhdlGeneratorOptions:
+    """
+    Options that change the generated VHDL of a function.
+        pipeline: A new call can enter every clock cycle.
+                  Skid buffers are inserted after the instances with a variable latency
+                  so that back-pressure never drops a token.
+        clock_period: Target clock period in ns. Consecutive operators are chained without a register
+                      as long as their estimated delay fits in the clock period. None disables chaining.
+        operator_delays: Entity names and delays in ns that replace the values of the default delay table.
+        narrow_widths: The results and tag items of integer instructions get the width of their value range
+                       instead of the width of their type (see LlvmValueRangeAnalysis).
+        optimization_passes: The names of the passes that are run over the instructions before the instances
+                             are generated, in the given order (see LlvmOptimizer).
+        share: The entity names of the operators that are shared by the instances of a function
+               when the cost model says that it pays off (see VhdlResourceSharingFactory).
+        call_policy: Called function names, or * for all functions, and how their calls are implemented,
+                     duplicate, share or inline (see LlvmCallPolicy).
+        memory_partitioning: The scheme that splits the array allocas into memory_banks banks, auto, cyclic, block
+                             or complete. None keeps every array in one memory (see LlvmMemoryPartitioner).
+        memory_arbiter: The arbitration of the memories with more than one accessor, round-robin or weighted.
+                        None uses the fixed priority arbiter (see VhdlMemoryArbiterFactory).
+        arbiter_registers: The register slices on each channel of an arbiter, None sizes them from the number of accessors.
+        reorder_memory: The loads and stores of allocas and pointer arguments are scheduled after the last access
+                        they conflict with instead of after all previous memory accesses (see InstanceContainer).
+    """
+    pipeline: bool = False
+    clock_period: Optional[float] = None
+    operator_delays: Tuple[Tuple[str, float], ...] = ()
+    narrow_widths: bool = False
+    optimization_passes: Tuple[str, ...] = ()
+    share: Tuple[str, ...] = ()
+    call_policy: Tuple[Tuple[str, str], ...] = ()
+    memory_partitioning: Optional[str] = None
+    memory_banks: int = 4
+    memory_arbiter: Optional[str] = None
+    arbiter_registers: Optional[int] = None
+    reorder_memory: bool = False
+
+    def get_key(self) -> str:
+        return repr(self)
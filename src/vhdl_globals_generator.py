@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+import os
+import re
+from typing import Dict, List
+
+from file_writer_interface import FileWriterInterface
+from llvm_constant import DeclarationBase
+from llvm_function import LlvmFunctionContainer
+from llvm_module import LlvmModule
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_function_container import FileWriterConstant, FileWriterReference, FileWriterVariable
+from vhdl_include_libraries import VhdlIncludeLibraries
+
+@dataclass
+class VhdlModuleGlobals:
+    """
+    The VHDL derived from the module globals. It is generated once per module and shared by all functions.
+    """
+    package_name: str
+    package: str
+    references: str
+    variables: str
+    aliases: Dict[str, str] = field(default_factory=dict)
+    def get_package_use_clause(self) -> str:
+        return f"use work.{self.package_name}.all;"
+
+@dataclass
+class VhdlGlobalsGenerator(FileWriterInterface):
+
+    constants: List[FileWriterConstant] = field(default_factory=list)
+    references: List[FileWriterReference] = field(default_factory=list)
+    variables: List[FileWriterVariable] = field(default_factory=list)
+
+    _default_constants = [("c_mem_addr_width", 32), ("c_mem_data_width", 32), ("c_mem_id_width", 8)]
+
+    def write_constant(self, constant: DeclarationBase):
+        self.constants.append(FileWriterConstant(constant=constant))
+
+    def write_reference(self, reference: DeclarationBase, functions: LlvmFunctionContainer):
+        self.references.append(FileWriterReference(reference=reference, functions=functions))
+
+    def write_variable(self, variable: DeclarationBase):
+        self.variables.append(FileWriterVariable(variable=variable))
+
+    def get_package_name(self, file_name: str) -> str:
+        """
+        file_name = "/path/fir.vhd" -> "fir_pkg"
+        """
+        base_name = os.path.splitext(os.path.basename(file_name))[0]
+        return re.sub(r"\W", "_", base_name).strip("_") + "_pkg"
+
+    def _get_package(self, package_name: str) -> str:
+        comment = VhdlCommentGenerator().get_comment()
+        default_constants = "\n".join(f"constant {name} : positive := {width};" for name, width in self._default_constants)
+        constants = "\n".join(i.write_constant() for i in self.constants)
+        return f"""{comment} Module globals
+{VhdlIncludeLibraries().get()}
+package {package_name} is
+
+{default_constants}
+{constants}
+
+end package {package_name};
+"""
+
+    def generate(self, module: LlvmModule, file_name: str) -> VhdlModuleGlobals:
+        module.write_globals(file_writer=self)
+        package_name = self.get_package_name(file_name=file_name)
+        package = self._get_package(package_name=package_name)
+        references = "".join(i.write_reference() for i in self.references)
+        variables = "".join(i.write_variable() for i in self.variables)
+        aliases = dict(i.get_alias() for i in self.references)
+        return VhdlModuleGlobals(package_name=package_name, package=package,
+                                 references=references, variables=variables, aliases=aliases)
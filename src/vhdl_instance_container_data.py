@@ -1,17 +1,50 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 from instance_container_data import InstanceContainerData
+from instance_data import InstanceStageData
 from llvm_globals_container import GlobalsContainer
 from vhdl_instance_data import VhdlInstanceData, VhdlInstanceDataFactory
+from vhdl_instance_name import VhdlInstanceName
+
+@dataclass
+class VhdlInstanceStageData:
+    stage_name: str
+    instance_names: List[str]
+    tag_name: str
+    previous_stage_name: Optional[str]
+    def is_parallel(self) -> bool:
+        return len(self.instance_names) > 1
+    def get_previous_signal_name(self, signal_name: str, port_name: str) -> str:
+        """
+        port_name is the function port used when this is the first stage
+        """
+        return port_name if self.previous_stage_name is None else f"{self.previous_stage_name}_{signal_name}_i"
+    def get_own_signal_name(self, signal_name: str) -> str:
+        return f"{self.stage_name}_{signal_name}_i"
+
+class VhdlInstanceStageDataFactory:
+
+    def _get_name(self, name: Optional[str]) -> Optional[str]:
+        return None if name is None else VhdlInstanceName(name=name).get_entity_name()
+
+    def get(self, stage: InstanceStageData) -> VhdlInstanceStageData:
+        return VhdlInstanceStageData(stage_name=VhdlInstanceName(name=stage.stage_name).get_entity_name(),
+                                     instance_names=[VhdlInstanceName(name=i).get_entity_name() for i in stage.instance_names],
+                                     tag_name=VhdlInstanceName(name=stage.tag_name).get_entity_name(),
+                                     previous_stage_name=self._get_name(name=stage.previous_stage_name))
 
 @dataclass
 class VhdlInstanceContainerData:
     instances: List[VhdlInstanceData]
+    stages: List[VhdlInstanceStageData] = field(default_factory=list)
 
     def get_return_instruction_driver(self) -> str:
         return self.instances[-1].instance_name
 
+    def get_last_stage_name(self) -> str:
+        return self.stages[-1].stage_name if self.stages else self.get_return_instruction_driver()
+
     def _flatten(self, xss: List[List[str]]) -> List[str]:
         return [x for xs in xss for x in xs]
 
@@ -26,4 +59,5 @@ class VhdlInstanceContainerDataFactory:
 
     def get(self, instance_container: InstanceContainerData, globals: GlobalsContainer) -> VhdlInstanceContainerData:
         instances = [VhdlInstanceDataFactory().get(instance_data=i, globals=globals) for i in instance_container.instances]
-        return VhdlInstanceContainerData(instances=instances)
+        stages = [VhdlInstanceStageDataFactory().get(stage=i) for i in instance_container.stages]
+        return VhdlInstanceContainerData(instances=instances, stages=stages)
@@ -23,6 +23,8 @@ class VhdlInstanceData:
     previous_instance_name: Optional[str]
     memory_interface: Optional[MemoryInterface]
     instruction: LlvmInstruction
+    parallel: bool = False
+    shared_operator: Optional[str] = None
     def _get_signal_name(self, instance_name: str, signal_name: str) -> str:
         return f"{instance_name}_{signal_name}_i"
     def get_previous_instance_signal_name(self, signal_name: str) -> Optional[str]:
@@ -51,6 +53,8 @@ class VhdlInstanceData:
         return self._remove_none_elements(elements=result)
     def is_work_library(self) -> bool:
         return self.library == "work"
+    def has_variable_latency(self) -> bool:
+        return self.is_work_library() or len(self.get_memory_instance_names()) > 0
     def get_output_port_type(self) -> str:
         assert self.output_port is not None, \
             f"Instance {self.instance_name} output port is not defined"
@@ -61,6 +65,8 @@ class VhdlInstanceData:
         return any(i.access_register() for i in self.input_ports)
     def get_input_port_names(self) -> List[str]:
         return [i.get_name() for i in self.input_ports]
+    def is_shared(self) -> bool:
+        return self.shared_operator is not None
 
 @dataclass
 class VhdlDeclarationData:
@@ -102,5 +108,6 @@ class VhdlInstanceDataFactory:
         input_ports=input_ports,
         previous_instance_name=previous_instance_name,
         memory_interface=instance_data.memory_interface,
-        instruction=instance_data.instruction
+        instruction=instance_data.instruction,
+        parallel=instance_data.parallel
         )
\ No newline at end of file
@@ -1,10 +1,17 @@
 
+from llvm_call_policy import LlvmCallPolicy
 from vhdl_comment_generator import VhdlCommentGenerator
 from ports import PortContainer
 from vhdl_function_container import VhdlFunctionContainer
 from vhdl_function_contents import VhdlFunctionContents
 from vhdl_instance_container_data import VhdlInstanceContainerData
 from vhdl_instantiation_groups import VhdlInstantiationGroupWriter
+from vhdl_memory_arbiter import VhdlMemoryArbiterFactory
+from vhdl_memory_binding import VhdlMemoryBindingFactory
+from vhdl_operator_chaining import VhdlOperatorChainingFactory, VhdlOperatorDelayTable
+from vhdl_parallel_stage import VhdlParallelStageWriter
+from vhdl_resource_sharing import VhdlResourceSharingFactory, VhdlSharedOperatorWriter
+from vhdl_tag_liveness import VhdlTagLivenessFactory
 
 class VhdlInstanceWriter:
 
@@ -17,16 +24,27 @@ class VhdlInstanceWriter:
 
     def _write_output_tag_assignment(self, instances: VhdlInstanceContainerData, function_contents: VhdlFunctionContents) -> None:
         return_driver = instances.get_return_instruction_driver()
+        last_stage = instances.get_last_stage_name()
         comment = VhdlCommentGenerator().get_comment() 
         function_contents.write_body(f"""
 {comment}
-m_tvalid <= {return_driver}_m_tvalid_i;
-{return_driver}_m_tready_i <= m_tready;
+m_tvalid <= {last_stage}_m_tvalid_i;
+{last_stage}_m_tready_i <= m_tready;
 m_tdata <= conv_std_ulogic_vector(tag_out_i.{return_driver}, m_tdata'length);
 m_tag <= tag_out_i.tag;
         """)
 
     def write_instances(self, instances: VhdlInstanceContainerData, ports: PortContainer, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
         self._write_input_tag_assignment(ports=ports, function_contents=function_contents)
+        container.tag_liveness = VhdlTagLivenessFactory().get(instances=instances, ports=ports, signals=container.signals)
+        container.memory_binding = VhdlMemoryBindingFactory().get(instances=instances, memory_port_names=ports.get_memory_port_names())
+        container.memory_arbiters = VhdlMemoryArbiterFactory().get(instances=instances, binding=container.memory_binding, mode=container.options.memory_arbiter,
+                                                                   registers=container.options.arbiter_registers, access_counts=container.memory_access_counts)
+        delay_table = VhdlOperatorDelayTable(delays=container.options.operator_delays)
+        shared_operators = VhdlResourceSharingFactory().get(instances=instances, entity_names=container.options.share, 
+                                                            call_policy=LlvmCallPolicy(items=container.options.call_policy))
+        container.operator_chaining = VhdlOperatorChainingFactory().get(instances=instances, clock_period=container.options.clock_period, delay_table=delay_table)
         VhdlInstantiationGroupWriter().write_instances(instances=instances.instances, function_contents=function_contents, container=container)
+        VhdlSharedOperatorWriter().write_operators(operators=shared_operators, function_contents=function_contents, container=container)
+        VhdlParallelStageWriter().write_stages(stages=instances.stages, function_contents=function_contents, container=container)
         self._write_output_tag_assignment(instances=instances, function_contents=function_contents)
@@ -51,6 +51,9 @@ class VhdlInstanceGroup(VhdlInstantiationGroupBase):
 
     _local_tag_in: str = "local_tag_in_i"
     _local_tag_out: str = "local_tag_out_i"   
+    _local_tag_skid: str = "local_tag_skid_i"
+    _skid_prefix: str = "skid_"
+    _skid_tdata: str = "m_tdata_skid_i"
    
     def append(self, instance: VhdlInstanceData) -> bool:
         return False
@@ -61,7 +64,8 @@ class VhdlInstanceGroup(VhdlInstantiationGroupBase):
     def _write_input_port_signal_assignments(self, instance: VhdlInstanceData, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
         vhdl_port = VhdlPortGenerator()
         input_ports_signal_assignment = [vhdl_port.get_port_signal_assignment(input_port=i, ports=container.ports, signals=container.signals) for i in instance.input_ports]
-        for i in input_ports_signal_assignment:
+        # An operand that is used more than once, e.g. mul %x, %x, is assigned once
+        for i in dict.fromkeys(input_ports_signal_assignment):
             function_contents.write_body(i)
                 
     def _write_instance_signal_assignments(self, instance: VhdlInstanceData, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
@@ -72,8 +76,9 @@ class VhdlInstanceGroup(VhdlInstantiationGroupBase):
 
     def _write_entity_instance(self, function_contents: VhdlFunctionContents, source_line: str, 
                                instance_name: str, library: str, entity: str, generic_map: str, port_map: str) -> None:
+        source_comment = VhdlCommentGenerator().get_source_comment(source_line=source_line)
         function_contents.write_body(f"""
--- {source_line}
+{source_comment}
 {instance_name}_inst : entity {library}.{entity}
 {generic_map}
 port map (
@@ -108,20 +113,31 @@ port map (
         input_ports_map = [self._get_input_port_map(input_port=i, instance=instance, container=container) for i in instance.input_ports]
         return self._flatten(input_ports_map)
  
+    def _has_skid_buffer(self, instance: VhdlInstanceData, container: VhdlFunctionContainer) -> bool:
+        """
+        In pipeline mode the loads, stores and calls have a variable latency and drive their outputs through a skid buffer
+        """
+        return container.options.pipeline and instance.has_variable_latency()
+
     def _get_component_instantiation_port_map(self, instance: VhdlInstanceData, container: VhdlFunctionContainer) -> str:
         vhdl_port = VhdlPortGenerator()
+        skid_buffer = self._has_skid_buffer(instance=instance, container=container)
+        tdata = self._skid_tdata if skid_buffer else "m_tdata_i"
+        master_signal_prefix = self._skid_prefix if skid_buffer else None
+        local_tag_out = self._local_tag_skid if skid_buffer else self._local_tag_out
         input_ports_map = ["-- Input ports"] + self._get_input_port_maps(instance=instance, container=container)
-        output_port_map = ["-- Output ports"] + vhdl_port.get_output_port_map(output_port=instance.output_port)
+        output_port_map = ["-- Output ports"] + vhdl_port.get_output_port_map(output_port=instance.output_port, signal_name=tdata)
         memory_port_map = ["-- Memory ports"] + self._get_component_instantiation_memory_port_map(instance=instance, container=container)
-        standard_port_map =  ["-- Standard port map"] + vhdl_port.get_standard_ports_map(instance=instance)
-        tag_port_map = ["-- Tag port map"] + [f"s_tag => {self._local_tag_in}", f"m_tag => {self._local_tag_out}"]
+        standard_port_map =  ["-- Standard port map"] + vhdl_port.get_standard_ports_map(instance=instance, master_signal_prefix=master_signal_prefix)
+        tag_port_map = ["-- Tag port map"] + [f"s_tag => {self._local_tag_in}", f"m_tag => {local_tag_out}"]
         ports = input_ports_map + output_port_map + memory_port_map + standard_port_map + tag_port_map
         return ",\n".join(ports)
 
-    def _get_component_instantiation_generic_map(self, instance: VhdlInstanceData) -> str:
-        if instance.generic_map is None:
+    def _get_component_instantiation_generic_map(self, instance: VhdlInstanceData, container: VhdlFunctionContainer) -> str:
+        instance_generic_map = container.operator_chaining.get_generic_map(instance=instance)
+        if instance_generic_map is None:
             return ""
-        generic_map = ", ".join(instance.generic_map)
+        generic_map = ", ".join(instance_generic_map)
         return f"""
 generic map (
 {generic_map}
@@ -132,13 +148,35 @@ generic map (
     def _write_component_instantiation(self, instance: VhdlInstanceData, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
         instance_name = instance.instance_name
         entity_name = instance.entity_name
-        generic_map = self._get_component_instantiation_generic_map(instance=instance)
+        generic_map = self._get_component_instantiation_generic_map(instance=instance, container=container)
         port_map = self._get_component_instantiation_port_map(instance=instance, container=container)
         source_line = instance.get_source_line()
         self._write_entity_instance(function_contents=function_contents, source_line=source_line, 
                                     instance_name=instance_name, library=instance.library, entity=entity_name, 
                                     generic_map=generic_map, port_map=port_map)
 
+    def _write_skid_buffer(self, instance: VhdlInstanceData, function_contents: VhdlFunctionContents) -> None:
+        m_tvalid = instance.get_own_instance_signal_name("m_tvalid")
+        m_tready = instance.get_own_instance_signal_name("m_tready")
+        comment = VhdlCommentGenerator().get_comment() 
+        function_contents.write_body(f"""
+{comment}
+{instance.instance_name}_skid_inst : entity llvm.llvm_skid_buffer
+port map (
+clk => clk,
+sreset => sreset,
+s_tvalid => {self._skid_prefix}m_tvalid_i,
+s_tready => {self._skid_prefix}m_tready_i,
+s_tdata => {self._skid_tdata},
+s_tag => {self._local_tag_skid},
+m_tvalid => {m_tvalid},
+m_tready => {m_tready},
+m_tdata => m_tdata_i,
+m_tag => {self._local_tag_out}
+);
+
+        """)
+
     def _write_component_output_signal_assignment(self, instance: VhdlInstanceData, function_contents: VhdlFunctionContents) -> None:
         comment = VhdlCommentGenerator().get_comment() 
         function_contents.write_body(f"""
@@ -155,29 +193,129 @@ end process;
         function_contents.write_body("begin")
         self._write_instance_signal_assignments(instance=instance, function_contents=function_contents, container=container)
         self._write_component_instantiation(instance=instance, function_contents=function_contents, container=container)
+        if self._has_skid_buffer(instance=instance, container=container):
+            self._write_skid_buffer(instance=instance, function_contents=function_contents)
         self._write_component_output_signal_assignment(instance=instance, function_contents=function_contents)
         function_contents.write_body(f"end block {block_name};")
  
-    def _write_instance_signals(self, instance: VhdlInstanceData, function_contents: VhdlFunctionContents) -> None:
+    def _write_instance_signals(self, instance: VhdlInstanceData, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
         vhdl_port = VhdlPortGenerator()
         input_ports_signals = [vhdl_port.get_port_signal(input_port=i) for i in instance.input_ports]
+        stage_tag = container.tag_liveness.get_stage_tag(instance_name=instance.instance_name)
+        function_contents.write_body(stage_tag.get_declarations())
         function_contents.write_body(self._get_comment())
         function_contents.write_body("signal tag_i : tag_t;")
         tag_signals = f"{self._local_tag_in}, {self._local_tag_out}"
         tag_type = "std_ulogic_vector(0 to c_tag_width - 1)"
         function_contents.write_body(f"signal {tag_signals} : {tag_type};")
-        for i in input_ports_signals:
+        for i in dict.fromkeys(input_ports_signals):
             function_contents.write_body(i)
         function_contents.write_body(f"signal m_tdata_i : {instance.get_output_port_type()};")
+        if self._has_skid_buffer(instance=instance, container=container):
+            function_contents.write_body(f"signal {self._skid_prefix}m_tvalid_i, {self._skid_prefix}m_tready_i : std_ulogic;")
+            function_contents.write_body(f"signal {self._local_tag_skid} : {tag_type};")
+            function_contents.write_body(f"signal {self._skid_tdata} : {instance.get_output_port_type()};")
 
     def write_instances(self, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
         if not self.instance.is_work_library():
             function_contents.append_instance(self.instance.entity_name)
+        if self._has_skid_buffer(instance=self.instance, container=container):
+            function_contents.append_instance("llvm_skid_buffer")
+        vhdl_port = VhdlPortGenerator()
+        container.instance_signals.add(vhdl_port.get_standard_ports_signals(instance=self.instance))
+        block_name = f"{self.instance.instance_name}_b"
+        function_contents.write_body(f"{block_name} : block")
+        self._write_instance_signals(instance=self.instance, function_contents=function_contents, container=container)
+        self._write_instance_contents(block_name=block_name, instance=self.instance, function_contents=function_contents, container=container)
+
+@dataclass
+class VhdlSharedClientGroup(VhdlInstanceGroup):
+    """
+    An instance that uses a shared operator (see VhdlSharedOperatorWriter) instead of its own entity instance.
+    The client accepts a call when it is idle or when its result is acknowledged in the same cycle.
+    The operands and the tag are registered, the operands are held until the shared operator grants the request
+    and the result is registered when the shared operator returns it, so the shared operator never waits for a client.
+    """
+
+    def _write_instance_signals(self, instance: VhdlInstanceData, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
+        super()._write_instance_signals(instance=instance, function_contents=function_contents, container=container)
+        function_contents.write_body("signal ready_i, busy_i, issued_i, done_i : std_ulogic;")
+
+    def _get_operand_assignments(self, instance: VhdlInstanceData) -> str:
+        return "\n".join(f"      {instance.get_own_instance_signal_name(f'share_operand_{index}')} <= {port.get_input_port_signal_name()};"
+                         for index, port in enumerate(instance.input_ports))
+
+    def _write_client(self, instance: VhdlInstanceData, function_contents: VhdlFunctionContents) -> None:
+        vhdl_port = VhdlPortGenerator()
+        s_tvalid, s_tready, m_tvalid, m_tready = [vhdl_port.get_standard_port_signal_name(instance=instance, name=i) 
+                                                  for i in ["s_tvalid", "s_tready", "m_tvalid", "m_tready"]]
+        request = instance.get_own_instance_signal_name("share_request")
+        grant = instance.get_own_instance_signal_name("share_grant")
+        valid = instance.get_own_instance_signal_name("share_valid")
+        comment = VhdlCommentGenerator().get_comment()
+        source_comment = VhdlCommentGenerator().get_source_comment(source_line=instance.get_source_line())
+        function_contents.write_body(f"""
+{comment}
+{source_comment}
+ready_i <= not busy_i or (done_i and {m_tready});
+{s_tready} <= ready_i;
+{m_tvalid} <= done_i;
+{request} <= busy_i and not issued_i;
+
+process (clk)
+begin
+  if rising_edge(clk) then
+    if sreset = '1' then
+      busy_i   <= '0';
+      issued_i <= '0';
+      done_i   <= '0';
+    else
+      if done_i = '1' and {m_tready} = '1' then
+        busy_i   <= '0';
+        issued_i <= '0';
+        done_i   <= '0';
+      end if;
+      if {grant} = '1' then
+        issued_i <= '1';
+      end if;
+      if {valid} = '1' then
+        done_i <= '1';
+      end if;
+      if {s_tvalid} = '1' and ready_i = '1' then
+        busy_i <= '1';
+      end if;
+    end if;
+  end if;
+end process;
+
+process (clk)
+begin
+  if rising_edge(clk) then
+    if {s_tvalid} = '1' and ready_i = '1' then
+      {self._local_tag_out} <= {self._local_tag_in};
+{self._get_operand_assignments(instance=instance)}
+    end if;
+    if {valid} = '1' then
+      m_tdata_i <= {instance.shared_operator}_m_tdata_i;
+    end if;
+  end if;
+end process;
+
+        """)
+
+    def _write_instance_contents(self, block_name: str, instance: VhdlInstanceData, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
+        function_contents.write_body("begin")
+        self._write_instance_signal_assignments(instance=instance, function_contents=function_contents, container=container)
+        self._write_client(instance=instance, function_contents=function_contents)
+        self._write_component_output_signal_assignment(instance=instance, function_contents=function_contents)
+        function_contents.write_body(f"end block {block_name};")
+
+    def write_instances(self, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
         vhdl_port = VhdlPortGenerator()
         container.instance_signals.add(vhdl_port.get_standard_ports_signals(instance=self.instance))
         block_name = f"{self.instance.instance_name}_b"
         function_contents.write_body(f"{block_name} : block")
-        self._write_instance_signals(instance=self.instance, function_contents=function_contents)
+        self._write_instance_signals(instance=self.instance, function_contents=function_contents, container=container)
         self._write_instance_contents(block_name=block_name, instance=self.instance, function_contents=function_contents, container=container)
 
 class VhdlInstantiationGroupsGenerator:
@@ -185,6 +323,8 @@ class VhdlInstantiationGroupsGenerator:
     def _add_group(self, groups: List[VhdlInstantiationGroupBase], instance: VhdlInstanceData) -> None:
         if instance.access_register():
             groups.append(VhdlRegisterAccessGroup(instances=[instance]))
+        elif instance.is_shared():
+            groups.append(VhdlSharedClientGroup(instance=instance))
         else:
             groups.append(VhdlInstanceGroup(instance=instance))
 
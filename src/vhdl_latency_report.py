@@ -0,0 +1,380 @@
+import ast
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+import json
+import operator
+import os
+from typing import Callable, Dict, List, Optional, Set, Type
+
+from vhdl_function_container import VhdlFunctionContainer
+from vhdl_function_definition import VhdlFunctionDefinition
+from vhdl_instance_data import VhdlInstanceData
+from vhdl_instruction_argument import VhdlInstructionArgument
+from vhdl_operator_chaining import VhdlOperatorDelayTable
+
+@dataclass
+class VhdlInstanceReport:
+    """
+    latency is the number of clock cycles of the instance itself.
+    The latency of a called function is added when the module report is resolved.
+    The widths are in bits and are None when they could not be evaluated.
+        tag_bits: The live tag item bits carried through the buffer of the instance, excluding the call tag
+        memory_bits: The size of the memory of an alloca
+    operands is the number of operands that are not pointers.
+    shared_operator is the name of the operator instance that the instance shares with other instances.
+    added_latency is the number of clock cycles that the instance has more than when it does not share the operator.
+    """
+    instance_name: str
+    entity_name: str
+    stage: int
+    latency: int
+    predecessors: List[str]
+    callee: Optional[str] = None
+    data_width: Optional[int] = None
+    operand_width: Optional[int] = None
+    tag_bits: int = 0
+    memory_bits: int = 0
+    operands: int = 0
+    shared_operator: Optional[str] = None
+    added_latency: int = 0
+
+@dataclass
+class VhdlFunctionReport:
+    """
+    Static timing of one generated entity.
+        registered_tag_bits: The tag item bits that are registered in the stage buffers, excluding the call tag
+        tag_registers: The number of stage buffers, each of them also registers s_tag'length bits of the call tag
+        memory_accesses: The highest number of accesses that share one memory arbiter
+        memory_accessors: The number of accesses that share the arbiter of each memory port, 1 for a point-to-point connection
+        unresolved_widths: Widths that could not be evaluated and are not counted in registered_tag_bits
+    """
+    entity_name: str
+    number_of_stages: int
+    instances: List[VhdlInstanceReport]
+    registered_tag_bits: int
+    tag_registers: int
+    memory_ports: List[str]
+    memory_accesses: int
+    unresolved_widths: List[str] = field(default_factory=list)
+    memory_accessors: List[int] = field(default_factory=list)
+
+class VhdlFunctionReportFactory:
+
+    _memory_access_latency: int = 3
+    """
+    Request register, one cycle memory read or write and output register
+    """
+
+    _shared_client_latency: int = 2
+    """
+    Operand register and result register of an instance that uses a shared operator or a shared called function
+    """
+
+    _operators: Dict[Type[ast.operator], Callable[[int, int], Optional[int]]] = {
+        ast.Add: operator.add,
+        ast.Sub: operator.sub,
+        ast.Mult: operator.mul,
+        ast.Div: lambda a, b: None if b == 0 else a // b}
+    """
+    The operators of the width expressions, a division by zero can not be evaluated
+    """
+
+    def _evaluate_width(self, width: str) -> Optional[int]:
+        try:
+            node = ast.parse(width.strip(), mode="eval").body
+        except SyntaxError:
+            return None
+        return self._evaluate_node(node=node)
+
+    def _evaluate_binary(self, node: ast.BinOp) -> Optional[int]:
+        left = self._evaluate_node(node=node.left)
+        right = self._evaluate_node(node=node.right)
+        operation = self._operators.get(type(node.op))
+        if left is None or right is None or operation is None:
+            return None
+        return operation(left, right)
+
+    def _evaluate_node(self, node: ast.AST) -> Optional[int]:
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        if isinstance(node, ast.BinOp):
+            return self._evaluate_binary(node=node)
+        return None
+
+    def _get_arbiter_latency(self, instance: VhdlInstanceData, container: VhdlFunctionContainer) -> int:
+        """
+        Returns the latency of the register slices of the arbiters that the memory accesses of the instance go through
+        """
+        names = set(instance.get_memory_instance_names())
+        return max((arbiter.get_added_latency() for memory_name, arbiter in container.memory_arbiters.items()
+                    if names & set(container.memory_binding.get_accessors(memory_name=memory_name))), default=0)
+
+    def _get_skid_buffer(self, instance: VhdlInstanceData, container: VhdlFunctionContainer) -> int:
+        return int(container.options.pipeline and instance.has_variable_latency())
+
+    def _get_operator_latency(self, instance: VhdlInstanceData, container: VhdlFunctionContainer, delay_table: VhdlOperatorDelayTable) -> int:
+        """
+        A chained or combinational operator has no register of its own
+        """
+        chained = container.operator_chaining.is_chained(instance_name=instance.instance_name) or delay_table.is_combinational(entity_name=instance.entity_name)
+        return 0 if chained else 1
+
+    def _get_unshared_latency(self, instance: VhdlInstanceData, container: VhdlFunctionContainer, delay_table: VhdlOperatorDelayTable) -> int:
+        if instance.is_work_library():
+            return self._get_skid_buffer(instance=instance, container=container)
+        if instance.is_memory():
+            return 0
+        if instance.get_memory_instance_names():
+            return (self._memory_access_latency + self._get_arbiter_latency(instance=instance, container=container) +
+                    self._get_skid_buffer(instance=instance, container=container))
+        return self._get_operator_latency(instance=instance, container=container, delay_table=delay_table)
+
+    def _get_latency(self, instance: VhdlInstanceData, container: VhdlFunctionContainer, delay_table: VhdlOperatorDelayTable) -> int:
+        if not instance.is_shared():
+            return self._get_unshared_latency(instance=instance, container=container, delay_table=delay_table)
+        if instance.is_work_library() or delay_table.is_combinational(entity_name=instance.entity_name):
+            return self._shared_client_latency
+        return self._shared_client_latency + 1
+
+    def _get_added_latency(self, instance: VhdlInstanceData, container: VhdlFunctionContainer, delay_table: VhdlOperatorDelayTable) -> int:
+        if not instance.is_shared():
+            return 0
+        return (self._get_latency(instance=instance, container=container, delay_table=delay_table) - 
+                self._get_unshared_latency(instance=instance, container=container, delay_table=delay_table))
+
+    def _get_stages(self, function: VhdlFunctionDefinition) -> List[List[str]]:
+        if function.instances.stages:
+            return [i.instance_names for i in function.instances.stages]
+        return [[i.instance_name] for i in function.instances.instances]
+
+    def _get_widths(self, function: VhdlFunctionDefinition, container: VhdlFunctionContainer) -> Dict[str, str]:
+        widths = {port.get_name(): port.get_data_width() for port in function.ports.ports if port.is_input()}
+        widths.update((signal.instance, signal.get_data_width()) for signal in container.signals)
+        return widths
+
+    def _get_data_width(self, instance: VhdlInstanceData) -> Optional[int]:
+        if instance.output_port is None or instance.output_port.is_pointer():
+            return None
+        return self._evaluate_width(width=instance.output_port.data_type.get_data_width())
+
+    def _get_operand_ports(self, instance: VhdlInstanceData) -> List[VhdlInstructionArgument]:
+        return [i for i in instance.input_ports if not i.is_pointer()]
+
+    def _get_operand_width(self, instance: VhdlInstanceData) -> Optional[int]:
+        widths = [self._evaluate_width(width=i.get_data_width()) for i in self._get_operand_ports(instance=instance)]
+        return max((i for i in widths if i is not None), default=None)
+
+    def _get_memory_bits(self, instance: VhdlInstanceData) -> int:
+        data_type = instance.instruction.get_data_type()
+        if not instance.is_memory() or data_type is None:
+            return 0
+        return self._evaluate_width(width=data_type.get_data_width()) or 0
+
+    def _get_tag_bits(self, items: List[str], widths: Dict[str, str], unresolved_widths: Set[str]) -> int:
+        tag_bits = 0
+        for name in items:
+            if name == "tag":
+                continue
+            width = self._evaluate_width(width=widths.get(name, name))
+            if width is None:
+                unresolved_widths.add(widths.get(name, name))
+            else:
+                tag_bits += width
+        return tag_bits
+
+    def _get_predecessors(self, instance: VhdlInstanceData, instance_names: Set[str]) -> List[str]:
+        return sorted({i.signal_name for i in instance.input_ports if i.signal_name in instance_names})
+
+    def _get_instance_report(self, instance: VhdlInstanceData, stage: int, instance_names: Set[str], tag_bits: int,
+                             container: VhdlFunctionContainer, delay_table: VhdlOperatorDelayTable) -> VhdlInstanceReport:
+        return VhdlInstanceReport(instance_name=instance.instance_name, entity_name=instance.entity_name, stage=stage,
+                                  latency=self._get_latency(instance=instance, container=container, delay_table=delay_table),
+                                  predecessors=self._get_predecessors(instance=instance, instance_names=instance_names),
+                                  callee=instance.entity_name if instance.is_work_library() else None,
+                                  data_width=self._get_data_width(instance=instance),
+                                  operand_width=self._get_operand_width(instance=instance),
+                                  tag_bits=tag_bits, memory_bits=self._get_memory_bits(instance=instance),
+                                  operands=len(self._get_operand_ports(instance=instance)),
+                                  shared_operator=instance.shared_operator,
+                                  added_latency=self._get_added_latency(instance=instance, container=container, delay_table=delay_table))
+
+    def _get_stage_index(self, function: VhdlFunctionDefinition) -> Dict[str, int]:
+        return {name: index for index, stage in enumerate(self._get_stages(function=function)) for name in stage}
+
+    def _get_stage_tag_bits(self, function: VhdlFunctionDefinition, container: VhdlFunctionContainer, unresolved_widths: Set[str]) -> Dict[str, int]:
+        """
+        Returns the tag bits of the buffer of each instance
+        """
+        widths = self._get_widths(function=function, container=container)
+        return {name: self._get_tag_bits(items=[i for i, _ in stage_tag.items], widths=widths, unresolved_widths=unresolved_widths) 
+                for name, stage_tag in container.tag_liveness.stage_tags.items()}
+
+    def _get_instance_reports(self, function: VhdlFunctionDefinition, container: VhdlFunctionContainer, tag_bits: Dict[str, int]) -> List[VhdlInstanceReport]:
+        delay_table = VhdlOperatorDelayTable(delays=container.options.operator_delays)
+        instance_names = {i.instance_name for i in function.instances.instances}
+        stage_index = self._get_stage_index(function=function)
+        return [self._get_instance_report(instance=i, stage=stage_index[i.instance_name], instance_names=instance_names, 
+                                          tag_bits=tag_bits.get(i.instance_name, 0), container=container, delay_table=delay_table)
+                for i in function.instances.instances]
+
+    def _get_registered(self, instances: List[VhdlInstanceReport], container: VhdlFunctionContainer) -> List[VhdlInstanceReport]:
+        """
+        Returns the instances whose stage buffer registers the tag
+        """
+        return [i for i in instances if i.instance_name in container.tag_liveness.stage_tags and i.latency > 0]
+
+    def get(self, function: VhdlFunctionDefinition, container: VhdlFunctionContainer) -> VhdlFunctionReport:
+        unresolved_widths: Set[str] = set()
+        tag_bits = self._get_stage_tag_bits(function=function, container=container, unresolved_widths=unresolved_widths)
+        instances = self._get_instance_reports(function=function, container=container, tag_bits=tag_bits)
+        registered = self._get_registered(instances=instances, container=container)
+        memory_ports = function.get_memory_port_names() + function.instances.get_memory_names()
+        return VhdlFunctionReport(entity_name=function.entity_name, number_of_stages=len(self._get_stages(function=function)),
+                                  instances=instances, registered_tag_bits=sum(i.tag_bits for i in registered), tag_registers=len(registered),
+                                  memory_ports=memory_ports, memory_accesses=container.memory_binding.get_max_accessors(),
+                                  unresolved_widths=sorted(unresolved_widths),
+                                  memory_accessors=[container.memory_binding.get_arbitrated_accessors(memory_name=i) for i in memory_ports])
+
+@dataclass
+class VhdlEntityTiming:
+    """
+    pipeline_depth: Clock cycles from s_tvalid to m_tvalid of one call, including the called functions
+    critical_path: The longest chain of dependent instances in clock cycles, which is the lowest
+                   pipeline depth that a better schedule of the same instances could reach
+    initiation_interval: Clock cycles between calls that can be accepted in steady state. The accesses of a memory
+                         share one arbiter, so a memory with N accesses accepts a new call every N cycles. A memory
+                         with one load and one store has no arbiter, because they use the read and the write port.
+                         The same holds for an operator or called function that is shared by N instances, and an
+                         instance that uses a shared operator only accepts a new call when its result is acknowledged
+    """
+    entity_name: str
+    pipeline_depth: Optional[int]
+    critical_path: Optional[int]
+    initiation_interval: Optional[int]
+    number_of_stages: int
+    registered_tag_bits: int
+    tag_registers: int
+    memory_ports: List[str]
+    unresolved_widths: List[str]
+
+class VhdlLatencyReport:
+    """
+    Static latency and throughput report of all generated entities.
+    Called functions are resolved through the hierarchy and the aliases of the module.
+    Recursive calls and calls to functions that are not in the module give an unknown (None) latency.
+    """
+
+    def __init__(self, functions: List[VhdlFunctionReport], aliases: Optional[Dict[str, str]] = None) -> None:
+        self._functions = {i.entity_name: i for i in functions}
+        self._aliases = {} if aliases is None else aliases
+        self._order = [i.entity_name for i in functions]
+        self._timing: Dict[str, VhdlEntityTiming] = {}
+        self._active: Set[str] = set()
+
+    def _get_instance_latency(self, instance: VhdlInstanceReport) -> Optional[int]:
+        if instance.callee is None:
+            return instance.latency
+        callee = self.get_timing(entity_name=instance.callee)
+        if callee is None or callee.pipeline_depth is None:
+            return None
+        return instance.latency + callee.pipeline_depth
+
+    def _get_callee_interval(self, instance: VhdlInstanceReport) -> Optional[int]:
+        if instance.callee is None:
+            return 1
+        callee = self.get_timing(entity_name=instance.callee)
+        return None if callee is None else callee.initiation_interval
+
+    def _get_pipeline_depth(self, function: VhdlFunctionReport, latencies: Dict[str, Optional[int]]) -> Optional[int]:
+        stage_latencies: Dict[int, int] = {}
+        for i in function.instances:
+            latency = latencies[i.instance_name]
+            if latency is None:
+                return None
+            stage_latencies[i.stage] = max(stage_latencies.get(i.stage, 0), latency)
+        return sum(stage_latencies.values())
+
+    def _get_critical_path(self, function: VhdlFunctionReport, latencies: Dict[str, Optional[int]]) -> Optional[int]:
+        finish: Dict[str, int] = {}
+        for i in function.instances:
+            latency = latencies[i.instance_name]
+            if latency is None:
+                return None
+            finish[i.instance_name] = max((finish[j] for j in i.predecessors if j in finish), default=0) + latency
+        return max(finish.values(), default=0)
+
+    def _get_shared_operator_intervals(self, function: VhdlFunctionReport) -> List[Optional[int]]:
+        clients = Counter(i.shared_operator for i in function.instances if i.shared_operator is not None)
+        latencies = [self._get_instance_latency(instance=i) for i in function.instances if i.shared_operator is not None]
+        return list(clients.values()) + latencies
+
+    def _get_initiation_interval(self, function: VhdlFunctionReport) -> Optional[int]:
+        intervals = [self._get_callee_interval(instance=i) for i in function.instances] + self._get_shared_operator_intervals(function=function)
+        known = [i for i in intervals if i is not None]
+        if len(known) < len(intervals):
+            return None
+        return max([1, function.memory_accesses] + known)
+
+    def _resolve(self, function: VhdlFunctionReport) -> VhdlEntityTiming:
+        latencies = {i.instance_name: self._get_instance_latency(instance=i) for i in function.instances}
+        return VhdlEntityTiming(entity_name=function.entity_name,
+                                pipeline_depth=self._get_pipeline_depth(function=function, latencies=latencies),
+                                critical_path=self._get_critical_path(function=function, latencies=latencies),
+                                initiation_interval=self._get_initiation_interval(function=function),
+                                number_of_stages=function.number_of_stages,
+                                registered_tag_bits=function.registered_tag_bits,
+                                tag_registers=function.tag_registers,
+                                memory_ports=function.memory_ports,
+                                unresolved_widths=function.unresolved_widths)
+
+    def get_timing(self, entity_name: str) -> Optional[VhdlEntityTiming]:
+        entity_name = self._aliases.get(entity_name, entity_name)
+        if entity_name in self._timing:
+            return self._timing[entity_name]
+        function = self._functions.get(entity_name)
+        if function is None or entity_name in self._active:
+            return None
+        self._active.add(entity_name)
+        timing = self._resolve(function=function)
+        self._active.discard(entity_name)
+        self._timing[entity_name] = timing
+        return timing
+
+    def get_timings(self) -> List[VhdlEntityTiming]:
+        timings = [self.get_timing(entity_name=i) for i in self._order]
+        return [i for i in timings if i is not None]
+
+    def get_json(self) -> str:
+        return json.dumps({"entities": [asdict(i) for i in self.get_timings()]}, indent=2)
+
+    def _get_value(self, value: Optional[int]) -> str:
+        return "?" if value is None else str(value)
+
+    def _get_row(self, timing: VhdlEntityTiming) -> List[str]:
+        return [timing.entity_name, self._get_value(timing.pipeline_depth), self._get_value(timing.critical_path),
+                self._get_value(timing.initiation_interval), str(timing.number_of_stages), str(timing.registered_tag_bits),
+                str(timing.tag_registers), ", ".join(timing.memory_ports) or "-"]
+
+    def _get_column_widths(self, rows: List[List[str]]) -> List[int]:
+        return [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+
+    def _get_notes(self) -> List[str]:
+        return [f"{i.entity_name}: unresolved tag widths {', '.join(i.unresolved_widths)}" for i in self.get_timings() if i.unresolved_widths]
+
+    def get_text(self) -> str:
+        header = ["Entity", "Depth", "Critical path", "II", "Stages", "Tag bits", "Tag registers", "Memory ports"]
+        rows = [header] + [self._get_row(timing=i) for i in self.get_timings()]
+        widths = self._get_column_widths(rows=rows)
+        lines = ["  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows]
+        return "\n".join(lines + self._get_notes()) + "\n"
+
+    def get_file_names(self, file_name: str) -> List[str]:
+        base_name = os.path.splitext(file_name)[0]
+        return [f"{base_name}_report.json", f"{base_name}_report.txt"]
+
+    def write(self, file_name: str) -> None:
+        json_file_name, text_file_name = self.get_file_names(file_name=file_name)
+        with open(json_file_name, 'w', encoding="utf-8") as file_handle:
+            print(self.get_json(), file=file_handle)
+        with open(text_file_name, 'w', encoding="utf-8") as file_handle:
+            print(self.get_text(), file=file_handle, end="")
@@ -0,0 +1,98 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from instruction import DefaultInstruction, LoadInstruction
+from llvm_function import LlvmFunction, LlvmFunctionContainer
+from llvm_instruction import LlvmInstruction
+from llvm_parser import LlvmInstructionCommand
+from vhdl_instance_container_data import VhdlInstanceContainerData
+from vhdl_instance_name import VhdlInstanceName
+from vhdl_memory_binding import VhdlMemoryBinding
+
+@dataclass
+class VhdlMemoryArbiter:
+    """
+    The generics of the memory.arbiter of one memory.
+        weights: Consecutive grants of each accessor, in the order of the accessors
+        outstanding: Reads that may be in flight through the arbiter
+        registers: Register slices on each request and each response channel
+    """
+    mode: str
+    weights: List[int] = field(default_factory=list)
+    outstanding: int = 1
+    registers: int = 0
+
+    def get_added_latency(self) -> int:
+        """
+        Returns the clock cycles that the register slices add to a memory access
+        """
+        return 2 * self.registers
+
+    def get_generic_map(self) -> List[str]:
+        weights = ", ".join(f"{index} => {weight}" for index, weight in enumerate(self.weights))
+        return ["round_robin => true", f"weights => ({weights})", f"outstanding => {self.outstanding}",
+                f"request_registers => {self.registers}", f"response_registers => {self.registers}"]
+
+class VhdlMemoryArbiterFactory:
+    """
+    Chooses the generics of the arbiter of each memory that has more than one arbitrated accessor.
+    The default fixed priority arbiter is used when no mode is given, otherwise every arbiter uses round robin
+    arbitration. In the weighted mode an accessor gets as many consecutive grants as the accesses it makes
+    per call, which is 1 for a load or a store and the number of loads and stores of the called function for a call.
+    The arbiter allows the reads of all the grants of one round and of the register slices to be in flight.
+    A register slice is put on each channel when the arbiter has more than register_threshold accessors,
+    because the multiplexers of the grant no longer fit in one logic level.
+    Example with 5 accessors, a call to a function with 3 loads and 4 loads:
+        weighted: weights => (0 => 3, 1 => 1, 2 => 1, 3 => 1, 4 => 1), outstanding => 9, 1 register slice
+    """
+
+    modes = ("round-robin", "weighted")
+
+    register_threshold: int = 4
+
+    def _is_access(self, instruction: LlvmInstruction) -> bool:
+        if not isinstance(instruction, LlvmInstructionCommand):
+            return False
+        return isinstance(instruction.instruction, LoadInstruction) or (isinstance(instruction.instruction, DefaultInstruction) and 
+                                                                        instruction.instruction.opcode == "store")
+
+    def _get_access_count(self, function: LlvmFunction) -> int:
+        return len([i for i in function.instructions if self._is_access(instruction=i)])
+
+    def get_access_counts(self, functions: LlvmFunctionContainer, aliases: Dict[str, str]) -> Dict[str, int]:
+        """
+        Returns the number of loads and stores of each function by entity name
+        """
+        counts = {VhdlInstanceName(name=function.name, library="work").get_entity_name(): self._get_access_count(function=function) 
+                  for function in functions.functions}
+        counts.update({alias: counts[name] for alias, name in aliases.items() if name in counts})
+        return counts
+
+    def _get_weights(self, accessors: List[str], entity_names: Dict[str, str], mode: str, access_counts: Dict[str, int]) -> List[int]:
+        if mode != "weighted":
+            return [1 for _ in accessors]
+        return [max(1, access_counts.get(entity_names.get(i, ""), 1)) for i in accessors]
+
+    def _get_entity_names(self, instances: VhdlInstanceContainerData) -> Dict[str, str]:
+        """
+        Returns the entity name of the called function of each memory interface of a call
+        """
+        return {name: i.entity_name for i in instances.instances if i.is_work_library() for name in i.get_memory_instance_names()}
+
+    def _get_registers(self, accessors: List[str], registers: Optional[int]) -> int:
+        if registers is not None:
+            return registers
+        return 1 if len(accessors) > self.register_threshold else 0
+
+    def get(self, instances: VhdlInstanceContainerData, binding: VhdlMemoryBinding, mode: Optional[str],
+            registers: Optional[int] = None, access_counts: Optional[Dict[str, int]] = None) -> Dict[str, VhdlMemoryArbiter]:
+        if mode is None:
+            return {}
+        assert mode in self.modes, f"Unknown arbiter mode {mode}, must be one of {list(self.modes)}"
+        entity_names = self._get_entity_names(instances=instances)
+        arbiters = {}
+        for memory_name, accessors in binding.get_arbitrated_memories().items():
+            weights = self._get_weights(accessors=accessors, entity_names=entity_names, mode=mode, access_counts=access_counts or {})
+            slices = self._get_registers(accessors=accessors, registers=registers)
+            arbiters[memory_name] = VhdlMemoryArbiter(mode=mode, weights=weights, outstanding=sum(weights) + 2 * slices, registers=slices)
+        return arbiters
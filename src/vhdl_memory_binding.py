@@ -0,0 +1,150 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from vhdl_instance_container_data import VhdlInstanceContainerData
+from vhdl_instance_data import VhdlInstanceData
+from vhdl_instruction_argument import VhdlInstructionArgument
+
+@dataclass
+class VhdlMemoryBinding:
+    """
+    The memory interface names of the instances that access each memory, in instruction order.
+    A memory is an alloca or a pointer port of the function.
+    readers: The accessors that use the read channels of each memory
+    writers: The accessors that use the write channels of each memory
+    unbound: The accesses whose memory is unknown when the function has no memory
+    """
+    accessors: Dict[str, List[str]] = field(default_factory=dict)
+    unbound: List[str] = field(default_factory=list)
+    readers: Dict[str, List[str]] = field(default_factory=dict)
+    writers: Dict[str, List[str]] = field(default_factory=dict)
+
+    def get_accessors(self, memory_name: str) -> List[str]:
+        return self.accessors.get(memory_name, [])
+
+    def get_readers(self, memory_name: str) -> List[str]:
+        return self.readers.get(memory_name, [])
+
+    def get_writers(self, memory_name: str) -> List[str]:
+        return self.writers.get(memory_name, [])
+
+    def is_dual_port(self, memory_name: str) -> bool:
+        """
+        Returns True when one accessor only reads and another one only writes the memory, so the read channels
+        and the write channels can be connected point-to-point without an arbiter
+        """
+        return (len(self.get_accessors(memory_name=memory_name)) > 1 and 
+                len(self.get_readers(memory_name=memory_name)) == 1 and len(self.get_writers(memory_name=memory_name)) == 1)
+
+    def get_arbitrated_accessors(self, memory_name: str) -> int:
+        """
+        Returns the number of accessors that share the arbiter of the memory, which is 1 when there is no arbiter
+        """
+        if self.is_dual_port(memory_name=memory_name):
+            return 1
+        return len(self.get_accessors(memory_name=memory_name))
+
+    def get_arbitrated_memories(self) -> Dict[str, List[str]]:
+        """
+        Returns the accessors of each memory whose arbiter is shared by more than one accessor
+        """
+        return {name: accessors for name, accessors in self.accessors.items() if self.get_arbitrated_accessors(memory_name=name) > 1}
+
+    def get_max_accessors(self) -> int:
+        """
+        Returns the highest number of accesses that share one memory arbiter
+        """
+        return max([len(self.unbound)] + [self.get_arbitrated_accessors(memory_name=i) for i in self.accessors])
+
+class VhdlMemoryBindingFactory:
+    """
+    Binds the memory accesses to the memory that their pointer is derived from.
+    The pointer is followed through the getelementptr instances to an alloca or a pointer port.
+    Accesses whose pointer can not be followed, for example a pointer that is loaded from memory,
+    are bound to all memories.
+    Example:
+        %n = alloca [4 x i32]                                          llvm_alloca_1
+        %m = alloca [4 x i32]                                          llvm_alloca_2
+        %g = getelementptr inbounds [4 x i32], ptr %m, i64 0, i64 1    llvm_getelementptr_3
+        %0 = load i32, ptr %g                                          llvm_load_4 -> llvm_alloca_2
+        %1 = load i32, ptr %n                                          llvm_load_5 -> llvm_alloca_1
+    """
+
+    def _get_accesses(self, instance: VhdlInstanceData) -> List[Tuple[str, Optional[VhdlInstructionArgument]]]:
+        """
+        Returns the memory interface names of the instance and the pointer that each of them accesses
+        """
+        if instance.memory_interface is not None and instance.memory_interface.is_master():
+            return [(instance.instance_name, self._get_pointer(instance=instance))]
+        accesses: List[Tuple[str, Optional[VhdlInstructionArgument]]] = []
+        for i in instance.input_ports:
+            name = instance.get_memory_port_name(port=i)
+            if name is not None:
+                accesses.append((name, i))
+        return accesses
+
+    def _get_channels(self, instance: VhdlInstanceData) -> Tuple[bool, bool]:
+        """
+        Returns if the accesses of the instance read and write the memory.
+        A load only reads and a store only writes, a called function may do both
+        """
+        if instance.entity_name == "llvm_load":
+            return True, False
+        if instance.entity_name == "llvm_store":
+            return False, True
+        return True, True
+
+    def _get_pointer(self, instance: VhdlInstanceData) -> Optional[VhdlInstructionArgument]:
+        pointers = [i for i in instance.input_ports if i.is_pointer()]
+        return pointers[0] if pointers else None
+
+    def _get_base(self, name: str, instances: Dict[str, VhdlInstanceData]) -> Optional[str]:
+        """
+        Returns the name of the pointer that a getelementptr instance is based on
+        """
+        instance = instances.get(name)
+        if instance is None or instance.entity_name != "llvm_getelementptr":
+            return None
+        pointer = self._get_pointer(instance=instance)
+        return None if pointer is None else pointer.get_name()
+
+    def _get_memory_name(self, pointer: VhdlInstructionArgument, instances: Dict[str, VhdlInstanceData], memory_names: List[str]) -> Optional[str]:
+        name: Optional[str] = pointer.get_name()
+        visited: Set[str] = set()
+        while name is not None and name not in visited and name not in memory_names:
+            visited.add(name)
+            name = self._get_base(name=name, instances=instances)
+        return name if name in memory_names else None
+
+    def _get_memory_names(self, pointer: Optional[VhdlInstructionArgument], instances: Dict[str, VhdlInstanceData],
+                          memory_names: List[str]) -> List[str]:
+        """
+        Returns all the memories when the memory of the pointer is unknown
+        """
+        memory_name = None if pointer is None else self._get_memory_name(pointer=pointer, instances=instances, memory_names=memory_names)
+        return memory_names if memory_name is None else [memory_name]
+
+    def _bind(self, binding: VhdlMemoryBinding, instance: VhdlInstanceData, name: str, memory_names: List[str]) -> None:
+        read, write = self._get_channels(instance=instance)
+        for i in memory_names:
+            binding.accessors[i].append(name)
+            if read:
+                binding.readers[i].append(name)
+            if write:
+                binding.writers[i].append(name)
+
+    def _get_binding(self, memory_names: List[str]) -> VhdlMemoryBinding:
+        return VhdlMemoryBinding(accessors={i: [] for i in memory_names}, readers={i: [] for i in memory_names},
+                                 writers={i: [] for i in memory_names})
+
+    def get(self, instances: VhdlInstanceContainerData, memory_port_names: List[str]) -> VhdlMemoryBinding:
+        memory_names = instances.get_memory_names() + memory_port_names
+        instance_names = {i.instance_name: i for i in instances.instances}
+        binding = self._get_binding(memory_names=memory_names)
+        for instance in instances.instances:
+            for name, pointer in self._get_accesses(instance=instance):
+                bound = self._get_memory_names(pointer=pointer, instances=instance_names, memory_names=memory_names)
+                if not bound:
+                    binding.unbound.append(name)
+                self._bind(binding=binding, instance=instance, name=name, memory_names=bound)
+        return binding
@@ -0,0 +1,153 @@
+from dataclasses import dataclass, field
+import json
+from typing import Dict, List, Optional, Set, Tuple
+
+from vhdl_instance_container_data import VhdlInstanceContainerData, VhdlInstanceStageData
+from vhdl_instance_data import VhdlInstanceData
+
+class VhdlOperatorDelayTable:
+    """
+    Estimated combinational delay in ns of each operator entity.
+    The default values are rough estimates for 32 bit operands on a mid range FPGA.
+    Entities that are not in the table are never chained.
+    The entities in the combinational set have no register (delay => 0 in the library)
+    and always pass their input delay on to the next operator.
+    """
+
+    default_delays: Dict[str, float] = {
+        "llvm_and": 0.4,
+        "llvm_or": 0.4,
+        "llvm_xor": 0.4,
+        "llvm_select": 0.5,
+        "llvm_eq": 0.8,
+        "llvm_ne": 0.8,
+        "llvm_shl": 1.0,
+        "llvm_lshr": 1.0,
+        "llvm_ashr": 1.0,
+        "llvm_add": 1.2,
+        "llvm_sub": 1.2,
+        "llvm_getelementptr": 1.5,
+        "llvm_mul": 3.5,
+        "llvm_udiv": 25.0,
+        "llvm_sdiv": 25.0,
+        "llvm_urem": 25.0,
+        "llvm_srem": 25.0,
+        "llvm_fabs_f32": 0.2,
+        "llvm_fcmp_uge": 2.0,
+        "llvm_fcmp_ule": 2.0,
+        "llvm_fadd": 8.0,
+        "llvm_fmul": 7.0,
+        "llvm_fmuladd_f32": 12.0,
+        "llvm_zext": 0.0,
+        "llvm_sext": 0.0,
+        "llvm_trunc": 0.0,
+        "llvm_bitcast": 0.0,
+    }
+
+    combinational: Set[str] = {"llvm_zext", "llvm_sext", "llvm_trunc", "llvm_bitcast"}
+
+    def __init__(self, delays: Tuple[Tuple[str, float], ...] = ()) -> None:
+        self._delays = dict(self.default_delays)
+        self._delays.update(delays)
+
+    def read_file(self, file_name: str) -> Tuple[Tuple[str, float], ...]:
+        """
+        Reads a json object of entity names and delays in ns, for example {"llvm_add": 0.9, "llvm_mul": 2.5}
+        """
+        with open(file_name, "r", encoding="utf-8") as file_handle:
+            delays = json.load(file_handle)
+        assert isinstance(delays, dict), f"Operator delay file {file_name} must contain a json object"
+        return tuple(sorted((str(name), float(delay)) for name, delay in delays.items()))
+
+    def get_delay(self, entity_name: str) -> Optional[float]:
+        return self._delays.get(entity_name)
+
+    def is_combinational(self, entity_name: str) -> bool:
+        return entity_name in self.combinational
+
+@dataclass
+class VhdlOperatorChaining:
+    """
+    The instances whose output register is removed with delay => 0,
+    so that they are combinationally chained with the next instance.
+    """
+    chained_instances: Set[str] = field(default_factory=set)
+
+    def is_chained(self, instance_name: str) -> bool:
+        return instance_name in self.chained_instances
+
+    def get_generic_map(self, instance: VhdlInstanceData) -> Optional[List[str]]:
+        if not self.is_chained(instance_name=instance.instance_name):
+            return instance.generic_map
+        return (instance.generic_map or []) + ["delay => 0"]
+
+class VhdlOperatorChainingFactory:
+    """
+    Packs consecutive stages into one register stage as long as the sum of their delays fits in the clock period.
+    Only stages with a single operator from the delay table are chained. Parallel stages, memory accesses,
+    calls, shared operators and register accesses keep their registers and the last stage of the function is always registered.
+    A stage keeps its register when the delay up to and including the next registered operator exceeds the clock period.
+    Example with clock_period = 3.0:
+        %and = and i32 %a, 255      0.4 ns -> delay => 0
+        %shl = shl i32 %and, 2      1.4 ns -> delay => 0
+        %add = add nsw i32 %shl, %b 2.6 ns -> registered
+        %mul = mul nsw i32 %add, %c 3.5 ns -> registered
+    """
+
+    def _get_stage(self, stage: VhdlInstanceStageData, instance_map: Dict[str, VhdlInstanceData]) -> List[VhdlInstanceData]:
+        return [instance_map[i] for i in stage.instance_names]
+
+    def _get_stages(self, instances: VhdlInstanceContainerData) -> List[List[VhdlInstanceData]]:
+        if not instances.stages:
+            return [[i] for i in instances.instances]
+        instance_map = {i.instance_name: i for i in instances.instances}
+        return [self._get_stage(stage=stage, instance_map=instance_map) for stage in instances.stages]
+
+    def _is_chainable(self, instance: VhdlInstanceData) -> bool:
+        return not (instance.has_variable_latency() or instance.access_register() or instance.is_memory() or instance.is_shared())
+
+    def _get_stage_delay(self, stage: List[VhdlInstanceData], delay_table: VhdlOperatorDelayTable) -> Optional[float]:
+        if len(stage) != 1 or not self._is_chainable(instance=stage[0]):
+            return None
+        return delay_table.get_delay(entity_name=stage[0].entity_name)
+
+    def _get_next_register_delay(self, stages: List[List[VhdlInstanceData]], index: int, delay_table: VhdlOperatorDelayTable) -> Optional[float]:
+        """
+        The delay from the output of stage index up to and including the next operator that can be registered
+        """
+        total = 0.0
+        for stage in stages[index + 1:]:
+            delay = self._get_stage_delay(stage=stage, delay_table=delay_table)
+            if delay is None:
+                return None
+            total += delay
+            if not delay_table.is_combinational(entity_name=stage[0].entity_name):
+                return total
+        return None
+
+    def _add_stage(self, stages: List[List[VhdlInstanceData]], index: int, arrival: float, clock_period: float, 
+                   delay_table: VhdlOperatorDelayTable, chaining: VhdlOperatorChaining) -> float:
+        """
+        Chains the registered operator of stage index when the next register is reached within the clock period.
+        arrival is the delay from the last register up to and including the stage, the returned arrival is 0 after a register.
+        """
+        instance = stages[index][0]
+        if delay_table.is_combinational(entity_name=instance.entity_name):
+            return arrival
+        next_delay = self._get_next_register_delay(stages=stages, index=index, delay_table=delay_table)
+        if next_delay is None or arrival + next_delay > clock_period:
+            return 0.0
+        chaining.chained_instances.add(instance.instance_name)
+        return arrival
+
+    def get(self, instances: VhdlInstanceContainerData, clock_period: Optional[float], delay_table: VhdlOperatorDelayTable) -> VhdlOperatorChaining:
+        chaining = VhdlOperatorChaining()
+        if clock_period is None:
+            return chaining
+        stages = self._get_stages(instances=instances)
+        arrival = 0.0
+        for index, stage in enumerate(stages):
+            delay = self._get_stage_delay(stage=stage, delay_table=delay_table)
+            arrival = 0.0 if delay is None else self._add_stage(stages=stages, index=index, arrival=arrival + delay, clock_period=clock_period, 
+                                                                delay_table=delay_table, chaining=chaining)
+        return chaining
@@ -0,0 +1,60 @@
+from typing import List
+
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_function_container import VhdlFunctionContainer
+from vhdl_function_contents import VhdlFunctionContents
+from vhdl_instance_container_data import VhdlInstanceStageData
+
+class VhdlParallelStageWriter:
+    """
+    Connects the instances of a parallel stage.
+    Fork: An instance only accepts the input when all instances of the stage are ready,
+    so all instances accept the same input at the same time.
+    Join: The stage output is valid when all instances have a valid output and the outputs are
+    acknowledged at the same time. The first instance carries the live tag items
+    and the results of the other instances are added to its tag.
+    """
+
+    def _get_and(self, names: List[str]) -> str:
+        return " and ".join(names)
+
+    def _write_fork(self, stage: VhdlInstanceStageData, function_contents: VhdlFunctionContents) -> None:
+        previous_valid = stage.get_previous_signal_name(signal_name="m_tvalid", port_name="s_tvalid")
+        previous_ready = stage.get_previous_signal_name(signal_name="m_tready", port_name="s_tready")
+        ready_names = [f"{i}_s_tready_i" for i in stage.instance_names]
+        function_contents.write_body(f"{previous_ready} <= {self._get_and(ready_names)};")
+        for i in stage.instance_names:
+            other_ready_names = [f"{j}_s_tready_i" for j in stage.instance_names if j != i]
+            function_contents.write_body(f"{i}_s_tvalid_i <= {self._get_and([previous_valid] + other_ready_names)};")
+
+    def _write_join(self, stage: VhdlInstanceStageData, function_contents: VhdlFunctionContents) -> None:
+        stage_valid = stage.get_own_signal_name(signal_name="m_tvalid")
+        stage_ready = stage.get_own_signal_name(signal_name="m_tready")
+        valid_names = [f"{i}_m_tvalid_i" for i in stage.instance_names]
+        function_contents.write_body(f"{stage_valid} <= {self._get_and(valid_names)};")
+        for i in stage.instance_names:
+            function_contents.write_body(f"{i}_m_tready_i <= {stage_ready} and {stage_valid};")
+        first_instance, *other_instances = stage.instance_names
+        results = "\n".join(f"  {stage.tag_name}.{i} <= {i}_tag_out_i.{i};" for i in other_instances)
+        comment = VhdlCommentGenerator().get_comment()
+        function_contents.write_body(f"""
+{comment}
+process (all)
+begin
+  {stage.tag_name} <= {first_instance}_tag_out_i;
+{results}
+end process;
+        """)
+
+    def _add_signals(self, stage: VhdlInstanceStageData, container: VhdlFunctionContainer) -> None:
+        signals = [f"{stage.get_own_signal_name(signal_name=i)} : std_ulogic" for i in ["m_tvalid", "m_tready"]]
+        if stage.tag_name != "tag_out_i":
+            signals.append(f"{stage.tag_name} : tag_t")
+        container.instance_signals.add(signals)
+
+    def write_stages(self, stages: List[VhdlInstanceStageData], function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
+        for i in stages:
+            if i.is_parallel():
+                self._add_signals(stage=i, container=container)
+                self._write_fork(stage=i, function_contents=function_contents)
+                self._write_join(stage=i, function_contents=function_contents)
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Generator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+from typing import Generator, List, Optional, Set, Tuple, Union
 
 from ports import Port, PortContainer, PortGenerator
 from vhdl_declarations import VhdlSignal
@@ -31,6 +31,8 @@ class VhdlSlavePort(VhdlPortRole):
     def is_slave(self) -> bool:
         return True
     def get_signal_name(self, instance: VhdlInstanceData, name: str) -> str:
+        if instance.parallel:
+            return instance.get_own_instance_signal_name(name)
         signal_name = instance.get_previous_instance_signal_name(name)
         if signal_name is None:
             return name
@@ -70,7 +72,7 @@ class VhdlBooleanWidth(VhdlDataWidth):
 class VhdlPortBase:
     name: str
     data_width: VhdlDataWidth = VhdlBooleanWidth()
-    role: VhdlPortRole = VhdlGlobalPort()
+    role: VhdlPortRole = field(default_factory=VhdlGlobalPort)
 
 class VhdlPort(ABC, VhdlPortBase):
     def _get_port_type(self, direction: Optional[str] = None) -> str:
@@ -166,10 +168,28 @@ class VhdlMemoryPort:
             else f"{destination_assignment} <= {port_name}"
         )
 
-    def get_signal_assignments(self, signal_name: str, assignment_names: List[str]) -> List[str]:
+    def _is_read_port(self, port: VhdlPort) -> bool:
+        return port.name.startswith("r") or port.name.startswith("ar")
+
+    def _get_channel_ports(self, read: Optional[bool]) -> List[VhdlPort]:
+        """
+        Returns the ports of the read channels (ar, r) or the write channels (aw, w, b), or all ports when read is None
+        """
+        return [i for i in self._memory_ports if read is None or self._is_read_port(port=i) == read]
+
+    def get_signal_assignments(self, signal_name: str, assignment_names: List[str], read: Optional[bool] = None) -> List[str]:
         return [
             f"{self._get_signal_assignment(port=i, signal_name=signal_name, assignment_names=assignment_names)}"
-            for i in self._memory_ports
+            for i in self._get_channel_ports(read=read)
+        ]
+
+    def get_tie_off_assignments(self, name: str, read: bool) -> List[str]:
+        """
+        Drives the slave ports of the read or write channels of a memory interface that is not connected
+        """
+        return [
+            f"{name}_{i.name} <= " + ("'0'" if i.data_width.is_boolean() else "(others => '0')")
+            for i in self._get_channel_ports(read=read) if i.is_slave()
         ]
 
     def get_ports(self, port: Port) -> List[str]:
@@ -207,6 +227,15 @@ class VhdlPortGenerator(PortGenerator):
             name for name, _ in self.get_tag_elements(ports=ports, signals=signals)
         ]
 
+    def get_tag_element_widths(self, ports: PortContainer, signals: List[VhdlSignal]) -> List[Tuple[str, str]]:
+        widths = [("tag", "s_tag'length")]
+        widths.extend((port.get_name(), self.get_data_width(port=port)) for port in ports.ports if port.is_input())
+        widths.extend((signal.instance, signal.get_data_width()) for signal in signals)
+        return widths
+
+    def get_tag_input_names(self, instance: VhdlInstanceData, tag_item_names: Set[str]) -> List[str]:
+        return [i.get_value() for i in instance.input_ports if i.signal_name in tag_item_names]
+
     def _get_input_port_signal_name(self, input_port: VhdlInstructionArgument) -> str:
         return input_port.get_input_port_signal_name()
 
@@ -228,10 +257,10 @@ class VhdlPortGenerator(PortGenerator):
             result.extend(VhdlMemoryPort().get_port_map(name=memory_interface_name, master=True, unknown_port_name=input_port.unnamed))
         return result
  
-    def get_output_port_map(self, output_port: Optional[LlvmOutputPort]) -> List[str]:
+    def get_output_port_map(self, output_port: Optional[LlvmOutputPort], signal_name: str = "m_tdata_i") -> List[str]:
         if output_port is None:
             return []
-        port_map = "m_tdata_i"
+        port_map = signal_name
         if output_port.port_name is not None:
             port_map = f"{output_port.get_name()} => {port_map}"
         return [port_map]
@@ -270,15 +299,24 @@ class VhdlPortGenerator(PortGenerator):
         argument_list = ", ".join(arguments)
         return f"{signal_name} <= get({argument_list});"
 
-    def get_standard_ports_map(self, instance: VhdlInstanceData) -> List[str]:
-        return [i.get_port_map(instance=instance) for i in self._standard_ports]
+    def get_standard_ports_map(self, instance: VhdlInstanceData, master_signal_prefix: Optional[str] = None) -> List[str]:
+        """
+        The master ports are mapped to <master_signal_prefix><port name>_i when a prefix is given
+        """
+        if master_signal_prefix is None:
+            return [i.get_port_map(instance=instance) for i in self._standard_ports]
+        return [f"{i.name} => {master_signal_prefix}{i.name}_i" if i.is_master() else i.get_port_map(instance=instance) for i in self._standard_ports]
     
     def _get_standard_port_signals(self, instance: VhdlInstanceData, port: VhdlPort) -> Optional[str]:
-        if not port.is_master():
+        if not port.is_master() and not (port.is_slave() and instance.parallel):
             return None
         signal_name = instance.get_own_instance_signal_name(port.name)
         return signal_name + port.get_port_type()
 
+    def get_standard_port_signal_name(self, instance: VhdlInstanceData, name: str) -> str:
+        port = next(i for i in self._standard_ports if i.name == name)
+        return port.get_signal_name(instance=instance)
+
     def get_standard_ports_signals(self, instance: VhdlInstanceData) -> List[str]:
         result = [self._get_standard_port_signals(instance=instance, port=i) for i in self._standard_ports]
         return [i for i in result if i is not None]
@@ -0,0 +1,385 @@
+from dataclasses import asdict, dataclass, field, fields
+import json
+import math
+import os
+from typing import Dict, List, Optional, Set
+
+from vhdl_latency_report import VhdlFunctionReport, VhdlInstanceReport
+
+@dataclass
+class VhdlOperatorCost:
+    """
+    lut_per_bit is multiplied with the operand width. dsp_per_block is multiplied with the number of
+    DSP blocks needed for the operand width, so that a 32 x 32 bit multiplier needs more than one block.
+    """
+    lut: float = 0.0
+    lut_per_bit: float = 0.0
+    dsp: int = 0
+    dsp_per_block: int = 0
+
+@dataclass
+class VhdlDeviceProfile:
+    """
+    The resource costs of a device family. The default values are typical for 6-input LUT FPGAs with
+    25 x 18 bit DSP multipliers and 36 kbit block RAMs.
+    The share fields are the cost of binding instances to a shared operator (see VhdlResourceSharingFactory):
+    the arbiter and control LUTs of each client, the operand multiplexer LUTs per operand bit and client,
+    and the number of LUTs that one DSP block is worth when deciding if sharing pays off.
+    A profile file is a json object with any of the fields below. The operators object is merged
+    with the default operators, for example:
+        {"name": "small", "bram_bits": 18432, "operators": {"llvm_mul": {"lut_per_bit": 30.0}}}
+    """
+    name: str = "generic"
+    call_tag_width: int = 32
+    memory_id_width: int = 8
+    memory_address_width: int = 32
+    memory_data_width: int = 32
+    bram_bits: int = 36864
+    bram_threshold_bits: int = 2048
+    lutram_bits_per_lut: int = 64
+    dsp_width_a: int = 25
+    dsp_width_b: int = 18
+    handshake_lut: float = 2.0
+    arbiter_lut_per_port: float = 40.0
+    share_client_lut: float = 8.0
+    share_mux_lut_per_bit: float = 0.5
+    share_dsp_lut: float = 100.0
+    operators: Dict[str, VhdlOperatorCost] = field(default_factory=lambda: {
+        "llvm_and": VhdlOperatorCost(lut_per_bit=0.5),
+        "llvm_or": VhdlOperatorCost(lut_per_bit=0.5),
+        "llvm_xor": VhdlOperatorCost(lut_per_bit=0.5),
+        "llvm_select": VhdlOperatorCost(lut_per_bit=1.0),
+        "llvm_eq": VhdlOperatorCost(lut_per_bit=0.34),
+        "llvm_ne": VhdlOperatorCost(lut_per_bit=0.34),
+        "llvm_shl": VhdlOperatorCost(lut_per_bit=2.5),
+        "llvm_lshr": VhdlOperatorCost(lut_per_bit=2.5),
+        "llvm_ashr": VhdlOperatorCost(lut_per_bit=2.5),
+        "llvm_add": VhdlOperatorCost(lut_per_bit=1.0),
+        "llvm_sub": VhdlOperatorCost(lut_per_bit=1.0),
+        "llvm_getelementptr": VhdlOperatorCost(lut_per_bit=1.0),
+        "llvm_mul": VhdlOperatorCost(lut=10.0, dsp_per_block=1),
+        "llvm_udiv": VhdlOperatorCost(lut_per_bit=32.0),
+        "llvm_sdiv": VhdlOperatorCost(lut_per_bit=32.0),
+        "llvm_urem": VhdlOperatorCost(lut_per_bit=32.0),
+        "llvm_srem": VhdlOperatorCost(lut_per_bit=32.0),
+        "llvm_fabs_f32": VhdlOperatorCost(),
+        "llvm_fcmp_uge": VhdlOperatorCost(lut=70.0),
+        "llvm_fcmp_ule": VhdlOperatorCost(lut=70.0),
+        "llvm_fadd": VhdlOperatorCost(lut=350.0),
+        "llvm_fmul": VhdlOperatorCost(lut=100.0, dsp=3),
+        "llvm_fmuladd_f32": VhdlOperatorCost(lut=450.0, dsp=3),
+        "llvm_load": VhdlOperatorCost(lut=50.0),
+        "llvm_store": VhdlOperatorCost(lut=50.0),
+        "llvm_alloca": VhdlOperatorCost(lut=20.0),
+    })
+
+    def _check_fields(self, values: Dict, file_name: str) -> None:
+        names = {i.name for i in fields(self)}
+        unknown = set(values) - names
+        assert not unknown, f"Unknown fields {sorted(unknown)} in device profile {file_name}, must be one of {sorted(names)}"
+
+    def _get_operators(self, values: Dict) -> Dict[str, VhdlOperatorCost]:
+        """
+        Returns the default operators updated with the operators of the profile file
+        """
+        operators = dict(self.operators)
+        operators.update((name, VhdlOperatorCost(**cost)) for name, cost in values.pop("operators", {}).items())
+        return operators
+
+    def read_file(self, file_name: str) -> "VhdlDeviceProfile":
+        with open(file_name, "r", encoding="utf-8") as file_handle:
+            values = json.load(file_handle)
+        assert isinstance(values, dict), f"Device profile {file_name} must contain a json object"
+        self._check_fields(values=values, file_name=file_name)
+        operators = self._get_operators(values=values)
+        profile = VhdlDeviceProfile(**{**asdict(self), **values})
+        profile.operators = operators
+        return profile
+
+@dataclass
+class VhdlResources:
+    lut: float = 0.0
+    ff: int = 0
+    dsp: int = 0
+    bram: int = 0
+    lutram: float = 0.0
+
+    def add(self, other: "VhdlResources", count: int = 1) -> None:
+        self.lut += other.lut * count
+        self.ff += other.ff * count
+        self.dsp += other.dsp * count
+        self.bram += other.bram * count
+        self.lutram += other.lutram * count
+
+    def get_rounded(self) -> Dict[str, int]:
+        return {"lut": math.ceil(self.lut + self.lutram), "ff": self.ff, "dsp": self.dsp, "bram": self.bram}
+
+@dataclass
+class VhdlEntityResources:
+    """
+    own: The resources of the entity itself
+    total: The resources including one copy of each called entity per call
+    """
+    entity_name: str
+    own: Dict[str, int]
+    total: Optional[Dict[str, int]]
+    unknown_entities: List[str]
+
+@dataclass
+class VhdlSharedOperatorResources:
+    """
+    saved: The resources of the operator or called function instances that are not needed, minus the
+           resources of the arbiter and the operand multiplexers and registers of the clients
+    added_latency: The clock cycles that each client has more than when it does not share the operator
+    """
+    entity_name: str
+    shared_operator: str
+    operator_entity_name: str
+    clients: List[str]
+    saved: Optional[Dict[str, int]]
+    added_latency: int
+
+class VhdlResourceEstimator:
+    """
+    Estimates the LUTs, flip-flops, DSP blocks and block RAMs of the generated entities from the instance graph.
+    Flip-flops: Each registered stage buffer holds the result, the live tag items, the call tag and the valid bit.
+    DSP blocks: Multipliers and floating point operators.
+    Block RAMs: Allocas and the tag storage of loads and stores that are larger than bram_threshold_bits,
+                smaller memories are distributed RAM in LUTs.
+    Calls to entities that are not in the module are counted as zero and listed as unknown.
+    Shared operators are counted once, each instance that uses them adds its operand multiplexer and registers.
+    A shared called function is counted once per shared operator instead of once per call.
+    """
+
+    def __init__(self, functions: List[VhdlFunctionReport], profile: VhdlDeviceProfile, aliases: Optional[Dict[str, str]] = None) -> None:
+        self._functions = {i.entity_name: i for i in functions}
+        self._order = [i.entity_name for i in functions]
+        self._profile = profile
+        self._aliases = {} if aliases is None else aliases
+        self._totals: Dict[str, Optional[VhdlResources]] = {}
+        self._active: Set[str] = set()
+
+    def _get_memory(self, bits: int) -> VhdlResources:
+        if bits <= 0:
+            return VhdlResources()
+        if bits > self._profile.bram_threshold_bits:
+            return VhdlResources(bram=math.ceil(bits / self._profile.bram_bits))
+        return VhdlResources(lutram=bits / self._profile.lutram_bits_per_lut)
+
+    def _get_dsp_blocks(self, width: int) -> int:
+        return math.ceil(width / self._profile.dsp_width_a) * math.ceil(width / self._profile.dsp_width_b)
+
+    def get_operator_resources(self, entity_name: str, width: int) -> VhdlResources:
+        cost = self._profile.operators.get(entity_name, VhdlOperatorCost())
+        return VhdlResources(lut=cost.lut + cost.lut_per_bit * width,
+                             dsp=cost.dsp + cost.dsp_per_block * self._get_dsp_blocks(width=width))
+
+    def get_share_client_resources(self, operand_bits: int) -> VhdlResources:
+        """
+        The arbiter request, operand multiplexer, operand registers and control of one instance that uses a shared operator
+        """
+        profile = self._profile
+        return VhdlResources(lut=profile.share_client_lut + profile.share_mux_lut_per_bit * operand_bits, ff=operand_bits + 3)
+
+    def _get_operand_width(self, instance: VhdlInstanceReport) -> int:
+        return instance.operand_width or instance.data_width or 0
+
+    def _get_operator(self, instance: VhdlInstanceReport) -> VhdlResources:
+        if instance.callee is not None:
+            return VhdlResources()
+        return self.get_operator_resources(entity_name=instance.entity_name, width=self._get_operand_width(instance=instance))
+
+    def _get_shared_operator(self, clients: List[VhdlInstanceReport]) -> VhdlResources:
+        instance = clients[0]
+        resources = self._get_operator(instance=instance)
+        resources.ff += (instance.data_width or 0) + len(clients) + 1
+        return resources
+
+    def _get_shared_operators(self, function: VhdlFunctionReport) -> Dict[str, List[VhdlInstanceReport]]:
+        shared_operators: Dict[str, List[VhdlInstanceReport]] = {}
+        for i in function.instances:
+            if i.shared_operator is not None:
+                shared_operators.setdefault(i.shared_operator, []).append(i)
+        return shared_operators
+
+    def _get_memory_interfaces(self) -> Dict[str, int]:
+        """
+        Returns the flip-flops of the memory interface of each memory accessing entity
+        """
+        profile = self._profile
+        interface = profile.memory_address_width + profile.memory_data_width + 2 * profile.memory_id_width
+        return {"llvm_load": interface, "llvm_store": interface}
+
+    def _get_tag_storage_bits(self, instance: VhdlInstanceReport) -> int:
+        if instance.entity_name not in self._get_memory_interfaces():
+            return 0
+        return 2 ** self._profile.memory_id_width * (instance.tag_bits + self._profile.call_tag_width)
+
+    def _get_stage_ff(self, instance: VhdlInstanceReport) -> int:
+        if instance.latency <= 0:
+            return 0
+        return (instance.data_width or 0) + instance.tag_bits + self._profile.call_tag_width + 1
+
+    def _get_share_client(self, instance: VhdlInstanceReport) -> VhdlResources:
+        return self.get_share_client_resources(operand_bits=self._get_operand_width(instance=instance) * instance.operands)
+
+    def _get_instance_operator(self, instance: VhdlInstanceReport) -> VhdlResources:
+        """
+        An instance of a shared operator only has its client side, a call has no operator
+        """
+        return self._get_operator(instance=instance) if instance.shared_operator is None else self._get_share_client(instance=instance)
+
+    def get_instance_resources(self, instance: VhdlInstanceReport) -> VhdlResources:
+        resources = VhdlResources(lut=self._profile.handshake_lut, 
+                                  ff=self._get_stage_ff(instance=instance) + self._get_memory_interfaces().get(instance.entity_name, 0))
+        resources.add(self._get_instance_operator(instance=instance))
+        resources.add(self._get_memory(bits=instance.memory_bits))
+        resources.add(self._get_memory(bits=self._get_tag_storage_bits(instance=instance)))
+        return resources
+
+    def get_own_resources(self, function: VhdlFunctionReport) -> VhdlResources:
+        resources = VhdlResources()
+        for i in function.instances:
+            resources.add(self.get_instance_resources(instance=i))
+        for clients in self._get_shared_operators(function=function).values():
+            resources.add(self._get_shared_operator(clients=clients))
+        resources.lut += sum(self._profile.arbiter_lut_per_port * i for i in function.memory_accessors if i > 1)
+        return resources
+
+    def _get_entity_name(self, entity_name: str) -> str:
+        return self._aliases.get(entity_name, entity_name)
+
+    def _get_callees(self, function: VhdlFunctionReport) -> List[str]:
+        """
+        Returns the callee of each call, a shared called function only once
+        """
+        callees = []
+        shared_operators: Set[str] = set()
+        for i in function.instances:
+            if i.callee is None or i.shared_operator in shared_operators:
+                continue
+            if i.shared_operator is not None:
+                shared_operators.add(i.shared_operator)
+            callees.append(i.callee)
+        return callees
+
+    def _add_callees(self, total: Optional[VhdlResources], callees: List[str]) -> Optional[VhdlResources]:
+        for callee in callees:
+            resources = self.get_total_resources(entity_name=callee)
+            if resources is None or total is None:
+                total = None
+            else:
+                total.add(resources)
+        return total
+
+    def get_total_resources(self, entity_name: str) -> Optional[VhdlResources]:
+        """
+        Returns None for recursive calls
+        """
+        entity_name = self._get_entity_name(entity_name=entity_name)
+        if entity_name in self._totals:
+            return self._totals[entity_name]
+        function = self._functions.get(entity_name)
+        if function is None:
+            return VhdlResources()
+        if entity_name in self._active:
+            return None
+        self._active.add(entity_name)
+        total = self._add_callees(total=self.get_own_resources(function=function), callees=self._get_callees(function=function))
+        self._active.discard(entity_name)
+        self._totals[entity_name] = total
+        return total
+
+    def _get_unknown_entities(self, function: VhdlFunctionReport) -> List[str]:
+        callees = {self._get_entity_name(entity_name=i.callee) for i in function.instances if i.callee is not None}
+        return sorted(i for i in callees if i not in self._functions)
+
+    def get_entity_resources(self) -> List[VhdlEntityResources]:
+        result = []
+        for name in self._order:
+            function = self._functions[name]
+            total = self.get_total_resources(entity_name=name)
+            result.append(VhdlEntityResources(entity_name=name, own=self.get_own_resources(function=function).get_rounded(),
+                                              total=None if total is None else total.get_rounded(),
+                                              unknown_entities=self._get_unknown_entities(function=function)))
+        return result
+
+    def _get_saved_resources(self, clients: List[VhdlInstanceReport]) -> Optional[VhdlResources]:
+        instance = clients[0]
+        saved = VhdlResources()
+        saved.add(self._get_shared_operator(clients=clients), count=-1)
+        if instance.callee is None:
+            saved.add(self._get_operator(instance=instance), count=len(clients))
+        else:
+            callee = self.get_total_resources(entity_name=instance.callee)
+            if callee is None:
+                return None
+            saved.add(callee, count=len(clients) - 1)
+        for i in clients:
+            saved.add(self.get_share_client_resources(operand_bits=self._get_operand_width(instance=i) * i.operands), count=-1)
+        return saved
+
+    def _get_shared_operator_resources(self, entity_name: str, shared_operator: str, 
+                                       clients: List[VhdlInstanceReport]) -> VhdlSharedOperatorResources:
+        saved = self._get_saved_resources(clients=clients)
+        return VhdlSharedOperatorResources(entity_name=entity_name, shared_operator=shared_operator,
+                                           operator_entity_name=clients[0].entity_name,
+                                           clients=[i.instance_name for i in clients],
+                                           saved=None if saved is None else saved.get_rounded(),
+                                           added_latency=max(i.added_latency for i in clients))
+
+    def get_shared_operator_resources(self) -> List[VhdlSharedOperatorResources]:
+        result = []
+        for name in self._order:
+            for shared_operator, clients in self._get_shared_operators(function=self._functions[name]).items():
+                result.append(self._get_shared_operator_resources(entity_name=name, shared_operator=shared_operator, clients=clients))
+        return result
+
+    def get_json(self) -> str:
+        return json.dumps({"device_profile": self._profile.name, "entities": [asdict(i) for i in self.get_entity_resources()],
+                           "shared_operators": [asdict(i) for i in self.get_shared_operator_resources()]}, indent=2)
+
+    def _get_values(self, resources: Optional[Dict[str, int]], keys: List[str]) -> List[str]:
+        """
+        Returns the resources of the keys, or ? for each key when they are not known
+        """
+        return ["?"] * len(keys) if resources is None else [str(resources[key]) for key in keys]
+
+    def _get_column_widths(self, rows: List[List[str]]) -> List[int]:
+        return [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+
+    def _get_table(self, rows: List[List[str]]) -> List[str]:
+        """
+        Returns the rows, the first of which is the header, with left aligned columns
+        """
+        widths = self._get_column_widths(rows=rows)
+        return ["  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows]
+
+    def _get_shared_operator_text(self) -> List[str]:
+        shared_operators = self.get_shared_operator_resources()
+        if not shared_operators:
+            return []
+        header = ["Entity", "Shared operator", "Clients", "Saved LUT", "Saved FF", "Saved DSP", "Added latency"]
+        keys = ["lut", "ff", "dsp"]
+        rows = [[i.entity_name, i.shared_operator, str(len(i.clients))] + self._get_values(resources=i.saved, keys=keys) + 
+                [str(i.added_latency)] for i in shared_operators]
+        return [""] + self._get_table(rows=[header] + rows)
+
+    def get_text(self) -> str:
+        header = ["Entity", "LUT", "FF", "DSP", "BRAM", "Total LUT", "Total FF", "Total DSP", "Total BRAM"]
+        keys = ["lut", "ff", "dsp", "bram"]
+        rows = [[i.entity_name] + self._get_values(resources=i.own, keys=keys) + self._get_values(resources=i.total, keys=keys)
+                for i in self.get_entity_resources()]
+        lines = [f"Device profile: {self._profile.name}"] + self._get_table(rows=[header] + rows)
+        return "\n".join(lines + self._get_shared_operator_text()) + "\n"
+
+    def get_file_names(self, file_name: str) -> List[str]:
+        base_name = os.path.splitext(file_name)[0]
+        return [f"{base_name}_resources.json", f"{base_name}_resources.txt"]
+
+    def write(self, file_name: str) -> None:
+        json_file_name, text_file_name = self.get_file_names(file_name=file_name)
+        with open(json_file_name, 'w', encoding="utf-8") as file_handle:
+            print(self.get_json(), file=file_handle)
+        with open(text_file_name, 'w', encoding="utf-8") as file_handle:
+            print(self.get_text(), file=file_handle, end="")
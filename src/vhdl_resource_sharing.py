@@ -0,0 +1,250 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from llvm_call_policy import LlvmCallPolicy
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_function_container import VhdlFunctionContainer
+from vhdl_function_contents import VhdlFunctionContents
+from vhdl_instance_container_data import VhdlInstanceContainerData
+from vhdl_instance_data import VhdlInstanceData
+from vhdl_port import VhdlPortGenerator
+from vhdl_resource_estimator import VhdlDeviceProfile, VhdlResourceEstimator
+
+@dataclass
+class VhdlSharedOperator:
+    """
+    One operator instance that is used by the client instances, which are in instruction order
+    """
+    name: str
+    clients: List[VhdlInstanceData]
+
+    def get_entity_instance(self) -> VhdlInstanceData:
+        return self.clients[0]
+
+class VhdlResourceSharingFactory:
+    """
+    Binds the instances of the shared entities of a function to one operator instance when the cost model
+    says that it pays off. Only instances with the same entity, generic map, operand widths and result width
+    are bound to the same operator. Every instruction is executed for every call, so all the instances of an
+    operator use it once per call and the initiation interval of the function becomes the number of clients.
+    The cost model compares the operator instances that are saved with the arbiter, multiplexers and registers
+    of the clients, where a DSP block is counted as share_dsp_lut LUTs of the device profile.
+    The calls to a function with the share call policy are always bound to one instance of the called function,
+    unless they access memory through pointer arguments.
+    Example with the default device profile:
+        2 x fmul float: saved 100 LUT + 3 DSP = 400 LUT, added 2 x (8 + 0.5 x 64) = 80 LUT -> shared
+        2 x add i32:    saved 32 LUT,                  added 2 x (8 + 0.5 x 64) = 80 LUT -> not shared
+    """
+
+    unshareable = {"llvm_load", "llvm_store", "llvm_alloca", "llvm_getelementptr"}
+
+    def __init__(self, profile: Optional[VhdlDeviceProfile] = None) -> None:
+        self._profile = VhdlDeviceProfile() if profile is None else profile
+        self._estimator = VhdlResourceEstimator(functions=[], profile=self._profile)
+
+    def get_shareable_entity_names(self) -> List[str]:
+        return sorted(i for i in self._profile.operators if i not in self.unshareable)
+
+    def get_entity_names(self, names: Iterable[str]) -> Tuple[str, ...]:
+        """
+        Returns the entity names of operator names like fmul or llvm_fmul
+        """
+        shareable = self.get_shareable_entity_names()
+        entity_names = []
+        for name in names:
+            entity_name = name if name.startswith("llvm_") else f"llvm_{name}"
+            assert entity_name in shareable, f"Operator {name} can not be shared, must be one of {[i.replace('llvm_', '', 1) for i in shareable]}"
+            entity_names.append(entity_name)
+        return tuple(entity_names)
+
+    def _get_width(self, width: Optional[str]) -> Optional[int]:
+        if width is None or not width.strip().isdigit():
+            return None
+        return int(width)
+
+    def _is_shared_call(self, instance: VhdlInstanceData, call_policy: LlvmCallPolicy) -> bool:
+        return instance.is_work_library() and call_policy.get(name=instance.entity_name) == "share"
+
+    def _is_requested(self, instance: VhdlInstanceData, entity_names: Tuple[str, ...], call_policy: LlvmCallPolicy) -> bool:
+        return instance.entity_name in entity_names or self._is_shared_call(instance=instance, call_policy=call_policy)
+
+    def _has_result(self, instance: VhdlInstanceData) -> bool:
+        return instance.output_port is not None and not instance.output_port.data_type.is_void()
+
+    def _accesses_memory(self, instance: VhdlInstanceData) -> bool:
+        return (instance.is_memory() or instance.access_register() or bool(instance.get_memory_instance_names()) or
+                any(i.is_pointer() for i in instance.input_ports))
+
+    def _has_fixed_latency(self, instance: VhdlInstanceData) -> bool:
+        """
+        A called function is shared even when its latency is variable, because its clients wait for the result
+        """
+        return not instance.has_variable_latency() or instance.is_work_library()
+
+    def _is_shareable(self, instance: VhdlInstanceData, entity_names: Tuple[str, ...], call_policy: LlvmCallPolicy) -> bool:
+        return (self._is_requested(instance=instance, entity_names=entity_names, call_policy=call_policy) and self._has_result(instance=instance) and
+                not self._accesses_memory(instance=instance) and self._has_fixed_latency(instance=instance))
+
+    def _get_key(self, instance: VhdlInstanceData) -> Tuple[str, ...]:
+        assert instance.output_port is not None
+        return (instance.entity_name, repr(instance.generic_map), instance.output_port.data_type.get_data_width(),
+                *[i.get_data_width() for i in instance.input_ports])
+
+    def _get_operand_widths(self, instance: VhdlInstanceData) -> List[int]:
+        """
+        Returns an empty list when a width is unknown
+        """
+        widths = [self._get_width(i.get_data_width()) for i in instance.input_ports]
+        known = [i for i in widths if i is not None]
+        return known if len(known) == len(widths) else []
+
+    def get_saving(self, clients: List[VhdlInstanceData]) -> Optional[float]:
+        """
+        Returns the saved LUTs when the clients share one operator, or None when the widths are unknown
+        """
+        widths = self._get_operand_widths(instance=clients[0])
+        if not widths:
+            return None
+        operator = self._estimator.get_operator_resources(entity_name=clients[0].entity_name, width=max(widths))
+        operator_lut = operator.lut + operator.dsp * self._profile.share_dsp_lut
+        client_lut = self._estimator.get_share_client_resources(operand_bits=sum(widths)).lut
+        return (len(clients) - 1) * operator_lut - len(clients) * client_lut
+
+    def _is_paying_off(self, clients: List[VhdlInstanceData]) -> bool:
+        if len(clients) < 2:
+            return False
+        if clients[0].is_work_library():
+            return True
+        saving = self.get_saving(clients=clients)
+        return saving is not None and saving > 0
+
+    def _get_candidates(self, instances: VhdlInstanceContainerData, entity_names: Tuple[str, ...],
+                        call_policy: LlvmCallPolicy) -> List[List[VhdlInstanceData]]:
+        """
+        Returns the shareable instances grouped by their entity, generics and widths
+        """
+        candidates: Dict[Tuple[str, ...], List[VhdlInstanceData]] = {}
+        for i in instances.instances:
+            if self._is_shareable(instance=i, entity_names=entity_names, call_policy=call_policy):
+                candidates.setdefault(self._get_key(instance=i), []).append(i)
+        return list(candidates.values())
+
+    def _get_operator(self, clients: List[VhdlInstanceData], number: int) -> VhdlSharedOperator:
+        operator = VhdlSharedOperator(name=f"{clients[0].entity_name}_share_{number}", clients=clients)
+        for i in clients:
+            i.shared_operator = operator.name
+        return operator
+
+    def get(self, instances: VhdlInstanceContainerData, entity_names: Tuple[str, ...], 
+            call_policy: LlvmCallPolicy = LlvmCallPolicy()) -> List[VhdlSharedOperator]:
+        """
+        Sets the shared operator of the instances that are bound to a shared operator
+        """
+        operators: List[VhdlSharedOperator] = []
+        for clients in self._get_candidates(instances=instances, entity_names=entity_names, call_policy=call_policy):
+            if self._is_paying_off(clients=clients):
+                operators.append(self._get_operator(clients=clients, number=len(operators) + 1))
+        return operators
+
+class VhdlSharedOperatorWriter:
+    """
+    Writes the operator instance of a shared operator and its arbiter.
+    The arbiter grants the requesting client that is furthest down the pipeline, so the oldest call is served first.
+    The grant is carried through the operator as its tag and selects the client that registers the result.
+    The clients always register the result, so the operator output is never stalled (m_tready => '1').
+    """
+
+    def _get_client_signal_name(self, client: VhdlInstanceData, signal_name: str) -> str:
+        return client.get_own_instance_signal_name(signal_name)
+
+    def _add_signals(self, operator: VhdlSharedOperator, container: VhdlFunctionContainer) -> None:
+        signals: List[str] = []
+        for client in operator.clients:
+            signals.extend(f"{self._get_client_signal_name(client=client, signal_name=i)} : std_ulogic" for i in ["share_request", "share_grant", "share_valid"])
+            signals.extend(f"{self._get_client_signal_name(client=client, signal_name=f'share_operand_{index}')} : std_ulogic_vector(0 to {port.get_data_width()} - 1)"
+                           for index, port in enumerate(client.input_ports))
+        signals.append(f"{operator.name}_m_tdata_i : {operator.get_entity_instance().get_output_port_type()}")
+        container.instance_signals.add(signals)
+
+    def _get_operand_assignments(self, client: VhdlInstanceData, indent: str) -> List[str]:
+        return [f"{indent}operand_{index}_i <= {self._get_client_signal_name(client=client, signal_name=f'share_operand_{index}')};"
+                for index in range(len(client.input_ports))]
+
+    def _get_arbiter(self, operator: VhdlSharedOperator) -> str:
+        last_client = operator.clients[-1]
+        lines = ["  grant_i <= (others => '0');"] + self._get_operand_assignments(client=last_client, indent="  ")
+        for index, client in reversed(list(enumerate(operator.clients))):
+            keyword = "if" if client is last_client else "elsif"
+            lines.append(f"  {keyword} {self._get_client_signal_name(client=client, signal_name='share_request')} = '1' then")
+            lines.append(f"    grant_i({index}) <= '1';")
+            lines.extend(self._get_operand_assignments(client=client, indent="    "))
+        lines.append("  end if;")
+        return "\n".join(lines)
+
+    def _get_client_assignments(self, operator: VhdlSharedOperator) -> str:
+        lines = []
+        for index, client in enumerate(operator.clients):
+            lines.append(f"{self._get_client_signal_name(client=client, signal_name='share_grant')} <= grant_i({index}) and s_tready_i;")
+            lines.append(f"{self._get_client_signal_name(client=client, signal_name='share_valid')} <= m_tvalid_i and m_tag_i({index});")
+        return "\n".join(lines)
+
+    def _get_port_map(self, operator: VhdlSharedOperator) -> str:
+        instance = operator.get_entity_instance()
+        input_ports_map = [f"{port.port_name} => operand_{index}_i" if port.port_name is not None else f"operand_{index}_i"
+                           for index, port in enumerate(instance.input_ports)]
+        output_port_map = VhdlPortGenerator().get_output_port_map(output_port=instance.output_port, signal_name=f"{operator.name}_m_tdata_i")
+        standard_port_map = ["clk => clk", "sreset => sreset", "s_tvalid => s_tvalid_i", "s_tready => s_tready_i",
+                             "m_tvalid => m_tvalid_i", "m_tready => '1'"]
+        tag_port_map = ["s_tag => grant_i", "m_tag => m_tag_i"]
+        return ",\n".join(["-- Input ports"] + input_ports_map + ["-- Output ports"] + output_port_map +
+                          ["-- Standard port map"] + standard_port_map + ["-- Tag port map"] + tag_port_map)
+
+    def _get_generic_map(self, operator: VhdlSharedOperator) -> str:
+        generic_map = operator.get_entity_instance().generic_map
+        if generic_map is None:
+            return ""
+        return f"""
+generic map (
+{", ".join(generic_map)}
+)
+        """
+
+    def _write_operator(self, operator: VhdlSharedOperator, function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
+        instance = operator.get_entity_instance()
+        if not instance.is_work_library():
+            function_contents.append_instance(instance.entity_name)
+        self._add_signals(operator=operator, container=container)
+        operands = "\n".join(f"signal operand_{index}_i : std_ulogic_vector(0 to {port.get_data_width()} - 1);"
+                             for index, port in enumerate(instance.input_ports))
+        clients = ", ".join(i.instance_name for i in operator.clients)
+        comment = VhdlCommentGenerator().get_comment()
+        function_contents.write_body(f"""
+{comment}
+-- Shared by {clients}
+{operator.name}_b : block
+signal grant_i, m_tag_i : std_ulogic_vector(0 to {len(operator.clients)} - 1);
+signal s_tvalid_i, s_tready_i, m_tvalid_i : std_ulogic;
+{operands}
+begin
+
+process (all)
+begin
+{self._get_arbiter(operator=operator)}
+end process;
+
+s_tvalid_i <= or grant_i;
+{self._get_client_assignments(operator=operator)}
+
+{operator.name}_inst : entity {instance.library}.{instance.entity_name}
+{self._get_generic_map(operator=operator)}
+port map (
+{self._get_port_map(operator=operator)}
+);
+
+end block {operator.name}_b;
+
+        """)
+
+    def write_operators(self, operators: List[VhdlSharedOperator], function_contents: VhdlFunctionContents, container: VhdlFunctionContainer) -> None:
+        for i in operators:
+            self._write_operator(operator=i, function_contents=function_contents, container=container)
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+from ports import PortContainer
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_declarations import VhdlSignal
+from vhdl_instance_container_data import VhdlInstanceContainerData
+from vhdl_instance_data import VhdlInstanceData
+from vhdl_port import VhdlPortGenerator
+
+@dataclass
+class VhdlStageTag:
+    """
+    The tag items carried through the buffer of one instance, together with their widths.
+    The conversion functions are declared in the block of the instance
+    and hide the tag_t record items that are not live.
+    """
+    items: List[Tuple[str, str]]
+
+    def _get_names(self) -> List[str]:
+        return [name for name, _ in self.items]
+
+    def _get_width(self) -> str:
+        return " + ".join(width for _, width in self.items)
+
+    def _get_conv_tag_assignment(self) -> str:
+        assign_items = [f"result_v.{i}" for i in self._get_names()]
+        if len(assign_items) == 1:
+            return f"{assign_items[0]} := arg;"
+        return "(" + ", ".join(assign_items) + ") := arg;"
+
+    def _get_conv_tag(self) -> str:
+        return f"""
+function conv_tag (
+  arg : std_ulogic_vector(0 to c_tag_width - 1)) return tag_t is
+  variable result_v : tag_t;
+begin
+  {self._get_conv_tag_assignment()}
+  return result_v;
+end function conv_tag;
+"""
+
+    def _get_tag_to_std_ulogic_vector(self) -> str:
+        assign_arg = " & ".join(f"arg.{i}" for i in self._get_names())
+        return f"""
+function tag_to_std_ulogic_vector (
+  arg : tag_t) return std_ulogic_vector is
+begin
+  return {assign_arg};
+end function tag_to_std_ulogic_vector;
+"""
+
+    def get_declarations(self) -> str:
+        comment = VhdlCommentGenerator().get_comment()
+        return f"""
+{comment}
+constant c_tag_width : natural := {self._get_width()};
+{self._get_conv_tag()}
+{self._get_tag_to_std_ulogic_vector()}
+"""
+
+@dataclass
+class VhdlTagLiveness:
+    """
+    The tag items that are live at the output of each stage.
+    An item is live when a later stage reads it or when it drives the function output.
+    The own result of an instance is assigned after its buffer and is not carried through it.
+    In a parallel stage only the first instance carries the live items, the other instances only carry the tag.
+    Example:
+        %mul = mul nsw i32 %a, %b   -> tag, c
+        %add = add nsw i32 %mul, %c -> tag
+        ret i32 %add
+    """
+    stage_tags: Dict[str, VhdlStageTag]
+
+    def get_stage_tag(self, instance_name: str) -> VhdlStageTag:
+        return self.stage_tags[instance_name]
+
+class VhdlTagLivenessFactory:
+
+    def _get_stages(self, instances: VhdlInstanceContainerData) -> List[List[str]]:
+        if instances.stages:
+            return [i.instance_names for i in instances.stages]
+        return [[i.instance_name] for i in instances.instances]
+
+    def _get_output_items(self, instances: VhdlInstanceContainerData) -> Set[str]:
+        """
+        Returns the tag items that are live at the function output
+        """
+        live = {"tag"}
+        if instances.instances:
+            live.add(instances.get_return_instruction_driver())
+        return live
+
+    def _add_stage_tags(self, stage: List[str], live: Set[str], widths: List[Tuple[str, str]], stage_tags: Dict[str, VhdlStageTag]) -> None:
+        first_instance, *other_instances = stage
+        stage_tags[first_instance] = VhdlStageTag(items=[(name, width) for name, width in widths if name in live])
+        stage_tags.update({i: VhdlStageTag(items=widths[:1]) for i in other_instances})
+
+    def _get_tag_inputs(self, stage: List[str], instance_map: Dict[str, VhdlInstanceData], tag_item_names: Set[str]) -> Set[str]:
+        port_generator = VhdlPortGenerator()
+        return {name for i in stage for name in port_generator.get_tag_input_names(instance=instance_map[i], tag_item_names=tag_item_names)}
+
+    def get(self, instances: VhdlInstanceContainerData, ports: PortContainer, signals: List[VhdlSignal]) -> VhdlTagLiveness:
+        widths = VhdlPortGenerator().get_tag_element_widths(ports=ports, signals=signals)
+        tag_item_names = {name for name, _ in widths}
+        instance_map = {i.instance_name: i for i in instances.instances}
+        live = self._get_output_items(instances=instances)
+        stage_tags: Dict[str, VhdlStageTag] = {}
+        for stage in reversed(self._get_stages(instances=instances)):
+            live.difference_update(stage)
+            self._add_stage_tags(stage=stage, live=live, widths=widths, stage_tags=stage_tags)
+            live.update(self._get_tag_inputs(stage=stage, instance_map=instance_map, tag_item_names=tag_item_names))
+        return VhdlTagLiveness(stage_tags=stage_tags)
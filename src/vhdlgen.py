@@ -1,28 +1,172 @@
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import List, Optional, Tuple
 
 from file_writer import VhdlFunctionContents, VhdlFunctionGenerator, FilePrinter
 from function_parser import FunctionParser
+from llvm_call_policy import LlvmCallInliner, LlvmCallPolicy
+from llvm_constant_memory import LlvmConstantLoadPass
 from llvm_function import LlvmFunction
-from llvm_globals_container import GlobalsContainer
+from llvm_memory_partitioning import LlvmMemoryPartitioner
+from llvm_optimizer import LlvmOptimizer, LlvmOptimizerStatistics, LlvmPassStatistics
 from llvm_parser import LlvmModule
+from vhdl_comment_generator import VhdlCommentGenerator
+from vhdl_function_cache import VhdlFunctionCache
+from vhdl_function_container import VhdlFunctionContainer
 from vhdl_function_definition import VhdlFunctionDefinitionFactory
+from vhdl_generator_options import VhdlGeneratorOptions
+from vhdl_globals_generator import VhdlGlobalsGenerator, VhdlModuleGlobals
+from vhdl_latency_report import VhdlFunctionReportFactory, VhdlLatencyReport
+from vhdl_memory_arbiter import VhdlMemoryArbiterFactory
+from vhdl_resource_estimator import VhdlDeviceProfile, VhdlResourceEstimator
 
 class VhdlGen:
 
-    def _write_function(self, function: LlvmFunction, file_generator: VhdlFunctionGenerator, globals: GlobalsContainer) -> VhdlFunctionContents:
-        parsed_functions = FunctionParser().parse(function=function)
-        translated_vhdl_function = VhdlFunctionDefinitionFactory().get(function_definition=parsed_functions, globals=globals)
-        return file_generator.write_function(function=translated_vhdl_function)    
-
-    def _generate_function(self, module: LlvmModule, function: LlvmFunction) -> VhdlFunctionContents:
-        file_generator = VhdlFunctionGenerator()
-        module.write_globals(file_writer=file_generator)
-        return self._write_function(function=function, file_generator=file_generator, globals=module.globals)    
-
-    def parse(self, file_name: str, module: LlvmModule) -> None:
-        file_contents: List[VhdlFunctionContents] = [
-            self._generate_function(module=module, function=function)
-            for function in module.functions.functions
-        ]
+    pipeline_passes = (LlvmCallInliner.name, LlvmConstantLoadPass.name, LlvmMemoryPartitioner.name)
+
+    # The optimization passes that need the module globals, they are run before the memory partitioning
+    module_passes = (LlvmConstantLoadPass.name,)
+
+    optimization_passes = module_passes + tuple(LlvmOptimizer.passes)
+
+    def _load_constants(self, module: LlvmModule, function: LlvmFunction, 
+                        options: VhdlGeneratorOptions) -> Tuple[LlvmFunction, List[LlvmPassStatistics]]:
+        """
+        Runs the constant-loads pass when it is one of the optimization passes
+        """
+        if LlvmConstantLoadPass.name not in options.optimization_passes:
+            return function, []
+        statistics = LlvmPassStatistics(pass_name=LlvmConstantLoadPass.name, functions=1)
+        function = replace(function, instructions=LlvmConstantLoadPass(constants=module.globals).run(instructions=function.instructions, 
+                                                                                                    statistics=statistics))
+        return function, [statistics] if statistics.removed_instructions > 0 else []
+
+    def _get_function_passes(self, options: VhdlGeneratorOptions) -> Tuple[str, ...]:
+        return tuple(i for i in options.optimization_passes if i not in self.module_passes)
+
+    def generate_function(self, module: LlvmModule, function: LlvmFunction, module_globals: VhdlModuleGlobals, 
+                          options: VhdlGeneratorOptions = VhdlGeneratorOptions()) -> VhdlFunctionContents:
+        call_policy = LlvmCallPolicy(items=options.call_policy)
+        function, inline_statistics = LlvmCallInliner(functions=module.functions, policy=call_policy).run(function=function)
+        function, constant_load_statistics = self._load_constants(module=module, function=function, options=options)
+        function, partition_statistics = LlvmMemoryPartitioner(scheme=options.memory_partitioning, 
+                                                               banks=options.memory_banks).run(function=function)
+        function, pass_statistics = LlvmOptimizer(pass_names=self._get_function_passes(options=options)).run(function=function)
+        if options.memory_partitioning is not None:
+            pass_statistics = [partition_statistics] + pass_statistics
+        pass_statistics = constant_load_statistics + pass_statistics
+        if call_policy.has_policy(policy="inline"):
+            pass_statistics = [inline_statistics] + pass_statistics
+        parsed_functions = FunctionParser().parse(function=function, narrow_widths=options.narrow_widths, reorder_memory=options.reorder_memory)
+        translated_vhdl_function = VhdlFunctionDefinitionFactory().get(function_definition=parsed_functions, globals=module.globals)
+        access_counts = {} if options.memory_arbiter != "weighted" else VhdlMemoryArbiterFactory().get_access_counts(functions=module.functions, aliases=module_globals.aliases)
+        function_generator = VhdlFunctionGenerator(container=VhdlFunctionContainer(options=options, memory_access_counts=access_counts))
+        contents = function_generator.write_function(function=translated_vhdl_function, module_globals=module_globals)
+        contents.report = VhdlFunctionReportFactory().get(function=translated_vhdl_function, container=function_generator.container)
+        contents.pass_statistics = pass_statistics
+        return contents
+
+    def _generate_functions(self, module: LlvmModule, module_globals: VhdlModuleGlobals, function_indexes: List[int], jobs: int, 
+                            options: VhdlGeneratorOptions) -> List[VhdlFunctionContents]:
+        functions = module.functions.functions
+        if jobs <= 1 or len(function_indexes) <= 1:
+            return [
+                self.generate_function(module=module, function=functions[i], module_globals=module_globals, options=options)
+                for i in function_indexes
+            ]
+        source_comment_mode = VhdlCommentGenerator().get_mode()
+        with ProcessPoolExecutor(max_workers=jobs, initializer=VhdlGenWorker().initialize, 
+                                 initargs=(module, module_globals, source_comment_mode, options)) as executor:
+            return list(executor.map(VhdlGenWorker().generate_function, function_indexes))
+
+    def _get_cached_contents(self, module: LlvmModule, keys: List[str], cache: VhdlFunctionCache) -> List[Optional[VhdlFunctionContents]]:
+        return [cache.get(key=i, first_line=j.digest.first_line) for i, j in zip(keys, module.functions.functions)]
+
+    def _generate_cached_functions(self, module: LlvmModule, module_globals: VhdlModuleGlobals, jobs: int, cache: VhdlFunctionCache, 
+                                   options: VhdlGeneratorOptions) -> List[VhdlFunctionContents]:
+        """
+        Only the functions that are not found in the cache are generated
+        """
+        keys = cache.get_keys(module=module, module_globals=module_globals, options=options)
+        cached_contents = self._get_cached_contents(module=module, keys=keys, cache=cache)
+        missing_indexes = [index for index, contents in enumerate(cached_contents) if contents is None]
+        generated_contents = self._generate_functions(module=module, module_globals=module_globals, function_indexes=missing_indexes, jobs=jobs, options=options)
+        self._add_generated_functions(module=module, keys=keys, cache=cache, cached_contents=cached_contents, 
+                                      function_indexes=missing_indexes, generated_contents=generated_contents)
+        cache.evict()
+        return [contents for contents in cached_contents if contents is not None]
+
+    def _add_generated_functions(self, module: LlvmModule, keys: List[str], cache: VhdlFunctionCache, 
+                                 cached_contents: List[Optional[VhdlFunctionContents]], function_indexes: List[int], 
+                                 generated_contents: List[VhdlFunctionContents]) -> None:
+        """
+        Puts the generated functions in the cache and in the place of the missing cached functions
+        """
+        functions = module.functions.functions
+        for index, contents in zip(function_indexes, generated_contents):
+            cache.put(key=keys[index], contents=contents, first_line=functions[index].digest.first_line)
+            cached_contents[index] = contents
+
+    def _get_file_contents(self, module: LlvmModule, module_globals: VhdlModuleGlobals, jobs: int, cache: Optional[VhdlFunctionCache], 
+                           options: VhdlGeneratorOptions) -> List[VhdlFunctionContents]:
+        if cache is None:
+            function_indexes = list(range(len(module.functions.functions)))
+            return self._generate_functions(module=module, module_globals=module_globals, function_indexes=function_indexes, jobs=jobs, options=options)
+        return self._generate_cached_functions(module=module, module_globals=module_globals, jobs=jobs, cache=cache, options=options)
+
+    def _write_reports(self, file_name: str, file_contents: List[VhdlFunctionContents], module_globals: VhdlModuleGlobals, report: bool, 
+                       device_profile: Optional[VhdlDeviceProfile]) -> None:
+        reports = [i.report for i in file_contents if i.report is not None]
+        if report:
+            VhdlLatencyReport(functions=reports, aliases=module_globals.aliases).write(file_name=file_name)
+        if device_profile is not None:
+            VhdlResourceEstimator(functions=reports, profile=device_profile, aliases=module_globals.aliases).write(file_name=file_name)
+
+    def _get_optimizer_statistics(self, file_contents: List[VhdlFunctionContents], options: VhdlGeneratorOptions) -> LlvmOptimizerStatistics:
+        optimizer_statistics = LlvmOptimizerStatistics(order=self.pipeline_passes + options.optimization_passes)
+        for i in file_contents:
+            optimizer_statistics.add(statistics=i.pass_statistics)
+        return optimizer_statistics
+
+    def parse(self, file_name: str, module: LlvmModule, jobs: int = 1, cache: Optional[VhdlFunctionCache] = None, 
+              options: VhdlGeneratorOptions = VhdlGeneratorOptions(), report: bool = False, 
+              device_profile: Optional[VhdlDeviceProfile] = None) -> LlvmOptimizerStatistics:
+        """
+        jobs > 1 generates the functions in a pool of processes. 
+        The contents are written in the same order as the functions in the module.
+        The module globals are generated once and shared by all functions.
+        Functions that are unchanged since a previous run are read from the cache when it is given.
+        The static latency report is written to <file_name>_report.json and <file_name>_report.txt when report is set.
+        The resource estimate is written to <file_name>_resources.json and <file_name>_resources.txt when a device profile is given.
+        Returns the statistics of the optimization passes summed over all functions.
+        """
+        module_globals = VhdlGlobalsGenerator().generate(module=module, file_name=file_name)
+        file_contents = self._get_file_contents(module=module, module_globals=module_globals, jobs=jobs, cache=cache, options=options)
         file_printer = FilePrinter()
-        file_printer.generate(file_name=file_name, contents=file_contents)
+        file_printer.generate(file_name=file_name, contents=file_contents, module_globals=module_globals)
+        self._write_reports(file_name=file_name, file_contents=file_contents, module_globals=module_globals, report=report, 
+                            device_profile=device_profile)
+        return self._get_optimizer_statistics(file_contents=file_contents, options=options)
+
+class VhdlGenWorker:
+    """
+    Generates functions in a worker process. 
+    The module is sent once to each worker when the worker is started.
+    """
+
+    _module: Optional[LlvmModule] = None
+    _module_globals: Optional[VhdlModuleGlobals] = None
+    _options: VhdlGeneratorOptions = VhdlGeneratorOptions()
+
+    def initialize(self, module: LlvmModule, module_globals: VhdlModuleGlobals, source_comment_mode: str, options: VhdlGeneratorOptions) -> None:
+        VhdlGenWorker._module = module
+        VhdlGenWorker._module_globals = module_globals
+        VhdlGenWorker._options = options
+        VhdlCommentGenerator().set_mode(mode=source_comment_mode)
+
+    def generate_function(self, function_index: int) -> VhdlFunctionContents:
+        module = self._module
+        module_globals = self._module_globals
+        assert module is not None and module_globals is not None, "Worker has not been initialized with a module"
+        function = module.functions.functions[function_index]
+        return VhdlGen().generate_function(module=module, function=function, module_globals=module_globals, options=self._options)
@@ -17,5 +17,8 @@ ruff check src/*.py
 echo "Running unit tests"
 $SCRIPTPATH/unit_tests.sh
 
+echo "Running memory arbiter test"
+$SCRIPTPATH/vhdl/arbiter_test.sh
+
 echo "Running module test"
 $SCRIPTPATH/test/cpp/tests.sh
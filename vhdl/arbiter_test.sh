@@ -0,0 +1,36 @@
+#!/bin/bash
+
+# Simulates memory.arbiter with fixed priority, round robin and weighted arbitration,
+# with a limit on the reads in flight and with register slices
+
+set -e
+
+SCRIPT=$(realpath $0)
+SCRIPTPATH=$(dirname $SCRIPT)
+
+memory_path=$SCRIPTPATH/../lib/memory
+
+ghdl_arguments="--std=08 -Wno-hide"
+
+work_path=$(mktemp -d)
+
+cd $work_path
+
+for i in register_slice arbiter; do
+    ghdl -i $ghdl_arguments $memory_path/$i.vhd
+done
+ghdl -i $ghdl_arguments $SCRIPTPATH/../lib/test/arbiter_test.vhd
+
+ghdl -m $ghdl_arguments arbiter_test
+
+ghdl -e $ghdl_arguments arbiter_test
+
+ghdl -r $ghdl_arguments arbiter_test
+ghdl -r $ghdl_arguments arbiter_test -gg_round_robin=true
+ghdl -r $ghdl_arguments arbiter_test -gg_round_robin=true -gg_weighted=true
+ghdl -r $ghdl_arguments arbiter_test -gg_round_robin=true -gg_weighted=true -gg_outstanding=1
+ghdl -r $ghdl_arguments arbiter_test -gg_round_robin=true -gg_weighted=true -gg_registers=1
+
+cd -
+
+rm -rf $work_path
@@ -26,10 +26,11 @@ llvm_instances=$(echo "$common_llvm_instances $instances")
 for i in $llvm_instances; do
     ghdl -i $ghdl_arguments --work=llvm $llvm_path/$i.vhd
 done
-memory_instances="arbiter"
+memory_instances="register_slice arbiter"
 for i in $memory_instances; do
     ghdl -i $ghdl_arguments --work=memory $memory_path/$i.vhd
 done
+ghdl -i $ghdl_arguments --work=work ${file_name%.cpp}_pkg.vhd
 vhdl_file_name=${file_name%.cpp}.vhd
 ghdl -i $ghdl_arguments --work=work $vhdl_file_name
 
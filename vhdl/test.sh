@@ -2,6 +2,9 @@
 
 file_name=$(realpath $1)
 
+# Optional number of calls that are issued back to back by the testbench
+calls=${2:-1}
+
 set -e
 
 SCRIPT=$(realpath $0)
@@ -29,7 +32,7 @@ ghdl -m $ghdl_arguments test_main
 
 ghdl -e $ghdl_arguments test_main
 
-ghdl -r $ghdl_arguments test_main --vcd=${vcd_file_name} --wave=${wave_file_name}
+ghdl -r $ghdl_arguments test_main -gg_calls=$calls --vcd=${vcd_file_name} --wave=${wave_file_name}
 
 EXIT_CODE=$?
 